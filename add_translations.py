@@ -1,5 +1,7 @@
 import sqlite3
 
+from db_utils import bump_cache_version
+
 # En yaygın İngilizce kelimeler ve Türkçe çevirileri
 common_words = {
     # Selamlaşma
@@ -1198,6 +1200,8 @@ for english, turkish in common_words.items():
         """, (english, turkish, f"This is an example with {english}.")) 
         inserted += 1
 
+# Kelime deposu ve word index yeni çevirileri görsün
+bump_cache_version(cursor, 'words')
 conn.commit()
 
 # Sonuçları kontrol et
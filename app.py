@@ -1,9 +1,14 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, g
 from backend.rules import analyze_sentence
 from backend.ai_utils import grammar_feedback_json, pronunciation_feedback, generate_sentence, personalized_feedback, generate_custom_lesson, mistake_feedback
 from backend.speech_stt import recognize_from_audio_file, recognize_from_blob
-from db_utils import get_db_connection, get_db, get_user_id, create_or_get_user, update_review_result, record_mistake, register_user, login_user, get_user_mistakes
+from db_utils import get_db_connection, get_db, create_or_get_user, record_mistake, register_user, login_user, get_user_mistakes_page, init_db, seed_topics_from_repo
 from backend.recommender import get_review_quiz
+from backend import srs
+from backend import memory_model
+from backend import selection
+from backend import feedback_cache
+from backend import word_search
 from translation_utils import get_translation, check_answer
 from user_db import UserInputLogger
 from features.user_stats import UserStats
@@ -12,7 +17,17 @@ from features.leaderboard import LeaderboardManager
 from features.notifications import NotificationManager
 from features.social import SocialManager
 from features.courses import CourseManager
-from features.course_system import course_system
+from features.course_system import course_system, LESSON_VARIANTS
+from features.placement import placement_engine, MAX_ITEMS as PLACEMENT_MAX_ITEMS
+import warmup
+import query_stats
+import profile_summary
+import retention
+import vocab_store
+from user_context import current_user, invalidate as invalidate_user
+from log_utils import get_logger
+from pagination import InvalidCursor, decode_cursor, clamp_page_size
+import click
 import json
 import random
 from datetime import datetime
@@ -67,6 +82,11 @@ app.secret_key = os.environ.get("SECRET_KEY", "dev_secret_key_change_in_producti
 # Rate limiter instance
 rate_limiter = RateLimiter(max_requests=20, window_seconds=60)
 
+# /api/mistake-feedback/batch tek istekte en fazla bu kadar hata
+MAX_FEEDBACK_BATCH = 20
+
+log = get_logger("app")
+
 # Managers'ı başlat
 logger = UserInputLogger()
 stats_manager = UserStats()
@@ -74,8 +94,133 @@ goal_manager = GoalManager()
 leaderboard_manager = LeaderboardManager()
 notification_manager = NotificationManager()
 social_manager = SocialManager()
+feed_manager = social_manager.feed
 course_manager = CourseManager()
 
+# ==================== BAŞLATMA KOMUTLARI ====================
+
+def init_app_db():
+    """Tabloları oluştur ve seed verilerini ekle (import sırasında değil, açıkça çağrılır)."""
+    init_db()
+    seed_topics_from_repo()
+    course_system.initialize()
+    profile_summary.rebuild()
+    memory_model.backfill()
+
+
+@app.cli.command("init-db")
+def init_db_command():
+    """Veritabanını hazırla: `flask --app app init-db`"""
+    init_app_db()
+
+
+@app.cli.command("refresh-leaderboards")
+def refresh_leaderboards_command():
+    """Kategori sıralamalarını yenile (cron için): `flask --app app refresh-leaderboards`"""
+    leaderboard_manager.refresh_category_rankings()
+
+@app.cli.command("archive-logs")
+@click.option("--days", default=retention.RETENTION_DAYS, show_default=True, help="Sıcak tablolarda tutulacak gün")
+@click.option("--enable-incremental-vacuum", is_flag=True, help="Mevcut DB'yi auto_vacuum=INCREMENTAL'a çevir (tam VACUUM)")
+def archive_logs_command(days, enable_incremental_vacuum):
+    """Eski olayları rollup'la, aylık arşive taşı, incremental VACUUM (cron için): `flask --app app archive-logs`"""
+    if enable_incremental_vacuum:
+        retention.enable_incremental_vacuum()
+    click.echo(json.dumps(retention.run(days=days), indent=2))
+
+@app.cli.command("materialize-lessons")
+@click.option("--variants", default=LESSON_VARIANTS, show_default=True, help="Ders başına soru seti")
+@click.option("--full", is_flag=True, help="Değişmemiş dersler dahil hepsini yeniden üret")
+def materialize_lessons_command(variants, full):
+    """Ders sorularını toplu üret (artımlı; kelimeler değişince cron/deploy sonrası): `flask --app app materialize-lessons`"""
+    click.echo(json.dumps(course_system.materialize_lessons(variants, full), indent=2))
+
+@app.cli.command("build-search-fts")
+@click.option("--drop", is_flag=True, help="FTS5 tablosunu ve trigger'larını kaldır")
+def build_search_fts_command(drop):
+    """Kelime araması için isteğe bağlı FTS5 index'i (kelime deposu kapalıyken kullanılır)."""
+    if drop:
+        word_search.drop_fts()
+        click.echo("words_fts kaldırıldı")
+    else:
+        click.echo(f"words_fts: {word_search.build_fts()} kelime")
+
+# ==================== SORGU İSTATİSTİKLERİ ====================
+
+@app.before_request
+def _begin_query_stats():
+    """İstek başına sorgu sayacını başlat (bkz. query_stats.py)."""
+    g.query_stats, g._query_stats_token = query_stats.begin_request()
+
+
+@app.after_request
+def _add_server_timing(response):
+    """Sorgu sayısı ve DB süresini Server-Timing header'ı olarak ekle."""
+    stats = g.get("query_stats")
+    if stats is not None:
+        response.headers["Server-Timing"] = query_stats.server_timing(stats)
+    return response
+
+
+@app.teardown_request
+def _end_query_stats(exc):
+    """İstatistiği route toplamlarına ekle ve context'i sıfırla."""
+    token = g.pop("_query_stats_token", None)
+    if token is not None:
+        route = request.url_rule.rule if request.url_rule else "<unmatched>"
+        query_stats.end_request(token, f"{request.method} {route}")
+
+# ==================== SAYFALAMA ====================
+
+def _page_args(default_limit: int, cursor_size: int = 2):
+    """
+    ?cursor=&limit= parametrelerini okur (bkz. pagination.py).
+    Geçersiz cursor InvalidCursor fırlatır.
+    """
+    return (decode_cursor(request.args.get("cursor"), cursor_size),
+            clamp_page_size(request.args.get("limit"), default_limit))
+
+
+def _page_response(page: dict):
+    """Sayfalı JSON API yanıtı."""
+    return jsonify({"success": True, "items": page["items"], "next_cursor": page["next_cursor"]})
+
+
+@app.errorhandler(InvalidCursor)
+def _invalid_cursor(e):
+    """API'lerde 400, sayfalarda ilk sayfaya yönlendirme."""
+    if request.path.startswith("/api/"):
+        return jsonify({"success": False, "error": str(e)}), 400
+    return redirect(request.path)
+
+
+# /metrics ham SQL metni ve süreler içerir: varsayılan olarak sadece localhost'tan
+METRICS_ALLOW_REMOTE = os.environ.get("METRICS_ALLOW_REMOTE") == "1"
+METRICS_MAX_TOP = 200
+
+
+@app.route("/metrics")
+def metrics():
+    """Süreç (worker) bazında route ve sorgu metrikleri (?top=, en fazla METRICS_MAX_TOP)."""
+    if not METRICS_ALLOW_REMOTE and request.remote_addr not in ("127.0.0.1", "::1"):
+        return jsonify({"error": "Yetkisiz"}), 403
+    top = request.args.get("top", 20, type=int)
+    return jsonify(query_stats.snapshot(top=max(1, min(top, METRICS_MAX_TOP))))
+
+# ==================== SAĞLIK KONTROLLERİ ====================
+
+@app.route("/healthz")
+def healthz():
+    """Liveness: süreç ayakta mı?"""
+    return jsonify({"status": "ok"})
+
+
+@app.route("/readyz")
+def readyz():
+    """Readiness: warmup tamamlanana kadar 503 döner (load balancer trafiği bekletir)."""
+    status = warmup.warmup_status()
+    return jsonify(status), (200 if status["ready"] else 503)
+
 # ==================== API ENDPOINTS ====================
 
 @app.route("/api/rate-limit")
@@ -124,7 +269,7 @@ def api_dashboard_stats():
             "accuracy": overall.get("accuracy", 0)
         })
     except Exception as e:
-        print(f"Dashboard stats error: {e}")
+        log.error(f"Dashboard stats error: {e}")
         return jsonify({
             "streak": 0,
             "today_correct": 0,
@@ -228,22 +373,30 @@ def practice_word():
     result = None
     
     if request.method == "GET":
+        # Kişiselleştirilmiş seçim (vade, zayıflık, yenilik, seviye uyumu)
+        picked = selection.next_items(user_id, 1) if user_id else []
+        if picked:
+            current_word = {"word_id": picked[0]["word_id"], "english": picked[0]["english"], "topic_id": None}
+
+    if request.method == "GET" and current_word is None:
         # Database'den random bir kelime al
         with get_db() as conn:
             cursor = conn.cursor()
-            # Kullanıcının seviyesini al
-            user_level = None
-            if user_id:
-                cursor.execute("SELECT level FROM users WHERE user_id = ?", (user_id,))
-                level_row = cursor.fetchone()
-                if level_row:
-                    user_level = level_row[0]
-            # Seviyeye göre random kelime seç
-            if user_level:
+            # Kullanıcının seviyesi (istek bağlamından, sorgusuz)
+            user = current_user()
+            user_level = user["level"] if user else None
+            # Seviyeye göre random kelime seç (önce paylaşılan kelime deposundan, tarama yok)
+            store = vocab_store.get_store()
+            pool = store.group(user_level, "_any") if store is not None and user_level else ()
+            word = store.get(random.choice(pool)) if pool else None
+            if word:
+                word_row = (word["word_id"], word["english"], word["topic_id"])
+            elif user_level:
                 cursor.execute("SELECT word_id, english, topic_id FROM words WHERE level = ? ORDER BY RANDOM() LIMIT 1", (user_level,))
+                word_row = cursor.fetchone()
             else:
                 cursor.execute("SELECT word_id, english, topic_id FROM words ORDER BY RANDOM() LIMIT 1")
-            word_row = cursor.fetchone()
+                word_row = cursor.fetchone()
             
             if word_row:
                 current_word = {
@@ -257,15 +410,20 @@ def practice_word():
         user_answer = request.form.get("answer", "").strip()
         english_word = None
         
-        # Kelimeyi database'den al
+        # Kelimeyi depodan (yoksa database'den) al
         if word_id:
-            with get_db() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT english, turkish FROM words WHERE word_id = ?", (word_id,))
-                word_row = cursor.fetchone()
-                
-                if word_row:
-                    english_word = word_row[0]
+            store = vocab_store.get_store()
+            word = store.get(word_id) if store is not None and word_id.isdigit() else None
+            if word:
+                english_word = word["english"]
+            else:
+                with get_db() as conn:
+                    cursor = conn.cursor()
+                    cursor.execute("SELECT english, turkish FROM words WHERE word_id = ?", (word_id,))
+                    word_row = cursor.fetchone()
+                    
+                    if word_row:
+                        english_word = word_row[0]
             
             if english_word:
                 # Çeviri al (önce DB cache, yoksa API)
@@ -296,7 +454,7 @@ def practice_word():
                         }
                 
                 except Exception as e:
-                    print(f"[Error] Translation API: {str(e)}")
+                    log.error(f"Translation API: {str(e)}")
                     result = {
                         "user_answer": user_answer,
                         "correct_answer": "Hata oluştu",
@@ -335,7 +493,8 @@ def practice_word():
                     )
 
                     # Genel giriş logu
-                    print(f"[DEBUG] log_user_input çağrısı: user_id={user_id}, input_type='word_translation', input_text={user_answer}, response_text={result['correct_answer']}, is_correct={result['is_correct']}, score={result['similarity']*100}, word_id={int(word_id) if result['is_correct'] else None}, metadata={{'english': english_word, 'feedback': result['feedback']}}")
+                    log.debug("log_user_input çağrısı: user_id=%s, input_type='word_translation', input_text=%s, is_correct=%s, score=%s",
+                              user_id, user_answer, result["is_correct"], result["similarity"] * 100)
                     logger.log_user_input(
                         user_id=user_id,
                         input_type='word_translation',
@@ -417,7 +576,7 @@ def practice_sentence():
                 if not example_sentence or "using the word" in example_sentence.lower():
                     example_sentence = f"Example: The {target_word} is very important in daily life."
             except Exception as e:
-                print(f"generate_sentence hatası: {e}")
+                log.error(f"generate_sentence hatası: {e}")
                 example_sentence = f"Example: I like to use the word '{target_word}' in my sentences."
 
     if request.method == "POST":
@@ -482,7 +641,7 @@ def practice_sentence():
                             if analysis_result["is_valid"]:
                                 analysis_result["score"] = 100
                 except Exception as e:
-                    print(f"AI Grammar hatası: {e}")
+                    log.error(f"AI Grammar hatası: {e}")
                     # AI başarısız olursa rules sonucuyla devam et
             
             feedback = {
@@ -543,7 +702,7 @@ def practice_sentence():
                     goal_manager.sync_goal_progress(user_id)
                 
             except Exception as e:
-                print(f"❌ DB logging hatası: {e}")
+                log.error(f"❌ DB logging hatası: {e}")
             
             # Eğer kurallar veya LLM kontrolünde hata varsa, mistakes tablosuna ekle
             try:
@@ -602,7 +761,7 @@ def pronunciation():
             if audio_file and audio_file.filename:
                 # speech_stt.py'deki fonksiyonu kullan
                 recognized_text = recognize_from_audio_file(audio_file, language="en-US")
-                print(f"🎤 STT Sonuç: {recognized_text}")
+                log.debug("🎤 STT Sonuç: %s", recognized_text)
         
         # Eğer ses dosyası yoksa veya hata olduysa, text input'u kontrol et
         if not recognized_text or recognized_text.startswith("❌"):
@@ -619,7 +778,7 @@ def pronunciation():
                 feedback_text = pron_result.get("feedback_tr", "Değerlendirme yapılamadı.")
                 is_correct = score >= 70
             except Exception as e:
-                print(f"Telaffuz değerlendirme hatası: {e}")
+                log.error(f"Telaffuz değerlendirme hatası: {e}")
                 # Basit benzerlik kontrolü (fallback)
                 if recognized_text.lower() == target_word.lower():
                     score = 100
@@ -694,9 +853,9 @@ def pronunciation():
         if word_row:
             word_id = word_row[0]
             target_word = word_row[1]
-            print(f"🎯 Yeni kelime seçildi: {target_word} (ID: {word_id})")
+            log.debug("🎯 Yeni kelime seçildi: %s (ID: %s)", target_word, word_id)
         else:
-            print("⚠️ Veritabanından kelime bulunamadı, apple kullanılıyor")
+            log.warning("⚠️ Veritabanından kelime bulunamadı, apple kullanılıyor")
 
     return render_template(
         "pronunciation.html",
@@ -721,37 +880,82 @@ def review_quiz():
     try:
         quiz_items = get_review_quiz(user_id=user_id, limit=30)
     except Exception as e:
-        print(f"Review quiz load error: {e}")
+        log.error(f"Review quiz load error: {e}")
 
     return render_template("review_quiz.html", username=username, quiz_items=quiz_items)
 
 
 @app.route("/review/submit", methods=["POST"])
 def review_submit():
+    """Tek sonuç (form). Quiz'in tamamı için /api/review/session kullanılır."""
     username = session.get("username")
     if not username:
         return redirect(url_for("login"))
 
     user_id = session.get("user_id")
-    mistake_id = request.form.get("mistake_id")
     item_key = request.form.get("item_key")
-    quality = int(request.form.get("quality", 0))
+    quality = srs.parse_quality(request.form.get("quality"))
+    if quality is None:
+        return redirect(url_for("review_quiz"))
 
-    # update_review_result expects user_id and item_key
     try:
-        res = update_review_result(user_id=user_id, item_key=item_key, quality=quality)
-        # kısa bir bildirim ekleyebiliriz
+        srs.apply_reviews(user_id, [{"item_key": item_key, "quality": quality}])
+    except Exception as e:
+        log.error(f"Review submit error: {e}")
+
+    return redirect(url_for("review_quiz"))
+
+
+@app.route("/api/review/session", methods=["POST"])
+def api_review_session():
+    """
+    Bir tekrar quiz'inin tüm sonuçlarını tek istekte kaydet.
+    Body: {"results": [{"mistake_id" | "item_key" | "word_id", "quality": 0-5}, ...], "scheduler": "sm2" | "fsrs"}
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+
+    data = request.get_json(silent=True) or {}
+    results = data.get("results")
+    if not isinstance(results, list) or not all(isinstance(r, dict) for r in results):
+        return jsonify({"success": False, "error": "Geçersiz results"}), 400
+    if len(results) > srs.MAX_SESSION_ITEMS:
+        return jsonify({"success": False, "error": f"En fazla {srs.MAX_SESSION_ITEMS} sonuç gönderilebilir"}), 400
+    # Eksik/geçersiz kalite tam başarısızlık olarak uygulanmasın: hiçbir öğe yeniden planlanmaz
+    qualities = [srs.parse_quality(r.get("quality")) for r in results]
+    if None in qualities:
+        return jsonify({"success": False, "error": "quality 0-5 arası tam sayı olmalı"}), 400
+    results = [dict(r, quality=q) for r, q in zip(results, qualities)]
+
+    try:
+        outcome = srs.apply_reviews(user_id, results, scheduler=data.get("scheduler"))
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    except Exception:
+        return jsonify({"success": False, "error": "Sonuçlar kaydedilemedi"}), 500
+
+    reviewed = len(outcome["updated"]) + len(outcome["words"])
+    if reviewed:
+        # Oturum başına tek bildirim
         notification_manager.create_notification(
             user_id=user_id,
             notification_type='review_result',
-            title='Tekrar sonucu kaydedildi',
-            message=f'"{item_key}" için sonuç kaydedildi.',
+            title='Tekrar oturumu kaydedildi',
+            message=f'{reviewed} öğe için sonuç kaydedildi. Sırada {outcome["due_count"]} tekrar var.',
             icon='🔁'
         )
-    except Exception as e:
-        print(f"Review submit error: {e}")
 
-    return redirect(url_for("review_quiz"))
+    return jsonify({"success": True, **outcome})
+
+
+@app.route("/api/review/due-count")
+def api_review_due_count():
+    """Vadesi gelmiş tekrar sayısı."""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    return jsonify({"success": True, "due_count": srs.get_due_count(user_id)})
 
 
 @app.route("/review/seed", methods=["GET"]) 
@@ -768,50 +972,101 @@ def review_seed():
         record_mistake(user_id=user_id, item_key="apple", wrong_answer="appel", correct_answer="apple", lesson_id="seed-1", context="pronunciation")
         record_mistake(user_id=user_id, item_key="orange", wrong_answer="oragne", correct_answer="orange", lesson_id="seed-1", context="sentence")
     except Exception as e:
-        print(f"Seed error: {e}")
+        log.error(f"Seed error: {e}")
 
     return redirect(url_for("review_quiz"))
 
 
 @app.route("/my-mistakes")
 def my_mistakes():
+    """
+    Hatalar sayfası sadece DB verisiyle hemen render edilir.
+    Cache'te olan AI geri bildirimleri sayfaya eklenir; diğerleri görünür
+    kartlar için /api/mistake-feedback/batch ile lazy yüklenir.
+    """
     username = session.get("username")
     if not username:
         return redirect(url_for("login"))
 
     user_id = session.get("user_id")
+    cursor_values, limit = _page_args(50)
     mistakes = []
+    next_cursor = None
     try:
-        raw_mistakes = get_user_mistakes(user_id=user_id, limit=200)
-        # sqlite3.Row'ları dict'e dönüştür
-        for mistake_row in raw_mistakes:
-            # Row nesnesini dict'e çevir
-            mistake = dict(mistake_row) if hasattr(mistake_row, 'keys') else mistake_row
-            
-            try:
-                feedback = mistake_feedback(
-                    wrong_answer=mistake.get("wrong_answer", ""),
-                    correct_answer=mistake.get("correct_answer", ""),
-                    context=mistake.get("context", "sentence")
-                )
-                mistake["ai_feedback"] = feedback
-            except Exception as e:
-                print(f"❌ Mistake feedback error for {mistake.get('mistake_id')}: {e}")
-                # Fallback geri bildirim
-                mistake["ai_feedback"] = {
-                    "explanation": "Geri bildirim şu anda alınamadı, lütfen daha sonra tekrar deneyin.",
-                    "tips": ["Doğru cevabı dikkatlice inceleyerek öğrenmeye devam et"],
-                    "example": mistake.get("correct_answer", ""),
-                    "practice_sentence": ""
-                }
-            
-            mistakes.append(mistake)
+        page = get_user_mistakes_page(user_id, cursor_values, limit)
+        mistakes, next_cursor = page["items"], page["next_cursor"]
+        cached = feedback_cache.get_cached_many(
+            feedback_cache.make_key(m.get("wrong_answer"), m.get("correct_answer"), m.get("context"))
+            for m in mistakes
+        )
+        for mistake in mistakes:
+            key = feedback_cache.make_key(mistake.get("wrong_answer"), mistake.get("correct_answer"), mistake.get("context"))
+            mistake["ai_feedback"] = cached.get(key)
     except Exception as e:
-        print(f"❌ Get user mistakes error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.error(f"❌ Get user mistakes error: {e}", exc_info=True)
+
+    return render_template("my_mistakes.html", username=username, mistakes=mistakes, next_cursor=next_cursor)
+
+
+@app.route("/api/my-mistakes")
+def api_my_mistakes():
+    """Kullanıcının hataları, sayfalı: ?cursor=&limit="""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    cursor_values, limit = _page_args(50)
+    return _page_response(get_user_mistakes_page(user_id, cursor_values, limit))
 
-    return render_template("my_mistakes.html", username=username, mistakes=mistakes)
+
+@app.route("/api/my-inputs")
+def api_my_inputs():
+    """Kullanıcının giriş geçmişi, sayfalı: ?cursor=&limit="""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    cursor_values, limit = _page_args(20)
+    return _page_response(logger.get_user_inputs_page(user_id, cursor_values, limit))
+
+
+# API: Görünen hatalar için toplu AI geri bildirimi
+@app.route("/api/mistake-feedback/batch", methods=["POST"])
+def api_mistake_feedback_batch():
+    """
+    JSON gövdesi: {"mistake_ids": [1, 2, 3]} (en fazla MAX_FEEDBACK_BATCH adet)
+    Sadece oturumdaki kullanıcının hataları döner.
+
+    Yanıt:
+    {"success": true, "feedback": {"<mistake_id>": {...}}, "pending": [<mistake_id>, ...]}
+    """
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+
+    data = request.get_json(silent=True) or {}
+    try:
+        mistake_ids = [int(i) for i in data.get("mistake_ids", [])][:MAX_FEEDBACK_BATCH]
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "Geçersiz mistake_ids"}), 400
+    if not mistake_ids:
+        return jsonify({"success": True, "feedback": {}, "pending": []})
+
+    placeholders = ",".join("?" for _ in mistake_ids)
+    with get_db() as conn:
+        rows = conn.execute(f"""
+            SELECT mistake_id, wrong_answer, correct_answer, context
+            FROM mistakes WHERE user_id = ? AND mistake_id IN ({placeholders})
+        """, (user_id, *mistake_ids)).fetchall()
+
+    keys = {row["mistake_id"]: feedback_cache.make_key(row["wrong_answer"], row["correct_answer"], row["context"])
+            for row in rows}
+    results, pending = feedback_cache.get_feedback_many(keys.values())
+    pending = set(pending)
+
+    return jsonify({
+        "success": True,
+        "feedback": {str(mid): results[key] for mid, key in keys.items() if key in results},
+        "pending": [mid for mid, key in keys.items() if key in pending]
+    })
 
 
 # API: Hata için LLM geri bildirimi al
@@ -840,8 +1095,8 @@ def api_mistake_feedback():
         if not wrong_answer or not correct_answer:
             return jsonify({"error": "Missing required fields"}), 400
         
-        # LLM feedback'ini al
-        feedback = mistake_feedback(
+        # LLM feedback'ini al (ortak cache üzerinden)
+        feedback = feedback_cache.get_feedback(
             wrong_answer=wrong_answer,
             correct_answer=correct_answer,
             context=context
@@ -853,7 +1108,7 @@ def api_mistake_feedback():
         })
     
     except Exception as e:
-        print(f"❌ Mistake feedback API error: {e}")
+        log.error(f"❌ Mistake feedback API error: {e}")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -866,9 +1121,7 @@ def api_test_feedback():
     """Test endpoint - feedback fonksiyonunun çalışıp çalışmadığını kontrol et"""
     try:
         import traceback
-        print("\n" + "="*60)
-        print("TEST: mistake_feedback fonksiyonu çağrılıyor")
-        print("="*60)
+        log.info("TEST: mistake_feedback fonksiyonu çağrılıyor")
         
         test_feedback = mistake_feedback(
             wrong_answer="I go to school yesterday",
@@ -876,8 +1129,8 @@ def api_test_feedback():
             context="sentence"
         )
         
-        print(f"✅ Feedback başarıyla oluşturuldu: {type(test_feedback)}")
-        print(f"Feedback data: {test_feedback}")
+        log.info(f"✅ Feedback başarıyla oluşturuldu: {type(test_feedback)}")
+        log.debug("Feedback data: %s", test_feedback)
         
         return jsonify({
             "success": True,
@@ -888,8 +1141,7 @@ def api_test_feedback():
     except Exception as e:
         import traceback
         error_msg = traceback.format_exc()
-        print(f"❌ Hata: {e}")
-        print(error_msg)
+        log.error(f"❌ Hata: {e}", exc_info=True)
         return jsonify({
             "success": False,
             "error": str(e),
@@ -959,8 +1211,8 @@ def user_stats():
     overall = stats_manager.get_overall_stats(user_id)
     word_perf = stats_manager.get_word_stats(user_id)
     
-    # Raporlar
-    weekly_report = stats_manager.generate_weekly_report(user_id)
+    # Raporlar (yukarıdaki istatistikler yeniden hesaplanmaz)
+    weekly_report = stats_manager.generate_weekly_report(user_id, weekly, overall, word_perf)
     
     return render_template(
         "stats.html",
@@ -1008,18 +1260,30 @@ def goals():
                 icon='🎯'
             )
     
-    # Tüm hedefleri al
-    all_goals = goal_manager.get_all_goals(user_id)
+    # Aktif hedefler + tamamlanmışların bir sayfası
+    cursor_values, limit = _page_args(10)
+    active_goals = goal_manager.get_active_goals(user_id)
+    completed_page = goal_manager.get_completed_goals_page(user_id, cursor_values, limit)
     suggestions = goal_manager.get_goal_suggestions(user_id)
     
     return render_template(
         "goals.html",
         username=username,
-        active_goals=all_goals['active'],
-        completed_goals=all_goals['completed'],
+        active_goals=active_goals,
+        completed_goals=completed_page['items'],
+        next_cursor=completed_page['next_cursor'],
         suggestions=suggestions
     )
 
+@app.route("/api/goals/completed")
+def api_completed_goals():
+    """Tamamlanmış hedefler, sayfalı: ?cursor=&limit="""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    cursor_values, limit = _page_args(10)
+    return _page_response(goal_manager.get_completed_goals_page(user_id, cursor_values, limit))
+
 @app.route("/delete-goal/<int:goal_id>", methods=["POST"])
 def delete_goal(goal_id):
     """Hedefi sil."""
@@ -1046,13 +1310,10 @@ def leaderboard():
     
     # Periyod parametresi al
     period = request.args.get("period", "all")
+    cursor_values, limit = _page_args(50)
     
-    if period == "weekly":
-        leaderboard_data = leaderboard_manager.get_weekly_leaderboard(limit=50)
-    elif period == "monthly":
-        leaderboard_data = leaderboard_manager.get_monthly_leaderboard(limit=50)
-    else:
-        leaderboard_data = leaderboard_manager.get_global_leaderboard(limit=50)
+    page = leaderboard_manager.get_leaderboard_page(period, cursor_values, limit)
+    leaderboard_data = page["items"]
     
     # Kullanıcının sırası
     user_rank = None
@@ -1070,9 +1331,27 @@ def leaderboard():
         leaderboard=leaderboard_data,
         user_rank=user_rank,
         friends_leaderboard=friends_leaderboard,
-        period=period
+        period=period,
+        next_cursor=page["next_cursor"]
     )
 
+@app.route("/api/leaderboard")
+def api_leaderboard():
+    """Sıralama, sayfalı: ?period=all|weekly|monthly&cursor=&limit="""
+    cursor_values, limit = _page_args(50)
+    period = request.args.get("period", "all")
+    return _page_response(leaderboard_manager.get_leaderboard_page(period, cursor_values, limit))
+
+
+@app.route("/api/leaderboard/category/<category>")
+def api_category_leaderboard(category):
+    """Kategori sıralaması: accuracy|speed|streak|improvement (?limit=), refreshed_at ile"""
+    limit = clamp_page_size(request.args.get("limit"), 50)
+    rankings = leaderboard_manager.get_category_rankings(category, limit)
+    if rankings is None:
+        return jsonify({"error": "Bilinmeyen kategori"}), 404
+    return jsonify(rankings)
+
 #-------BİLDİRİMLER------#
 @app.route("/notifications")
 def notifications():
@@ -1083,20 +1362,31 @@ def notifications():
     user_id = session.get("user_id")
     
     # Bildirimleri al
-    notif_list = notification_manager.get_user_notifications(user_id, limit=50)
+    cursor_values, limit = _page_args(50)
+    page = notification_manager.get_user_notifications_page(user_id, cursor_values, limit)
+    notif_list = page["items"]
     unread_count = notification_manager.get_unread_notification_count(user_id)
     
-    # DEBUG
-    print(f"[DEBUG] user_id: {user_id}, notifications count: {len(notif_list)}, unread: {unread_count}")
-    print(f"[DEBUG] notifications: {notif_list}")
+    log.debug("user_id: %s, notifications count: %s, unread: %s", user_id, len(notif_list), unread_count)
     
     return render_template(
         "notifications.html",
         username=username,
         notifications=notif_list,
-        unread_count=unread_count
+        unread_count=unread_count,
+        next_cursor=page["next_cursor"]
     )
 
+@app.route("/api/notifications")
+def api_notifications():
+    """Bildirimler, sayfalı: ?cursor=&limit=&unread=1"""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    cursor_values, limit = _page_args(20)
+    unread_only = request.args.get("unread") == "1"
+    return _page_response(notification_manager.get_user_notifications_page(user_id, cursor_values, limit, unread_only))
+
 @app.route("/notification/<int:notification_id>/read", methods=["POST"])
 def mark_notification_read(notification_id):
     user_id = session.get("user_id")
@@ -1138,17 +1428,28 @@ def friends():
     friends_list = social_manager.get_friends(user_id)
     friend_requests = social_manager.get_friend_requests(user_id)
     
-    # Aktivite akışı
-    activity_feed = social_manager.get_friend_activity_feed(user_id)
+    # Aktivite akışı (cursor: son event_id)
+    cursor_values, limit = _page_args(10, cursor_size=1)
+    feed_page = feed_manager.get_feed_page(user_id, cursor_values, limit)
     
     return render_template(
         "friends.html",
         username=username,
         friends=friends_list,
         friend_requests=friend_requests,
-        activity_feed=activity_feed
+        activity_feed=feed_page["items"],
+        next_cursor=feed_page["next_cursor"]
     )
 
+@app.route("/api/activity-feed")
+def api_activity_feed():
+    """Arkadaşların aktivite akışı, sayfalı: ?cursor=&limit="""
+    user_id = session.get("user_id")
+    if not user_id:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    cursor_values, limit = _page_args(20, cursor_size=1)
+    return _page_response(feed_manager.get_feed_page(user_id, cursor_values, limit))
+
 @app.route("/add-friend/<int:friend_id>", methods=["POST"])
 def add_friend(friend_id):
     user_id = session.get("user_id")
@@ -1335,6 +1636,38 @@ def create_course():
         available_topics=available_topics
     )
 
+#-------KELİME ARAMA (API)------#
+@app.route("/api/words/search")
+def api_word_search():
+    """Otomatik tamamlama / kurs oluşturma: ?q=&limit=&lang=en|tr|both&mode=auto|prefix|fuzzy&level=&topic="""
+    if not session.get("user_id"):
+        return jsonify({"error": "Unauthorized"}), 401
+    
+    query = request.args.get("q", "").strip()
+    limit = clamp_page_size(request.args.get("limit"), 10)
+    lang = request.args.get("lang", "both")
+    mode = request.args.get("mode", "auto")
+    if lang not in ("en", "tr", "both") or mode not in ("auto", "prefix", "fuzzy"):
+        return jsonify({"error": "Geçersiz lang veya mode"}), 400
+    
+    # Konu adı da verilebilir (kurs oluşturma formundaki konu listesi)
+    topic_id = request.args.get("topic", type=int)
+    topic_name = request.args.get("topic_name")
+    topics = course_manager.get_available_topics()
+    if topic_name:
+        with get_db() as conn:
+            row = conn.execute("SELECT topic_id FROM topics WHERE topic_name = ?", (topic_name,)).fetchone()
+        if not row:
+            return jsonify({"query": query, "items": [], "topics": []})
+        topic_id = row[0]
+    
+    folded = vocab_store.fold(query)
+    return jsonify({
+        "query": query,
+        "items": word_search.search(query, limit, lang, mode, request.args.get("level"), topic_id),
+        "topics": [t for t in topics if folded and folded in vocab_store.fold(t)][:limit],
+    })
+
 #-------ÜNİTE İLERLEME GÜNCELLE (API)------#
 @app.route("/api/unit/<int:unit_id>/progress", methods=["POST"])
 def api_update_unit_progress(unit_id):
@@ -1398,12 +1731,12 @@ def delete_course(course_id):
             """, (course_id,))
             
             conn.commit()
-            print(f"✓ Kurs silindi [ID: {course_id}]")
+            log.info(f"✓ Kurs silindi [ID: {course_id}]")
         
         conn.close()
     
     except Exception as e:
-        print(f"❌ Kurs silme hatası: {e}")
+        log.error(f"❌ Kurs silme hatası: {e}")
     
     return redirect(url_for("courses"))
 
@@ -1412,11 +1745,11 @@ def delete_course(course_id):
 @app.route("/feedback", methods=["GET", "POST"])
 def personal_feedback():
     """Kişisel geri bildirim sayfası - AI ile analiz (istek üzerine)"""
-    username = session.get("username")
-    if not username:
+    user = current_user()
+    if not user:
         return redirect(url_for("login"))
     
-    user_id = get_user_id(username)
+    username, user_id = user["username"], user["user_id"]
     feedback = None
     
     # Kullanıcı istatistiklerini al
@@ -1445,7 +1778,7 @@ def personal_feedback():
                 feedback = "⏳ API limit aşıldı. Lütfen 30 saniye bekleyip tekrar deneyin."
             else:
                 feedback = "AI geri bildirimi şu an alınamıyor. Lütfen daha sonra tekrar deneyin."
-            print(f"❌ Feedback hatası: {e}")
+            log.error(f"❌ Feedback hatası: {e}")
     
     return render_template("feedback.html", 
                           username=username,
@@ -1458,9 +1791,10 @@ def personal_feedback():
 @app.route("/custom-lesson", methods=["GET", "POST"])
 def custom_lesson():
     """AI ile özel ders oluşturma"""
-    username = session.get("username")
-    if not username:
+    user = current_user()
+    if not user:
         return redirect(url_for("login"))
+    username = user["username"]
     
     lesson_content = None
     topic = None
@@ -1475,12 +1809,11 @@ def custom_lesson():
             try:
                 # AI'dan özel ders içeriği al
                 lesson_content = generate_custom_lesson(topic, level)
-                print(f"✓ Özel ders oluşturuldu: {topic}")
+                log.info(f"✓ Özel ders oluşturuldu: {topic}")
                 
                 # Loglama
-                user_id = get_user_id(username)
                 logger.log_user_action(
-                    user_id=user_id,
+                    user_id=user["user_id"],
                     action_type='custom_lesson',
                     action_details=f'Konu: {topic}, Seviye: {level}',
                     page='custom_lesson'
@@ -1493,7 +1826,7 @@ def custom_lesson():
                     error_message = "🔑 API bağlantı hatası. Lütfen daha sonra tekrar deneyin."
                 else:
                     error_message = f"Ders oluşturulurken hata: {error_str}"
-                print(f"❌ Özel ders hatası: {e}")
+                log.error(f"❌ Özel ders hatası: {e}")
     
     return render_template("custom_lesson.html",
                           username=username,
@@ -1508,77 +1841,77 @@ def custom_lesson():
 @app.route("/placement-test")
 def placement_test():
     """Seviye belirleme testi sayfasi - kapsamli test."""
-    if "username" not in session:
+    user = current_user()
+    if not user:
         return redirect(url_for("login"))
     
-    username = session["username"]
-    user_id = get_user_id(username)
+    username = user["username"]
     
     # Kullanıcı zaten testi yapmışsa, direkt learn sayfasına yönlendir
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT placement_test_done FROM users WHERE user_id = ?", (user_id,))
-    row = cursor.fetchone()
-    conn.close()
-    
-    if row and row[0] == 1:
+    if user["placement_test_done"]:
         return redirect(url_for("learn"))
     
-    import random
-    
-    # Her seviyeden farkli soru tipleri olustur
-    questions = []
-    levels = ['A1', 'A2', 'B1', 'B2']
-    question_types = ['vocabulary', 'listening', 'translation', 'grammar', 'pronunciation']
-    
-    for level in levels:
-        # Her seviyeden farkli tiplerden sorular
-        for i, q_type in enumerate(question_types):
-            try:
-                # Her tipten 1 soru (pronunciation dahil)
-                count = 1
-                level_questions = course_system._generate_questions(q_type, level, count)
-                for q in level_questions:
-                    q['level'] = level
-                questions.extend(level_questions)
-            except Exception as e:
-                print(f"Soru olusturma hatasi ({level}, {q_type}): {e}")
-    
-    # Soruları seviye sirasina gore grupla
-    grouped = {}
-    for q in questions:
-        level = q.get('level', 'A1')
-        if level not in grouped:
-            grouped[level] = []
-        grouped[level].append(q)
-    
-    # Her grubu kendi icinde karistir ve sirala
-    final_questions = []
-    for level in levels:
-        if level in grouped:
-            random.shuffle(grouped[level])
-            final_questions.extend(grouped[level])
-    
+    # Sorular uyarlamalı testte tek tek /api/placement/* üzerinden gelir
     return render_template("placement_test.html", 
                           username=username,
-                          questions=final_questions)
+                          max_items=PLACEMENT_MAX_ITEMS)
+
+
+@app.route("/api/placement/start", methods=["POST"])
+def api_placement_start():
+    """Uyarlamalı seviye testini başlat: ilk soruyu döner."""
+    user = current_user()
+    if not user:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    if user["placement_test_done"]:
+        return jsonify({"success": False, "error": "Seviye testi zaten tamamlandı"}), 409
+    try:
+        return jsonify({"success": True, **placement_engine.start(user["user_id"])})
+    except Exception as e:
+        log.error(f"❌ Seviye testi başlatılamadı: {e}")
+        return jsonify({"success": False, "error": "Test başlatılamadı"}), 500
+
+
+@app.route("/api/placement/answer", methods=["POST"])
+def api_placement_answer():
+    """
+    Güncel soruya cevap. Body: {"answer": "..."}
+    Puanlama sunucuda yapılır; test bitince sonuç ve seviye döner.
+    """
+    user = current_user()
+    if not user:
+        return jsonify({"success": False, "error": "Giriş yapmalısınız"}), 401
+    if user["placement_test_done"]:
+        return jsonify({"success": False, "error": "Seviye testi zaten tamamlandı"}), 409
+    user_id = user["user_id"]
+    data = request.get_json(silent=True) or {}
+    answer = data.get("answer")
+    if answer is not None and not isinstance(answer, str):
+        return jsonify({"success": False, "error": "Geçersiz cevap"}), 400
+    try:
+        outcome = placement_engine.answer(user_id, answer or "")
+        if outcome["done"]:
+            invalidate_user(user_id)
+        return jsonify({"success": True, **outcome})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 409
+    except Exception as e:
+        log.error(f"❌ Seviye testi cevabı kaydedilemedi: {e}")
+        return jsonify({"success": False, "error": "Cevap kaydedilemedi"}), 500
 
 
 @app.route("/placement-test/save", methods=["POST"])
 def save_placement_result():
-    """Seviye belirleme sonucunu kaydet."""
-    if "username" not in session:
+    """Testi atla: kullanıcıyı A1'den başlat."""
+    user = current_user()
+    if not user:
         return jsonify({"error": "Unauthorized"}), 401
     
-    username = session["username"]
-    user_id = get_user_id(username)
+    user_id = user["user_id"]
     
-    data = request.get_json()
-    level = data.get("level", "A1")
-    
-    # Geçerli seviye kontrolü
-    if level not in ['A1', 'A2', 'B1', 'B2']:
-        level = 'A1'
+    # Seviye sunucuda puanlanan testten gelir (/api/placement/answer);
+    # buradan yalnızca testi atlayıp baştan başlama (A1) kaydedilir
+    level = 'A1'
     
     # Kullanıcı seviyesini ve placement_test_done'u güncelle
     conn = get_db_connection()
@@ -1592,6 +1925,8 @@ def save_placement_result():
     
     # Kurs ilerlemesini belirlenen seviyeden başlat
     course_system.init_user_progress(user_id, level)
+    invalidate_user(user_id)
+    selection.invalidate(user_id)
     
     return jsonify({"success": True, "level": level})
 
@@ -1601,28 +1936,21 @@ def save_placement_result():
 @app.route("/learn")
 def learn():
     """Ana kurs haritası sayfası (Duolingo tarzı)."""
-    if "username" not in session:
+    user = current_user()
+    if not user:
         return redirect(url_for("login"))
     
-    username = session["username"]
-    user_id = get_user_id(username)
-    
-    # Placement test yapılmış mı kontrol et
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT placement_test_done FROM users WHERE user_id = ?", (user_id,))
-    row = cursor.fetchone()
-    conn.close()
+    username, user_id = user["username"], user["user_id"]
     
     # Eğer placement test yapılmamışsa, teste yönlendir
-    if not row or not row[0]:
+    if not user["placement_test_done"]:
         return redirect(url_for("placement_test"))
     
     # Kurs haritasını al
     course_map = course_system.get_user_course_map(user_id)
 
     # Gerçek streak bilgisini ekle (günlük girişe göre)
-    course_map["streak"] = stats_manager._calculate_streak(user_id)
+    course_map["streak"] = stats_manager.get_streak(user_id)
 
     return render_template("learn.html",
                           username=username,
@@ -1632,38 +1960,26 @@ def learn():
 @app.route("/learn/lesson/<int:lesson_id>")
 def learn_lesson(lesson_id):
     """Ders sayfası."""
-    if "username" not in session:
+    user = current_user()
+    if not user:
         return redirect(url_for("login"))
     
-    username = session["username"]
-    user_id = get_user_id(username)
+    username, user_id = user["username"], user["user_id"]
     
-    # Dersin açık olup olmadığını kontrol et
+    # Ders bilgileri ve dersin açık olup olmadığı tek sorguda
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT status FROM user_course_progress 
-        WHERE user_id = ? AND lesson_id = ?
-    """, (user_id, lesson_id))
-    progress = cursor.fetchone()
-    conn.close()
-    
-    if not progress or progress[0] == 'locked':
-        return redirect(url_for("learn"))
-    
-    # Ders bilgilerini al
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT l.lesson_id, l.lesson_type, l.title, l.xp_reward, u.title as unit_title, u.level_code
+        SELECT l.lesson_id, l.lesson_type, l.title, l.xp_reward, u.title as unit_title, u.level_code, p.status
         FROM course_lessons l
         JOIN course_units u ON l.unit_id = u.unit_id
+        LEFT JOIN user_course_progress p ON p.user_id = ? AND p.lesson_id = l.lesson_id
         WHERE l.lesson_id = ?
-    """, (lesson_id,))
+    """, (user_id, lesson_id))
     lesson_info = cursor.fetchone()
     conn.close()
     
-    if not lesson_info:
+    if not lesson_info or not lesson_info[6] or lesson_info[6] == 'locked':
         return redirect(url_for("learn"))
     
     # Soruları al
@@ -1684,30 +2000,42 @@ def learn_lesson(lesson_id):
 
 @app.route("/api/learn/complete-lesson", methods=["POST"])
 def api_complete_lesson():
-    """Ders tamamlama API."""
-    if "username" not in session:
+    """Ders tamamlama API. Yanıttaki 'delta' kurs haritasında değişen ders/ünite satırlarıdır."""
+    user = current_user()
+    if not user:
         return jsonify({"success": False, "error": "Giriş yapmalısınız"})
+    user_id = user["user_id"]
     
-    user_id = get_user_id(session["username"])
-    data = request.get_json()
+    data = request.get_json(silent=True) or {}
     
     lesson_id = data.get("lesson_id")
     score = data.get("score", 0)
     
     if not lesson_id:
         return jsonify({"success": False, "error": "Ders ID gerekli"})
+    try:
+        lesson_id, score = int(lesson_id), max(0, min(int(score), 100))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "Geçersiz ders ID veya skor"})
     
     result = course_system.complete_lesson(user_id, lesson_id, score)
+    if result.get("success"):
+        invalidate_user(user_id)  # XP değişti
+        # Arkadaş akışı: ders tamamlama + (varsa) streak dönüm noktası
+        feed_manager.publish_lesson_completed(user_id, lesson_id, result.get("lesson_title"),
+                                              score, result["xp_earned"])
+        feed_manager.publish_streak_milestone(user_id, stats_manager.get_streak(user_id))
     return jsonify(result)
 
 
 @app.route("/api/learn/record-mistake", methods=["POST"])
 def api_record_lesson_mistake():
     """Ders sırasında yapılan hatayı kaydet."""
-    if "username" not in session:
+    user = current_user()
+    if not user:
         return jsonify({"success": False, "error": "Giriş yapmalısınız"})
     
-    user_id = get_user_id(session["username"])
+    user_id = user["user_id"]
     data = request.get_json()
     
     item_key = data.get("item_key", "")  # Soru/kelime
@@ -1730,17 +2058,18 @@ def api_record_lesson_mistake():
         )
         return jsonify({"success": True, "mistake_id": mistake_id})
     except Exception as e:
-        print(f"❌ Hata kaydetme hatası: {e}")
+        log.error(f"❌ Hata kaydetme hatası: {e}")
         return jsonify({"success": False, "error": str(e)})
 
 
 @app.route("/api/learn/course-map")
 def api_course_map():
     """Kurs haritası API."""
-    if "username" not in session:
+    user = current_user()
+    if not user:
         return jsonify({"error": "Giriş yapmalısınız"})
     
-    user_id = get_user_id(session["username"])
+    user_id = user["user_id"]
     course_map = course_system.get_user_course_map(user_id)
     return jsonify(course_map)
 
@@ -1778,5 +2107,18 @@ def api_check_grammar():
 
     
 if __name__ == "__main__":
-    app.run(debug=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="LoroLeng Flask uygulaması")
+    parser.add_argument("--init-db", action="store_true", help="Tabloları oluştur ve seed et, sonra çık")
+    parser.add_argument("--import-profile", action="store_true", help="Modül başına import süresi raporu yazdır, sonra çık")
+    args = parser.parse_args()
+
+    if args.import_profile:
+        from import_profile import print_import_profile
+        print_import_profile("app")
+    elif args.init_db:
+        init_app_db()
+    else:
+        app.run(debug=True)
 
@@ -13,24 +13,54 @@ API yoksa dummy modda çalışır.
 """
 
 import os
-from dotenv import load_dotenv
 import json
+import threading
 import time
+from log_utils import get_logger
 
-from google import genai
+log = get_logger("ai_utils")
 
 
-load_dotenv()
-API_KEY = os.getenv("API_KEY")
-
+# google.genai ve dotenv ilk LLM çağrısında yüklenir (lazy).
+# Böylece app.py import edilirken ve fork edilen her worker'da bu maliyet ödenmez.
+API_KEY = None
 model = None
-if API_KEY:
-    try:
-        model = genai.Client(api_key=API_KEY)
-    except Exception as e:
-        print(f"⚠️ LLM API başlatılamadı: {e}")
-else:
-    print("⚠️ API_KEY set edilmemiş, dummy modda çalışacak.")
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    """
+    LLM istemcisini ilk kullanımda oluşturur.
+    API yoksa veya başlatılamazsa None döner (dummy mod).
+    """
+    global API_KEY, model, _model_loaded
+
+    if _model_loaded:
+        return model
+
+    with _model_lock:
+        if _model_loaded:
+            return model
+
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()
+        except ImportError:
+            pass
+
+        API_KEY = os.getenv("API_KEY")
+        if API_KEY:
+            try:
+                from google import genai
+                model = genai.Client(api_key=API_KEY)
+            except Exception as e:
+                log.warning(f"⚠️ LLM API başlatılamadı: {e}")
+        else:
+            log.warning("⚠️ API_KEY set edilmemiş, dummy modda çalışacak.")
+
+        _model_loaded = True
+        return model
 
 
 def _llm_chat(prompt: str, system: str = "You are an English teacher.", timeout: int = 10) -> str:
@@ -38,20 +68,21 @@ def _llm_chat(prompt: str, system: str = "You are an English teacher.", timeout:
     Tüm LLM çağrıları buradan geçer.
     Eğer API yoksa dummy cevap döner.
     """
+    client = _get_model()
 
-    if model is None:
+    if client is None:
         # Fallback: gerçek LLM yokken JSON döndür
         # Bu sentinel string kullanılarak mistake_feedback'te tanınır
         return "DUMMY_RESPONSE"
 
     try:
-        response = model.models.generate_content(
+        response = client.models.generate_content(
             model="gemini-2.5-flash",
             contents=f"Sistem: {system}\n\nPrompt: {prompt}",
         )
         return response.text
     except Exception as e:
-        print(f"❌ LLM API hatası: {e}")
+        log.error(f"❌ LLM API hatası: {e}")
         return "DUMMY_RESPONSE"
 
 def translate_word(word: str) -> str:
@@ -526,6 +557,8 @@ def mistake_feedback(wrong_answer: str, correct_answer: str, context: str = "sen
       "example": "Benzeri bir örnek",
       "practice_sentence": "Pratik için örnek cümle"
     }
+    LLM yoksa veya cevap ayrıştırılamazsa üretilen yedek geri bildirimde
+    ayrıca "is_fallback": True bulunur (kalıcı cache'e yazılmaz).
     """
     
     context_descriptions = {
@@ -557,7 +590,7 @@ SADECE şu JSON formatında cevap ver, başka birşey yazma:
     
     # Dummy response kontrolü
     if result == "DUMMY_RESPONSE":
-        print(f"⚠️ API bağlantısı yok, fallback feedback kullanılıyor")
+        log.warning(f"⚠️ API bağlantısı yok, fallback feedback kullanılıyor")
         
         # Doğru cevaba göre anlamlı bir örnek cümle oluştur
         correct_lower = correct_answer.lower().strip()
@@ -669,7 +702,8 @@ SADECE şu JSON formatında cevap ver, başka birşey yazma:
                 "Günlük hayatta bu kelimeyi kullanacak durumlar düşün"
             ],
             "example": f"Correct usage: {correct_answer}",
-            "practice_sentence": practice_sent
+            "practice_sentence": practice_sent,
+            "is_fallback": True
         }
     
     try:
@@ -685,7 +719,7 @@ SADECE şu JSON formatında cevap ver, başka birşey yazma:
                 raise ValueError("Eksik alanlar")
             return data
     except (json.JSONDecodeError, ValueError, IndexError) as e:
-        print(f"⚠️ JSON parse hatası: {e}, fallback kullanılıyor")
+        log.warning(f"⚠️ JSON parse hatası: {e}, fallback kullanılıyor")
     
     # Fallback: Manuel bir geri bildirim oluştur
     return {
@@ -696,6 +730,7 @@ SADECE şu JSON formatında cevap ver, başka birşey yazma:
             "Sık sık pratik yap"
         ],
         "example": f"Doğru kullanım: {correct_answer}",
-        "practice_sentence": f"Örnek cümle: She decided to {correct_answer} the project carefully."
+        "practice_sentence": f"Örnek cümle: She decided to {correct_answer} the project carefully.",
+        "is_fallback": True
     }
 
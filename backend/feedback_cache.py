@@ -0,0 +1,163 @@
+"""
+feedback_cache.py
+
+Hata geri bildirimleri (mistake_feedback) için kalıcı cache ve sınırlı iş havuzu.
+
+- Anahtar: (wrong_answer, correct_answer, context). Aynı çift tüm kullanıcılar
+  için bir kez üretilir ve mistake_feedback_cache tablosunda saklanır.
+- Eksik çiftler sınırlı bir ThreadPoolExecutor üzerinde paralel üretilir;
+  aynı çift için eşzamanlı istekler aynı future'ı bekler.
+- LLM yokken üretilen yedek geri bildirimler (is_fallback) cache'e yazılmaz.
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db_utils import get_db_connection
+from backend.ai_utils import mistake_feedback
+from log_utils import get_logger
+
+log = get_logger("feedback_cache")
+
+FEEDBACK_WORKERS = int(os.environ.get("FEEDBACK_WORKERS", 4))
+BATCH_TIMEOUT_SECONDS = 20
+
+Key = Tuple[str, str, str]
+
+_executor = None
+_executor_lock = threading.Lock()
+_inflight = {}  # Key -> Future
+_inflight_lock = threading.RLock()  # future zaten bitmişse done-callback aynı thread'de çalışır
+
+
+def make_key(wrong_answer: Optional[str], correct_answer: Optional[str], context: Optional[str]) -> Key:
+    """Cache anahtarı (boşluklar kırpılır, context varsayılanı 'sentence')."""
+    return ((wrong_answer or "").strip(), (correct_answer or "").strip(), (context or "sentence").strip())
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Fork edilen worker'da ilk kullanımda oluşturulur (master'da thread açılmaz)
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FEEDBACK_WORKERS,
+                                               thread_name_prefix="mistake-feedback")
+    return _executor
+
+
+def get_cached_many(keys: Iterable[Key]) -> Dict[Key, dict]:
+    """Verilen anahtarlardan cache'te olanları tek sorguda döner."""
+    keys = list(set(keys))
+    if not keys:
+        return {}
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    found = {}
+    try:
+        # SQLite değişken limiti için parçalara böl (her anahtar 3 değişken)
+        for i in range(0, len(keys), 250):
+            chunk = keys[i:i + 250]
+            conditions = " OR ".join(["(wrong_answer = ? AND correct_answer = ? AND context = ?)"] * len(chunk))
+            cursor.execute(f"""
+                SELECT wrong_answer, correct_answer, context, feedback
+                FROM mistake_feedback_cache WHERE {conditions}
+            """, [v for key in chunk for v in key])
+            for row in cursor.fetchall():
+                found[(row[0], row[1], row[2])] = json.loads(row[3])
+    except Exception as e:
+        log.error(f"❌ Feedback cache okuma hatası: {e}")
+    finally:
+        conn.close()
+    return found
+
+
+def _store_many(results: Dict[Key, dict]):
+    """Yedek olmayan geri bildirimleri cache'e yazar."""
+    rows = [(*key, json.dumps(fb, ensure_ascii=False))
+            for key, fb in results.items() if not fb.get("is_fallback")]
+    if not rows:
+        return
+
+    conn = get_db_connection()
+    try:
+        conn.executemany("""
+            INSERT OR REPLACE INTO mistake_feedback_cache (wrong_answer, correct_answer, context, feedback)
+            VALUES (?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+    except Exception as e:
+        log.error(f"❌ Feedback cache yazma hatası: {e}")
+    finally:
+        conn.close()
+
+
+def _generate(key: Key) -> dict:
+    """İş havuzunda çalışır: geri bildirimi üretir ve cache'e yazar (istek timeout olsa bile)."""
+    wrong_answer, correct_answer, context = key
+    try:
+        feedback = mistake_feedback(wrong_answer=wrong_answer, correct_answer=correct_answer, context=context)
+    except Exception as e:
+        log.error(f"❌ Mistake feedback error for {key}: {e}")
+        return fallback_feedback(correct_answer)
+    _store_many({key: feedback})
+    return feedback
+
+
+def fallback_feedback(correct_answer: str) -> dict:
+    """Geri bildirim alınamadığında gösterilecek içerik."""
+    return {
+        "explanation": "Geri bildirim şu anda alınamadı, lütfen daha sonra tekrar deneyin.",
+        "tips": ["Doğru cevabı dikkatlice inceleyerek öğrenmeye devam et"],
+        "example": correct_answer or "",
+        "practice_sentence": "",
+        "is_fallback": True
+    }
+
+
+def get_feedback_many(keys: Iterable[Key], timeout: float = BATCH_TIMEOUT_SECONDS) -> Tuple[Dict[Key, dict], List[Key]]:
+    """
+    Anahtarlar için geri bildirimleri döner: önce cache, eksikler iş havuzunda paralel.
+
+    Returns:
+        (sonuçlar, timeout içinde bitmeyen anahtarlar)
+    """
+    keys = list(dict.fromkeys(keys))
+    results = get_cached_many(keys)
+    missing = [k for k in keys if k not in results]
+    if not missing:
+        return results, []
+
+    executor = _get_executor()
+    futures = {}
+    with _inflight_lock:
+        for key in missing:
+            future = _inflight.get(key)
+            if future is None:
+                future = executor.submit(_generate, key)
+                _inflight[key] = future
+                future.add_done_callback(lambda f, key=key: _release(key, f))
+            futures[key] = future
+
+    done, _ = wait(futures.values(), timeout=timeout)
+    results.update({key: f.result() for key, f in futures.items() if f in done})
+
+    pending = [key for key, f in futures.items() if f not in done]
+    return results, pending
+
+
+def _release(key: Key, future):
+    with _inflight_lock:
+        if _inflight.get(key) is future:
+            del _inflight[key]
+
+
+def get_feedback(wrong_answer: str, correct_answer: str, context: str = "sentence") -> dict:
+    """Tek çift için geri bildirim (cache'li)."""
+    key = make_key(wrong_answer, correct_answer, context)
+    results, _ = get_feedback_many([key])
+    return results.get(key) or fallback_feedback(correct_answer)
@@ -0,0 +1,214 @@
+"""
+memory_model.py
+
+Öğrenci-kelime hafıza modeli: (user_id, word_id) başına tek satır `learner_items`.
+
+Her satır deneme/doğru sayısı, üstel ağırlıklı ortalama skor (EWMA, 0-100),
+son görülme zamanı ve SM-2 tekrar durumunu (repetition, interval, easiness,
+due_day) tutar. Satır, cevabı kaydeden kodla aynı transaction içinde
+record_answer() ile güncellenir:
+- çeviri denemeleri (UserInputLogger.log_translation_attempt)
+- telaffuz denemeleri (UserInputLogger.log_pronunciation_attempt, backend/tracker)
+- tekrar quiz'indeki kelime soruları (backend/srs.apply_reviews)
+
+Okuyucular ham logları toplamak yerine bu tabloyu okur:
+- (user_id, ewma_score) index'i: "en zayıf N kelime" (recommender.get_weak_words)
+- (user_id, due_day) index'i: "şimdi tekrar edilecekler" (backend/selection üzerinden
+  get_review_quiz, /practice_word ve ders soruları)
+
+Tablo ilk kurulduğunda mevcut loglardan backfill() ile doldurulur.
+"""
+
+from datetime import datetime
+from itertools import groupby
+from typing import Any, Dict, List, Optional
+
+from db_utils import get_db_connection
+from log_utils import get_logger
+from backend.srs import epoch_day, schedule_sm2
+
+log = get_logger("memory_model")
+
+EWMA_ALPHA = 0.3
+PRONUNCIATION_PASS_SCORE = 70
+
+
+def create_schema(cur):
+    """learner_items tablosu ve index'leri (db_utils.init_db'den çağrılır)."""
+    # Cevap yazma yolu (user_db.log_translation_attempt) ve backfill() kelimeyi
+    # english ile bulur; index yoksa her cevapta words taranır
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_words_english ON words(english)")
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS learner_items (
+        user_id INTEGER NOT NULL,
+        word_id INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        ewma_score REAL NOT NULL DEFAULT 0,
+        last_score REAL,
+        last_source TEXT,
+        last_seen TIMESTAMP,
+        repetition INTEGER NOT NULL DEFAULT 0,
+        interval INTEGER NOT NULL DEFAULT 0,
+        easiness REAL NOT NULL DEFAULT 2.5,
+        due_day INTEGER NOT NULL DEFAULT 0,
+        last_review_day INTEGER,
+        PRIMARY KEY (user_id, word_id)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_learner_items_weak ON learner_items (user_id, ewma_score)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_learner_items_due ON learner_items (user_id, due_day)")
+
+
+def quality_from_score(score: Optional[float], is_correct: Optional[bool]) -> int:
+    """0-100 skoru ve doğruluk bilgisini SM-2 kalitesine (0-5) çevirir."""
+    score = score or 0
+    if is_correct:
+        return 5 if score >= 95 else 4 if score >= 85 else 3
+    return 2 if score >= 50 else 1 if score >= 20 else 0
+
+
+def _next_state(state: Optional[Dict[str, Any]], score: float, is_correct: bool, source: str,
+                seen_at: str, today: int) -> Dict[str, Any]:
+    if state is None:
+        state = {"attempts": 0, "correct": 0, "ewma_score": score, "repetition": 0,
+                 "interval": 0, "easiness": 2.5, "due_day": today, "last_review_day": None}
+
+    ewma = score if state["attempts"] == 0 else EWMA_ALPHA * score + (1 - EWMA_ALPHA) * state["ewma_score"]
+    new_state = dict(state, attempts=state["attempts"] + 1, correct=state["correct"] + (1 if is_correct else 0),
+                     ewma_score=ewma, last_score=score, last_source=source, last_seen=seen_at)
+
+    # Vadesinden önce verilen doğru cevap planı ilerletmez; yanlış cevap her zaman sıfırlar
+    quality = quality_from_score(score, is_correct)
+    if quality < 3 or state["due_day"] <= today:
+        new_state = schedule_sm2(new_state, quality, today)
+    return new_state
+
+
+_STATE_COLUMNS = ("attempts", "correct", "ewma_score", "last_score", "last_source", "last_seen",
+                  "repetition", "interval", "easiness", "due_day", "last_review_day")
+
+_UPSERT_SQL = f"""
+    INSERT OR REPLACE INTO learner_items (user_id, word_id, {', '.join(_STATE_COLUMNS)})
+    VALUES (?, ?, {', '.join('?' * len(_STATE_COLUMNS))})
+"""
+
+
+def record_answer(cursor, user_id: int, word_id: Optional[int], score: Optional[float],
+                  is_correct: Optional[bool], source: str, seen_at: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Bir cevabı hafıza modeline işler. Cevabı yazan transaction'ın cursor'ı ile çağrılır.
+
+    Args:
+        score: 0-100 arası skor (None ise doğruluktan türetilir)
+        source: 'translation', 'pronunciation', 'review' ...
+
+    Returns:
+        Yeni durum (word_id yoksa None)
+    """
+    if not user_id or not word_id:
+        return None
+    if score is None:
+        score = 100.0 if is_correct else 0.0
+    seen_at = seen_at or datetime.now().isoformat()
+
+    cursor.execute(f"SELECT {', '.join(_STATE_COLUMNS)} FROM learner_items WHERE user_id = ? AND word_id = ?",
+                   (user_id, word_id))
+    row = cursor.fetchone()
+    state = dict(zip(_STATE_COLUMNS, row)) if row else None
+
+    new_state = _next_state(state, float(score), bool(is_correct), source, seen_at, epoch_day())
+    cursor.execute(_UPSERT_SQL, (user_id, word_id, *(new_state[c] for c in _STATE_COLUMNS)))
+    return new_state
+
+
+# ==================== OKUMA ====================
+
+def get_weakest(user_id: int, limit: int = 10, min_attempts: int = 1,
+                max_score: Optional[float] = None) -> List[Dict[str, Any]]:
+    """En düşük EWMA skorlu kelimeler ((user_id, ewma_score) index'i sırasıyla)."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute(f"""
+            SELECT li.word_id, w.english, w.turkish, li.ewma_score, li.attempts, li.correct, li.due_day
+            FROM learner_items li
+            JOIN words w ON w.word_id = li.word_id
+            WHERE li.user_id = ? AND li.attempts >= ?{" AND li.ewma_score < ?" if max_score is not None else ""}
+            ORDER BY li.ewma_score ASC
+            LIMIT ?
+        """, [user_id, min_attempts, *([max_score] if max_score is not None else []), limit]).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
+
+
+def get_due(user_id: int, limit: int = 20, today: Optional[int] = None,
+            exclude_words: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Vadesi gelmiş kelimeler: önce en eski vade, sonra en zayıf."""
+    today = epoch_day() if today is None else today
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT li.word_id, w.english, w.turkish, li.ewma_score, li.attempts, li.correct, li.due_day
+            FROM learner_items li
+            JOIN words w ON w.word_id = li.word_id
+            WHERE li.user_id = ? AND li.due_day <= ?
+            ORDER BY li.due_day ASC, li.ewma_score ASC
+            LIMIT ?
+        """, (user_id, today, limit + len(exclude_words or []))).fetchall()
+        excluded = {w.lower() for w in exclude_words or []}
+        return [dict(r) for r in rows if (r["english"] or "").lower() not in excluded][:limit]
+    finally:
+        conn.close()
+
+
+# ==================== BACKFILL ====================
+
+def backfill() -> int:
+    """
+    learner_items boşsa çeviri ve telaffuz loglarını zaman sırasıyla yeniden oynatarak doldurur.
+    Dolu tabloya dokunmaz (tekrar quiz'inden gelen SRS durumu loglarda yoktur).
+
+    Returns:
+        Oluşturulan satır sayısı
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        if cur.execute("SELECT EXISTS (SELECT 1 FROM learner_items)").fetchone()[0]:
+            return 0
+
+        cur.execute("""
+            SELECT user_id, word_id, score, is_correct, source, ts FROM (
+                SELECT t.user_id,
+                       COALESCE(t.word_id, (SELECT w.word_id FROM words w WHERE w.english = t.english_word LIMIT 1)) AS word_id,
+                       COALESCE(t.similarity_score, 0) * 100 AS score, t.is_correct,
+                       'translation' AS source, t.timestamp AS ts
+                FROM translation_log t
+                UNION ALL
+                SELECT user_id, word_id, score, score >= :pass_score, 'pronunciation', timestamp
+                FROM pronunciation_attempts
+                WHERE score IS NOT NULL
+            )
+            WHERE word_id IS NOT NULL
+            ORDER BY user_id, word_id, ts
+        """, {"pass_score": PRONUNCIATION_PASS_SCORE})
+
+        rows = []
+        for (user_id, word_id), events in groupby(cur, key=lambda r: (r[0], r[1])):
+            state = None
+            for event in events:
+                seen_at = event[5] or datetime.now().isoformat()
+                state = _next_state(state, float(event[2] or 0), bool(event[3]), event[4], seen_at,
+                                    epoch_day(seen_at[:10]))
+            rows.append((user_id, word_id, *(state[c] for c in _STATE_COLUMNS)))
+
+        cur.executemany(_UPSERT_SQL, rows)
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        log.error(f"❌ Hafıza modeli backfill hatası: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
@@ -1,21 +1,22 @@
 from typing import List, Dict
 from db_utils import get_db_connection, get_due_mistakes
+from backend import selection
 import random
 
 
-def get_weak_words(user_id, min_attempts=3, threshold=60):
+def get_weak_words(user_id, min_attempts=3, threshold=60, limit=50):
+    """En zayıf kelimeler: learner_items (user_id, ewma_score) index'i üzerinden, log taraması yok."""
     conn = get_db_connection()
     cur = conn.cursor()
 
     cur.execute("""
-        SELECT word_id, english as target_word, AVG(score) as avg_score, COUNT(*) as cnt
-        FROM pronunciation_attempts
-        JOIN words USING(word_id)
-        WHERE user_id = ?
-        GROUP BY word_id
-        HAVING cnt >= ? AND avg_score < ?
-        ORDER BY avg_score ASC
-    """, (user_id, min_attempts, threshold))
+        SELECT li.word_id, w.english as target_word, li.ewma_score as avg_score, li.attempts as cnt
+        FROM learner_items li
+        JOIN words w ON w.word_id = li.word_id
+        WHERE li.user_id = ? AND li.ewma_score < ? AND li.attempts >= ?
+        ORDER BY li.ewma_score ASC
+        LIMIT ?
+    """, (user_id, threshold, min_attempts, limit))
 
     rows = cur.fetchall()
     conn.close()
@@ -32,6 +33,8 @@ def get_review_quiz(user_id: int, limit: int = 20) -> List[Dict]:
     - `get_due_mistakes()` ile next_review zamanı gelen hataları al
     - `count`, `repetition` gibi alanlara göre öncelik ver
     - `context`'e göre prompt oluştur ("Daha önce telaffuz hatası" veya "Cümle hatası")
+    - Kalan yerleri vadesi gelmiş kelimelerle doldur (backend/selection, `word_id` taşırlar,
+      sonuçları /api/review/session ile learner_items'a yazılır); öncelik seçim puanıdır
     """
     rows = get_due_mistakes(user_id=user_id, limit=limit)
     quiz_items = []
@@ -73,6 +76,29 @@ def get_review_quiz(user_id: int, limit: int = 20) -> List[Dict]:
             },
         })
 
+    mistake_keys = {(q["item_key"] or "").lower() for q in quiz_items}
+    remaining = max(limit - len(quiz_items), 0)
+    due_words = selection.next_items(user_id, remaining + len(mistake_keys), review=True) if remaining else []
+    due_words = [w for w in due_words if w["turkish"] and w["english"].lower() not in mistake_keys][:remaining]
+    answers = [w["turkish"] for w in due_words]
+    for w in due_words:
+        distractors = [a for a in answers if a != w["turkish"]]
+        quiz_items.append({
+            "mistake_id": None,
+            "word_id": w["word_id"],
+            "item_key": w["english"],
+            "context": "word",
+            "prompt": f"'{w['english']}' kelimesinin anlamı nedir?",
+            "correct_answer": w["turkish"],
+            "wrong_example": random.choice(distractors) if distractors else None,
+            "priority": w["score"],
+            "meta": {
+                "next_review": None,
+                "last_seen": None,
+                "easiness": None,
+            },
+        })
+
     # Shuffle with priority bias (higher priority => appear earlier)
     quiz_items.sort(key=lambda x: (-x["priority"], x["meta"]["next_review"] or ""))
 
@@ -0,0 +1,236 @@
+"""
+selection.py
+
+Kişiselleştirilmiş sıradaki-kelime seçimi: next_items(user_id, k).
+
+Aday kelimeler dört sinyalle puanlanır:
+- vade (due): hafıza modelinde (learner_items) vadesi gelmiş/geçmiş kelimeler
+- zayıflık: düşük EWMA skoru
+- yenilik: kullanıcının henüz hiç görmediği kelimeler
+- seviye uyumu: kullanıcının seviyesi (veya dersin seviyesi) ve komşu seviyeler
+
+Puanlanan adaylar (kullanıcı, kapsam) başına bellekte bir max-heap'te tutulur.
+Heap ilk istekte, boşaldığında veya HEAP_TTL_SECONDS dolduğunda DB'den yeniden
+kurulur; aradaki istekler yalnızca heap'ten pop + k satırlık PK okumasıdır.
+Yeni kelimeler ORDER BY RANDOM() taraması yerine CourseSystem'in word index'inden
+örneklenir. Heap'ler süreç-içi bir LRU'da durur; worker'lar arasında paylaşılmaz.
+
+Sunulan kelimeler son RECENT_SIZE seçimde tekrar sunulmaz (tekrar kapsamı hariç).
+Kelime verisi toplu değiştiğinde ('words' cache sürümü artınca) tüm heap'ler düşürülür.
+
+Kapsamlar:
+- pratik (varsayılan): kullanıcının seviyesi, tüm kategoriler
+- ders: ünitenin seviyesi ve kategorileri (CourseSystem._generate_questions)
+- tekrar: sadece vadesi gelmiş görülmüş kelimeler (get_review_quiz)
+"""
+
+import heapq
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from db_utils import get_db_connection
+from log_utils import get_logger
+from backend.srs import epoch_day
+from features.course_system import LEVEL_ORDER, course_system
+import vocab_store
+
+log = get_logger("selection")
+
+W_DUE = 3.0
+W_WEAK = 2.0
+W_NOVEL = 1.0
+W_LEVEL = 1.0
+JITTER = 0.5
+
+HEAP_SIZE = 100
+LEARNER_CANDIDATES = 500
+NOVEL_CANDIDATES = 150
+RECENT_SIZE = 20
+HEAP_TTL_SECONDS = int(os.environ.get("SELECTION_HEAP_TTL", 300))
+HEAP_CACHE_SIZE = 5000
+
+_heaps: "OrderedDict[Tuple, _UserHeap]" = OrderedDict()
+_heaps_lock = threading.Lock()
+_heaps_version = None
+
+
+class _UserHeap:
+    __slots__ = ("entries", "built_at", "recent")
+
+    def __init__(self):
+        self.entries: List[Tuple[float, int]] = []
+        self.built_at = 0.0
+        self.recent = deque(maxlen=RECENT_SIZE)
+
+
+def _nearby_levels(level: str) -> List[str]:
+    idx = LEVEL_ORDER.index(level) if level in LEVEL_ORDER else 0
+    return LEVEL_ORDER[max(idx - 1, 0):idx] + LEVEL_ORDER[idx + 1:idx + 2]
+
+
+def _level_fit(word_level: Optional[str], level: str) -> float:
+    if word_level == level:
+        return 1.0
+    if word_level in LEVEL_ORDER and level in LEVEL_ORDER:
+        return 0.5 if abs(LEVEL_ORDER.index(word_level) - LEVEL_ORDER.index(level)) == 1 else 0.0
+    return 0.0
+
+
+def score_learner_item(ewma_score: float, due_day: int, word_level: Optional[str], level: str, today: int) -> float:
+    """Görülmüş bir kelimenin puanı: vade + zayıflık + seviye uyumu."""
+    due = 1 + min(today - due_day, 30) / 30 if due_day <= today else 0.0
+    weak = (100 - (ewma_score or 0)) / 100
+    return W_DUE * due + W_WEAK * weak + W_LEVEL * _level_fit(word_level, level)
+
+
+def score_novel_item(word_level: Optional[str], level: str) -> float:
+    """Hiç görülmemiş bir kelimenin puanı: yenilik + seviye uyumu."""
+    return W_NOVEL + W_LEVEL * _level_fit(word_level, level)
+
+
+def _user_level(conn, user_id: int) -> str:
+    row = conn.execute("SELECT level FROM users WHERE user_id = ?", (user_id,)).fetchone()
+    return (row[0] if row else None) or 'A1'
+
+
+def _build(user_id: int, scope: Tuple, exclude: Sequence[int]) -> List[Tuple[float, int]]:
+    """Adayları DB'den okuyup puanlar; en iyi HEAP_SIZE tanesini heap olarak döner."""
+    level, categories, review = scope
+    today = epoch_day()
+    excluded = set(exclude)
+
+    conn = get_db_connection()
+    try:
+        level = level or _user_level(conn, user_id)
+        filters, params = [], [user_id]
+        if review:
+            filters.append("li.due_day <= ?")
+            params.append(today)
+        else:
+            filters.append("w.level IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps([level] + _nearby_levels(level)))
+        if categories:
+            filters.append("""EXISTS (SELECT 1 FROM word_categories wc WHERE wc.word_id = w.word_id
+                              AND wc.category IN (SELECT value FROM json_each(?)))""")
+            params.append(json.dumps(list(categories)))
+
+        rows = conn.execute(f"""
+            SELECT li.word_id, li.ewma_score, li.due_day, w.level
+            FROM learner_items li
+            JOIN words w ON w.word_id = li.word_id
+            WHERE li.user_id = ? AND {" AND ".join(filters)}
+            ORDER BY li.due_day ASC
+            LIMIT ?
+        """, (*params, LEARNER_CANDIDATES)).fetchall()
+    finally:
+        conn.close()
+
+    seen = {row[0] for row in rows}
+    scored = [(score_learner_item(row[1], row[2], row[3], level, today) + random.random() * JITTER, row[0])
+              for row in rows if row[0] not in excluded]
+
+    if not review:
+        skip = seen | excluded
+        # Yeni kelimeler: çoğu kendi seviyesinden, kalanı komşu seviyelerden
+        for word_level, share in [(level, 0.7)] + [(l, 0.3) for l in _nearby_levels(level)]:
+            ids = course_system.sample_word_ids([word_level], list(categories) if categories else None,
+                                                int(NOVEL_CANDIDATES * share), skip)
+            base = score_novel_item(word_level, level)
+            scored.extend((base + random.random() * JITTER, word_id) for word_id in ids)
+
+    best = heapq.nlargest(HEAP_SIZE, scored)
+    entries = [(-score, word_id) for score, word_id in best]
+    heapq.heapify(entries)
+    return entries
+
+
+def _fetch(word_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    if not word_ids:
+        return {}
+    store = vocab_store.get_store()
+    if store is not None:
+        found = store.get_many(word_ids)
+        if len(found) == len(set(word_ids)):
+            return {word_id: {key: word[key] for key in ("word_id", "english", "turkish", "level", "example_sentence")}
+                    for word_id, word in found.items()}
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT word_id, english, turkish, level, example_sentence
+            FROM words WHERE word_id IN (SELECT value FROM json_each(?))
+        """, (json.dumps(word_ids),)).fetchall()
+        return {row["word_id"]: dict(row) for row in rows}
+    finally:
+        conn.close()
+
+
+def next_items(user_id: int, k: int = 1, level: Optional[str] = None,
+               categories: Optional[Sequence[str]] = None, review: bool = False) -> List[Dict[str, Any]]:
+    """
+    Kullanıcı için sıradaki k kelimeyi seçer (en yüksek puan önce).
+
+    Args:
+        level: Seviye kapsamı (varsayılan kullanıcının seviyesi)
+        categories: Kategori kapsamı (ders üniteleri için)
+        review: Sadece vadesi gelmiş görülmüş kelimeler
+
+    Returns:
+        [{'word_id', 'english', 'turkish', 'level', 'example_sentence', 'score'}, ...]
+        (k'dan az olabilir)
+    """
+    global _heaps_version
+    if not user_id or k <= 0:
+        return []
+    # Seviyeler yeniden etiketlendiyse eski seviyeyle puanlanmış heap'ler geçersiz
+    version = course_system.ensure_fresh_word_index()
+    if version != _heaps_version:
+        with _heaps_lock:
+            _heaps.clear()
+            _heaps_version = version
+    scope = (level, tuple(sorted(categories)) if categories else None, review)
+    key = (user_id, scope)
+
+    with _heaps_lock:
+        user_heap = _heaps.get(key)
+        if user_heap is None:
+            user_heap = _heaps[key] = _UserHeap()
+            if len(_heaps) > HEAP_CACHE_SIZE:
+                _heaps.popitem(last=False)
+        else:
+            _heaps.move_to_end(key)
+        stale = len(user_heap.entries) < k or time.monotonic() - user_heap.built_at > HEAP_TTL_SECONDS
+        recent = list(user_heap.recent)
+
+    if stale:
+        entries = _build(user_id, scope, recent)
+        with _heaps_lock:
+            user_heap.entries = entries
+            user_heap.built_at = time.monotonic()
+
+    with _heaps_lock:
+        picked = []
+        while user_heap.entries and len(picked) < k:
+            score, word_id = heapq.heappop(user_heap.entries)
+            picked.append((word_id, -score))
+            # Tekrar kapsamı her quiz'de vadesi gelenlerin tamamını ister; cevaplanan
+            # kelimeler zaten vadeden çıkar
+            if not review:
+                user_heap.recent.append(word_id)
+
+    words = _fetch([word_id for word_id, _ in picked])
+    return [dict(words[word_id], score=round(score, 3)) for word_id, score in picked if word_id in words]
+
+
+def invalidate(user_id: Optional[int] = None):
+    """Kullanıcının (veya tümünün) heap'lerini düşürür; sonraki istekte yeniden kurulur."""
+    with _heaps_lock:
+        if user_id is None:
+            _heaps.clear()
+            return
+        for key in [key for key in _heaps if key[0] == user_id]:
+            del _heaps[key]
@@ -1,23 +1,32 @@
-import speech_recognition as sr
 import io
 import tempfile
 import os
+from log_utils import get_logger
+
+log = get_logger("speech_stt")
+
+
+def _load_sr():
+    """speech_recognition modülünü ilk STT isteğinde yükler (lazy import)."""
+    import speech_recognition
+    return speech_recognition
 
 
 def listen_and_recognize(language="en-US") -> str:
     """
     Mikrofonu açar, kullanıcının sesini dinler ve metne çevirir.
     """
+    sr = _load_sr()
     recognizer = sr.Recognizer()
 
     with sr.Microphone() as source:
-        print("🎤 Konuşabilirsiniz...")
+        log.info("🎤 Konuşabilirsiniz...")
         recognizer.adjust_for_ambient_noise(source, duration=0.5)
         audio = recognizer.listen(source)
 
     try:
         text = recognizer.recognize_google(audio, language=language)
-        print("📝 Algılanan metin:", text)
+        log.debug("📝 Algılanan metin: %s", text)
         return text
 
     except sr.UnknownValueError:
@@ -32,6 +41,7 @@ def recognize_from_audio_file(audio_file, language="en-US") -> str:
     Web'den gelen ses dosyasını alır ve metne çevirir.
     audio_file: Flask request.files'dan gelen dosya veya dosya yolu
     """
+    sr = _load_sr()
     recognizer = sr.Recognizer()
     
     try:
@@ -56,7 +66,7 @@ def recognize_from_audio_file(audio_file, language="en-US") -> str:
         
         # Google STT ile tanı
         text = recognizer.recognize_google(audio, language=language)
-        print(f"📝 Web STT Sonuç: {text}")
+        log.debug("📝 Web STT Sonuç: %s", text)
         
         # Geçici dosyayı sil
         if temp_path != audio_file and os.path.exists(temp_path):
@@ -76,6 +86,7 @@ def recognize_from_blob(audio_blob: bytes, language="en-US") -> str:
     """
     Web'den gelen raw audio blob'u alır ve metne çevirir.
     """
+    sr = _load_sr()
     recognizer = sr.Recognizer()
     
     try:
@@ -90,7 +101,7 @@ def recognize_from_blob(audio_blob: bytes, language="en-US") -> str:
         
         # Google STT ile tanı
         text = recognizer.recognize_google(audio, language=language)
-        print(f"📝 Blob STT Sonuç: {text}")
+        log.debug("📝 Blob STT Sonuç: %s", text)
         
         # Temizle
         os.remove(temp_path)
@@ -0,0 +1,332 @@
+"""
+srs.py
+
+Aralıklı tekrar (spaced repetition) zamanlayıcısı ve toplu tekrar oturumu.
+
+- Vade tarihi `mistakes.due_day` kolonunda tamsayı epoch günü (UTC,
+  1970-01-01'den itibaren gün) olarak tutulur; (user_id, due_day) index'i
+  vadesi gelen kuyruğudur. ISO string karşılaştırması yapılmaz.
+- Kullanıcı başına vadesi gelen sayısı `srs_due_counts` (user_id, due_day,
+  items) sayaçlarından okunur; sayaçlar mistakes üzerindeki trigger'larla
+  güncellenir (bkz. db_utils.init_db). Okuma öğe sayısından bağımsızdır.
+- apply_reviews() bir quiz'in tüm sonuçlarını tek transaction'da uygular:
+  tek SELECT ile durumlar okunur, yeni durumlar `executemany` ile yazılır.
+  `word_id` taşıyan kelime soruları aynı transaction'da öğrenci-kelime
+  hafıza modeline (backend/memory_model.learner_items) işlenir.
+
+İki zamanlayıcı vardır (SRS_SCHEDULER ortam değişkeni, varsayılan sm2):
+- sm2: klasik SM-2 (repetition / interval / easiness)
+- fsrs: FSRS-4.5 tarzı stabilite/zorluk modeli (hedef hatırlama oranı
+  FSRS_RETENTION, varsayılan 0.9)
+"""
+
+import json
+import math
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from db_utils import get_db_connection
+from log_utils import get_logger
+
+log = get_logger("srs")
+
+DEFAULT_SCHEDULER = os.environ.get("SRS_SCHEDULER", "sm2")
+MAX_INTERVAL_DAYS = 36500
+MAX_SESSION_ITEMS = 200
+
+_EPOCH = date(1970, 1, 1)
+
+
+def epoch_day(value: Optional[Any] = None) -> int:
+    """Tarihi (date/datetime/ISO string, varsayılan bugün UTC) epoch gününe çevirir."""
+    if value is None:
+        value = datetime.utcnow().date()
+    elif isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def day_to_datetime(day: int) -> datetime:
+    """Epoch gününü (gece yarısı UTC) datetime'a çevirir."""
+    return datetime.combine(_EPOCH + timedelta(days=day), datetime.min.time())
+
+
+def parse_quality(value: Any) -> Optional[int]:
+    """
+    İstemciden gelen kaliteyi doğrular: 0-5 arası tam sayı veya tam sayı string'i.
+    Geçersizse None (çağıran öğeyi yeniden planlamadan reddeder).
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value.isdigit():
+            return None
+        value = int(value)
+    if not isinstance(value, int) or not 0 <= value <= 5:
+        return None
+    return value
+
+
+def _clamp_quality(quality: Any) -> int:
+    try:
+        quality = int(quality)
+    except (TypeError, ValueError):
+        quality = 0
+    return max(0, min(5, quality))
+
+
+# ==================== SM-2 ====================
+
+def schedule_sm2(state: Dict[str, Any], quality: int, today: int) -> Dict[str, Any]:
+    """
+    SM-2: quality 0-5 (>=3 geçer). Yeni repetition/interval/easiness ve vade günü.
+    """
+    repetition = state.get("repetition") or 0
+    interval = state.get("interval") or 0
+    easiness = state.get("easiness") or 2.5
+
+    if quality < 3:
+        repetition = 0
+        interval = 1
+    else:
+        if repetition == 0:
+            interval = 1
+        elif repetition == 1:
+            interval = 6
+        else:
+            interval = max(1, round(interval * easiness))
+        repetition += 1
+
+    easiness = max(1.3, easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    interval = min(interval, MAX_INTERVAL_DAYS)
+
+    return dict(state, repetition=repetition, interval=interval, easiness=easiness,
+                due_day=today + interval, last_review_day=today)
+
+
+# ==================== FSRS ====================
+
+# FSRS-4.5 varsayılan ağırlıkları
+FSRS_WEIGHTS = (0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031,
+                1.6474, 0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755)
+FSRS_RETENTION = float(os.environ.get("FSRS_RETENTION", 0.9))
+_DECAY = -0.5
+_FACTOR = 0.9 ** (1 / _DECAY) - 1
+
+
+def _fsrs_grade(quality: int) -> int:
+    """0-5 kalitesini FSRS notuna çevirir: 1 tekrar, 2 zor, 3 iyi, 4 kolay."""
+    if quality < 3:
+        return 1
+    return {3: 2, 4: 3}.get(quality, 4)
+
+
+def _fsrs_initial_difficulty(grade: int) -> float:
+    w = FSRS_WEIGHTS
+    return min(10.0, max(1.0, w[4] - (grade - 3) * w[5]))
+
+
+def schedule_fsrs(state: Dict[str, Any], quality: int, today: int) -> Dict[str, Any]:
+    """
+    FSRS-4.5 tarzı zamanlama: stabilite (gün) ve zorluk (1-10) güncellenir,
+    aralık hedef hatırlama oranına göre stabiliteden hesaplanır.
+    SM-2 ile planlanmış öğeler ilk FSRS tekrarında interval'den başlatılır.
+    """
+    w = FSRS_WEIGHTS
+    grade = _fsrs_grade(quality)
+    stability = state.get("stability")
+    difficulty = state.get("difficulty")
+    repetition = state.get("repetition") or 0
+
+    if stability is None and repetition == 0:
+        stability = w[grade - 1]
+        difficulty = _fsrs_initial_difficulty(grade)
+    else:
+        if stability is None:
+            stability = float(max(state.get("interval") or 1, 1))
+            difficulty = _fsrs_initial_difficulty(3)
+        last_review = state.get("last_review_day")
+        elapsed = today - last_review if last_review is not None else (state.get("interval") or 0)
+        retrievability = (1 + _FACTOR * max(elapsed, 0) / stability) ** _DECAY
+
+        difficulty = difficulty - w[6] * (grade - 3)
+        difficulty = w[7] * _fsrs_initial_difficulty(4) + (1 - w[7]) * difficulty
+        difficulty = min(10.0, max(1.0, difficulty))
+
+        if grade == 1:
+            stability = min(stability, w[11] * difficulty ** -w[12]
+                            * ((stability + 1) ** w[13] - 1) * math.exp(w[14] * (1 - retrievability)))
+        else:
+            hard_penalty = w[15] if grade == 2 else 1
+            easy_bonus = w[16] if grade == 4 else 1
+            stability = stability * (1 + math.exp(w[8]) * (11 - difficulty) * stability ** -w[9]
+                                     * (math.exp(w[10] * (1 - retrievability)) - 1) * hard_penalty * easy_bonus)
+
+    interval = stability / _FACTOR * (FSRS_RETENTION ** (1 / _DECAY) - 1)
+    interval = min(MAX_INTERVAL_DAYS, max(1, round(interval)))
+
+    return dict(state,
+                repetition=0 if grade == 1 else repetition + 1,
+                interval=interval,
+                stability=stability,
+                difficulty=difficulty,
+                due_day=today + interval,
+                last_review_day=today)
+
+
+SCHEDULERS: Dict[str, Callable[[Dict[str, Any], int, int], Dict[str, Any]]] = {
+    "sm2": schedule_sm2,
+    "fsrs": schedule_fsrs,
+}
+
+
+# ==================== TOPLU TEKRAR OTURUMU ====================
+
+_STATE_COLUMNS = "mistake_id, item_key, repetition, interval, easiness, stability, difficulty, last_review_day, due_day"
+
+
+def apply_reviews(user_id: int, results: Iterable[Dict[str, Any]],
+                  scheduler: Optional[str] = None, today: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Bir tekrar oturumunun sonuçlarını tek transaction'da uygular.
+
+    Args:
+        user_id: Kullanıcı
+        results: [{'mistake_id' veya 'item_key' veya 'word_id', 'quality': 0-5}, ...]
+                 Aynı öğe birden çok kez geçerse sırayla uygulanır.
+                 Sadece 'word_id' taşıyan sonuçlar learner_items'a yazılır.
+        scheduler: 'sm2' veya 'fsrs' (varsayılan SRS_SCHEDULER)
+        today: Epoch günü (test/benchmark için; varsayılan bugün)
+
+    Returns:
+        {'updated': [...], 'words': [...], 'missing': [...], 'due_count': int}
+
+    Raises:
+        ValueError: Bilinmeyen zamanlayıcı
+    """
+    schedule = SCHEDULERS.get(scheduler or DEFAULT_SCHEDULER)
+    if schedule is None:
+        raise ValueError(f"Bilinmeyen zamanlayıcı: {scheduler}")
+    today = epoch_day() if today is None else today
+    results = list(results)[:MAX_SESSION_ITEMS]
+    word_results = [r for r in results if _is_word_result(r)]
+    results = [r for r in results if not _is_word_result(r)]
+
+    ids = [r["mistake_id"] for r in results if r.get("mistake_id") is not None]
+    keys = [r["item_key"] for r in results if r.get("mistake_id") is None and r.get("item_key")]
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+
+    try:
+        cursor.execute(f"""
+            SELECT {_STATE_COLUMNS} FROM mistakes
+            WHERE user_id = ?
+              AND (mistake_id IN (SELECT value FROM json_each(?))
+                   OR item_key IN (SELECT value FROM json_each(?)))
+        """, (user_id, json.dumps(ids), json.dumps(keys)))
+        states = {}
+        for row in cursor.fetchall():
+            state = dict(row)
+            states[("id", state["mistake_id"])] = state
+            states[("key", state["item_key"])] = state
+
+        now = datetime.utcnow()
+        updated, missing = {}, []
+        for result in results:
+            ref = ("id", result["mistake_id"]) if result.get("mistake_id") is not None else ("key", result.get("item_key"))
+            state = states.get(ref)
+            if state is None:
+                missing.append(result.get("mistake_id") or result.get("item_key"))
+                continue
+            new_state = schedule(state, _clamp_quality(result.get("quality")), today)
+            # Aynı öğe tekrar gelirse güncel durumdan devam et
+            states[("id", new_state["mistake_id"])] = states[("key", new_state["item_key"])] = new_state
+            updated[new_state["mistake_id"]] = new_state
+
+        cursor.executemany("""
+            UPDATE mistakes SET repetition = ?, interval = ?, easiness = ?, stability = ?, difficulty = ?,
+                due_day = ?, last_review_day = ?, next_review = ?, last_seen = ?
+            WHERE mistake_id = ?
+        """, [(s["repetition"], s["interval"], s.get("easiness"), s.get("stability"), s.get("difficulty"),
+               s["due_day"], s["last_review_day"], day_to_datetime(s["due_day"]).isoformat(sep=' '),
+               now.isoformat(sep=' '), mistake_id) for mistake_id, s in updated.items()])
+
+        words = {}
+        if word_results:
+            from backend import memory_model
+            for result in word_results:
+                quality = _clamp_quality(result.get("quality"))
+                state = memory_model.record_answer(cursor, user_id, result["word_id"], quality * 20,
+                                                   quality >= 3, "review", now.isoformat())
+                words[result["word_id"]] = {"word_id": result["word_id"], "ewma_score": state["ewma_score"],
+                                            "due_day": state["due_day"]}
+
+        cursor.execute(_DUE_COUNT_SQL, (user_id, today))
+        due_count = cursor.fetchone()[0]
+        conn.commit()
+
+        return {
+            "updated": [_public_state(s) for s in updated.values()],
+            "words": list(words.values()),
+            "missing": missing,
+            "due_count": due_count,
+        }
+
+    except Exception as e:
+        log.error(f"❌ Tekrar oturumu kaydetme hatası: {e}")
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _is_word_result(result: Dict[str, Any]) -> bool:
+    return result.get("mistake_id") is None and not result.get("item_key") and isinstance(result.get("word_id"), int)
+
+
+def _public_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "mistake_id": state["mistake_id"],
+        "item_key": state["item_key"],
+        "repetition": state["repetition"],
+        "interval": state["interval"],
+        "easiness": state.get("easiness"),
+        "stability": state.get("stability"),
+        "difficulty": state.get("difficulty"),
+        "due_day": state["due_day"],
+        "next_review": day_to_datetime(state["due_day"]).isoformat(sep=' '),
+    }
+
+
+# ==================== VADESİ GELENLER ====================
+
+_DUE_COUNT_SQL = "SELECT COALESCE(SUM(items), 0) FROM srs_due_counts WHERE user_id = ? AND due_day <= ?"
+
+
+def get_due_count(user_id: int, today: Optional[int] = None) -> int:
+    """Vadesi gelmiş öğe sayısı (gün sayaçlarından, öğe taraması yok)."""
+    conn = get_db_connection()
+    try:
+        return conn.execute(_DUE_COUNT_SQL, (user_id, epoch_day() if today is None else today)).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def get_due_items(user_id: int, limit: int = 20, today: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Vadesi gelmiş öğeler: önce en eski vade, sonra en çok tekrarlanan hata."""
+    conn = get_db_connection()
+    try:
+        rows = conn.execute("""
+            SELECT * FROM mistakes
+            WHERE user_id = ? AND due_day <= ?
+            ORDER BY due_day ASC, count DESC
+            LIMIT ?
+        """, (user_id, epoch_day() if today is None else today, limit)).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        conn.close()
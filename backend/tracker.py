@@ -1,8 +1,15 @@
 import json
 from db_utils import get_db_connection
+from backend import memory_model
+import vocab_store
 
 
 def _get_or_create_word_id(conn, english_word: str):
+    store = vocab_store.get_store()
+    word_id = store.word_id_for(english_word) if store is not None else None
+    if word_id:
+        return word_id
+
     cur = conn.cursor()
     # Önce kelimeyi ara
     cur.execute("SELECT word_id FROM words WHERE english = ?", (english_word,))
@@ -46,6 +53,9 @@ def save_pronunciation(user_id, word=None, score=None, feedback=None, word_id=No
         """,
         (user_id, word_id, english or None, score, feedback),
     )
+    if score is not None:
+        memory_model.record_answer(cur, user_id, word_id, score,
+                                   score >= memory_model.PRONUNCIATION_PASS_SCORE, 'pronunciation')
 
     conn.commit()
     conn.close()
@@ -0,0 +1,236 @@
+"""
+word_search.py
+
+Kelime arama: otomatik tamamlama ve konu bazlı kurs oluşturma için
+english/turkish üzerinde önek ve bulanık (typo toleranslı) arama.
+
+Index'ler vocab_store snapshot'ındadır (tüm worker'lar paylaşır):
+- önek: normalize english ve katlanmış turkish'e göre sıralı satır dizileri
+  üzerinde ikili arama
+- bulanık: katlanmış trigram ters index'i; trigram örtüşmesi en yüksek adaylar
+  difflib oranıyla yeniden puanlanır. Katlama Türkçe karakterleri ASCII'ye
+  indirger ("seker" → "şeker", "gozluk" → "gözlük").
+
+Sıralama: tam eşleşme, sonra freq (yüksek önce), sonra kısa kelime.
+Depo kapalıysa (VOCAB_STORE=0) words_fts (FTS5, `flask --app app build-search-fts`
+ile kurulur) veya idx_words_english üzerinde önek aralığı kullanılır.
+"""
+
+import difflib
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+import vocab_store
+from db_utils import get_db_connection
+from log_utils import get_logger
+
+log = get_logger("word_search")
+
+MIN_FUZZY_LENGTH = 3
+MIN_FUZZY_RATIO = 0.6
+PREFIX_SCAN = 2000
+FUZZY_CANDIDATES = 200
+# Çok yaygın trigramlar (ör. "  s") aday üretmez, sadece sayımı pahalılaştırır
+MAX_TRIGRAM_POSTINGS = 20000
+
+_RESULT_KEYS = ("word_id", "english", "turkish", "level", "category", "topic_id")
+
+
+def _freq_key(word: Dict[str, Any]) -> float:
+    return -(word["freq"] or 0.0)
+
+
+def _matches_filters(word: Dict[str, Any], level: Optional[str], topic_id: Optional[int]) -> bool:
+    return (level is None or word["level"] == level) and (topic_id is None or word["topic_id"] == topic_id)
+
+
+def _result(word: Dict[str, Any], match: str, score: float) -> Dict[str, Any]:
+    return dict({key: word[key] for key in _RESULT_KEYS}, match=match, score=round(score, 3))
+
+
+def _prefix_search(store, query: str, langs: List[str], limit: int,
+                   level: Optional[str], topic_id: Optional[int]) -> List[Dict[str, Any]]:
+    found = {}
+    for lang in langs:
+        key = vocab_store.fold(query) if lang == "tr" else vocab_store.normalize(query)
+        for row in store.prefix_rows(query, lang, PREFIX_SCAN):
+            word = store.record(row)
+            if word["word_id"] in found or not _matches_filters(word, level, topic_id):
+                continue
+            text = vocab_store.fold(word["turkish"]) if lang == "tr" else vocab_store.normalize(word["english"])
+            found[word["word_id"]] = (text != key, _freq_key(word), len(text), text, word)
+
+    ranked = sorted(found.values(), key=lambda item: item[:4])[:limit]
+    return [_result(item[4], "exact" if not item[0] else "prefix", 1.0) for item in ranked]
+
+
+def _fuzzy_search(store, query: str, langs: List[str], limit: int, exclude,
+                  level: Optional[str], topic_id: Optional[int]) -> List[Dict[str, Any]]:
+    key = vocab_store.fold(query)
+    hits = Counter()
+    for gram in vocab_store.trigrams(key):
+        rows = store.trigram_rows(gram)
+        if len(rows) <= MAX_TRIGRAM_POSTINGS:
+            hits.update(rows)
+
+    scored = []
+    for row, _ in hits.most_common(FUZZY_CANDIDATES):
+        word = store.record(row)
+        if word["word_id"] in exclude or not _matches_filters(word, level, topic_id):
+            continue
+        texts = []
+        if "en" in langs:
+            texts.append(vocab_store.fold(word["english"]))
+        if "tr" in langs and word["turkish"]:
+            texts.append(vocab_store.fold(word["turkish"]))
+        ratio = max((difflib.SequenceMatcher(None, key, text).ratio() for text in texts), default=0.0)
+        if ratio >= MIN_FUZZY_RATIO:
+            scored.append((-ratio, _freq_key(word), len(word["english"]), word))
+
+    scored.sort(key=lambda item: item[:3])
+    return [_result(item[3], "fuzzy", -item[0]) for item in scored[:limit]]
+
+
+def _db_search(query: str, langs: List[str], limit: int,
+               level: Optional[str], topic_id: Optional[int]) -> List[Dict[str, Any]]:
+    """Depo yokken: FTS5 tablosu varsa onunla, yoksa istenen dillerin kolonlarında önek aralığı."""
+    key = vocab_store.normalize(query)
+    filters, params = [], []
+    if level:
+        filters.append("w.level = ?")
+        params.append(level)
+    if topic_id is not None:
+        filters.append("w.topic_id = ?")
+        params.append(topic_id)
+    extra = "".join(f" AND {f}" for f in filters)
+
+    conn = get_db_connection()
+    try:
+        has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'words_fts'").fetchone()
+        if has_fts:
+            columns = "{english turkish}" if len(langs) == 2 else ("english" if langs == ["en"] else "turkish")
+            phrase = '"' + key.replace('"', '""') + '"'
+            rows = conn.execute(f"""
+                SELECT w.word_id, w.english, w.turkish, w.level, w.category, w.topic_id
+                FROM words_fts f JOIN words w ON w.word_id = f.rowid
+                WHERE words_fts MATCH ?{extra}
+                ORDER BY w.english = ? DESC, COALESCE(w.freq, 0) DESC, f.rank
+                LIMIT ?
+            """, (f"{columns} : {phrase} *", *params, key, limit)).fetchall()
+        else:
+            # Dil başına önek aralığı: english idx_words_english'i kullanır, turkish
+            # index'siz taranır (bu yol sadece depo ve FTS yokken çalışır)
+            found = {}
+            for lang in langs:
+                column = "english" if lang == "en" else "turkish"
+                lang_key = key if lang == "en" else query.strip().replace("İ", "i").replace("I", "ı").lower()
+                for row in conn.execute(f"""
+                    SELECT w.word_id, w.english, w.turkish, w.level, w.category, w.topic_id, w.freq
+                    FROM words w
+                    WHERE w.{column} >= ? AND w.{column} < ?{extra}
+                    ORDER BY w.{column} = ? DESC, COALESCE(w.freq, 0) DESC, LENGTH(w.{column}), w.{column}
+                    LIMIT ?
+                """, (lang_key, lang_key + "\uffff", *params, lang_key, limit)):
+                    text = row[1] if lang == "en" else row[2]
+                    rank = (text != lang_key, -(row[6] or 0.0), len(text))
+                    if row[0] not in found or rank < found[row[0]][0]:
+                        found[row[0]] = (rank, row)
+            ranked = sorted(found.values(), key=lambda item: item[0])[:limit]
+            return [dict(dict(zip(_RESULT_KEYS, row)), match="prefix" if rank[0] else "exact", score=1.0)
+                    for rank, row in ranked]
+        return [dict(dict(zip(_RESULT_KEYS, row)), match="exact" if row[1] == key else "prefix", score=1.0)
+                for row in rows]
+    finally:
+        conn.close()
+
+
+def search(query: str, limit: int = 10, lang: str = "both", mode: str = "auto",
+           level: Optional[str] = None, topic_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Kelime arar.
+
+    Args:
+        lang: 'en', 'tr' veya 'both'
+        mode: 'prefix', 'fuzzy' veya 'auto' (önek sonuçları limit'e ulaşmazsa bulanıkla tamamlar)
+        level, topic_id: İsteğe bağlı filtreler
+
+    Returns:
+        [{'word_id', 'english', 'turkish', 'level', 'category', 'topic_id', 'match', 'score'}, ...]
+    """
+    query = (query or "").strip()
+    if not query or limit <= 0:
+        return []
+    langs = ["en", "tr"] if lang == "both" else [lang]
+
+    store = vocab_store.get_store()
+    if store is None:
+        try:
+            return _db_search(query, langs, limit, level, topic_id)
+        except Exception as e:
+            log.error(f"❌ Kelime arama hatası: {e}")
+            return []
+
+    results = [] if mode == "fuzzy" else _prefix_search(store, query, langs, limit, level, topic_id)
+    if mode != "prefix" and len(results) < limit and len(vocab_store.fold(query)) >= MIN_FUZZY_LENGTH:
+        seen = {r["word_id"] for r in results}
+        results += _fuzzy_search(store, query, langs, limit - len(results), seen, level, topic_id)
+    return results
+
+
+# ==================== FTS5 (isteğe bağlı) ====================
+
+def build_fts() -> int:
+    """
+    words_fts (FTS5, harici içerik = words) tablosunu ve senkron trigger'larını kurar,
+    içeriği yeniden oluşturur. SQLite FTS5 olmadan derlenmişse hata verir.
+
+    Returns:
+        İndekslenen kelime sayısı
+    """
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(
+                english, turkish, content='words', content_rowid='word_id',
+                tokenize="unicode61 remove_diacritics 2"
+            )
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_words_fts_insert AFTER INSERT ON words BEGIN
+                INSERT INTO words_fts (rowid, english, turkish) VALUES (NEW.word_id, NEW.english, NEW.turkish);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_words_fts_delete AFTER DELETE ON words BEGIN
+                INSERT INTO words_fts (words_fts, rowid, english, turkish)
+                VALUES ('delete', OLD.word_id, OLD.english, OLD.turkish);
+            END
+        """)
+        cur.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_words_fts_update AFTER UPDATE OF english, turkish ON words BEGIN
+                INSERT INTO words_fts (words_fts, rowid, english, turkish)
+                VALUES ('delete', OLD.word_id, OLD.english, OLD.turkish);
+                INSERT INTO words_fts (rowid, english, turkish) VALUES (NEW.word_id, NEW.english, NEW.turkish);
+            END
+        """)
+        cur.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+        conn.commit()
+        return cur.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def drop_fts():
+    """words_fts tablosunu ve trigger'larını kaldırır (toplu importlar trigger'sız daha hızlı)."""
+    conn = get_db_connection()
+    try:
+        for trigger in ("trg_words_fts_insert", "trg_words_fts_delete", "trg_words_fts_update"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        conn.execute("DROP TABLE IF EXISTS words_fts")
+        conn.commit()
+    finally:
+        conn.close()
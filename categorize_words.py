@@ -1,10 +1,28 @@
 """
 Kelimeleri kategorilere ayıran script.
 En yaygın ~5000 kelimeyi kategorize eder, geri kalanı 'other' olur.
+
+Sözlük TEMP bir tabloya yüklenir ve words ile tek geçişte birleştirilir (kelime başına
+UPDATE yok). Bir kelime sözlükte birden fazla kategorideyse hepsi word_categories'e
+yazılır; words.category birincil (sözlükteki ilk) kategoridir. Sözlükte olmayan ve
+elle/seed ile atanmış birincil kategoriler korunur.
+
+İş artımlı ve idempotent'tir: her satıra sözlüğün sürümü (category_rules) yazılır,
+sonraki çalıştırmalar sadece yeni, english'i değişmiş veya eski sözlükle işlenmiş
+kelimelere dokunur. --full tüm kelimeleri yeniden işler.
+
+Kullanım:
+    python categorize_words.py
+    python categorize_words.py --full
 """
 
+import argparse
+import hashlib
+import json
 import sqlite3
 
+from db_utils import DB_PATH, bump_cache_version
+
 # Kategori tanımları - her kategoriye ait kelimeler
 CATEGORIES = {
     # A1 - Temel
@@ -491,58 +509,117 @@ UNIT_CATEGORY_MAP = {
 }
 
 
-def categorize_words():
-    """Kelimeleri kategorilere ayır."""
-    conn = sqlite3.connect('app.db')
-    cursor = conn.cursor()
-    
-    # Tüm kategorilerdeki kelimeleri düz listeye çevir (kelime -> kategori)
-    word_to_category = {}
-    for category, words in CATEGORIES.items():
-        for word in words:
-            word_lower = word.lower()
-            if word_lower not in word_to_category:
-                word_to_category[word_lower] = category
-    
-    print(f"📚 Toplam {len(word_to_category)} kelime tanımlandı")
-    
-    # Veritabanındaki kelimeleri kategorize et
-    updated = 0
-    
-    # Batch güncelleme için
+def rules_version() -> str:
+    """Sözlükten türetilen sürüm; sözlük değişince değişir."""
+    return hashlib.sha1(json.dumps(CATEGORIES, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+
+def _load_terms(conn):
+    """Sözlüğü TEMP category_terms tablosuna yükler (ord: sözlükteki sıra → birincil kategori)."""
+    conn.execute("DROP TABLE IF EXISTS temp.category_terms")
+    conn.execute("""
+        CREATE TEMP TABLE category_terms (
+            term TEXT NOT NULL,
+            category TEXT NOT NULL,
+            ord INTEGER NOT NULL,
+            PRIMARY KEY (term, category)
+        ) WITHOUT ROWID
+    """)
+    rows = []
     for category, words in CATEGORIES.items():
-        if not words:
-            continue
-            
-        # Her kelime için güncelle
         for word in words:
-            cursor.execute("""
-                UPDATE words 
-                SET category = ? 
-                WHERE LOWER(english) = ? AND (category IS NULL OR category = '')
-            """, (category, word.lower()))
-            updated += cursor.rowcount
-    
-    # Kategorize edilmemiş kelimeleri 'other' yap
-    cursor.execute("""
-        UPDATE words 
-        SET category = 'other' 
-        WHERE category IS NULL OR category = ''
-    """)
-    other_count = cursor.rowcount
+            rows.append((word.lower(), category, len(rows)))
+    conn.executemany("INSERT OR IGNORE INTO category_terms (term, category, ord) VALUES (?, ?, ?)", rows)
+    return conn.execute("SELECT COUNT(DISTINCT term) FROM category_terms").fetchone()[0]
+
+
+def categorize_words(full: bool = False, db_path: str = None):
+    """
+    Kelimeleri kategorilere ayır.
+    
+    Args:
+        full: Sürümü güncel olanlar dahil tüm kelimeleri yeniden işle
+    
+    Returns:
+        {'processed', 'categorized', 'other', 'links'}
+    """
+    rules = rules_version()
+    manual = f"manual:{rules}"
+    conn = sqlite3.connect(db_path or DB_PATH, isolation_level=None, timeout=60)
+    cursor = conn.cursor()
     
-    conn.commit()
+    try:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        print(f"📚 Toplam {_load_terms(conn)} kelime tanımlandı (sözlük: {rules})")
+        
+        conn.execute("BEGIN IMMEDIATE")
+        
+        # İşlenecek kelimeler ve eşleşmeleri: words tek kez taranır, her kelime
+        # category_terms'in PK'sında aranır
+        conn.execute("DROP TABLE IF EXISTS temp.categorize_todo")
+        conn.execute(f"""
+            CREATE TEMP TABLE categorize_todo AS
+            SELECT word_id,
+                   (SELECT t.category FROM category_terms t
+                    WHERE t.term = LOWER(w.english) ORDER BY t.ord LIMIT 1) AS matched,
+                   CASE WHEN category_rules IS NULL OR category_rules LIKE 'manual:%'
+                        THEN NULLIF(NULLIF(category, ''), 'other') END AS kept
+            FROM words w
+            {"" if full else "WHERE category_rules IS NULL OR category_rules NOT IN (?, ?)"}
+        """, () if full else (rules, manual))
+        conn.execute("CREATE UNIQUE INDEX temp.idx_categorize_todo ON categorize_todo (word_id)")
+        processed = conn.execute("SELECT COUNT(*) FROM categorize_todo").fetchone()[0]
+        
+        # Birincil kategori: sözlükteki ilk eşleşme, yoksa elle atanmış kategori, yoksa 'other'
+        # (trigger'lar word_categories'teki birincil satırı günceller)
+        cursor.execute("""
+            UPDATE words
+            SET category = COALESCE(c.matched, c.kept, 'other'),
+                category_rules = CASE WHEN c.matched IS NULL AND c.kept IS NOT NULL THEN ? ELSE ? END
+            FROM categorize_todo c
+            WHERE words.word_id = c.word_id
+        """, (manual, rules))
+        
+        # Ek kategoriler: işlenen kelimelerin bağlantıları baştan yazılır
+        cursor.execute("""
+            DELETE FROM word_categories
+            WHERE word_id IN (SELECT word_id FROM categorize_todo)
+        """)
+        cursor.execute("""
+            INSERT OR IGNORE INTO word_categories (word_id, category)
+            SELECT c.word_id, t.category
+            FROM categorize_todo c
+            JOIN words w ON w.word_id = c.word_id
+            JOIN category_terms t ON t.term = LOWER(w.english)
+            UNION ALL
+            SELECT c.word_id, c.kept FROM categorize_todo c WHERE c.kept IS NOT NULL
+        """)
+        links = cursor.rowcount
+        
+        categorized = conn.execute("SELECT COUNT(*) FROM categorize_todo WHERE matched IS NOT NULL").fetchone()[0]
+        other_count = conn.execute("""
+            SELECT COUNT(*) FROM categorize_todo WHERE matched IS NULL AND kept IS NULL
+        """).fetchone()[0]
+        
+        if processed:
+            bump_cache_version(cursor, 'words')
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.close()
+        raise
     
     # İstatistikleri göster
-    print(f"\n✅ {updated} kelime kategorize edildi")
+    print(f"\n🔄 {processed} kelime işlendi")
+    print(f"✅ {categorized} kelime kategorize edildi ({links} kategori bağlantısı)")
     print(f"📦 {other_count} kelime 'other' kategorisine atandı")
     
-    # Kategori dağılımını göster
+    # Kategori dağılımını göster (bir kelime birden fazla kategoride sayılabilir)
     print("\n📊 Kategori Dağılımı:")
     cursor.execute("""
         SELECT category, COUNT(*) as cnt 
-        FROM words 
-        WHERE category != 'other' AND category IS NOT NULL
+        FROM word_categories
         GROUP BY category 
         ORDER BY cnt DESC
     """)
@@ -556,7 +633,11 @@ def categorize_words():
     
     conn.close()
     print("\n✅ Kategorileme tamamlandı!")
+    return {"processed": processed, "categorized": categorized, "other": other_count, "links": links}
 
 
 if __name__ == "__main__":
-    categorize_words()
+    parser = argparse.ArgumentParser(description="Kelimeleri kategorilere ayır")
+    parser.add_argument("--full", action="store_true", help="tüm kelimeleri yeniden işle")
+    args = parser.parse_args()
+    categorize_words(args.full)
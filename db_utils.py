@@ -15,33 +15,43 @@ import sqlite3
 from typing import List, Generator
 from contextlib import contextmanager
 import threading
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
+import query_stats
+from log_utils import get_logger
+from pagination import build_page, keyset_condition
+
+logger = get_logger("db_utils")
+
+# APP_DB_PATH ile farklı bir veritabanı kullanılabilir (benchmark, test ortamı vb.)
+DB_PATH = os.environ.get("APP_DB_PATH") or os.path.join(os.path.dirname(__file__), "app.db")
 
 # Thread-safe bağlantı için lock (yazma işlemleri için)
 _db_write_lock = threading.Lock()
 
+# cache_versions satırlarının başlangıç değeri (veritabanına özgü olsun diye rastgele)
+_RANDOM_VERSION_SQL = "ABS(RANDOM() % 1000000000000) + 1"
 
-def _connect():
-	"""Veritabanı bağlantısı oluşturur."""
-	conn = sqlite3.connect(DB_PATH, timeout=60, check_same_thread=False)
+
+def _connect(row_factory: bool = False):
+	"""
+	Tek bağlantı fabrikası: tüm bağlantılar buradan açılır.
+	Bağlantılar query_stats ile enstrümante edilir (sorgu sayısı, süre, yavaş sorgu logu).
+	"""
+	conn = sqlite3.connect(DB_PATH, timeout=60, check_same_thread=False, factory=query_stats.connection_factory())
 	# WAL mode - daha iyi eşzamanlılık için
 	conn.execute("PRAGMA journal_mode=WAL")
 	conn.execute("PRAGMA busy_timeout=60000")  # 60 saniye bekle
 	conn.execute("PRAGMA synchronous=NORMAL")  # Performans için
+	if row_factory:
+		conn.row_factory = sqlite3.Row
 	return conn
 
 
 def get_db_connection():
 	"""Veritabani baglantisi dondur. 
 	DEPRECATED: Yeni kodlarda get_db() context manager kullanın."""
-	conn = sqlite3.connect(DB_PATH, timeout=60, check_same_thread=False)
-	conn.execute("PRAGMA journal_mode=WAL")
-	conn.execute("PRAGMA busy_timeout=60000")
-	conn.execute("PRAGMA synchronous=NORMAL")
-	conn.row_factory = sqlite3.Row
-	return conn
+	return _connect(row_factory=True)
 
 
 @contextmanager
@@ -61,11 +71,7 @@ def get_db() -> Generator[sqlite3.Connection, None, None]:
 		- Otomatik close (her durumda)
 		- Database locked hatası minimize edilir
 	"""
-	conn = sqlite3.connect(DB_PATH, timeout=60, check_same_thread=False)
-	conn.execute("PRAGMA journal_mode=WAL")
-	conn.execute("PRAGMA busy_timeout=60000")
-	conn.execute("PRAGMA synchronous=NORMAL")
-	conn.row_factory = sqlite3.Row
+	conn = _connect(row_factory=True)
 	
 	try:
 		yield conn
@@ -82,6 +88,11 @@ def init_db():
 	conn = _connect()
 	cur = conn.cursor()
 
+	# Yeni veritabanı: boşalan sayfalar retention'da incremental VACUUM ile iade edilsin
+	if cur.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+		cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+		cur.execute("VACUUM")
+
 	# users
 	cur.execute("""
 	CREATE TABLE IF NOT EXISTS users (
@@ -106,6 +117,29 @@ def init_db():
 	except:
 		pass  # Kolon zaten var
 
+	# placement_sessions - Süren uyarlamalı seviye testi (kullanıcı başına tek oturum, JSON durum)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS placement_sessions (
+		user_id INTEGER PRIMARY KEY,
+		state TEXT NOT NULL,
+		updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+	)
+	""")
+
+	# placement_responses - Biten testlerin cevapları (soru bankası kalibrasyonu için)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS placement_responses (
+		response_id INTEGER PRIMARY KEY AUTOINCREMENT,
+		user_id INTEGER NOT NULL,
+		word_id INTEGER NOT NULL,
+		q_type TEXT NOT NULL,
+		theta REAL NOT NULL,
+		correct INTEGER NOT NULL,
+		answered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+	)
+	""")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_placement_responses_word ON placement_responses (word_id)")
+
 	# topics
 	cur.execute("""
 	CREATE TABLE IF NOT EXISTS topics (
@@ -142,6 +176,95 @@ def init_db():
 	
 	# category için index oluştur (hızlı sorgular için)
 	cur.execute("CREATE INDEX IF NOT EXISTS idx_words_category ON words(category)")
+	# english ile arama: cevap yazma yolu, hafıza modeli backfill'i, import (memory_model de kurar)
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_words_english ON words(english)")
+
+	# level_rules: seviyeyi hesaplayan kural setinin sürümü (artımlı yeniden etiketleme için);
+	# english değişirse sıfırlanır
+	try:
+		cur.execute("ALTER TABLE words ADD COLUMN level_rules TEXT")
+	except:
+		pass  # Kolon zaten var
+	cur.execute("""
+	CREATE TRIGGER IF NOT EXISTS trg_words_english_relabel AFTER UPDATE OF english ON words
+	BEGIN
+		UPDATE words SET level_rules = NULL WHERE word_id = NEW.word_id;
+	END
+	""")
+
+	# word_categories - Kelime ↔ kategori (bir kelime birden fazla kategoride olabilir).
+	# words.category birincil kategoridir; trigger'lar onu tabloya yansıtır, ek kategorileri
+	# categorize_words.py yazar
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS word_categories (
+		word_id INTEGER NOT NULL,
+		category TEXT NOT NULL,
+		PRIMARY KEY (word_id, category)
+	) WITHOUT ROWID
+	""")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_word_categories_category ON word_categories (category, word_id)")
+	# category_rules: kategorize eden sözlüğün sürümü (NULL → henüz işlenmedi; 'manual:' öneki →
+	# birincil kategori elle/seed ile atanmış; english değişirse sürüm düşer, yeniden işlenir)
+	try:
+		cur.execute("ALTER TABLE words ADD COLUMN category_rules TEXT")
+	except:
+		pass  # Kolon zaten var
+	cur.execute("""
+	CREATE TRIGGER IF NOT EXISTS trg_words_category_insert AFTER INSERT ON words
+	WHEN NEW.category IS NOT NULL AND NEW.category NOT IN ('', 'other')
+	BEGIN
+		INSERT OR IGNORE INTO word_categories (word_id, category) VALUES (NEW.word_id, NEW.category);
+	END
+	""")
+	cur.execute("""
+	CREATE TRIGGER IF NOT EXISTS trg_words_category_update AFTER UPDATE OF category ON words
+	WHEN NEW.category IS NOT OLD.category
+	BEGIN
+		DELETE FROM word_categories WHERE word_id = NEW.word_id AND category = OLD.category;
+		INSERT OR IGNORE INTO word_categories (word_id, category)
+		SELECT NEW.word_id, NEW.category WHERE NEW.category IS NOT NULL AND NEW.category NOT IN ('', 'other');
+	END
+	""")
+	cur.execute("""
+	CREATE TRIGGER IF NOT EXISTS trg_words_category_delete AFTER DELETE ON words
+	BEGIN
+		DELETE FROM word_categories WHERE word_id = OLD.word_id;
+	END
+	""")
+	cur.execute("""
+	CREATE TRIGGER IF NOT EXISTS trg_words_english_recategorize AFTER UPDATE OF english ON words
+	BEGIN
+		UPDATE words SET category_rules = CASE WHEN category_rules LIKE 'manual:%' THEN 'manual:' ELSE 'stale' END
+		WHERE word_id = NEW.word_id AND category_rules IS NOT NULL;
+	END
+	""")
+	# Tablo yeni eklendiyse mevcut birincil kategorilerle doldur
+	cur.execute("""
+	INSERT INTO word_categories (word_id, category)
+	SELECT word_id, category FROM words
+	WHERE category IS NOT NULL AND category NOT IN ('', 'other')
+	AND NOT EXISTS (SELECT 1 FROM word_categories)
+	""")
+
+	# word_distractors - Çoktan seçmeli sorular için önceden hesaplanmış yanlış seçenekler
+	# (distractor_ids: little-endian int64 word_id dizisi; bkz. scripts/build_distractors.py)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS word_distractors (
+		word_id INTEGER PRIMARY KEY,
+		distractor_ids BLOB NOT NULL
+	)
+	""")
+
+	# cache_versions - Süreç içi cache'lerin (word index, seçim heap'leri) geçersiz kılınma sayaçları
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS cache_versions (
+		name TEXT PRIMARY KEY,
+		version INTEGER NOT NULL DEFAULT 0
+	)
+	""")
+	# Sürüm rastgele bir tabandan başlar: yeniden oluşturulan bir veritabanı, diskte kalan
+	# cache'lerle (ör. vocab_store snapshot'ı) aynı sürüm numarasına düşmez
+	cur.execute(f"INSERT OR IGNORE INTO cache_versions (name, version) VALUES ('words', {_RANDOM_VERSION_SQL})")
 
 	# grammar_rules
 	cur.execute("""
@@ -265,6 +388,66 @@ CREATE TABLE IF NOT EXISTS mistakes (
 CREATE INDEX IF NOT EXISTS idx_mistakes_user_next ON mistakes (user_id, next_review)
 """)
 
+	# SRS alanları yoksa ekle (migration): due_day = vade (epoch günü, bkz. backend/srs.py)
+	try:
+		cur.execute("ALTER TABLE mistakes ADD COLUMN due_day INTEGER NOT NULL DEFAULT 0")
+		cur.execute("""
+			UPDATE mistakes SET due_day = CAST(julianday(next_review) - 2440587.5 AS INTEGER)
+			WHERE next_review IS NOT NULL
+		""")
+	except sqlite3.OperationalError:
+		pass  # Kolon zaten var
+	for column, column_type in (("stability", "REAL"), ("difficulty", "REAL"), ("last_review_day", "INTEGER")):
+		try:
+			cur.execute(f"ALTER TABLE mistakes ADD COLUMN {column} {column_type}")
+		except sqlite3.OperationalError:
+			pass  # Kolon zaten var
+
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_mistakes_user_due ON mistakes (user_id, due_day)")
+
+	# srs_due_counts - Kullanıcı/vade günü başına öğe sayısı (vadesi gelen sayısı için)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS srs_due_counts (
+		user_id INTEGER NOT NULL,
+		due_day INTEGER NOT NULL,
+		items INTEGER NOT NULL DEFAULT 0,
+		PRIMARY KEY (user_id, due_day)
+	) WITHOUT ROWID
+	""")
+	for name, event, body in (
+		("trg_srs_due_insert", "AFTER INSERT ON mistakes", """
+			INSERT INTO srs_due_counts (user_id, due_day, items) VALUES (NEW.user_id, NEW.due_day, 1)
+			ON CONFLICT (user_id, due_day) DO UPDATE SET items = items + 1;"""),
+		("trg_srs_due_update", "AFTER UPDATE OF due_day, user_id ON mistakes", """
+			UPDATE srs_due_counts SET items = items - 1 WHERE user_id = OLD.user_id AND due_day = OLD.due_day;
+			DELETE FROM srs_due_counts WHERE user_id = OLD.user_id AND due_day = OLD.due_day AND items <= 0;
+			INSERT INTO srs_due_counts (user_id, due_day, items) VALUES (NEW.user_id, NEW.due_day, 1)
+			ON CONFLICT (user_id, due_day) DO UPDATE SET items = items + 1;"""),
+		("trg_srs_due_delete", "AFTER DELETE ON mistakes", """
+			UPDATE srs_due_counts SET items = items - 1 WHERE user_id = OLD.user_id AND due_day = OLD.due_day;
+			DELETE FROM srs_due_counts WHERE user_id = OLD.user_id AND due_day = OLD.due_day AND items <= 0;"""),
+	):
+		cur.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN {body} END")
+
+	# Sayaçlar boşsa (ilk kurulum / migration) mevcut hatalardan doldur
+	if cur.execute("SELECT NOT EXISTS (SELECT 1 FROM srs_due_counts)").fetchone()[0]:
+		cur.execute("""
+			INSERT INTO srs_due_counts (user_id, due_day, items)
+			SELECT user_id, due_day, COUNT(*) FROM mistakes GROUP BY user_id, due_day
+		""")
+
+	# mistake_feedback_cache - LLM hata geri bildirimleri (tüm kullanıcılar için ortak)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS mistake_feedback_cache (
+		wrong_answer TEXT NOT NULL,
+		correct_answer TEXT NOT NULL,
+		context TEXT NOT NULL,
+		feedback TEXT NOT NULL,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+		PRIMARY KEY (wrong_answer, correct_answer, context)
+	)
+	""")
+
 	# user_actions - Kullanıcı aksiyonlarını kaydı (sayfa ziyareti, buton tıklama vb.)
 	cur.execute("""
 	CREATE TABLE IF NOT EXISTS user_actions (
@@ -345,6 +528,60 @@ CREATE INDEX IF NOT EXISTS idx_mistakes_user_next ON mistakes (user_id, next_rev
 	)
 	""")
 
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_friends_friend ON friends (friend_id, status)")
+
+	# activity_events - Arkadaş akışı için özet olaylar (bkz. features/feed.py)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS activity_events (
+		event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+		actor_id INTEGER NOT NULL,
+		event_type TEXT NOT NULL,
+		payload TEXT,
+		dedupe_key TEXT,
+		created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+		FOREIGN KEY (actor_id) REFERENCES users(user_id),
+		UNIQUE(actor_id, dedupe_key)
+	)
+	""")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_actor ON activity_events (actor_id, event_id)")
+
+	# feed_inbox - Kullanıcı başına sınırlı akış (fan-out-on-write)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS feed_inbox (
+		user_id INTEGER NOT NULL,
+		event_id INTEGER NOT NULL,
+		actor_id INTEGER NOT NULL,
+		PRIMARY KEY (user_id, event_id)
+	) WITHOUT ROWID
+	""")
+
+	# feed_pull_actors - Olayları dağıtılmayan, okuma anında çekilen çok takipçili aktörler
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS feed_pull_actors (
+		actor_id INTEGER PRIMARY KEY
+	)
+	""")
+
+	# category_rankings - Kategori sıralamalarının periyodik anlık görüntüsü (bkz. features/leaderboard.py)
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS category_rankings (
+		category TEXT NOT NULL,
+		rank INTEGER NOT NULL,
+		user_id INTEGER NOT NULL,
+		value REAL NOT NULL,
+		total_inputs INTEGER NOT NULL DEFAULT 0,
+		PRIMARY KEY (category, rank)
+	) WITHOUT ROWID
+	""")
+
+	# category_rankings_meta - Her kategorinin son yenilenme zamanı
+	cur.execute("""
+	CREATE TABLE IF NOT EXISTS category_rankings_meta (
+		category TEXT PRIMARY KEY,
+		refreshed_at TIMESTAMP NOT NULL
+	)
+	""")
+
 	# study_groups - Çalışma grupları
 	cur.execute("""
 	CREATE TABLE IF NOT EXISTS study_groups (
@@ -455,9 +692,45 @@ CREATE INDEX IF NOT EXISTS idx_mistakes_user_next ON mistakes (user_id, next_rev
 	)
 	""")
 
+	# Keyset sayfalama index'leri: (user_id, zaman, id) sırası ORDER BY ile aynı
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_user_inputs_user_ts ON user_inputs (user_id, timestamp, input_id)")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_mistakes_user_seen ON mistakes (user_id, last_seen, mistake_id)")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications (user_id, created_at, notification_id)")
+	cur.execute("CREATE INDEX IF NOT EXISTS idx_goals_user_status_completed ON goals (user_id, status, completed_at, goal_id)")
+
+	# Profil özeti (denormalize okuma modeli) ve onu güncel tutan trigger'lar
+	from profile_summary import create_schema as create_profile_summary_schema
+	create_profile_summary_schema(cur)
+
+	# Öğrenci-kelime hafıza modeli (learner_items)
+	from backend.memory_model import create_schema as create_memory_model_schema
+	create_memory_model_schema(cur)
+
+	# Retention: günlük rollup'lar ve arşiv manifest'i
+	from retention import create_schema as create_retention_schema
+	create_retention_schema(cur)
+
 	conn.commit()
 	conn.close()
-	print("✓ SQLite DB hazır: " + DB_PATH)
+	logger.info("✓ SQLite DB hazır: " + DB_PATH)
+
+
+def bump_cache_version(cur, name: str):
+	"""
+	Bir cache sürümünü artırır (yazan transaction içinde çağrılır).
+	Süreç içi cache'ler sürümü okuyup değiştiyse yeniden yüklenir (ör. 'words' → word index).
+	Satır yoksa rastgele bir tabandan başlar (bkz. init_db).
+	"""
+	cur.execute(f"""
+		INSERT INTO cache_versions (name, version) VALUES (?, {_RANDOM_VERSION_SQL})
+		ON CONFLICT (name) DO UPDATE SET version = version + 1
+	""", (name,))
+
+
+def get_cache_version(cur, name: str) -> int:
+	"""Cache sürümü (hiç artırılmadıysa 0)."""
+	row = cur.execute("SELECT version FROM cache_versions WHERE name = ?", (name,)).fetchone()
+	return row[0] if row else 0
 
 
 def seed_topics_from_repo(repo_data_dir: str = None) -> int:
@@ -469,7 +742,7 @@ def seed_topics_from_repo(repo_data_dir: str = None) -> int:
 		repo_data_dir = os.path.join(os.path.dirname(__file__), "database_icin_kelime", "data")
 
 	if not os.path.isdir(repo_data_dir):
-		print("Uyarı: repo data dizini bulunamadı:", repo_data_dir)
+		logger.warning(f"Uyarı: repo data dizini bulunamadı: {repo_data_dir}")
 		return 0
 
 	files = [f for f in os.listdir(repo_data_dir) if f.endswith('.txt')]
@@ -487,7 +760,7 @@ def seed_topics_from_repo(repo_data_dir: str = None) -> int:
 
 	conn.commit()
 	conn.close()
-	print(f"✓ {added} topic eklendi (kaynak: {repo_data_dir})")
+	logger.info(f"✓ {added} topic eklendi (kaynak: {repo_data_dir})")
 	return added
 
 
@@ -582,7 +855,8 @@ def record_mistake(user_id: int, item_key: str, wrong_answer: str, correct_answe
 		cur = conn.cursor()
 		cur.execute("SELECT mistake_id FROM mistakes WHERE user_id = ? AND item_key = ?", (user_id, item_key))
 		row = cur.fetchone()
-		now = datetime.utcnow().isoformat(sep=' ')
+		now_dt = datetime.utcnow()
+		now = now_dt.isoformat(sep=' ')
 		if row:
 			mistake_id = row[0]
 			cur.execute(
@@ -591,9 +865,10 @@ def record_mistake(user_id: int, item_key: str, wrong_answer: str, correct_answe
 			)
 		else:
 			cur.execute(
-				"""INSERT INTO mistakes (user_id, item_key, lesson_id, context, wrong_answer, correct_answer, last_seen, created_at, next_review)
-				VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-				(user_id, item_key, lesson_id, context, wrong_answer, correct_answer, now, now, now)
+				"""INSERT INTO mistakes (user_id, item_key, lesson_id, context, wrong_answer, correct_answer, last_seen, created_at, next_review, due_day)
+				VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+				(user_id, item_key, lesson_id, context, wrong_answer, correct_answer, now, now, now,
+				 (now_dt.date() - date(1970, 1, 1)).days)
 			)
 			mistake_id = cur.lastrowid
 		
@@ -601,74 +876,31 @@ def record_mistake(user_id: int, item_key: str, wrong_answer: str, correct_answe
 
 
 def get_due_mistakes(user_id: int, limit: int = 20) -> List[dict]:
-	"""next_review zamani gelen veya NULL olan hatalari dondurur (oncelik: next_review, sonra count).
+	"""Vadesi (due_day) gelmis hatalari dondurur (oncelik: due_day, sonra count).
 	Donen liste dict satirlardan olusur.
 	"""
-	with get_db() as conn:
-		cur = conn.cursor()
-		now = datetime.utcnow().isoformat(sep=' ')
-		cur.execute(
-			"""SELECT * FROM mistakes WHERE user_id = ? AND (next_review IS NULL OR next_review <= ?) ORDER BY next_review ASC, count DESC LIMIT ?""",
-			(user_id, now, limit)
-		)
-		rows = cur.fetchall()
-		return [dict(r) for r in rows]
+	from backend.srs import get_due_items
+	return get_due_items(user_id, limit)
 
 
 def update_review_result(user_id: int, item_key: str, quality: int):
 	"""SM-2 mantigi ile bir tekrar sonucunu uygular.
 	quality 0-5 arasi (>=3 gecer), fonksiyon yeni SRS alanlarini dondurur.
+	Birden cok sonuc icin backend.srs.apply_reviews kullanin (tek transaction).
 	"""
-	if quality < 0:
-		quality = 0
-	if quality > 5:
-		quality = 5
-
-	with get_db() as conn:
-		cur = conn.cursor()
-		cur.execute("SELECT mistake_id, repetition, interval, easiness FROM mistakes WHERE user_id = ? AND item_key = ?", (user_id, item_key))
-		row = cur.fetchone()
-		if not row:
-			return None
-
-		mistake_id = row[0]
-		repetition = row[1] or 0
-		interval = row[2] or 0
-		easiness = row[3] or 2.5
-
-		if quality < 3:
-			repetition = 0
-			interval = 1
-		else:
-			if repetition == 0:
-				interval = 1
-			elif repetition == 1:
-				interval = 6
-			else:
-				interval = max(1, round(interval * easiness))
-			repetition += 1
-
-		# easiness güncellemesi (SM-2 formülü)
-		new_easiness = easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)
-		if new_easiness < 1.3:
-			new_easiness = 1.3
-
-		next_review_dt = datetime.utcnow() + timedelta(days=interval)
-		next_review = next_review_dt.isoformat(sep=' ')
-		now = datetime.utcnow().isoformat(sep=' ')
+	from backend.srs import apply_reviews
+	result = apply_reviews(user_id, [{"item_key": item_key, "quality": quality}], scheduler="sm2")
+	if not result["updated"]:
+		return None
 
-		cur.execute(
-			"""UPDATE mistakes SET repetition = ?, interval = ?, easiness = ?, next_review = ?, last_seen = ? WHERE mistake_id = ?""",
-			(repetition, interval, new_easiness, next_review, now, mistake_id)
-		)
-
-		return {
-			"mistake_id": mistake_id,
-			"repetition": repetition,
-			"interval": interval,
-			"easiness": new_easiness,
-			"next_review": next_review,
-		}
+	state = result["updated"][0]
+	return {
+		"mistake_id": state["mistake_id"],
+		"repetition": state["repetition"],
+		"interval": state["interval"],
+		"easiness": state["easiness"],
+		"next_review": state["next_review"],
+	}
 
 
 def get_user_mistakes(user_id: int, limit: int = 100):
@@ -683,6 +915,22 @@ def get_user_mistakes(user_id: int, limit: int = 100):
 		return [dict(r) for r in rows]
 
 
+def get_user_mistakes_page(user_id: int, cursor_values: list = None, limit: int = 50) -> dict:
+	"""
+	Kullanicinin hatalarini (last_seen, mistake_id) uzerinden keyset sayfalama ile dondurur.
+	Doner: {"items": [...], "next_cursor": str | None}
+	"""
+	condition, params = keyset_condition(("last_seen", "mistake_id"), cursor_values)
+	with get_db() as conn:
+		cur = conn.cursor()
+		cur.execute(
+			f"SELECT * FROM mistakes WHERE user_id = ?{condition} ORDER BY last_seen DESC, mistake_id DESC LIMIT ?",
+			[user_id, *params, limit + 1],
+		)
+		rows = [dict(r) for r in cur.fetchall()]
+		return build_page(rows, limit, key=lambda r: (r["last_seen"], r["mistake_id"]))
+
+
 if __name__ == "__main__":
 	init_db()
 	# Sadece topic satirlarini ekleyelim; kelime importlari ayri script ile yapilmali
@@ -8,6 +8,7 @@ Bu modül aşağıdaki özellikleri içerir:
 - leaderboard: Sıralamalar
 - notifications: Bildirim sistemi
 - social: Sosyal özellikleri (arkadaş, paylaşım)
+- feed: Arkadaş aktivite akışı (olaylar + inbox)
 
 Tüm modüller user_db.py'den veri alır ve birbiriyle bağlantılıdır.
 """
@@ -18,6 +19,7 @@ from .courses import CourseManager
 from .leaderboard import LeaderboardManager
 from .notifications import NotificationManager
 from .social import SocialManager
+from .feed import FeedManager
 
 __all__ = [
     'UserStats',
@@ -25,5 +27,6 @@ __all__ = [
     'CourseManager',
     'LeaderboardManager',
     'NotificationManager',
-    'SocialManager'
+    'SocialManager',
+    'FeedManager'
 ]
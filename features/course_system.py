@@ -7,20 +7,48 @@ CEFR seviyelerine göre organize edilmiş üniteler ve dersler.
 Bu modül mevcut courses.py'yi BOZMAZ, ayrı bir sistem olarak çalışır.
 """
 
-from db_utils import get_db_connection
+from db_utils import get_db_connection, get_cache_version
 from translation_utils import get_translation
 from datetime import datetime
 from typing import Dict, List, Any, Optional
+from array import array
+import hashlib
 import json
+import os
+import vocab_store
+import random
+import time
+from log_utils import get_logger
+
+log = get_logger("course_system")
+
+
+LEVEL_ORDER = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+
+# Ders başına materyalize edilen soru seti sayısı ve üretici sürümü
+# (soru formatı değişirse GENERATOR_VERSION artırılır → tüm dersler yeniden üretilir)
+LESSON_VARIANTS = int(os.environ.get("LESSON_VARIANTS", 3))
+GENERATOR_VERSION = 1
+
+# Word index'in 'words' cache sürümüyle karşılaştırılma aralığı (saniye)
+WORD_INDEX_CHECK_SECONDS = int(os.environ.get("WORD_INDEX_CHECK_SECONDS", 30))
 
 
 class CourseSystem:
     """CEFR tabanlı kurs ilerleme sistemi."""
     
     def __init__(self):
-        self._ensure_tables()
+        # Tablo oluşturma ve seed import sırasında yapılmaz; açık init komutu
+        # (`flask --app app init-db` veya `python app.py --init-db`) ile çalışır.
+        # Bellek içi yapılar warmup sırasında yüklenir (bkz. warmup.py);
+        # yüklenmemişlerse tüm metotlar doğrudan DB'ye gider.
+        self._skeleton = None      # seviye → ünite → ders iskeleti
+        self._lesson_graph = None  # lesson_id → ünite/seviye/XP ve sonraki ders/ünite (complete_lesson)
+        self._word_index = None    # seviye → kategori → word_id dizisi
+        self._word_index_version = None
+        self._word_index_checked_at = 0.0
     
-    def _ensure_tables(self):
+    def ensure_tables(self):
         """Gerekli tabloları oluştur (varsa dokunma)."""
         conn = get_db_connection()
         cursor = conn.cursor()
@@ -94,6 +122,27 @@ class CourseSystem:
                 )
             """)
             
+            # Materyalize sorular: ders başına birkaç varyant seti (variant) ve içerik sürümü.
+            # content_version NULL olan satırlar elle yazılmıştır, iş onlara dokunmaz.
+            for column in ("variant INTEGER NOT NULL DEFAULT 0", "content_version TEXT", "audio_text TEXT"):
+                try:
+                    cursor.execute(f"ALTER TABLE lesson_questions ADD COLUMN {column}")
+                except:
+                    pass  # Kolon zaten var
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_lesson_questions_variant
+                ON lesson_questions (lesson_id, variant, order_num)
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS lesson_materializations (
+                    lesson_id INTEGER PRIMARY KEY,
+                    variants INTEGER NOT NULL,
+                    content_version TEXT NOT NULL,
+                    built_at TIMESTAMP,
+                    FOREIGN KEY (lesson_id) REFERENCES course_lessons(lesson_id)
+                )
+            """)
+            
             # Kullanıcı Kurs İlerlemesi
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS user_course_progress (
@@ -133,14 +182,270 @@ class CourseSystem:
             """)
             
             conn.commit()
-            print("✓ Kurs sistemi tabloları hazır")
+            log.info("✓ Kurs sistemi tabloları hazır")
             
         except Exception as e:
-            print(f"❌ Tablo oluşturma hatası: {e}")
+            log.error(f"❌ Tablo oluşturma hatası: {e}")
             conn.rollback()
         finally:
             conn.close()
     
+    def initialize(self):
+        """Tabloları oluştur ve seviye/ünite/ders seed'lerini uygula (idempotent)."""
+        self.ensure_tables()
+        self.seed_levels()
+        self.seed_units()
+        self.seed_lessons()
+    
+    # ==================== BELLEK İÇİ İNDEKSLER ====================
+    
+    def load_skeleton(self) -> int:
+        """
+        Kurs iskeletini (seviyeler, üniteler, dersler) belleğe yükler.
+        Kullanıcıdan bağımsızdır; get_user_course_map bunu ilerleme satırlarıyla birleştirir.
+        
+        Returns:
+            Yüklenen ders sayısı
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute("SELECT code, name, icon, color FROM cefr_levels ORDER BY order_num")
+            levels = [{"code": r[0], "name": r[1], "icon": r[2], "color": r[3], "units": []}
+                      for r in cursor.fetchall()]
+            by_level = {lv["code"]: lv for lv in levels}
+            
+            cursor.execute("""
+                SELECT unit_id, level_code, order_num, title, description, icon
+                FROM course_units ORDER BY level_code, order_num
+            """)
+            units = {}
+            for unit_id, level_code, order_num, title, desc, icon in cursor.fetchall():
+                unit = {"unit_id": unit_id, "order": order_num, "title": title,
+                        "description": desc, "icon": icon, "lessons": []}
+                units[unit_id] = unit
+                if level_code in by_level:
+                    by_level[level_code]["units"].append(unit)
+            
+            cursor.execute("""
+                SELECT lesson_id, unit_id, order_num, lesson_type, title, xp_reward
+                FROM course_lessons ORDER BY unit_id, order_num
+            """)
+            lesson_count = 0
+            for lesson_id, unit_id, order_num, lesson_type, title, xp in cursor.fetchall():
+                if unit_id in units:
+                    units[unit_id]["lessons"].append({
+                        "lesson_id": lesson_id, "order": order_num,
+                        "type": lesson_type, "title": title, "xp": xp
+                    })
+                    lesson_count += 1
+            
+            self._skeleton = levels
+            self._lesson_graph = self._build_lesson_graph(levels)
+            return lesson_count
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def _build_lesson_graph(levels: List[Dict]) -> Dict[int, Dict[str, Any]]:
+        """
+        Müfredat grafiği: her ders için ünitesi, seviyesi, XP'si ve açacağı yer.
+        Sonraki ders aynı ünitede order_num + 1; ünitenin son dersiyse aynı seviyede
+        order_num + 1 olan ünite ve onun ilk dersi.
+        """
+        graph = {}
+        for level in levels:
+            units_by_order = {unit["order"]: unit for unit in level["units"]}
+            for unit in level["units"]:
+                lessons_by_order = {lesson["order"]: lesson for lesson in unit["lessons"]}
+                next_unit = units_by_order.get(unit["order"] + 1)
+                first_lesson = None
+                if next_unit:
+                    first_lesson = next((l for l in next_unit["lessons"] if l["order"] == 1), None)
+                for lesson in unit["lessons"]:
+                    next_lesson = lessons_by_order.get(lesson["order"] + 1)
+                    graph[lesson["lesson_id"]] = {
+                        "unit_id": unit["unit_id"],
+                        "level_code": level["code"],
+                        "xp": lesson["xp"],
+                        "title": lesson["title"],
+                        "next_lesson_id": next_lesson["lesson_id"] if next_lesson else None,
+                        "next_unit_id": next_unit["unit_id"] if next_unit and not next_lesson else None,
+                        "next_unit_first_lesson_id": first_lesson["lesson_id"] if first_lesson and not next_lesson else None,
+                    }
+        return graph
+    
+    def _lesson_exists(self, lesson_id: int) -> bool:
+        conn = get_db_connection()
+        try:
+            return conn.execute("SELECT 1 FROM course_lessons WHERE lesson_id = ?", (lesson_id,)).fetchone() is not None
+        finally:
+            conn.close()
+    
+    def load_word_index(self) -> int:
+        """
+        Soru üretimi için çevirisi olan kelimelerin id'lerini seviye/kategori bazında
+        belleğe yükler. ORDER BY RANDOM() tam tarama yerine buradan örnekleme yapılır.
+        
+        id'ler array('l') içinde tutulur: fork sonrası referans sayacı yazmaları
+        sayfaları kopyalamaz, worker'lar belleği paylaşır.
+        
+        Returns:
+            İndekslenen kelime sayısı
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            version = get_cache_version(cursor, 'words')
+            store = vocab_store.get_store()
+            if store is not None and store.version == version:
+                # Paylaşılan snapshot'taki gruplar (kopyasız): worker başına dizi yok
+                index = {level: {key: store.group(level, key) for key in store.group_keys(level)}
+                         for level in LEVEL_ORDER}
+                self._word_index = index
+                self._word_index_version = version
+                self._word_index_checked_at = time.monotonic()
+                return sum(len(groups.get("_all", ())) for groups in index.values())
+            
+            # Bir kelime word_categories'teki her kategorisinin listesine girer
+            cursor.execute("""
+                SELECT w.word_id, w.level, wc.category
+                FROM words w
+                LEFT JOIN word_categories wc ON wc.word_id = w.word_id
+                WHERE w.turkish IS NOT NULL AND w.turkish != '' AND w.level IS NOT NULL
+                ORDER BY w.word_id
+            """)
+            index = {}
+            total = 0
+            last_id = None
+            for word_id, level, category in cursor.fetchall():
+                level_index = index.setdefault(level, {"_all": array('l'), "_named": array('l')})
+                if word_id != last_id:
+                    level_index["_all"].append(word_id)
+                    if category is not None:
+                        level_index["_named"].append(word_id)
+                    total += 1
+                    last_id = word_id
+                level_index.setdefault(category or 'other', array('l')).append(word_id)
+            
+            self._word_index = index
+            self._word_index_version = version
+            self._word_index_checked_at = time.monotonic()
+            return total
+        finally:
+            conn.close()
+    
+    def ensure_fresh_word_index(self) -> Optional[int]:
+        """
+        Yüklü word index'i 'words' cache sürümüyle karşılaştırır (en fazla
+        WORD_INDEX_CHECK_SECONDS'ta bir); toplu seviye/kelime yazımlarından sonra
+        (relabel_words_cefr, import_words) index'i yeniden yükler.
+        
+        Returns:
+            Index'in sürümü (index yüklenmemişse None)
+        """
+        if self._word_index is None:
+            return None
+        now = time.monotonic()
+        if now - self._word_index_checked_at < WORD_INDEX_CHECK_SECONDS:
+            return self._word_index_version
+        self._word_index_checked_at = now
+        
+        conn = get_db_connection()
+        try:
+            version = get_cache_version(conn.cursor(), 'words')
+        finally:
+            conn.close()
+        if version != self._word_index_version:
+            log.info(f"Kelime verisi değişti (sürüm {self._word_index_version} → {version}), word index yenileniyor")
+            self.load_word_index()
+        return self._word_index_version
+    
+    def _sample_ids(self, level_codes: List[str], categories: Optional[List[str]], count: int,
+                    exclude=()) -> List[int]:
+        """
+        Word index'ten rastgele id seçer.
+        categories=None → 'other' dışındaki kelimeler, ["*"] → seviyedeki tüm kelimeler.
+        """
+        if categories is None:
+            keys = ["_named"]
+        elif categories == ["*"]:
+            keys = ["_all"]
+        else:
+            keys = categories
+        
+        pools = [self._word_index.get(level_code, {}).get(key, ())
+                 for level_code in level_codes for key in keys]
+        pools = [p for p in pools if p]
+        if not pools:
+            return []
+        # Çok kategorili kelimeler birden fazla havuzda olabilir
+        pool = pools[0] if len(pools) == 1 else list(dict.fromkeys(wid for p in pools for wid in p))
+        
+        # exclude küçük olduğu için fazladan örnekleyip süzmek pool kopyalamaktan ucuz
+        picked = random.sample(pool, min(len(pool), count + len(exclude)))
+        return [wid for wid in picked if wid not in exclude][:count]
+    
+    def sample_word_ids(self, level_codes: List[str], categories: Optional[List[str]] = None,
+                        count: int = 10, exclude=()) -> List[int]:
+        """Word index'ten rastgele id seçer; index yüklenmemişse önce yükler (bkz. backend/selection)."""
+        if self._word_index is None:
+            self.load_word_index()
+        else:
+            self.ensure_fresh_word_index()
+        return self._sample_ids(level_codes, categories, count, exclude)
+    
+    def _pick_words_from_index(self, cursor, level_code: str, categories: List[str], count: int) -> List[tuple]:
+        """_generate_questions'daki kategori → seviye → yakın seviye sırasını index ile uygular."""
+        ids = []
+        if categories:
+            ids = self._sample_ids([level_code], categories, count)
+        if len(ids) < count:
+            ids += self._sample_ids([level_code], None, count - len(ids), set(ids))
+        if len(ids) < count:
+            idx = LEVEL_ORDER.index(level_code) if level_code in LEVEL_ORDER else 0
+            nearby = LEVEL_ORDER[max(idx - 1, 0):idx] + LEVEL_ORDER[idx + 1:idx + 2]
+            ids += self._sample_ids(nearby, ["*"], count - len(ids), set(ids))
+        return self._fetch_words(cursor, ids)
+    
+    def _fetch_words(self, cursor, ids: List[int]) -> List[tuple]:
+        """id listesine ait kelime satırlarını aynı sırayla döner."""
+        if not ids:
+            return []
+        store = vocab_store.get_store()
+        if store is not None:
+            found = store.get_many(ids)
+            if len(found) == len(set(ids)):
+                return [(wid, found[wid]["english"], found[wid]["turkish"], found[wid]["example_sentence"])
+                        for wid in ids]
+        placeholders = ",".join("?" for _ in ids)
+        cursor.execute(f"""
+            SELECT word_id, english, turkish, example_sentence
+            FROM words WHERE word_id IN ({placeholders})
+        """, ids)
+        rows = {row[0]: tuple(row) for row in cursor.fetchall()}
+        return [rows[wid] for wid in ids if wid in rows]
+    
+    def _distractor_ids(self, cursor, word_id: int) -> List[int]:
+        """
+        Önceden hesaplanmış yanlış seçenekler (scripts/build_distractors.py), karışık sırayla.
+        Önce paylaşılan kelime deposu, yoksa word_distractors satırı; kurulmamışsa boş.
+        """
+        store = vocab_store.get_store()
+        if store is not None and store.distractor_k:
+            ids = store.distractors(word_id)
+        else:
+            cursor.execute("SELECT distractor_ids FROM word_distractors WHERE word_id = ?", (word_id,))
+            row = cursor.fetchone()
+            ids = array('q')
+            if row:
+                ids.frombytes(row[0])
+            ids = list(ids)
+        random.shuffle(ids)
+        return ids
+    
     # ==================== SEVİYE YÖNETİMİ ====================
     
     def seed_levels(self):
@@ -170,11 +475,11 @@ class CourseSystem:
                     added += 1
             
             conn.commit()
-            print(f"✓ {added} seviye eklendi")
+            log.info(f"✓ {added} seviye eklendi")
             return added
             
         except Exception as e:
-            print(f"❌ Seviye ekleme hatası: {e}")
+            log.error(f"❌ Seviye ekleme hatası: {e}")
             conn.rollback()
             return 0
         finally:
@@ -232,11 +537,11 @@ class CourseSystem:
                         added += 1
             
             conn.commit()
-            print(f"✓ {added} ünite eklendi")
+            log.info(f"✓ {added} ünite eklendi")
             return added
             
         except Exception as e:
-            print(f"❌ Ünite ekleme hatası: {e}")
+            log.error(f"❌ Ünite ekleme hatası: {e}")
             conn.rollback()
             return 0
         finally:
@@ -276,11 +581,11 @@ class CourseSystem:
                         added += 1
             
             conn.commit()
-            print(f"✓ {added} ders eklendi")
+            log.info(f"✓ {added} ders eklendi")
             return added
             
         except Exception as e:
-            print(f"❌ Ders ekleme hatası: {e}")
+            log.error(f"❌ Ders ekleme hatası: {e}")
             conn.rollback()
             return 0
         finally:
@@ -365,11 +670,11 @@ class CourseSystem:
                     """, (user_id, start_level, first_unit[0], first_lesson[0]))
             
             conn.commit()
-            print(f"✓ Kullanıcı {user_id} için kurs ilerlemesi {start_level} seviyesinden başlatıldı")
+            log.info(f"✓ Kullanıcı {user_id} için kurs ilerlemesi {start_level} seviyesinden başlatıldı")
             return True
             
         except Exception as e:
-            print(f"❌ İlerleme başlatma hatası: {e}")
+            log.error(f"❌ İlerleme başlatma hatası: {e}")
             conn.rollback()
             return False
         finally:
@@ -410,6 +715,18 @@ class CourseSystem:
             
             current_level, total_xp, total_crowns, hearts, streak = state
             
+            if self._skeleton is not None:
+                levels = self._merge_skeleton_progress(cursor, user_id)
+                return {
+                    "user_id": user_id,
+                    "current_level": current_level,
+                    "total_xp": total_xp,
+                    "total_crowns": total_crowns,
+                    "hearts": hearts,
+                    "streak": streak,
+                    "levels": levels
+                }
+            
             # Seviyeleri al
             cursor.execute("""
                 SELECT code, name, icon, color, order_num FROM cefr_levels ORDER BY order_num
@@ -487,30 +804,85 @@ class CourseSystem:
             }
             
         except Exception as e:
-            print(f"❌ Kurs haritası hatası: {e}")
+            log.error(f"❌ Kurs haritası hatası: {e}")
             return {}
         finally:
             conn.close()
     
+    def _merge_skeleton_progress(self, cursor, user_id: int) -> List[Dict]:
+        """Bellekteki iskeleti kullanıcının ilerleme satırlarıyla tek sorguda birleştirir."""
+        cursor.execute("""
+            SELECT unit_id, lesson_id, status, crowns, best_score
+            FROM user_course_progress WHERE user_id = ?
+        """, (user_id,))
+        unit_progress = {}
+        lesson_progress = {}
+        for unit_id, lesson_id, status, crowns, best_score in cursor.fetchall():
+            if lesson_id is None:
+                unit_progress[unit_id] = (status, crowns)
+            else:
+                lesson_progress[lesson_id] = (status, best_score)
+        
+        levels = []
+        for level in self._skeleton:
+            units = []
+            for unit in level["units"]:
+                status, crowns = unit_progress.get(unit["unit_id"], ('locked', 0))
+                lessons = []
+                for lesson in unit["lessons"]:
+                    lesson_status, best_score = lesson_progress.get(lesson["lesson_id"], ('locked', 0))
+                    lessons.append({
+                        **lesson,
+                        "status": lesson_status or 'locked',
+                        "best_score": best_score or 0
+                    })
+                units.append({
+                    **{k: v for k, v in unit.items() if k != "lessons"},
+                    "status": status or 'locked',
+                    "crowns": crowns or 0,
+                    "lessons": lessons
+                })
+            levels.append({**{k: v for k, v in level.items() if k != "units"}, "units": units})
+        return levels
+    
     def complete_lesson(self, user_id: int, lesson_id: int, score: int) -> Dict[str, Any]:
-        """Ders tamamla ve sonraki dersi aç."""
+        """
+        Ders tamamla ve sonraki dersi aç.
+        
+        Ders bilgisi ve açılacak ders/ünite bellekteki müfredat grafiğinden gelir
+        (load_skeleton); okuma sorgusu yoktur. Tüm yazımlar tek transaction'dadır.
+        Dönen 'delta', kurs haritasında değişen ders/ünite satırlarıdır: istemci
+        haritayı yeniden çekmeden günceller.
+        """
+        if self._lesson_graph is None:
+            self.load_skeleton()
+        node = self._lesson_graph.get(lesson_id)
+        if node is None and self._lesson_exists(lesson_id):
+            # İskelet ders seed'inden önce yüklenmiş (ör. warmup, sonra `flask init-db`)
+            log.info(f"Ders {lesson_id} kurs iskeletinde yok, iskelet yeniden yükleniyor")
+            self.load_skeleton()
+            node = self._lesson_graph.get(lesson_id)
+        if node is None:
+            return {"success": False, "error": "Ders bulunamadı"}
+        
+        unit_id, level_code = node["unit_id"], node["level_code"]
+        earned_xp = int(node["xp"] * (score / 100))
+        now = datetime.now()
+        
+        # Açılacak satırlar (level_code, unit_id, lesson_id); ünite satırında lesson_id NULL
+        unlocks = []
+        if node["next_lesson_id"]:
+            unlocks.append((level_code, unit_id, node["next_lesson_id"]))
+        elif node["next_unit_id"]:
+            unlocks.append((level_code, node["next_unit_id"], None))
+            if node["next_unit_first_lesson_id"]:
+                unlocks.append((level_code, node["next_unit_id"], node["next_unit_first_lesson_id"]))
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
-            # Ders bilgisini al
-            cursor.execute("""
-                SELECT l.unit_id, l.order_num, l.xp_reward, u.level_code
-                FROM course_lessons l
-                JOIN course_units u ON l.unit_id = u.unit_id
-                WHERE l.lesson_id = ?
-            """, (lesson_id,))
-            lesson_info = cursor.fetchone()
-            
-            if not lesson_info:
-                return {"success": False, "error": "Ders bulunamadı"}
-            
-            unit_id, lesson_order, xp_reward, level_code = lesson_info
+            cursor.execute("BEGIN IMMEDIATE")
             
             # İlerlemeyi güncelle
             cursor.execute("""
@@ -519,80 +891,68 @@ class CourseSystem:
                 VALUES (?, ?, ?, ?, 'completed', ?, 1, ?, ?)
                 ON CONFLICT(user_id, unit_id, lesson_id) DO UPDATE SET
                     status = 'completed',
-                    best_score = MAX(best_score, ?),
+                    best_score = MAX(best_score, excluded.best_score),
                     attempts = attempts + 1,
-                    last_activity = ?
-            """, (user_id, level_code, unit_id, lesson_id, score, 
-                  datetime.now(), datetime.now(), score, datetime.now()))
+                    last_activity = excluded.last_activity
+                RETURNING best_score
+            """, (user_id, level_code, unit_id, lesson_id, score, now, now))
+            delta = {
+                "lessons": [{"lesson_id": lesson_id, "status": "completed", "best_score": cursor.fetchone()[0]}],
+                "units": [],
+            }
             
             # XP ekle
-            earned_xp = xp_reward * (score / 100)
-
             cursor.execute("""
                 UPDATE user_course_state SET total_xp = total_xp + ?, last_lesson_at = ?
                 WHERE user_id = ?
-            """, (int(earned_xp), datetime.now(), user_id))
+                RETURNING total_xp
+            """, (earned_xp, now, user_id))
+            row = cursor.fetchone()
+            delta["total_xp"] = row[0] if row else None
             
-            # Sonraki dersi aç
-            cursor.execute("""
-                SELECT lesson_id FROM course_lessons 
-                WHERE unit_id = ? AND order_num = ?
-            """, (unit_id, lesson_order + 1))
-            next_lesson = cursor.fetchone()
-            
-            unlocked_next = False
-            if next_lesson:
-                cursor.execute("""
-                    INSERT OR IGNORE INTO user_course_progress 
-                    (user_id, level_code, unit_id, lesson_id, status)
-                    VALUES (?, ?, ?, ?, 'unlocked')
-                """, (user_id, level_code, unit_id, next_lesson[0]))
-                unlocked_next = True
-            else:
-                # Ünite bitti, üniteyi tamamla ve sonraki üniteyi aç
+            if not node["next_lesson_id"]:
+                # Ünite bitti, üniteyi tamamla
                 cursor.execute("""
                     UPDATE user_course_progress SET status = 'completed', crowns = crowns + 1
                     WHERE user_id = ? AND unit_id = ? AND lesson_id IS NULL
+                    RETURNING crowns
                 """, (user_id, unit_id))
-                
-                # Sonraki üniteyi bul
-                cursor.execute("""
-                    SELECT u2.unit_id FROM course_units u1
-                    JOIN course_units u2 ON u1.level_code = u2.level_code AND u2.order_num = u1.order_num + 1
-                    WHERE u1.unit_id = ?
-                """, (unit_id,))
-                next_unit = cursor.fetchone()
-                
-                if next_unit:
-                    cursor.execute("""
-                        INSERT OR IGNORE INTO user_course_progress 
-                        (user_id, level_code, unit_id, status)
-                        VALUES (?, ?, ?, 'unlocked')
-                    """, (user_id, level_code, next_unit[0]))
-                    
-                    # İlk dersini de aç
-                    cursor.execute("""
-                        SELECT lesson_id FROM course_lessons WHERE unit_id = ? AND order_num = 1
-                    """, (next_unit[0],))
-                    first_lesson = cursor.fetchone()
-                    if first_lesson:
-                        cursor.execute("""
-                            INSERT OR IGNORE INTO user_course_progress 
-                            (user_id, level_code, unit_id, lesson_id, status)
-                            VALUES (?, ?, ?, ?, 'unlocked')
-                        """, (user_id, level_code, next_unit[0], first_lesson[0]))
+                for (crowns,) in cursor.fetchall():
+                    delta["units"].append({"unit_id": unit_id, "status": "completed", "crowns": crowns})
+            
+            if unlocks:
+                # Sonraki ders / ünite (+ ilk dersi) tek INSERT'te; sadece yeni açılanlar döner.
+                # Ünite satırlarında lesson_id NULL olduğu için UNIQUE çakışması yerine NOT EXISTS
+                values = ", ".join("(?, ?, ?)" for _ in unlocks)
+                cursor.execute(f"""
+                    INSERT INTO user_course_progress (user_id, level_code, unit_id, lesson_id, status)
+                    SELECT ?, v.column1, v.column2, v.column3, 'unlocked'
+                    FROM (VALUES {values}) v
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM user_course_progress p
+                        WHERE p.user_id = ? AND p.unit_id = v.column2 AND p.lesson_id IS v.column3
+                    )
+                    RETURNING unit_id, lesson_id
+                """, (user_id, *[value for row in unlocks for value in row], user_id))
+                for new_unit_id, new_lesson_id in cursor.fetchall():
+                    if new_lesson_id is None:
+                        delta["units"].append({"unit_id": new_unit_id, "status": "unlocked", "crowns": 0})
+                    else:
+                        delta["lessons"].append({"lesson_id": new_lesson_id, "status": "unlocked", "best_score": 0})
             
             conn.commit()
             
             return {
                 "success": True,
-                "xp_earned": int(earned_xp),
+                "xp_earned": earned_xp,
                 "score": score,
-                "unlocked_next": unlocked_next
+                "unlocked_next": bool(node["next_lesson_id"]),
+                "lesson_title": node["title"],
+                "delta": delta
             }
             
         except Exception as e:
-            print(f"❌ Ders tamamlama hatası: {e}")
+            log.error(f"❌ Ders tamamlama hatası: {e}")
             conn.rollback()
             return {"success": False, "error": str(e)}
         finally:
@@ -618,14 +978,27 @@ class CourseSystem:
             
             lesson_type, unit_id, level_code, unit_title = lesson_info
             
+            # Materyalize edilmişse kullanıcının sıradaki varyantı: tamamlanana kadar aynı set
+            # (tekrar denemeler aynı soruları görür), her tamamlamada bir sonraki set
+            variant = 0
+            cursor.execute("SELECT variants FROM lesson_materializations WHERE lesson_id = ?", (lesson_id,))
+            materialized = cursor.fetchone()
+            if materialized and user_id:
+                cursor.execute("""
+                    SELECT attempts FROM user_course_progress
+                    WHERE user_id = ? AND unit_id = ? AND lesson_id = ?
+                """, (user_id, unit_id, lesson_id))
+                progress = cursor.fetchone()
+                variant = (user_id + ((progress[0] or 0) if progress else 0)) % materialized[0]
+            
             # Hazır sorular varsa getir
             cursor.execute("""
                 SELECT question_id, question_type, question_text, correct_answer, 
-                       wrong_options, hint, word_id
+                       wrong_options, hint, word_id, audio_text
                 FROM lesson_questions
-                WHERE lesson_id = ?
+                WHERE lesson_id = ? AND variant = ?
                 ORDER BY order_num
-            """, (lesson_id,))
+            """, (lesson_id, variant))
             
             questions = []
             for row in cursor.fetchall():
@@ -638,22 +1011,249 @@ class CourseSystem:
                     "hint": row[5],
                     "word_id": row[6]
                 }
+                if row[7]:
+                    q["audio_text"] = row[7]
                 questions.append(q)
             
             # Hazır soru yoksa, words tablosundan dinamik oluştur (ünite konusuna göre)
             if not questions:
-                questions = self._generate_questions(lesson_type, level_code, 10, unit_title)
+                questions = self._generate_questions(lesson_type, level_code, 10, unit_title, user_id)
             
             return questions
             
         except Exception as e:
-            print(f"❌ Soru getirme hatası: {e}")
+            log.error(f"❌ Soru getirme hatası: {e}")
             return []
         finally:
             conn.close()
     
-    def _generate_questions(self, lesson_type: str, level_code: str, count: int = 10, unit_title: str = None) -> List[Dict]:
-        """Words tablosundan dinamik soru oluştur."""
+    # ==================== SORU MATERYALİZASYONU ====================
+    
+    def _content_version(self, cursor, lesson: tuple, word_ids: List[int]) -> str:
+        """Dersin ayarları + kullandığı kelimelerin güncel içeriğinden türetilen sürüm."""
+        cursor.execute("""
+            SELECT word_id, english, turkish, level, category FROM words
+            WHERE word_id IN (SELECT value FROM json_each(?))
+            ORDER BY word_id
+        """, (json.dumps(sorted(set(word_ids))),))
+        payload = json.dumps([GENERATOR_VERSION, list(lesson[1:]), [tuple(row) for row in cursor.fetchall()]])
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+    
+    def materialize_lessons(self, variants: int = LESSON_VARIANTS, full: bool = False) -> Dict[str, int]:
+        """
+        Tüm dersler için soru setlerini üretip lesson_questions'a yazar (variant 0..variants-1).
+        
+        Artımlıdır: kullandığı kelimelerden biri değişmiş/silinmiş, varyant sayısı farklı
+        veya hiç materyalize edilmemiş dersler yeniden üretilir; diğerleri atlanır.
+        Elle yazılmış sorusu olan dersler (content_version NULL) atlanır.
+        
+        Args:
+            full: Tüm dersleri yeniden üret
+        
+        Returns:
+            {'lessons', 'built', 'skipped', 'authored', 'questions'}
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        report = {"lessons": 0, "built": 0, "skipped": 0, "authored": 0, "questions": 0}
+        if self._word_index is None:
+            self.load_word_index()
+        
+        try:
+            cursor.execute("""
+                SELECT l.lesson_id, l.lesson_type, u.level_code, u.title, COALESCE(l.questions_count, 10)
+                FROM course_lessons l
+                JOIN course_units u ON l.unit_id = u.unit_id
+                ORDER BY l.lesson_id
+            """)
+            lessons = [tuple(row) for row in cursor.fetchall()]
+            cursor.execute("SELECT DISTINCT lesson_id FROM lesson_questions WHERE content_version IS NULL")
+            authored = {row[0] for row in cursor.fetchall()}
+            cursor.execute("SELECT lesson_id, variants, content_version FROM lesson_materializations")
+            state = {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+            used = {}
+            cursor.execute("""
+                SELECT lesson_id, word_id FROM lesson_questions
+                WHERE content_version IS NOT NULL AND word_id IS NOT NULL
+            """)
+            for lesson_id, word_id in cursor.fetchall():
+                used.setdefault(lesson_id, []).append(word_id)
+            
+            for lesson in lessons:
+                lesson_id, lesson_type, level_code, unit_title, count = lesson
+                report["lessons"] += 1
+                if lesson_id in authored:
+                    report["authored"] += 1
+                    continue
+                if (not full and lesson_id in state and state[lesson_id][0] == variants
+                        and state[lesson_id][1] == self._content_version(cursor, lesson, used.get(lesson_id, []))):
+                    report["skipped"] += 1
+                    continue
+                
+                # Üretim yazma transaction'ı dışında (çeviri API'si çağrılabilir)
+                sets = [self._generate_questions(lesson_type, level_code, count, unit_title)
+                        for _ in range(variants)]
+                sets = [qs for qs in sets if qs]
+                if not sets:
+                    continue
+                version = self._content_version(cursor, lesson, [q["word_id"] for qs in sets for q in qs
+                                                                 if q.get("word_id")])
+                
+                cursor.execute("DELETE FROM lesson_questions WHERE lesson_id = ? AND content_version IS NOT NULL",
+                               (lesson_id,))
+                cursor.executemany("""
+                    INSERT INTO lesson_questions
+                    (lesson_id, question_type, question_text, correct_answer, wrong_options, hint,
+                     word_id, order_num, variant, content_version, audio_text)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(lesson_id, q["type"], q["question"], q["answer"], json.dumps(q["options"], ensure_ascii=False),
+                       q.get("hint"), q.get("word_id"), order, variant, version, q.get("audio_text"))
+                      for variant, qs in enumerate(sets) for order, q in enumerate(qs, 1)])
+                cursor.execute("""
+                    INSERT OR REPLACE INTO lesson_materializations (lesson_id, variants, content_version, built_at)
+                    VALUES (?, ?, ?, ?)
+                """, (lesson_id, len(sets), version, datetime.now()))
+                conn.commit()
+                report["built"] += 1
+                report["questions"] += sum(len(qs) for qs in sets)
+            
+            log.info(f"✓ Ders soruları materyalize edildi: {report}")
+            return report
+        except Exception as e:
+            log.error(f"❌ Soru materyalizasyon hatası: {e}")
+            conn.rollback()
+            return report
+        finally:
+            conn.close()
+    
+    def _build_question(self, cursor, lesson_type: str, level_code: str, word: tuple, i: int = 0) -> Optional[Dict]:
+        """
+        Tek kelimeden soru oluşturur (word = (word_id, english, turkish, example)).
+        Yanlış seçenekler önce önceden hesaplanmış index'ten gelir. Çeviri bulunamazsa None.
+        """
+        word_id, english, turkish, example = word
+        
+        # Türkçe çevirisi yoksa, API'den al (cache sistemi ile)
+        if not turkish or turkish.strip() == '':
+            turkish = get_translation(english)
+            if not turkish:
+                return None  # Çeviri alınamazsa bu kelimeyi atla
+        
+        # Yanlış seçenekler: önce önceden hesaplanmış index, yoksa aynı seviyeden rastgele
+        distractor_ids = self._distractor_ids(cursor, word_id)
+        if distractor_ids:
+            wrong_options = [w[2] for w in self._fetch_words(cursor, distractor_ids) if w[2]]
+        elif self._word_index is not None:
+            distractor_ids = self._sample_ids([level_code], ["*"], 5, {word_id})
+            wrong_options = [w[2] for w in self._fetch_words(cursor, distractor_ids)]
+        else:
+            cursor.execute("""
+                SELECT turkish FROM words 
+                WHERE word_id != ? AND turkish IS NOT NULL AND turkish != ''
+                AND level = ?
+                ORDER BY RANDOM() LIMIT 5
+            """, (word_id, level_code))
+            wrong_options = [r[0] for r in cursor.fetchall()]
+        
+        # Eğer aynı seviyeden yeterli seçenek bulunamazsa, yakın seviyelerden tamamla
+        if len(wrong_options) < 3:
+            level_order = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+            current_idx = level_order.index(level_code) if level_code in level_order else 0
+            nearby_levels = []
+            if current_idx > 0:
+                nearby_levels.append(level_order[current_idx - 1])
+            if current_idx < len(level_order) - 1:
+                nearby_levels.append(level_order[current_idx + 1])
+            
+            if nearby_levels:
+                level_placeholders = ",".join(["?" for _ in nearby_levels])
+                cursor.execute(f"""
+                    SELECT turkish FROM words 
+                    WHERE word_id != ? AND turkish IS NOT NULL AND turkish != ''
+                    AND level IN ({level_placeholders})
+                    ORDER BY RANDOM() LIMIT ?
+                """, (word_id, *nearby_levels, 5 - len(wrong_options)))
+                wrong_options.extend([r[0] for r in cursor.fetchall()])
+        
+        # Yanlış seçeneklerde doğru cevap varsa çıkar
+        wrong_options = [opt for opt in wrong_options if opt.lower() != turkish.lower()][:3]
+        # Tüm seçenekleri karıştır
+        import random
+        all_options = wrong_options + [turkish]
+        random.shuffle(all_options)
+        
+        if lesson_type == "vocabulary":
+            q = {
+                "question_id": i + 1,
+                "type": "word_to_turkish",
+                "question": english,
+                "answer": turkish,
+                "options": all_options,
+                "hint": example,
+                "word_id": word_id
+            }
+        elif lesson_type == "translation":
+            q = {
+                "question_id": i + 1,
+                "type": "turkish_to_word",
+                "question": turkish,
+                "answer": english,
+                "options": [],  # Yazarak cevap
+                "hint": f"{english[:1] if len(english) <= 2 else english[:2]}...",
+                "word_id": word_id
+            }
+        elif lesson_type == "listening":
+            q = {
+                "question_id": i + 1,
+                "type": "listen_select",
+                "question": f"🔊 '{english}' kelimesini dinle",
+                "answer": turkish,
+                "options": all_options,
+                "hint": None,
+                "word_id": word_id,
+                "audio_text": english
+            }
+        elif lesson_type == "grammar":
+            q = {
+                "question_id": i + 1,
+                "type": "grammar",
+                "question": english,
+                "answer": english,
+                "options": [],
+                "hint": None,
+                "word_id": word_id
+            }
+        elif lesson_type == "pronunciation":
+            q = {
+                "question_id": i + 1,
+                "type": "pronunciation",
+                "question": f"'{english}' kelimesini telaffuz et",
+                "answer": english,
+                "options": [],
+                "hint": turkish,
+                "word_id": word_id,
+                "audio_text": english
+            }
+        else:  # quiz - karışık
+            q = {
+                "question_id": i + 1,
+                "type": "word_to_turkish" if i % 2 == 0 else "turkish_to_word",
+                "question": english if i % 2 == 0 else turkish,
+                "answer": turkish if i % 2 == 0 else english,
+                "options": all_options if i % 2 == 0 else [],
+                "hint": example,
+                "word_id": word_id
+            }
+        
+        return q
+    
+    def _generate_questions(self, lesson_type: str, level_code: str, count: int = 10, unit_title: str = None,
+                            user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Words tablosundan dinamik soru oluştur.
+        user_id verilirse kelimeler kişiselleştirilmiş seçimden (backend/selection) gelir;
+        eksik kalırsa rastgele örneklemeyle tamamlanır.
+        """
         conn = get_db_connection()
         cursor = conn.cursor()
         
@@ -698,12 +1298,23 @@ class CourseSystem:
             
             # Önce kategoriye göre kelime ara (SEVİYE FİLTRESİ İLE)
             words = []
-            if categories:
+            if user_id:
+                # Kişiselleştirilmiş seçim: vade, zayıflık, yenilik ve seviye uyumu
+                from backend.selection import next_items
+                picked = next_items(user_id, count, level=level_code, categories=categories or None)
+                words = [(w["word_id"], w["english"], w["turkish"], w["example_sentence"]) for w in picked]
+            if words:
+                pass
+            elif self._word_index is not None:
+                # Warmup'ta yüklenen index'ten örnekle (ORDER BY RANDOM() taraması yok)
+                self.ensure_fresh_word_index()
+                words = self._pick_words_from_index(cursor, level_code, categories, count)
+            elif categories:
                 placeholders = ",".join(["?" for _ in categories])
                 cursor.execute(f"""
                     SELECT word_id, english, turkish, example_sentence
                     FROM words
-                    WHERE category IN ({placeholders})
+                    WHERE word_id IN (SELECT word_id FROM word_categories WHERE category IN ({placeholders}))
                     AND level = ?
                     AND turkish IS NOT NULL AND turkish != ''
                     ORDER BY RANDOM()
@@ -783,119 +1394,14 @@ class CourseSystem:
                 words.extend(cursor.fetchall())
             
             for i, word in enumerate(words):
-                word_id, english, turkish, example = word
-                
-                # Türkçe çevirisi yoksa, API'den al (cache sistemi ile)
-                if not turkish or turkish.strip() == '':
-                    turkish = get_translation(english)
-                    if not turkish:
-                        continue  # Çeviri alınamazsa bu kelimeyi atla
-                
-                # Yanlış seçenekler için aynı seviyeden başka kelimeler al
-                cursor.execute("""
-                    SELECT turkish FROM words 
-                    WHERE word_id != ? AND turkish IS NOT NULL AND turkish != ''
-                    AND level = ?
-                    ORDER BY RANDOM() LIMIT 5
-                """, (word_id, level_code))
-                wrong_options = [r[0] for r in cursor.fetchall()]
-                
-                # Eğer aynı seviyeden yeterli seçenek bulunamazsa, yakın seviyelerden tamamla
-                if len(wrong_options) < 3:
-                    level_order = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
-                    current_idx = level_order.index(level_code) if level_code in level_order else 0
-                    nearby_levels = []
-                    if current_idx > 0:
-                        nearby_levels.append(level_order[current_idx - 1])
-                    if current_idx < len(level_order) - 1:
-                        nearby_levels.append(level_order[current_idx + 1])
-                    
-                    if nearby_levels:
-                        level_placeholders = ",".join(["?" for _ in nearby_levels])
-                        cursor.execute(f"""
-                            SELECT turkish FROM words 
-                            WHERE word_id != ? AND turkish IS NOT NULL AND turkish != ''
-                            AND level IN ({level_placeholders})
-                            ORDER BY RANDOM() LIMIT ?
-                        """, (word_id, *nearby_levels, 5 - len(wrong_options)))
-                        wrong_options.extend([r[0] for r in cursor.fetchall()])
-                
-                # Yanlış seçeneklerde doğru cevap varsa çıkar
-                wrong_options = [opt for opt in wrong_options if opt.lower() != turkish.lower()][:3]
-                # Tüm seçenekleri karıştır
-                import random
-                all_options = wrong_options + [turkish]
-                random.shuffle(all_options)
-                
-                if lesson_type == "vocabulary":
-                    q = {
-                        "question_id": i + 1,
-                        "type": "word_to_turkish",
-                        "question": english,
-                        "answer": turkish,
-                        "options": all_options,
-                        "hint": example,
-                        "word_id": word_id
-                    }
-                elif lesson_type == "translation":
-                    q = {
-                        "question_id": i + 1,
-                        "type": "turkish_to_word",
-                        "question": turkish,
-                        "answer": english,
-                        "options": [],  # Yazarak cevap
-                        "hint": f"{english[:1] if len(english) <= 2 else english[:2]}...",
-                        "word_id": word_id
-                    }
-                elif lesson_type == "listening":
-                    q = {
-                        "question_id": i + 1,
-                        "type": "listen_select",
-                        "question": f"🔊 '{english}' kelimesini dinle",
-                        "answer": turkish,
-                        "options": all_options,
-                        "hint": None,
-                        "word_id": word_id,
-                        "audio_text": english
-                    }
-                elif lesson_type == "grammar":
-                    q = {
-                        "question_id": i + 1,
-                        "type": "grammar",
-                        "question": english,
-                        "answer": english,
-                        "options": [],
-                        "hint": None,
-                        "word_id": word_id
-                    }
-                elif lesson_type == "pronunciation":
-                    q = {
-                        "question_id": i + 1,
-                        "type": "pronunciation",
-                        "question": f"'{english}' kelimesini telaffuz et",
-                        "answer": english,
-                        "options": [],
-                        "hint": turkish,
-                        "word_id": word_id,
-                        "audio_text": english
-                    }
-                else:  # quiz - karışık
-                    q = {
-                        "question_id": i + 1,
-                        "type": "word_to_turkish" if i % 2 == 0 else "turkish_to_word",
-                        "question": english if i % 2 == 0 else turkish,
-                        "answer": turkish if i % 2 == 0 else english,
-                        "options": all_options if i % 2 == 0 else [],
-                        "hint": example,
-                        "word_id": word_id
-                    }
-                
-                questions.append(q)
+                q = self._build_question(cursor, lesson_type, level_code, word, i)
+                if q:
+                    questions.append(q)
             
             return questions
             
         except Exception as e:
-            print(f"❌ Soru oluşturma hatası: {e}")
+            log.error(f"❌ Soru oluşturma hatası: {e}")
             return []
         finally:
             conn.close()
@@ -9,6 +9,9 @@ from db_utils import get_db_connection
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
+from log_utils import get_logger
+
+log = get_logger("courses")
 
 
 class CourseManager:
@@ -117,11 +120,11 @@ class CourseManager:
                 
                 conn.commit()
             
-            print(f"✓ Kurs oluşturuldu [ID: {course_id}] - Tip: {course_type}")
+            log.info(f"✓ Kurs oluşturuldu [ID: {course_id}] - Tip: {course_type}")
             return course_id
         
         except Exception as e:
-            print(f"❌ Kurs oluşturma hatası: {e}")
+            log.error(f"❌ Kurs oluşturma hatası: {e}")
             conn.rollback()
             return -1
         finally:
@@ -161,11 +164,11 @@ class CourseManager:
             
             conn.commit()
             unit_id = cursor.lastrowid
-            print(f"✓ Ünite eklendi [ID: {unit_id}] - '{title}'")
+            log.info(f"✓ Ünite eklendi [ID: {unit_id}] - '{title}'")
             return unit_id
         
         except Exception as e:
-            print(f"❌ Ünite ekleme hatası: {e}")
+            log.error(f"❌ Ünite ekleme hatası: {e}")
             conn.rollback()
             return -1
         finally:
@@ -229,7 +232,7 @@ class CourseManager:
             return courses
         
         except Exception as e:
-            print(f"❌ Kurs alma hatası: {e}")
+            log.error(f"❌ Kurs alma hatası: {e}")
             return []
         finally:
             conn.close()
@@ -276,7 +279,7 @@ class CourseManager:
             return units
         
         except Exception as e:
-            print(f"❌ Ünite alma hatası: {e}")
+            log.error(f"❌ Ünite alma hatası: {e}")
             return []
         finally:
             conn.close()
@@ -302,11 +305,11 @@ class CourseManager:
             """, (unit_id,))
             
             conn.commit()
-            print(f"✓ Ünite başlatıldı [ID: {unit_id}]")
+            log.info(f"✓ Ünite başlatıldı [ID: {unit_id}]")
             return True
         
         except Exception as e:
-            print(f"❌ Ünite başlatma hatası: {e}")
+            log.error(f"❌ Ünite başlatma hatası: {e}")
             return False
         finally:
             conn.close()
@@ -353,7 +356,7 @@ class CourseManager:
             ))
             
             conn.commit()
-            print(f"✓ Ünite ilerleme güncellendi [ID: {unit_id}] - %{progress_percent}")
+            log.info(f"✓ Ünite ilerleme güncellendi [ID: {unit_id}] - %{progress_percent}")
             
             # Kurs ilerleme güncelle
             cursor.execute("""
@@ -365,7 +368,7 @@ class CourseManager:
             return True
         
         except Exception as e:
-            print(f"❌ Ünite ilerleme güncelleme hatası: {e}")
+            log.error(f"❌ Ünite ilerleme güncelleme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -410,7 +413,7 @@ class CourseManager:
             conn.commit()
         
         except Exception as e:
-            print(f"❌ Kurs ilerleme güncelleme hatası: {e}")
+            log.error(f"❌ Kurs ilerleme güncelleme hatası: {e}")
         finally:
             conn.close()
     
@@ -469,7 +472,7 @@ class CourseManager:
             }
         
         except Exception as e:
-            print(f"❌ İstatistik alma hatası: {e}")
+            log.error(f"❌ İstatistik alma hatası: {e}")
             return {}
         finally:
             conn.close()
@@ -557,7 +560,7 @@ class CourseManager:
                 level="A1"  # Başlangıç seviyesi
             )
         
-        print(f"✓ Özel kurs oluşturuldu [{course_id}] - {len(topics_list)} konu")
+        log.info(f"✓ Özel kurs oluşturuldu [{course_id}] - {len(topics_list)} konu")
         return course_id
     
     def get_available_topics(self) -> List[str]:
@@ -579,7 +582,7 @@ class CourseManager:
             return topics
         
         except Exception as e:
-            print(f"❌ Konu alma hatası: {e}")
+            log.error(f"❌ Konu alma hatası: {e}")
             return []
         finally:
             conn.close()
@@ -625,11 +628,11 @@ class CourseManager:
             """, (unit_id, resource_type, content_json))
             
             conn.commit()
-            print(f"✓ Kaynak eklendi [Ünite: {unit_id}] - Tip: {resource_type}")
+            log.info(f"✓ Kaynak eklendi [Ünite: {unit_id}] - Tip: {resource_type}")
             return True
         
         except Exception as e:
-            print(f"❌ Kaynak ekleme hatası: {e}")
+            log.error(f"❌ Kaynak ekleme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -672,7 +675,7 @@ class CourseManager:
             return resources
         
         except Exception as e:
-            print(f"❌ Kaynak alma hatası: {e}")
+            log.error(f"❌ Kaynak alma hatası: {e}")
             return []
         finally:
             conn.close()
@@ -0,0 +1,278 @@
+"""
+feed.py
+
+Arkadaş aktivite akışı (fan-out-on-write).
+
+- Özet olaylar (ders tamamlandı, streak dönüm noktası, paylaşılan başarı)
+  activity_events tablosuna BİR KEZ yazılır.
+- Yazma anında olay, aktörün arkadaşlarının feed_inbox'ına dağıtılır
+  (fan-out-on-write). Inbox kullanıcı başına yaklaşık FEED_INBOX_SIZE
+  satırla sınırlıdır.
+- Arkadaş sayısı FANOUT_MAX_FOLLOWERS'ı aşan aktörlerin olayları dağıtılmaz;
+  feed_pull_actors'a işaretlenir ve okuma anında (actor_id, event_id)
+  index'inden çekilir (fan-out-on-read).
+- Inbox okuması (user_id, event_id) birincil anahtarında tek bir aralık
+  taramasıdır; cursor son görülen event_id'dir.
+
+Arkadaşlık iki yönlü kabul edilir: friends tablosunda hangi yönde
+onaylanmış olursa olsun iki taraf da birbirinin olaylarını görür.
+"""
+
+import json
+import os
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from db_utils import get_db_connection
+from log_utils import get_logger
+from pagination import InvalidCursor, build_page
+
+log = get_logger("feed")
+
+FEED_INBOX_SIZE = 500
+FANOUT_MAX_FOLLOWERS = int(os.environ.get("FEED_FANOUT_MAX_FOLLOWERS", 1000))
+# Inbox kırpması her dağıtımda değil, alıcı başına bu olasılıkla yapılır
+FEED_TRIM_PROBABILITY = 1 / 16
+# Yeni arkadaşlıkta karşı tarafın inbox'ına kopyalanacak son olay sayısı
+FEED_BACKFILL_EVENTS = 20
+
+STREAK_MILESTONES = (3, 7, 14, 30, 60, 100)
+
+_FOLLOWERS_SQL = """
+    SELECT friend_id FROM friends WHERE user_id = ? AND status = 'confirmed'
+    UNION
+    SELECT user_id FROM friends WHERE friend_id = ? AND status = 'confirmed'
+"""
+
+
+def get_follower_ids(cursor, user_id: int) -> List[int]:
+    """Onaylı arkadaş id'leri (iki yönlü); akış dağıtımı ve arkadaş sıralaması bunları kullanır."""
+    cursor.execute(_FOLLOWERS_SQL, (user_id, user_id))
+    return [row[0] for row in cursor.fetchall()]
+
+
+class FeedManager:
+    """Aktivite olaylarını yazar, inbox'lara dağıtır ve akışı okur."""
+
+    def __init__(self):
+        self.event_types = {
+            'lesson_completed': '📘',
+            'streak_milestone': '🔥',
+            'achievement_shared': '🎉',
+        }
+
+    # ==================== YAZMA ====================
+
+    def publish(self, actor_id: int, event_type: str, payload: Optional[Dict[str, Any]] = None,
+                dedupe_key: Optional[str] = None) -> int:
+        """
+        Olayı kaydet ve arkadaşların inbox'ına dağıt.
+
+        Args:
+            actor_id: Olayı yapan kullanıcı
+            event_type: self.event_types anahtarlarından biri
+            payload: Olayın özet verisi (JSON)
+            dedupe_key: Verilirse aynı aktör için aynı anahtarlı ikinci olay yazılmaz
+
+        Returns:
+            event_id, tekrar eden olay için 0, hata durumunda -1
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute("""
+                INSERT OR IGNORE INTO activity_events (actor_id, event_type, payload, dedupe_key, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (actor_id, event_type, json.dumps(payload or {}, ensure_ascii=False),
+                  dedupe_key, datetime.now().isoformat()))
+            if cursor.rowcount == 0:
+                return 0
+            event_id = cursor.lastrowid
+
+            followers = get_follower_ids(cursor, actor_id)
+
+            if len(followers) > FANOUT_MAX_FOLLOWERS:
+                # Çok takipçili aktör: okuma anında çekilir
+                cursor.execute("INSERT OR IGNORE INTO feed_pull_actors (actor_id) VALUES (?)", (actor_id,))
+            elif followers:
+                cursor.executemany("""
+                    INSERT OR IGNORE INTO feed_inbox (user_id, event_id, actor_id) VALUES (?, ?, ?)
+                """, [(follower_id, event_id, actor_id) for follower_id in followers])
+                self._trim_inboxes(cursor, [f for f in followers if random.random() < FEED_TRIM_PROBABILITY])
+
+            conn.commit()
+            log.debug("✓ Aktivite olayı yazıldı [ID: %s, %s, %s alıcı]", event_id, event_type, len(followers))
+            return event_id
+
+        except Exception as e:
+            log.error(f"❌ Aktivite olayı yazma hatası: {e}")
+            conn.rollback()
+            return -1
+        finally:
+            conn.close()
+
+    def publish_lesson_completed(self, user_id: int, lesson_id: int, title: Optional[str],
+                                 score: int, xp_earned: int) -> int:
+        """Ders tamamlama olayı."""
+        return self.publish(user_id, 'lesson_completed', {
+            'lesson_id': lesson_id,
+            'title': title,
+            'score': score,
+            'xp': xp_earned
+        })
+
+    def publish_streak_milestone(self, user_id: int, streak_days: int) -> int:
+        """Streak dönüm noktası olayı (aynı gün aynı dönüm noktası bir kez)."""
+        if streak_days not in STREAK_MILESTONES:
+            return 0
+        today = datetime.now().date().isoformat()
+        return self.publish(user_id, 'streak_milestone', {'streak_days': streak_days},
+                            dedupe_key=f"streak:{streak_days}:{today}")
+
+    def publish_achievement_shared(self, user_id: int, achievement_name: str, share_id: int) -> int:
+        """Paylaşılan başarı olayı."""
+        return self.publish(user_id, 'achievement_shared', {
+            'achievement': achievement_name,
+            'share_id': share_id
+        }, dedupe_key=f"share:{share_id}")
+
+    def _trim_inboxes(self, cursor, user_ids: List[int]):
+        """Inbox'larda en yeni FEED_INBOX_SIZE olay dışındakileri sil."""
+        if not user_ids:
+            return
+        cursor.executemany("""
+            DELETE FROM feed_inbox
+            WHERE user_id = ? AND event_id < (
+                SELECT event_id FROM feed_inbox WHERE user_id = ?
+                ORDER BY event_id DESC LIMIT 1 OFFSET ?
+            )
+        """, [(user_id, user_id, FEED_INBOX_SIZE - 1) for user_id in user_ids])
+
+    # ==================== ARKADAŞLIK DEĞİŞİKLİKLERİ ====================
+
+    def on_friendship_confirmed(self, user_id: int, friend_id: int):
+        """İki tarafın son olaylarını karşı tarafın inbox'ına kopyala."""
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            for owner_id, actor_id in ((user_id, friend_id), (friend_id, user_id)):
+                cursor.execute("""
+                    INSERT OR IGNORE INTO feed_inbox (user_id, event_id, actor_id)
+                    SELECT ?, event_id, actor_id FROM activity_events
+                    WHERE actor_id = ?
+                    ORDER BY event_id DESC
+                    LIMIT ?
+                """, (owner_id, actor_id, FEED_BACKFILL_EVENTS))
+            conn.commit()
+
+        except Exception as e:
+            log.error(f"❌ Akış doldurma hatası: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    def on_friendship_removed(self, user_id: int, friend_id: int):
+        """Silinen arkadaşın olaylarını iki tarafın inbox'ından da kaldır."""
+        conn = get_db_connection()
+
+        try:
+            conn.executemany("DELETE FROM feed_inbox WHERE user_id = ? AND actor_id = ?",
+                             [(user_id, friend_id), (friend_id, user_id)])
+            conn.commit()
+
+        except Exception as e:
+            log.error(f"❌ Akış temizleme hatası: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
+
+    # ==================== OKUMA ====================
+
+    def get_feed_page(self, user_id: int, cursor_values: Optional[list] = None,
+                      limit: int = 20) -> Dict[str, Any]:
+        """
+        Kullanıcının akışını event_id'ye göre azalan sırada, keyset sayfalama ile al.
+
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+
+        Raises:
+            InvalidCursor: Cursor bir event_id (tam sayı) değilse
+        """
+        before = cursor_values[0] if cursor_values else None
+        # SQLite'ta metin her tam sayıdan büyüktür: sahte cursor yanlış sayfa döndürmesin
+        if before is not None and (isinstance(before, bool) or not isinstance(before, int)):
+            raise InvalidCursor("Geçersiz cursor")
+
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        before_sql = " AND {column} < ?" if before is not None else ""
+        before_params = [before] if before is not None else []
+
+        try:
+            # Inbox: (user_id, event_id) üzerinde tek aralık taraması
+            cursor.execute(f"""
+                SELECT e.event_id, e.actor_id, u.username, e.event_type, e.payload, e.created_at
+                FROM feed_inbox i
+                JOIN activity_events e ON e.event_id = i.event_id
+                JOIN users u ON u.user_id = e.actor_id
+                WHERE i.user_id = ?{before_sql.format(column="i.event_id")}
+                ORDER BY i.event_id DESC
+                LIMIT ?
+            """, [user_id, *before_params, limit + 1])
+            rows = {row[0]: row for row in cursor.fetchall()}
+
+            # Çok takipçili arkadaşlar: olayları (actor_id, event_id) index'inden oku
+            cursor.execute(f"""
+                SELECT actor_id FROM feed_pull_actors
+                WHERE actor_id IN ({_FOLLOWERS_SQL})
+            """, (user_id, user_id))
+            for (actor_id,) in cursor.fetchall():
+                cursor.execute(f"""
+                    SELECT e.event_id, e.actor_id, u.username, e.event_type, e.payload, e.created_at
+                    FROM activity_events e
+                    JOIN users u ON u.user_id = e.actor_id
+                    WHERE e.actor_id = ?{before_sql.format(column="e.event_id")}
+                    ORDER BY e.event_id DESC
+                    LIMIT ?
+                """, [actor_id, *before_params, limit + 1])
+                rows.update((row[0], row) for row in cursor.fetchall())
+
+            items = [self._event_from_row(rows[event_id])
+                     for event_id in sorted(rows, reverse=True)[:limit + 1]]
+            return build_page(items, limit, key=lambda item: (item['event_id'],))
+
+        except Exception as e:
+            log.error(f"❌ Aktivite akışı alma hatası: {e}")
+            return {'items': [], 'next_cursor': None}
+        finally:
+            conn.close()
+
+    def _event_from_row(self, row) -> Dict[str, Any]:
+        """SELECT satırını görüntülenebilir akış öğesine çevir."""
+        payload = json.loads(row[4]) if row[4] else {}
+        return {
+            'event_id': row[0],
+            'friend_id': row[1],
+            'friend_username': row[2],
+            'event_type': row[3],
+            'payload': payload,
+            'icon': self.event_types.get(row[3], '📢'),
+            'message': self._describe(row[3], payload),
+            'timestamp': row[5]
+        }
+
+    def _describe(self, event_type: str, payload: Dict[str, Any]) -> str:
+        """Olay için kısa açıklama metni."""
+        if event_type == 'lesson_completed':
+            title = payload.get('title') or 'bir dersi'
+            return f'"{title}" dersini tamamladı (skor: {payload.get("score", 0)}, +{payload.get("xp", 0)} XP)'
+        if event_type == 'streak_milestone':
+            return f'{payload.get("streak_days")} günlük seriye ulaştı'
+        if event_type == 'achievement_shared':
+            return f'"{payload.get("achievement")}" başarısını paylaştı'
+        return event_type
@@ -9,6 +9,10 @@ from db_utils import get_db_connection
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
+from log_utils import get_logger
+from pagination import build_page, keyset_condition
+
+log = get_logger("goals")
 
 
 class GoalManager:
@@ -79,11 +83,11 @@ class GoalManager:
             
             conn.commit()
             goal_id = cursor.lastrowid
-            print(f"✓ Hedef oluşturuldu [ID: {goal_id}]")
+            log.info(f"✓ Hedef oluşturuldu [ID: {goal_id}]")
             return goal_id
         
         except Exception as e:
-            print(f"❌ Hedef oluşturma hatası: {e}")
+            log.error(f"❌ Hedef oluşturma hatası: {e}")
             conn.rollback()
             return -1
         finally:
@@ -116,7 +120,7 @@ class GoalManager:
             if new_progress >= target_value and status == 'active':
                 new_status = 'completed'
                 completed_at = datetime.now().isoformat()
-                print(f"🎉 Hedef tamamlandı! [ID: {goal_id}]")
+                log.info(f"🎉 Hedef tamamlandı! [ID: {goal_id}]")
             
             cursor.execute("""
                 UPDATE goals 
@@ -128,7 +132,7 @@ class GoalManager:
             return True
         
         except Exception as e:
-            print(f"❌ İlerleme güncelleme hatası: {e}")
+            log.error(f"❌ İlerleme güncelleme hatası: {e}")
             conn.rollback()
             return False
         finally:
@@ -174,7 +178,7 @@ class GoalManager:
             return goals
         
         except Exception as e:
-            print(f"❌ Aktif hedef alma hatası: {e}")
+            log.error(f"❌ Aktif hedef alma hatası: {e}")
             return goals
         finally:
             conn.close()
@@ -213,11 +217,51 @@ class GoalManager:
             return goals
         
         except Exception as e:
-            print(f"❌ Tamamlanmış hedef alma hatası: {e}")
+            log.error(f"❌ Tamamlanmış hedef alma hatası: {e}")
             return goals
         finally:
             conn.close()
     
+    def get_completed_goals_page(self, user_id: int, cursor_values: Optional[list] = None,
+                                 limit: int = 10) -> Dict[str, Any]:
+        """
+        Tamamlanmış hedefleri (completed_at, goal_id) üzerinden keyset sayfalama ile al.
+        
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            condition, params = keyset_condition(('completed_at', 'goal_id'), cursor_values)
+            cursor.execute(f"""
+                SELECT goal_id, goal_type, target_value, current_progress, 
+                       title, deadline, status, completed_at
+                FROM goals 
+                WHERE user_id = ? AND status = 'completed'{condition}
+                ORDER BY completed_at DESC, goal_id DESC
+                LIMIT ?
+            """, [user_id, *params, limit + 1])
+            
+            rows = [{
+                'goal_id': row[0],
+                'goal_type': row[1],
+                'target_value': row[2],
+                'current_progress': row[3],
+                'title': row[4],
+                'deadline': row[5],
+                'status': row[6],
+                'completed_at': row[7]
+            } for row in cursor.fetchall()]
+            return build_page(rows, limit, key=lambda g: (g['completed_at'], g['goal_id']))
+        
+        except Exception as e:
+            log.error(f"❌ Tamamlanmış hedef alma hatası: {e}")
+            return {'items': [], 'next_cursor': None}
+        finally:
+            conn.close()
+    
     def get_all_goals(self, user_id: int) -> Dict[str, List]:
         """
         Kullanıcının tüm hedeflerini al (aktif + tamamlanmış).
@@ -242,7 +286,7 @@ class GoalManager:
             
             row = cursor.fetchone()
             if not row or row[0] != user_id:
-                print(f"❌ Hedef bulunamadı veya yetki yok [ID: {goal_id}]")
+                log.warning(f"❌ Hedef bulunamadı veya yetki yok [ID: {goal_id}]")
                 return False
             
             # İlgili milestones'ları sil
@@ -252,11 +296,11 @@ class GoalManager:
             cursor.execute("DELETE FROM goals WHERE goal_id = ?", (goal_id,))
             
             conn.commit()
-            print(f"✓ Hedef silindi [ID: {goal_id}]")
+            log.info(f"✓ Hedef silindi [ID: {goal_id}]")
             return True
         
         except Exception as e:
-            print(f"❌ Hedef silme hatası: {e}")
+            log.error(f"❌ Hedef silme hatası: {e}")
             conn.rollback()
             return False
         finally:
@@ -306,7 +350,7 @@ class GoalManager:
             return milestones
         
         except Exception as e:
-            print(f"❌ Milestone alma hatası: {e}")
+            log.error(f"❌ Milestone alma hatası: {e}")
             return milestones
         finally:
             conn.close()
@@ -334,7 +378,7 @@ class GoalManager:
             return cursor.lastrowid
         
         except Exception as e:
-            print(f"❌ Milestone oluşturma hatası: {e}")
+            log.error(f"❌ Milestone oluşturma hatası: {e}")
             return -1
         finally:
             conn.close()
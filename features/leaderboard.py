@@ -2,7 +2,10 @@
 leaderboard.py
 
 Sıralamalar ve rekabet sistemi.
-user_stats'den puan hesaplaması yapar.
+user_stats'den puan hesaplaması yapar; global sıralama ve kullanıcı sırası
+profile_summary'deki materyalize puanlardan okunur.
+Kategori sıralamaları (accuracy, speed, streak, improvement) profile_summary
+sayaçlarından periyodik olarak category_rankings'e yazılır.
 """
 
 from db_utils import get_db_connection
@@ -10,6 +13,72 @@ from features.user_stats import UserStats
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
+import os
+import threading
+from bisect import bisect_right
+from log_utils import get_logger
+from pagination import InvalidCursor, build_page
+import profile_summary
+
+log = get_logger("leaderboard")
+
+# Kategori sıralamaları: periyodik anlık görüntü (category_rankings tablosu)
+CATEGORY_RANKING_SIZE = 1000
+CATEGORY_REFRESH_SECONDS = int(os.environ.get("LEADERBOARD_REFRESH_SECONDS", 300))
+# Sadece doğruluk sıralamasında: birkaç girişle %100 alanlar listeyi doldurmasın
+ACCURACY_MIN_INPUTS = 10
+IMPROVEMENT_WINDOW_DAYS = 30
+IMPROVEMENT_MIN_INPUTS = 5  # gelişim: her iki 15 günlük yarıda en az bu kadar giriş
+
+# kategori -> (metrik etiketi, (user_id, value, total_inputs) döndüren kaynak sorgu)
+CATEGORY_METRICS = {
+    'accuracy': ("{:.2f}%", """
+        SELECT user_id, correct_answers * 100.0 / total_inputs AS value, total_inputs
+        FROM user_profile_summary WHERE total_inputs >= :accuracy_min_inputs
+    """),
+    'speed': ("{:.2f} input/saat", """
+        SELECT user_id, total_inputs * 60.0 / session_minutes AS value, total_inputs
+        FROM user_profile_summary WHERE session_minutes > 0 AND total_inputs > 0
+    """),
+    'streak': ("{:.0f} gün", """
+        SELECT user_id, best_streak AS value, total_inputs
+        FROM user_profile_summary WHERE best_streak > 0
+    """),
+    # Son 15 günün doğruluğu - önceki 15 günün doğruluğu (yüzde puanı)
+    'improvement': ("{:+.2f} puan", """
+        SELECT user_id,
+               SUM(CASE WHEN day >= :window_mid THEN correct END) * 100.0
+                   / SUM(CASE WHEN day >= :window_mid THEN inputs END)
+               - SUM(CASE WHEN day < :window_mid THEN correct END) * 100.0
+                   / SUM(CASE WHEN day < :window_mid THEN inputs END) AS value,
+               SUM(inputs) AS total_inputs
+        FROM user_daily_stats
+        WHERE day >= :window_start
+        GROUP BY user_id
+        HAVING SUM(CASE WHEN day >= :window_mid THEN inputs END) >= :improvement_min_inputs
+           AND SUM(CASE WHEN day < :window_mid THEN inputs END) >= :improvement_min_inputs
+    """),
+}
+
+_category_refresh_lock = threading.Lock()
+
+
+def medal_for_rank(rank: Optional[int]) -> Optional[str]:
+    """
+    Sıraya göre madalya veya emoji döndür.
+    """
+    if not rank:
+        return None
+    if rank == 1:
+        return '🥇'
+    elif rank == 2:
+        return '🥈'
+    elif rank == 3:
+        return '🥉'
+    elif rank <= 10:
+        return '⭐'
+    else:
+        return None
 
 
 class LeaderboardManager:
@@ -17,16 +86,8 @@ class LeaderboardManager:
     
     def __init__(self):
         self.stats_manager = UserStats()
-        self.point_system = {
-            'correct_answer': 10,
-            'accuracy_milestone_80': 50,
-            'accuracy_milestone_90': 100,
-            'daily_streak': 25,
-            'weekly_streak': 100,
-            'goal_completed': 200,
-            'session_1hour': 30,
-            'weak_word_mastered': 50
-        }
+        # Puan formülü profile_summary.SCORE_SQL ile aynı tutulur
+        self.point_system = dict(profile_summary.SCORE_POINTS)
     
     # ==================== PUAN SİSTEMİ ====================
     
@@ -76,61 +137,68 @@ class LeaderboardManager:
             return round(score, 2)
         
         except Exception as e:
-            print(f"❌ Puan hesaplama hatası: {e}")
+            log.error(f"❌ Puan hesaplama hatası: {e}")
             return 0.0
     
     # ==================== GLOBAL SIRALAMALAR ====================
     
-    def get_global_leaderboard(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_global_leaderboard(self, limit: Optional[int] = 50) -> List[Dict[str, Any]]:
         """
         Global sıralamayı döndür (tüm kullanıcılar).
+        Puanlar user_profile_summary'den, (score, user_id) index'i sırasıyla okunur.
         """
+        return self._read_global(None, limit)['items']
+    
+    def _read_global(self, cursor_values: Optional[list], limit: Optional[int]) -> Dict[str, Any]:
+        """
+        Materyalize global sıralamadan bir sayfa oku.
+        Sıra: puana göre azalan, eşitlikte user_id'ye göre artan.
+        """
+        profile_summary.refresh_streaks()
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        leaderboard = []
-        
         try:
-            cursor.execute("SELECT user_id FROM users ORDER BY user_id")
-            users = cursor.fetchall()
-            
-            user_scores = []
-            for user in users:
-                user_id = user[0]
-                score = self.calculate_user_score(user_id)
-                
+            condition, params, start_rank = "", [], 1
+            if cursor_values is not None:
+                score, last_user_id = cursor_values
+                condition = "WHERE s.score < ? OR (s.score = ? AND s.user_id > ?)"
+                params = [score, score, last_user_id]
                 cursor.execute("""
-                    SELECT username FROM users WHERE user_id = ?
-                """, (user_id,))
-                
-                username = cursor.fetchone()[0]
-                user_scores.append({
-                    'user_id': user_id,
-                    'username': username,
-                    'score': score
-                })
+                    SELECT (SELECT COUNT(*) FROM user_profile_summary WHERE score > ?)
+                         + (SELECT COUNT(*) FROM user_profile_summary WHERE score = ? AND user_id <= ?)
+                """, params)
+                start_rank = cursor.fetchone()[0] + 1
             
-            # Puanlara göre sırala
-            user_scores.sort(key=lambda x: x['score'], reverse=True)
+            fetch = -1 if limit is None else limit + 1
+            cursor.execute(f"""
+                SELECT s.user_id, u.username, s.score
+                FROM user_profile_summary s
+                JOIN users u ON u.user_id = s.user_id
+                {condition}
+                ORDER BY s.score DESC, s.user_id ASC
+                LIMIT ?
+            """, params + [fetch])
             
-            for rank, user_data in enumerate(user_scores[:limit], 1):
-                leaderboard.append({
-                    'rank': rank,
-                    'user_id': user_data['user_id'],
-                    'username': user_data['username'],
-                    'score': user_data['score'],
-                    'medal': self._get_medal(rank)
-                })
+            leaderboard = [{
+                'rank': rank,
+                'user_id': row[0],
+                'username': row[1],
+                'score': round(row[2], 2),
+                'medal': self._get_medal(rank)
+            } for rank, row in enumerate(cursor.fetchall(), start_rank)]
             
-            return leaderboard
+            if limit is None:
+                return {'items': leaderboard, 'next_cursor': None}
+            return build_page(leaderboard, limit, key=lambda e: (e['score'], e['user_id']))
         
         except Exception as e:
-            print(f"❌ Global sıralama alma hatası: {e}")
-            return leaderboard
+            log.error(f"❌ Global sıralama alma hatası: {e}")
+            return {'items': [], 'next_cursor': None}
         finally:
             conn.close()
     
-    def get_weekly_leaderboard(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_weekly_leaderboard(self, limit: Optional[int] = 50) -> List[Dict[str, Any]]:
         """
         Haftalık sıralamayı döndür.
         """
@@ -162,7 +230,7 @@ class LeaderboardManager:
                     })
             
             # Puanlara göre sırala
-            user_scores.sort(key=lambda x: x['score'], reverse=True)
+            user_scores.sort(key=self._rank_key)
             
             for rank, user_data in enumerate(user_scores[:limit], 1):
                 leaderboard.append({
@@ -176,12 +244,12 @@ class LeaderboardManager:
             return leaderboard
         
         except Exception as e:
-            print(f"❌ Haftalık sıralama alma hatası: {e}")
+            log.error(f"❌ Haftalık sıralama alma hatası: {e}")
             return leaderboard
         finally:
             conn.close()
     
-    def get_monthly_leaderboard(self, limit: int = 50) -> List[Dict[str, Any]]:
+    def get_monthly_leaderboard(self, limit: Optional[int] = 50) -> List[Dict[str, Any]]:
         """
         Aylık sıralamayı döndür.
         """
@@ -213,7 +281,7 @@ class LeaderboardManager:
                     })
             
             # Puanlara göre sırala
-            user_scores.sort(key=lambda x: x['score'], reverse=True)
+            user_scores.sort(key=self._rank_key)
             
             for rank, user_data in enumerate(user_scores[:limit], 1):
                 leaderboard.append({
@@ -227,11 +295,46 @@ class LeaderboardManager:
             return leaderboard
         
         except Exception as e:
-            print(f"❌ Aylık sıralama alma hatası: {e}")
+            log.error(f"❌ Aylık sıralama alma hatası: {e}")
             return leaderboard
         finally:
             conn.close()
     
+    def get_leaderboard_page(self, period: str = 'all', cursor_values: Optional[list] = None,
+                             limit: int = 50) -> Dict[str, Any]:
+        """
+        Sıralamayı (puan, user_id) üzerinden keyset sayfalama ile döndür.
+        
+        Eşit puanlılar user_id'ye göre sıralanır, böylece sayfa sınırları
+        kararlıdır; cursor'daki kullanıcının puanı değişse bile sayfa atlanmaz
+        veya tekrar edilmez.
+        
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+        
+        Raises:
+            InvalidCursor: Cursor (puan, user_id) değilse
+        """
+        if cursor_values is not None:
+            score, last_user_id = cursor_values
+            if (isinstance(score, bool) or not isinstance(score, (int, float))
+                    or isinstance(last_user_id, bool) or not isinstance(last_user_id, int)):
+                raise InvalidCursor("Geçersiz cursor")
+        
+        if period == 'weekly':
+            ranked = self.get_weekly_leaderboard(limit=None)
+        elif period == 'monthly':
+            ranked = self.get_monthly_leaderboard(limit=None)
+        else:
+            return self._read_global(cursor_values, limit)
+        
+        start = 0
+        if cursor_values is not None:
+            keys = [self._rank_key(entry) for entry in ranked]
+            start = bisect_right(keys, self._rank_key({'score': cursor_values[0], 'user_id': cursor_values[1]}))
+        
+        return build_page(ranked[start:start + limit + 1], limit, key=lambda e: (e['score'], e['user_id']))
+    
     # ==================== KULLANICI SIRASI ====================
     
     def get_user_rank(self, user_id: int, period: str = 'all') -> Dict[str, Any]:
@@ -245,12 +348,22 @@ class LeaderboardManager:
         Returns:
             Sıralama bilgileri
         """
-        if period == 'weekly':
+        if period not in ('weekly', 'monthly'):
+            rank = profile_summary.get_rank(user_id)
+            if rank and rank['rank']:
+                return {
+                    'user_id': user_id,
+                    'rank': rank['rank'],
+                    'score': rank['score'],
+                    'medal': self._get_medal(rank['rank']),
+                    'period': period,
+                    'total_participants': rank['total_participants']
+                }
+            leaderboard = []
+        elif period == 'weekly':
             leaderboard = self.get_weekly_leaderboard(limit=10000)
-        elif period == 'monthly':
-            leaderboard = self.get_monthly_leaderboard(limit=10000)
         else:
-            leaderboard = self.get_global_leaderboard(limit=10000)
+            leaderboard = self.get_monthly_leaderboard(limit=10000)
         
         for entry in leaderboard:
             if entry['user_id'] == user_id:
@@ -277,38 +390,47 @@ class LeaderboardManager:
     def get_friends_leaderboard(self, user_id: int) -> List[Dict[str, Any]]:
         """
         Kullanıcının arkadaşlarının sıralamasını döndür.
-        social.py ile entegre olacak.
+        Arkadaş id'leri süreç içi cache'ten (friends_version ile doğrulanır),
+        puanlar user_profile_summary'den tek IN sorgusuyla okunur.
         """
-        from features.social import SocialManager
-        
-        social_mgr = SocialManager()
-        friends = social_mgr.get_friends(user_id)
+        from features.social import get_friend_ids
         
-        friend_scores = []
-        
-        for friend in friends:
-            friend_id = friend['friend_id']
-            score = self.calculate_user_score(friend_id)
-            friend_scores.append({
-                'user_id': friend_id,
-                'username': friend['friend_username'],
-                'score': score
-            })
-        
-        # Puanlara göre sırala
-        friend_scores.sort(key=lambda x: x['score'], reverse=True)
+        profile_summary.refresh_streaks()
+        conn = get_db_connection()
+        cursor = conn.cursor()
         
-        leaderboard = []
-        for rank, friend_data in enumerate(friend_scores, 1):
-            leaderboard.append({
+        try:
+            cursor.execute("SELECT friends_version FROM user_profile_summary WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return []
+            
+            friend_ids = get_friend_ids(cursor, user_id, row[0])
+            if not friend_ids:
+                return []
+            
+            # Tek parametre: id listesi JSON olarak (değişken sayısı sınırı yok)
+            cursor.execute("""
+                SELECT s.user_id, u.username, s.score
+                FROM user_profile_summary s
+                JOIN users u ON u.user_id = s.user_id
+                WHERE s.user_id IN (SELECT value FROM json_each(?))
+                ORDER BY s.score DESC, s.user_id ASC
+            """, (json.dumps(sorted(friend_ids)),))
+            
+            return [{
                 'rank': rank,
-                'user_id': friend_data['user_id'],
-                'username': friend_data['username'],
-                'score': friend_data['score'],
+                'user_id': row[0],
+                'username': row[1],
+                'score': round(row[2], 2),
                 'medal': self._get_medal(rank)
-            })
+            } for rank, row in enumerate(cursor.fetchall(), 1)]
         
-        return leaderboard
+        except Exception as e:
+            log.error(f"❌ Arkadaş sıralaması alma hatası: {e}")
+            return []
+        finally:
+            conn.close()
     
     # ==================== ÖZ EL SIRALAMALAR ====================
     
@@ -320,95 +442,135 @@ class LeaderboardManager:
         - accuracy: Doğruluk yüksek olanlar
         - streak: En uzun ardışık gün
         - speed: En hızlı olanlar
-        - improvement: En çok iyileşenler
+        - improvement: En çok iyileşenler (son 30 gün)
         """
+        rankings = self.get_category_rankings(category, limit)
+        return rankings['items'] if rankings else []
+    
+    def get_category_rankings(self, category: str, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        Kategori sıralamasını periyodik anlık görüntüden oku.
+        Görüntü CATEGORY_REFRESH_SECONDS'tan eskiyse önce yenilenir.
+        
+        Returns:
+            {'category', 'refreshed_at', 'items': [...]} veya bilinmeyen kategori için None
+        """
+        if category not in CATEGORY_METRICS:
+            return None
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        leaderboard = []
-        
         try:
-            if category == 'accuracy':
-                # Doğruluk bazlı
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username,
-                        COUNT(ui.input_id) as total_inputs,
-                        SUM(CASE WHEN ui.is_correct = 1 THEN 1 ELSE 0 END) as correct_inputs,
-                        (SUM(CASE WHEN ui.is_correct = 1 THEN 1 ELSE 0 END) * 100 / 
-                         COUNT(ui.input_id)) as accuracy
-                    FROM users u
-                    LEFT JOIN user_inputs ui ON u.user_id = ui.user_id
-                    WHERE ui.input_id IS NOT NULL
-                    GROUP BY u.user_id
-                    ORDER BY accuracy DESC
-                    LIMIT ?
-                """, (limit,))
-                
-                for rank, row in enumerate(cursor.fetchall(), 1):
-                    leaderboard.append({
-                        'rank': rank,
-                        'user_id': row[0],
-                        'username': row[1],
-                        'metric': f"{row[4]:.2f}%",
-                        'total_inputs': row[2],
-                        'medal': self._get_medal(rank)
-                    })
+            cursor.execute("SELECT refreshed_at FROM category_rankings_meta WHERE category = ?", (category,))
+            row = cursor.fetchone()
+            refreshed_at = row[0] if row else None
+            if self._is_stale(refreshed_at):
+                refreshed_at = self.refresh_category_rankings(stale_before=refreshed_at) or refreshed_at
             
-            elif category == 'speed':
-                # Hız bazlı (dakika başına input sayısı)
-                cursor.execute("""
-                    SELECT 
-                        u.user_id,
-                        u.username,
-                        COUNT(ui.input_id) as total_inputs,
-                        SUM(sl.session_duration_minutes) as total_minutes,
-                        (COUNT(ui.input_id) * 60 / 
-                         NULLIF(SUM(sl.session_duration_minutes), 0)) as speed
-                    FROM users u
-                    LEFT JOIN user_inputs ui ON u.user_id = ui.user_id
-                    LEFT JOIN session_logs sl ON u.user_id = sl.user_id
-                    WHERE ui.input_id IS NOT NULL
-                    GROUP BY u.user_id
-                    ORDER BY speed DESC
-                    LIMIT ?
-                """, (limit,))
-                
-                for rank, row in enumerate(cursor.fetchall(), 1):
-                    leaderboard.append({
-                        'rank': rank,
-                        'user_id': row[0],
-                        'username': row[1],
-                        'metric': f"{row[4]:.2f} input/saat",
-                        'total_inputs': row[2],
-                        'medal': self._get_medal(rank)
-                    })
+            cursor.execute("""
+                SELECT r.rank, r.user_id, u.username, r.value, r.total_inputs
+                FROM category_rankings r
+                JOIN users u ON u.user_id = r.user_id
+                WHERE r.category = ?
+                ORDER BY r.rank
+                LIMIT ?
+            """, (category, limit))
             
-            return leaderboard
+            label = CATEGORY_METRICS[category][0]
+            items = [{
+                'rank': row[0],
+                'user_id': row[1],
+                'username': row[2],
+                'value': round(row[3], 2),
+                'metric': label.format(row[3]),
+                'total_inputs': row[4],
+                'medal': self._get_medal(row[0])
+            } for row in cursor.fetchall()]
+            
+            return {'category': category, 'refreshed_at': refreshed_at, 'items': items}
         
         except Exception as e:
-            print(f"❌ Kategori sıralaması alma hatası: {e}")
-            return leaderboard
+            log.error(f"❌ Kategori sıralaması alma hatası: {e}")
+            return {'category': category, 'refreshed_at': None, 'items': []}
         finally:
             conn.close()
     
+    @staticmethod
+    def _is_stale(refreshed_at: Optional[str]) -> bool:
+        if refreshed_at is None:
+            return True
+        age = datetime.now() - datetime.fromisoformat(refreshed_at)
+        return age.total_seconds() >= CATEGORY_REFRESH_SECONDS
+    
+    def refresh_category_rankings(self, stale_before: Optional[str] = None) -> Optional[str]:
+        """
+        Tüm kategori sıralamalarını profile_summary sayaçlarından yeniden oluştur.
+        
+        Args:
+            stale_before: Verilirse ve başka bir istek/süreç bu arada yenilemişse
+                          tekrar yenilenmez
+        
+        Returns:
+            Yeni refreshed_at değeri (hata durumunda None)
+        """
+        with _category_refresh_lock:
+            profile_summary.refresh_streaks()
+            conn = get_db_connection()
+            cursor = conn.cursor()
+            
+            try:
+                cursor.execute("SELECT MIN(refreshed_at), COUNT(*) FROM category_rankings_meta")
+                oldest, count = cursor.fetchone()
+                if stale_before is not None and count == len(CATEGORY_METRICS) and oldest > stale_before:
+                    return oldest
+                
+                refreshed_at = datetime.now().isoformat()
+                today = datetime.now().date()
+                window = {
+                    'accuracy_min_inputs': ACCURACY_MIN_INPUTS,
+                    'improvement_min_inputs': IMPROVEMENT_MIN_INPUTS,
+                    'window_start': (today - timedelta(days=IMPROVEMENT_WINDOW_DAYS - 1)).isoformat(),
+                    'window_mid': (today - timedelta(days=IMPROVEMENT_WINDOW_DAYS // 2 - 1)).isoformat(),
+                }
+                
+                for category, (_, source_sql) in CATEGORY_METRICS.items():
+                    cursor.execute("DELETE FROM category_rankings WHERE category = ?", (category,))
+                    cursor.execute(f"""
+                        INSERT INTO category_rankings (category, rank, user_id, value, total_inputs)
+                        SELECT :category, ROW_NUMBER() OVER (ORDER BY value DESC, user_id), user_id, value, total_inputs
+                        FROM ({source_sql})
+                        WHERE value IS NOT NULL
+                        ORDER BY value DESC, user_id
+                        LIMIT :size
+                    """, {**window, 'category': category, 'size': CATEGORY_RANKING_SIZE})
+                    cursor.execute("""
+                        INSERT OR REPLACE INTO category_rankings_meta (category, refreshed_at) VALUES (?, ?)
+                    """, (category, refreshed_at))
+                
+                conn.commit()
+                log.debug("✓ Kategori sıralamaları yenilendi")
+                return refreshed_at
+            
+            except Exception as e:
+                log.error(f"❌ Kategori sıralaması yenileme hatası: {e}")
+                conn.rollback()
+                return None
+            finally:
+                conn.close()
+    
     # ==================== YARDIMCI METODLAR ====================
     
+    @staticmethod
+    def _rank_key(entry: Dict[str, Any]):
+        """Sıralama anahtarı: puana göre azalan, eşitlikte user_id'ye göre artan."""
+        return (-entry['score'], entry['user_id'])
+    
     def _get_medal(self, rank: int) -> str:
         """
         Sıraya göre madalya veya emoji döndür.
         """
-        if rank == 1:
-            return '🥇'
-        elif rank == 2:
-            return '🥈'
-        elif rank == 3:
-            return '🥉'
-        elif rank <= 10:
-            return '⭐'
-        else:
-            return None
+        return medal_for_rank(rank)
     
     def _calculate_weekly_score(self, user_id: int, week_ago: str) -> float:
         """
@@ -446,7 +608,7 @@ class LeaderboardManager:
             return score
         
         except Exception as e:
-            print(f"❌ Haftalık puan hesaplama hatası: {e}")
+            log.error(f"❌ Haftalık puan hesaplama hatası: {e}")
             return 0.0
         finally:
             conn.close()
@@ -480,7 +642,7 @@ class LeaderboardManager:
         """
         Ardışık gün sayısını hesapla.
         """
-        return self.stats_manager._calculate_streak(user_id)
+        return self.stats_manager.get_streak(user_id)
     
     def _count_weak_words_mastered(self, user_id: int) -> int:
         """
@@ -9,6 +9,10 @@ from db_utils import get_db_connection
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
+from log_utils import get_logger
+from pagination import build_page, keyset_condition
+
+log = get_logger("notifications")
 
 
 class NotificationManager:
@@ -66,7 +70,7 @@ class NotificationManager:
                 )
             """)
             
-            print(f"[DEBUG] create_notification: user_id={user_id}, type={notification_type}, title={title}, message={message}, icon={icon}, action_url={action_url}, metadata={metadata}")
+            log.debug("create_notification: user_id=%s, type=%s, title=%s, message=%s, icon=%s, action_url=%s, metadata=%s", user_id, notification_type, title, message, icon, action_url, metadata)
             metadata_json = json.dumps(metadata) if metadata else None
             
             cursor.execute("""
@@ -77,11 +81,11 @@ class NotificationManager:
             
             conn.commit()
             notif_id = cursor.lastrowid
-            print(f"✓ Bildirim oluşturuldu [ID: {notif_id}]")
+            log.debug("✓ Bildirim oluşturuldu [ID: %s]", notif_id)
             return notif_id
         
         except Exception as e:
-            print(f"❌ Bildirim oluşturma hatası: {e}")
+            log.error(f"❌ Bildirim oluşturma hatası: {e}")
             conn.rollback()
             return -1
         finally:
@@ -120,29 +124,70 @@ class NotificationManager:
             """, params + [limit])
             
             for row in cursor.fetchall():
-                metadata = json.loads(row[6]) if row[6] else None
-                
-                notifications.append({
-                    'notification_id': row[0],
-                    'notification_type': row[1],
-                    'title': row[2],
-                    'message': row[3],
-                    'icon': row[4],
-                    'action_url': row[5],
-                    'metadata': metadata,
-                    'is_read': bool(row[7]),
-                    'created_at': row[8],
-                    'read_at': row[9]
-                })
+                notifications.append(self._notification_from_row(row))
             
             return notifications
         
         except Exception as e:
-            print(f"❌ Bildirim alma hatası: {e}")
+            log.error(f"❌ Bildirim alma hatası: {e}")
             return notifications
         finally:
             conn.close()
     
+    def get_user_notifications_page(
+        self,
+        user_id: int,
+        cursor_values: Optional[list] = None,
+        limit: int = 20,
+        unread_only: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Bildirimleri (created_at, notification_id) üzerinden keyset sayfalama ile al.
+        
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            condition, params = keyset_condition(('created_at', 'notification_id'), cursor_values)
+            if unread_only:
+                condition += " AND is_read = 0"
+            
+            cursor.execute(f"""
+                SELECT notification_id, notification_type, title, message, icon, 
+                       action_url, metadata, is_read, created_at, read_at
+                FROM notifications 
+                WHERE user_id = ?{condition}
+                ORDER BY created_at DESC, notification_id DESC
+                LIMIT ?
+            """, [user_id, *params, limit + 1])
+            
+            rows = [self._notification_from_row(row) for row in cursor.fetchall()]
+            return build_page(rows, limit, key=lambda n: (n['created_at'], n['notification_id']))
+        
+        except Exception as e:
+            log.error(f"❌ Bildirim alma hatası: {e}")
+            return {'items': [], 'next_cursor': None}
+        finally:
+            conn.close()
+    
+    def _notification_from_row(self, row) -> Dict[str, Any]:
+        """SELECT satırını bildirim sözlüğüne çevir."""
+        return {
+            'notification_id': row[0],
+            'notification_type': row[1],
+            'title': row[2],
+            'message': row[3],
+            'icon': row[4],
+            'action_url': row[5],
+            'metadata': json.loads(row[6]) if row[6] else None,
+            'is_read': bool(row[7]),
+            'created_at': row[8],
+            'read_at': row[9]
+        }
+    
     def get_unread_notification_count(self, user_id: int) -> int:
         """
         Okunmamış bildirim sayısını al.
@@ -159,7 +204,7 @@ class NotificationManager:
             return cursor.fetchone()[0] or 0
         
         except Exception as e:
-            print(f"❌ Okunmamış bildirim sayısı hatası: {e}")
+            log.error(f"❌ Okunmamış bildirim sayısı hatası: {e}")
             return 0
         finally:
             conn.close()
@@ -184,7 +229,7 @@ class NotificationManager:
             return True
         
         except Exception as e:
-            print(f"❌ Bildirim işaretleme hatası: {e}")
+            log.error(f"❌ Bildirim işaretleme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -207,7 +252,7 @@ class NotificationManager:
             return True
         
         except Exception as e:
-            print(f"❌ Tüm bildirimler işaretleme hatası: {e}")
+            log.error(f"❌ Tüm bildirimler işaretleme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -415,7 +460,7 @@ class NotificationManager:
             return triggered_notifications
         
         except Exception as e:
-            print(f"❌ Bildirim tetikleme hatası: {e}")
+            log.error(f"❌ Bildirim tetikleme hatası: {e}")
             return triggered_notifications
     
     # ==================== BİLDİRİMLERİ SİL ====================
@@ -436,7 +481,7 @@ class NotificationManager:
             return True
         
         except Exception as e:
-            print(f"❌ Bildirim silme hatası: {e}")
+            log.error(f"❌ Bildirim silme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -457,11 +502,11 @@ class NotificationManager:
             
             conn.commit()
             deleted = cursor.rowcount
-            print(f"✓ {deleted} eski bildirim silindi")
+            log.info(f"✓ {deleted} eski bildirim silindi")
             return deleted
         
         except Exception as e:
-            print(f"❌ Eski bildirim silme hatası: {e}")
+            log.error(f"❌ Eski bildirim silme hatası: {e}")
             return 0
         finally:
             conn.close()
@@ -0,0 +1,396 @@
+"""
+placement.py
+
+Uyarlamalı seviye belirleme testi (CAT - computerized adaptive testing).
+
+Soru bankası bellekte tutulur. A1-B2 seviyesindeki çevirisi olan her kelime
+Rasch (1PL) ölçeğinde bir zorluk (b) alır:
+- seviye çapası (A1=-1.5, A2=-0.5, B1=0.5, B2=1.5)
+- seviye içi sıra: yaygın kelime kolay (freq yoksa kısa kelime kolay)
+- kalibrasyon: önceki testlerin cevapları (placement_responses) ile önsel
+  ağırlıklı tek Newton adımı
+Soru tipi zorluğa sabit bir fark ekler (dinleme, telaffuz ve yazarak çeviri
+seçmeli kelime sorusundan zordur).
+
+Kelimeler BIN_WIDTH genişliğinde zorluk kovalarına dağıtılır. Sıradaki soru
+yetenek tahminine (θ) en yakın kovadan rastgele seçilir: Rasch modelinde bir
+sorunun bilgisi b = θ'da en yüksektir, kova içi rastgelelik aynı kelimelerin
+herkese sorulmasını önler. Seçim O(1)'dir; soru başına DB taraması yoktur.
+
+θ her cevaptan sonra normal önselle EAP (ızgara üzerinde sonsal ortalama)
+olarak yeniden tahmin edilir. Standart hata SE_TARGET'ın altına düşünce (en az
+MIN_ITEMS soru) veya MAX_ITEMS soruda test biter. Puanlama sunucudadır: doğru
+cevap istemciye soru cevaplanmadan gönderilmez, seviye θ'dan hesaplanır.
+
+Oturum durumu placement_sessions'dadır (worker'lar arasında paylaşılır).
+Banka warmup'ta kurulur, 'words' cache sürümü değişince yeniden kurulur.
+"""
+
+import json
+import math
+import os
+import random
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend import selection
+from db_utils import get_db_connection, get_cache_version
+from features.course_system import course_system
+from log_utils import get_logger
+
+log = get_logger("placement")
+
+# Seviye çapaları (θ ölçeği): seviyenin ortalama kelimesinin zorluğu
+LEVEL_ANCHORS = {"A1": -1.5, "A2": -0.5, "B1": 0.5, "B2": 1.5}
+PLACEMENT_LEVELS = list(LEVEL_ANCHORS)
+LEVEL_SPREAD = 0.8
+
+TYPE_OFFSETS = {"vocabulary": 0.0, "listening": 0.3, "pronunciation": 0.3, "translation": 0.7}
+TYPE_CYCLE = ["vocabulary", "listening", "translation", "vocabulary", "pronunciation"]
+
+BIN_WIDTH = 0.25
+B_MIN, B_MAX = -3.0, 3.0
+THETA_GRID = [-4.0 + i * 0.1 for i in range(81)]
+PRIOR_MEAN = -0.5
+PRIOR_SD = 1.0
+
+MIN_ITEMS = 6
+MAX_ITEMS = int(os.environ.get("PLACEMENT_MAX_ITEMS", 15))
+SE_TARGET = float(os.environ.get("PLACEMENT_SE_TARGET", 0.5))
+
+# Kalibrasyon: az cevaplı kelimelerde önsel zorluk baskın kalsın
+CALIBRATION_PRIOR_WEIGHT = 5.0
+MAX_CALIBRATION_SHIFT = 1.5
+BANK_CHECK_SECONDS = 30
+
+# Telaffuz: kelimeyi içeren konuşma tanıma sonucu en fazla bu kadar sözcük olabilir
+PRONUNCIATION_MAX_TOKENS = 3
+
+NUMBER_WORDS = {
+    "zero": "0", "one": "1", "two": "2", "three": "3", "four": "4", "five": "5",
+    "six": "6", "seven": "7", "eight": "8", "nine": "9", "ten": "10",
+    "eleven": "11", "twelve": "12", "thirteen": "13", "fourteen": "14", "fifteen": "15",
+    "sixteen": "16", "seventeen": "17", "eighteen": "18", "nineteen": "19",
+    "twenty": "20", "thirty": "30", "forty": "40", "fifty": "50", "sixty": "60",
+    "seventy": "70", "eighty": "80", "ninety": "90", "hundred": "100", "thousand": "1000",
+}
+
+
+def _p_correct(theta: float, b: float) -> float:
+    return 1.0 / (1.0 + math.exp(b - theta))
+
+
+def _bin_index(b: float) -> int:
+    b = min(max(b, B_MIN), B_MAX - 1e-9)
+    return int((b - B_MIN) / BIN_WIDTH)
+
+
+def estimate_ability(responses: List[Tuple[float, bool]]) -> Tuple[float, float]:
+    """
+    EAP yetenek tahmini.
+
+    Args:
+        responses: [(zorluk, doğru mu), ...]
+
+    Returns:
+        (θ, standart hata)
+    """
+    log_post = [-((t - PRIOR_MEAN) / PRIOR_SD) ** 2 / 2 for t in THETA_GRID]
+    for b, correct in responses:
+        for j, t in enumerate(THETA_GRID):
+            p = _p_correct(t, b)
+            log_post[j] += math.log(p if correct else 1.0 - p)
+    top = max(log_post)
+    weights = [math.exp(lp - top) for lp in log_post]
+    total = sum(weights)
+    mean = sum(w * t for w, t in zip(weights, THETA_GRID)) / total
+    var = sum(w * (t - mean) ** 2 for w, t in zip(weights, THETA_GRID)) / total
+    return mean, math.sqrt(var)
+
+
+def level_for_ability(theta: float) -> str:
+    """
+    θ'ya karşılık gelen seviye: çapası θ'nın altında kalan en yüksek seviye, yani
+    o seviyenin ortalama kelimesini en az %50 olasılıkla bilen kullanıcı o seviyededir
+    (eski testteki "seviyede %50 başarı" kuralının model karşılığı).
+    """
+    level = PLACEMENT_LEVELS[0]
+    for candidate in PLACEMENT_LEVELS:
+        if theta >= LEVEL_ANCHORS[candidate]:
+            level = candidate
+    return level
+
+
+def _levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def grade_answer(q_type: str, correct_answer: str, answer: str) -> bool:
+    """
+    Sunucu tarafı puanlama.
+    Telaffuzda konuşma tanıma sonucu kelimeyi ayrı bir sözcük olarak içerebilir
+    ("the apple"); yazım toleransı kelime uzunluğuyla ölçeklenir, kısa ve kısmi
+    cevaplar (ör. tek harf) geçmez.
+    """
+    given = (answer or "").strip().lower()
+    expected = (correct_answer or "").strip().lower()
+    if not given:
+        return False
+    if q_type == "translation":
+        return given == expected or _levenshtein(given, expected) <= 1
+    if q_type == "pronunciation":
+        tokens = given.split()
+        return (given == expected
+                or (len(tokens) <= PRONUNCIATION_MAX_TOKENS and expected in tokens)
+                or _levenshtein(given, expected) <= min(2, len(expected) // 4)
+                or NUMBER_WORDS.get(expected) == given or NUMBER_WORDS.get(given) == expected)
+    return given == expected
+
+
+class _ItemBank:
+    """Zorluk kovalarına dağıtılmış kelime id'leri ve kelime başına (zorluk, seviye)."""
+
+    __slots__ = ("version", "bins", "items", "calibrated")
+
+    def __init__(self, version: int):
+        self.version = version
+        self.bins = [array('l') for _ in range(_bin_index(B_MAX) + 1)]
+        self.items: Dict[int, Tuple[float, str]] = {}
+        self.calibrated = 0
+
+    def pick(self, target: float, exclude) -> Optional[int]:
+        """target zorluğuna en yakın kovadan rastgele, exclude'da olmayan bir kelime."""
+        center = _bin_index(target)
+        for distance in range(len(self.bins)):
+            for idx in {center - distance, center + distance}:
+                if not 0 <= idx < len(self.bins) or not self.bins[idx]:
+                    continue
+                bucket = self.bins[idx]
+                for _ in range(5):
+                    word_id = bucket[random.randrange(len(bucket))]
+                    if word_id not in exclude:
+                        return word_id
+        return None
+
+
+class PlacementEngine:
+    """Seviye belirleme testi: soru bankası, uyarlamalı seçim ve sunucu tarafı puanlama."""
+
+    def __init__(self):
+        self._bank: Optional[_ItemBank] = None
+        self._bank_lock = threading.Lock()
+        self._checked_at = 0.0
+
+    # ==================== SORU BANKASI ====================
+
+    def load_bank(self) -> int:
+        """
+        Soru bankasını kurar (warmup adımı).
+
+        Returns:
+            Bankadaki kelime sayısı
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            bank = _ItemBank(get_cache_version(cursor, 'words'))
+            placeholders = ",".join("?" for _ in PLACEMENT_LEVELS)
+            cursor.execute(f"""
+                SELECT word_id, level, COALESCE(freq, 0), LENGTH(english)
+                FROM words
+                WHERE turkish IS NOT NULL AND turkish != '' AND level IN ({placeholders})
+            """, PLACEMENT_LEVELS)
+            by_level: Dict[str, List[tuple]] = {}
+            for word_id, level, freq, length in cursor.fetchall():
+                by_level.setdefault(level, []).append((-freq, length, word_id))
+
+            for level, words in by_level.items():
+                words.sort()
+                last = max(len(words) - 1, 1)
+                for rank, (_, _, word_id) in enumerate(words):
+                    b = LEVEL_ANCHORS[level] + (rank / last - 0.5) * LEVEL_SPREAD
+                    bank.items[word_id] = (b, level)
+
+            # Kalibrasyon: Σ(p - u) / (Σ p(1-p) + önsel ağırlık), p kelimenin önsel zorluğuyla
+            cursor.execute("SELECT word_id, q_type, theta, correct FROM placement_responses")
+            sums: Dict[int, List[float]] = {}
+            for word_id, q_type, theta, correct in cursor.fetchall():
+                if word_id not in bank.items:
+                    continue
+                p = _p_correct(theta, bank.items[word_id][0] + TYPE_OFFSETS.get(q_type, 0.0))
+                acc = sums.setdefault(word_id, [0.0, 0.0])
+                acc[0] += p - correct
+                acc[1] += p * (1.0 - p)
+            for word_id, (residual, information) in sums.items():
+                shift = residual / (information + CALIBRATION_PRIOR_WEIGHT)
+                shift = max(-MAX_CALIBRATION_SHIFT, min(MAX_CALIBRATION_SHIFT, shift))
+                b, level = bank.items[word_id]
+                bank.items[word_id] = (b + shift, level)
+            bank.calibrated = len(sums)
+
+            for word_id, (b, _) in bank.items.items():
+                bank.bins[_bin_index(b)].append(word_id)
+
+            self._bank = bank
+            self._checked_at = time.monotonic()
+            return len(bank.items)
+        finally:
+            conn.close()
+
+    def _get_bank(self) -> _ItemBank:
+        """Yüklü banka; yoksa veya 'words' sürümü değiştiyse yeniden kurar."""
+        with self._bank_lock:
+            if self._bank is None:
+                self.load_bank()
+            elif time.monotonic() - self._checked_at >= BANK_CHECK_SECONDS:
+                self._checked_at = time.monotonic()
+                conn = get_db_connection()
+                try:
+                    version = get_cache_version(conn.cursor(), 'words')
+                finally:
+                    conn.close()
+                if version != self._bank.version:
+                    log.info(f"Kelime verisi değişti, seviye testi bankası yenileniyor (sürüm {version})")
+                    self.load_bank()
+            return self._bank
+
+    # ==================== TEST AKIŞI ====================
+
+    def _next_question(self, cursor, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """θ tahminine en bilgilendirici soruyu seçer ve state['current']'e yazar."""
+        bank = self._get_bank()
+        q_type = TYPE_CYCLE[len(state["items"]) % len(TYPE_CYCLE)]
+        used = {item["word_id"] for item in state["items"]}
+        for _ in range(3):
+            word_id = bank.pick(state["theta"] - TYPE_OFFSETS[q_type], used)
+            if word_id is None:
+                break
+            words = course_system._fetch_words(cursor, [word_id])
+            level = bank.items[word_id][1]
+            question = course_system._build_question(cursor, q_type, level, words[0]) if words else None
+            if question:
+                question.update(level=level, b=round(bank.items[word_id][0] + TYPE_OFFSETS[q_type], 3),
+                                placement_type=q_type)
+                state["current"] = question
+                return question
+            used.add(word_id)
+        state["current"] = None
+        return None
+
+    @staticmethod
+    def _public(question: Dict[str, Any], number: int) -> Dict[str, Any]:
+        """İstemciye giden soru: cevap, zorluk ve kelimenin seviyesi gönderilmez."""
+        public = {key: value for key, value in question.items()
+                  if key not in ("answer", "b", "placement_type", "level")}
+        public["question_id"] = number
+        return public
+
+    def _save_state(self, cursor, user_id: int, state: Dict[str, Any]):
+        cursor.execute("""
+            INSERT INTO placement_sessions (user_id, state, updated_at) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT (user_id) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at
+        """, (user_id, json.dumps(state)))
+
+    def start(self, user_id: int) -> Dict[str, Any]:
+        """
+        Yeni test oturumu başlatır (süren oturum varsa baştan başlar).
+
+        Returns:
+            {'question', 'number', 'max_items'}
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            state = {"theta": PRIOR_MEAN, "se": PRIOR_SD, "items": [], "current": None}
+            question = self._next_question(cursor, state)
+            if question is None:
+                raise RuntimeError("Seviye testi için soru bankası boş")
+            self._save_state(cursor, user_id, state)
+            conn.commit()
+            return {"question": self._public(question, 1), "number": 1, "max_items": MAX_ITEMS}
+        finally:
+            conn.close()
+
+    def answer(self, user_id: int, answer: str) -> Dict[str, Any]:
+        """
+        Güncel soruyu puanlar, θ'yı günceller; test bitmediyse sıradaki soruyu döner.
+        Test bitince seviye users tablosuna yazılır ve kurs ilerlemesi o seviyeden başlatılır.
+
+        Returns:
+            {'correct', 'correct_answer', 'level', 'theta', 'se', 'done', 'question' | 'result'}
+
+        Raises:
+            ValueError: Süren test veya cevaplanacak soru yoksa
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT state FROM placement_sessions WHERE user_id = ?", (user_id,))
+            row = cursor.fetchone()
+            state = json.loads(row[0]) if row else None
+            if not state or not state.get("current"):
+                raise ValueError("Süren seviye testi yok")
+
+            current = state["current"]
+            q_type = current["placement_type"]
+            correct = grade_answer(q_type, current["answer"], answer)
+            state["items"].append({"word_id": current["word_id"], "type": q_type, "b": current["b"],
+                                   "level": current["level"], "correct": correct})
+            state["theta"], state["se"] = estimate_ability([(item["b"], item["correct"]) for item in state["items"]])
+
+            outcome = {"correct": correct, "correct_answer": current["answer"], "level": current["level"],
+                       "theta": round(state["theta"], 3), "se": round(state["se"], 3)}
+            count = len(state["items"])
+            done = count >= MAX_ITEMS or (count >= MIN_ITEMS and state["se"] <= SE_TARGET)
+            question = None if done else self._next_question(cursor, state)
+
+            if question is None:
+                result = self._finish(cursor, user_id, state)
+                conn.commit()
+                # Kurs ilerlemesi kendi bağlantısıyla (eski /placement-test/save ile aynı)
+                course_system.init_user_progress(user_id, result["level"])
+                # Pratik heap'leri eski seviyenin kelimeleriyle kurulmuştu
+                selection.invalidate(user_id)
+                outcome.update(done=True, result=result)
+                return outcome
+
+            self._save_state(cursor, user_id, state)
+            conn.commit()
+            outcome.update(done=False, number=count + 1, question=self._public(question, count + 1))
+            return outcome
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def _finish(self, cursor, user_id: int, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Seviyeyi yazar, cevapları kalibrasyon için saklar ve oturumu kapatır."""
+        level = level_for_ability(state["theta"])
+        cursor.execute("UPDATE users SET level = ?, placement_test_done = 1 WHERE user_id = ?", (level, user_id))
+        # Kalibrasyonda son θ kullanılır (cevap anındaki tahminden daha isabetli)
+        cursor.executemany("""
+            INSERT INTO placement_responses (user_id, word_id, q_type, theta, correct) VALUES (?, ?, ?, ?, ?)
+        """, [(user_id, item["word_id"], item["type"], state["theta"], int(item["correct"]))
+              for item in state["items"]])
+        cursor.execute("DELETE FROM placement_sessions WHERE user_id = ?", (user_id,))
+
+        by_level = {lvl: {"correct": 0, "total": 0} for lvl in PLACEMENT_LEVELS}
+        for item in state["items"]:
+            by_level[item["level"]]["total"] += 1
+            by_level[item["level"]]["correct"] += int(item["correct"])
+        correct = sum(int(item["correct"]) for item in state["items"])
+        return {"level": level, "theta": round(state["theta"], 3), "se": round(state["se"], 3),
+                "correct": correct, "total": len(state["items"]), "by_level": by_level}
+
+
+# Singleton instance
+placement_engine = PlacementEngine()
@@ -7,9 +7,52 @@ notifications ve leaderboard ile entegre.
 
 from db_utils import get_db_connection
 from features.notifications import NotificationManager
+from features.feed import FeedManager, get_follower_ids
+from features.leaderboard import medal_for_rank
+import profile_summary
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, FrozenSet, List, Any, Optional
 import json
+import threading
+from log_utils import get_logger
+
+log = get_logger("social")
+
+# Süreç içi arkadaş-id cache'i: user_id -> (friends_version, frozenset(friend_id)).
+# Sürüm user_profile_summary.friends_version'dan okunur; arkadaşlık başka bir
+# worker'da değişse bile sürüm tutmayan kayıt yeniden yüklenir.
+FRIEND_IDS_CACHE_SIZE = 10000
+_friend_ids_cache = OrderedDict()
+_friend_ids_lock = threading.Lock()
+
+
+def get_friend_ids(cursor, user_id: int, version: int) -> FrozenSet[int]:
+    """
+    Onaylı arkadaşların id kümesi (iki yönlü). Cache'teki sürüm eşleşmezse
+    verilen cursor ile yeniden okunur.
+    """
+    with _friend_ids_lock:
+        entry = _friend_ids_cache.get(user_id)
+        if entry is not None and entry[0] == version:
+            _friend_ids_cache.move_to_end(user_id)
+            return entry[1]
+
+    friend_ids = frozenset(get_follower_ids(cursor, user_id))
+
+    with _friend_ids_lock:
+        _friend_ids_cache[user_id] = (version, friend_ids)
+        _friend_ids_cache.move_to_end(user_id)
+        if len(_friend_ids_cache) > FRIEND_IDS_CACHE_SIZE:
+            _friend_ids_cache.popitem(last=False)
+    return friend_ids
+
+
+def invalidate_friend_ids(*user_ids: int):
+    """Verilen kullanıcıların cache'lenmiş arkadaş kümelerini düşür."""
+    with _friend_ids_lock:
+        for user_id in user_ids:
+            _friend_ids_cache.pop(user_id, None)
 
 
 class SocialManager:
@@ -17,6 +60,7 @@ class SocialManager:
     
     def __init__(self):
         self.notif_mgr = NotificationManager()
+        self.feed = FeedManager()
     
     # ==================== ARKADAŞ YÖNETİMİ ====================
     
@@ -70,7 +114,7 @@ class SocialManager:
             """, (user_id, friend_id))
             
             conn.commit()
-            print(f"✓ Arkadaş isteği gönderildi [{user_id} -> {friend_id}]")
+            log.info(f"✓ Arkadaş isteği gönderildi [{user_id} -> {friend_id}]")
             
             # Bildirim gönder
             cursor.execute("SELECT username FROM users WHERE user_id = ?", (user_id,))
@@ -91,7 +135,7 @@ class SocialManager:
             return {'success': True, 'message': 'Arkadaş isteği gönderildi!'}
         
         except Exception as e:
-            print(f"❌ Arkadaş ekleme hatası: {e}")
+            log.error(f"❌ Arkadaş ekleme hatası: {e}")
             return {'success': False, 'message': f'Hata: {str(e)}'}
         finally:
             conn.close()
@@ -111,11 +155,17 @@ class SocialManager:
             """, (datetime.now().isoformat(), friendship_id))
             
             conn.commit()
-            print(f"✓ Arkadaş isteği onaylandı [ID: {friendship_id}]")
+            log.info(f"✓ Arkadaş isteği onaylandı [ID: {friendship_id}]")
+            
+            cursor.execute("SELECT user_id, friend_id FROM friends WHERE friendship_id = ?", (friendship_id,))
+            row = cursor.fetchone()
+            if row:
+                invalidate_friend_ids(row[0], row[1])
+                self.feed.on_friendship_confirmed(row[0], row[1])
             return True
         
         except Exception as e:
-            print(f"❌ İstek onaylama hatası: {e}")
+            log.error(f"❌ İstek onaylama hatası: {e}")
             return False
         finally:
             conn.close()
@@ -135,11 +185,13 @@ class SocialManager:
             """, (user_id, friend_id, friend_id, user_id))
             
             conn.commit()
-            print(f"✓ Arkadaş silindi [{user_id}, {friend_id}]")
+            log.info(f"✓ Arkadaş silindi [{user_id}, {friend_id}]")
+            invalidate_friend_ids(user_id, friend_id)
+            self.feed.on_friendship_removed(user_id, friend_id)
             return True
         
         except Exception as e:
-            print(f"❌ Arkadaş silme hatası: {e}")
+            log.error(f"❌ Arkadaş silme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -181,7 +233,7 @@ class SocialManager:
             return friends
         
         except Exception as e:
-            print(f"❌ Arkadaş alma hatası: {e}")
+            log.error(f"❌ Arkadaş alma hatası: {e}")
             return friends
         finally:
             conn.close()
@@ -219,7 +271,7 @@ class SocialManager:
             return requests
         
         except Exception as e:
-            print(f"❌ İstek alma hatası: {e}")
+            log.error(f"❌ İstek alma hatası: {e}")
             return requests
         finally:
             conn.close()
@@ -239,27 +291,19 @@ class SocialManager:
         cursor = conn.cursor()
         
         try:
-            # Paylaşım tablosu oluştur
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS shares (
-                    share_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id INTEGER NOT NULL,
-                    achievement_name TEXT NOT NULL,
-                    friends_only BOOLEAN DEFAULT 1,
-                    shared_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(user_id)
-                )
-            """)
-            
+            # shares tablosu db_utils.init_db'de oluşturulur
             cursor.execute("""
                 INSERT INTO shares 
-                (user_id, achievement_name, friends_only)
-                VALUES (?, ?, ?)
-            """, (user_id, achievement_name, friends_only))
+                (user_id, share_type, content, privacy)
+                VALUES (?, 'achievement', ?, ?)
+            """, (user_id, achievement_name, 'friends' if friends_only else 'public'))
             
             conn.commit()
             share_id = cursor.lastrowid
             
+            # Arkadaş akışına tek olay olarak yaz
+            self.feed.publish_achievement_shared(user_id, achievement_name, share_id)
+            
             # Arkadaşlara bildirim gönder
             friends = self.get_friends(user_id)
             
@@ -277,65 +321,30 @@ class SocialManager:
                     metadata={'achievement': achievement_name, 'user_id': user_id}
                 )
             
-            print(f"✓ Başarı paylaşıldı [ID: {share_id}]")
+            log.info(f"✓ Başarı paylaşıldı [ID: {share_id}]")
             return share_id
         
         except Exception as e:
-            print(f"❌ Başarı paylaşma hatası: {e}")
+            log.error(f"❌ Başarı paylaşma hatası: {e}")
             return -1
         finally:
             conn.close()
     
     def get_friend_activity_feed(self, user_id: int, limit: int = 20) -> List[Dict[str, Any]]:
         """
-        Arkadaşların aktivite akışını al.
+        Arkadaşların aktivite akışını al (bkz. features/feed.py).
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        feed = []
-        
-        try:
-            # Arkadaşların son girdilerini al
-            cursor.execute("""
-                SELECT 
-                    ui.input_id,
-                    ui.user_id,
-                    u.username,
-                    ui.input_type,
-                    ui.score,
-                    ui.is_correct,
-                    ui.timestamp
-                FROM user_inputs ui
-                JOIN users u ON ui.user_id = u.user_id
-                WHERE ui.user_id IN (
-                    SELECT friend_id FROM friends 
-                    WHERE user_id = ? AND status = 'confirmed'
-                )
-                ORDER BY ui.timestamp DESC
-                LIMIT ?
-            """, (user_id, limit))
-            
-            for row in cursor.fetchall():
-                activity_type = 'Doğru cevap' if row[5] else 'Yanlış cevap'
-                
-                feed.append({
-                    'activity_id': row[0],
-                    'friend_id': row[1],
-                    'friend_username': row[2],
-                    'activity_type': activity_type,
-                    'input_type': row[3],
-                    'score': row[4],
-                    'timestamp': row[6]
-                })
-            
-            return feed
+        return self.feed.get_feed_page(user_id, limit=limit)['items']
+    
+    def get_friend_activity_feed_page(self, user_id: int, cursor_values: Optional[list] = None,
+                                      limit: int = 20) -> Dict[str, Any]:
+        """
+        Arkadaşların aktivite akışını event_id üzerinden keyset sayfalama ile al.
         
-        except Exception as e:
-            print(f"❌ Aktivite akışı alma hatası: {e}")
-            return feed
-        finally:
-            conn.close()
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+        """
+        return self.feed.get_feed_page(user_id, cursor_values, limit)
     
     # ==================== GRUP ÇALIŞMA ====================
     
@@ -397,11 +406,11 @@ class SocialManager:
             """, (group_id, creator_id))
             
             conn.commit()
-            print(f"✓ Grup oluşturuldu [ID: {group_id}]")
+            log.info(f"✓ Grup oluşturuldu [ID: {group_id}]")
             return group_id
         
         except Exception as e:
-            print(f"❌ Grup oluşturma hatası: {e}")
+            log.error(f"❌ Grup oluşturma hatası: {e}")
             return -1
         finally:
             conn.close()
@@ -428,11 +437,11 @@ class SocialManager:
             """, (group_id, group_id))
             
             conn.commit()
-            print(f"✓ Gruba kullanıcı eklendi [{group_id}, {user_id}]")
+            log.info(f"✓ Gruba kullanıcı eklendi [{group_id}, {user_id}]")
             return True
         
         except Exception as e:
-            print(f"❌ Gruba ekleme hatası: {e}")
+            log.error(f"❌ Gruba ekleme hatası: {e}")
             return False
         finally:
             conn.close()
@@ -476,7 +485,7 @@ class SocialManager:
             return groups
         
         except Exception as e:
-            print(f"❌ Grup alma hatası: {e}")
+            log.error(f"❌ Grup alma hatası: {e}")
             return groups
         finally:
             conn.close()
@@ -516,7 +525,7 @@ class SocialManager:
             return members
         
         except Exception as e:
-            print(f"❌ Üye alma hatası: {e}")
+            log.error(f"❌ Üye alma hatası: {e}")
             return members
         finally:
             conn.close()
@@ -526,42 +535,60 @@ class SocialManager:
     def get_user_profile(self, user_id: int) -> Dict[str, Any]:
         """
         Kullanıcı profilini al (sosyal bilgileriyle).
+        
+        Sayaçlar, puan ve sıra user_profile_summary'den tek sorguda; son
+        aktiviteler (user_id, timestamp) index'inden ikinci sorguda okunur.
         """
-        from features.user_stats import UserStats
-        from features.leaderboard import LeaderboardManager
+        summary = profile_summary.get_summary(user_id)
+        if not summary:
+            return {}
         
         conn = get_db_connection()
         cursor = conn.cursor()
         
         try:
             cursor.execute("""
-                SELECT user_id, username, level, created_at FROM users WHERE user_id = ?
+                SELECT input_type, input_text, is_correct, score, timestamp
+                FROM user_inputs 
+                WHERE user_id = ?
+                ORDER BY timestamp DESC
+                LIMIT 10
             """, (user_id,))
-            
-            user_row = cursor.fetchone()
-            if not user_row:
-                return {}
-            
-            stats = UserStats()
-            lb = LeaderboardManager()
-            
-            profile = {
-                'user_id': user_row[0],
-                'username': user_row[1],
-                'level': user_row[2],
-                'created_at': user_row[3],
-                'statistics': stats.get_overall_stats(user_id),
-                'score': lb.calculate_user_score(user_id),
-                'rank': lb.get_user_rank(user_id),
-                'friends_count': len(self.get_friends(user_id)),
-                'groups_count': len(self.get_user_groups(user_id)),
-                'recent_activity': stats.get_user_recent_inputs(user_id, limit=10)
+            recent_activity = [{
+                'type': row[0],
+                'input': row[1][:50] if row[1] else '',
+                'is_correct': bool(row[2]),
+                'score': row[3],
+                'timestamp': row[4]
+            } for row in cursor.fetchall()]
+            
+            return {
+                'user_id': summary['user_id'],
+                'username': summary['username'],
+                'level': summary['level'],
+                'created_at': summary['created_at'],
+                'statistics': {
+                    'total_inputs': summary['total_inputs'],
+                    'correct_answers': summary['correct_answers'],
+                    'accuracy_percent': summary['accuracy_percent'],
+                    'average_score': summary['average_score'],
+                    'average_pronunciation_score': summary['average_pronunciation_score'],
+                    'weak_words': summary['weak_words'],
+                    'streak_days': summary['streak_days']
+                },
+                'score': summary['score'],
+                'rank': {
+                    'rank': summary['rank'],
+                    'score': summary['score'],
+                    'medal': medal_for_rank(summary['rank'])
+                },
+                'friends_count': summary['friends_count'],
+                'groups_count': summary['groups_count'],
+                'recent_activity': recent_activity
             }
-            
-            return profile
         
         except Exception as e:
-            print(f"❌ Profil alma hatası: {e}")
+            log.error(f"❌ Profil alma hatası: {e}")
             return {}
         finally:
             conn.close()
@@ -3,13 +3,23 @@ user_stats.py
 
 Kullanıcı istatistikleri ve raporlar.
 user_db modülünden veri alır ve analiz eder.
+
+Günlük/haftalık/aylık istatistikler tek bir aralık motorundan gelir:
+_range_days() verilen [başlangıç, bitiş) aralığının gün başına girdi, doğru,
+oturum, dakika ve girdi türü sayılarını tek `GROUP BY gün` sorgusuyla okur;
+arşivlenmiş olaylar (retention.py) event_rollups_daily'den eklenir. Streak
+trigger'larla tutulan user_daily_stats'tan tek sorguyla hesaplanır.
 """
 
 from user_db import UserInputLogger
 from db_utils import get_db_connection
+from collections import Counter
 from datetime import datetime, timedelta
 from typing import Dict, List, Any
 import json
+from log_utils import get_logger
+
+log = get_logger("user_stats")
 
 
 class UserStats:
@@ -50,35 +60,16 @@ class UserStats:
         }
         
         try:
-            # O gün başlangıcı ve bitişi
-            start_date = f"{date}T00:00:00"
-            end_date = f"{date}T23:59:59"
-            
-            # Günlük girişler
-            cursor.execute("""
-                SELECT COUNT(*), SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END)
-                FROM user_inputs 
-                WHERE user_id = ? AND timestamp BETWEEN ? AND ?
-            """, (user_id, start_date, end_date))
-            
-            row = cursor.fetchone()
-            if row:
-                stats['total_inputs'] = row[0] or 0
-                correct = row[1] or 0
-                stats['correct_answers'] = correct
-                if stats['total_inputs'] > 0:
-                    stats['accuracy_percent'] = round((correct / stats['total_inputs']) * 100, 2)
-            
-            # Giriş türlerine göre dağılım
-            cursor.execute("""
-                SELECT input_type, COUNT(*) as count
-                FROM user_inputs 
-                WHERE user_id = ? AND timestamp BETWEEN ? AND ?
-                GROUP BY input_type
-            """, (user_id, start_date, end_date))
-            
-            for row in cursor.fetchall():
-                stats['input_types'][row[0]] = row[1]
+            day_start = f"{date}T00:00:00"
+            next_day = (datetime.strptime(date, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00')
+            day = self._range_days(cursor, user_id, day_start, next_day).get(date)
+            if day:
+                stats['total_inputs'] = day['inputs']
+                stats['correct_answers'] = day['correct']
+                stats['accuracy_percent'] = self._accuracy(day['correct'], day['inputs'])
+                stats['total_sessions'] = day['sessions']
+                stats['total_minutes'] = day['minutes']
+                stats['input_types'] = dict(day['types'])
             
             # Oturum bilgileri
             cursor.execute("""
@@ -87,11 +78,7 @@ class UserStats:
                 WHERE user_id = ? AND DATE(login_time) = ?
             """, (user_id, date))
             
-            sessions = cursor.fetchall()
-            stats['total_sessions'] = len(sessions)
-            stats['total_minutes'] = sum([s[2] or 0 for s in sessions])
-            
-            for session in sessions:
+            for session in cursor.fetchall():
                 stats['sessions'].append({
                     'session_id': session[0],
                     'login_time': session[1],
@@ -99,12 +86,12 @@ class UserStats:
                 })
             
             # Streak hesapla
-            stats['streak'] = self._calculate_streak(user_id)
+            stats['streak'] = self._calculate_streak(user_id, cursor)
             
             return stats
         
         except Exception as e:
-            print(f"❌ Günlük istatistik hatası: {e}")
+            log.error(f"❌ Günlük istatistik hatası: {e}")
             return stats
         finally:
             conn.close()
@@ -134,29 +121,24 @@ class UserStats:
         }
         
         try:
-            # Haftalık toplam girişler
-            cursor.execute("""
-                SELECT COUNT(*), SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END)
-                FROM user_inputs 
-                WHERE user_id = ? AND timestamp > ?
-            """, (user_id, week_ago))
+            # Kayan 7×24 saatlik pencere; dökümdeki bugün tam gün olarak okunur
+            tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00')
+            days = self._range_days(cursor, user_id, week_ago, tomorrow)
             
-            row = cursor.fetchone()
-            if row:
-                stats['total_inputs'] = row[0] or 0
-                correct = row[1] or 0
-                stats['correct_answers'] = correct
-                if stats['total_inputs'] > 0:
-                    stats['accuracy_percent'] = round((correct / stats['total_inputs']) * 100, 2)
+            total = self._sum_days(days.values())
+            stats['total_inputs'] = total['inputs']
+            stats['correct_answers'] = total['correct']
+            stats['accuracy_percent'] = self._accuracy(total['correct'], total['inputs'])
+            stats['total_minutes'] = total['minutes']
             
             # Günlere göre dağılım
             for i in range(7):
                 date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                daily = self.get_daily_stats(user_id, date)
+                day = days.get(date) or self._empty_day()
                 stats['daily_breakdown'][date] = {
-                    'inputs': daily['total_inputs'],
-                    'accuracy': daily['accuracy_percent'],
-                    'minutes': daily['total_minutes']
+                    'inputs': day['inputs'],
+                    'accuracy': self._accuracy(day['correct'], day['inputs']),
+                    'minutes': day['minutes']
                 }
             
             # En iyi gün
@@ -164,37 +146,17 @@ class UserStats:
                           key=lambda x: x[1]['inputs'])
             stats['best_day'] = best_date[0]
             
-            # Toplam dakika
-            cursor.execute("""
-                SELECT SUM(session_duration_minutes)
-                FROM session_logs 
-                WHERE user_id = ? AND login_time > ?
-            """, (user_id, week_ago))
-            
-            minutes = cursor.fetchone()[0]
-            stats['total_minutes'] = minutes or 0
-            
             # Giriş tipi dağılımı
-            cursor.execute("""
-                SELECT input_type, COUNT(*) as count
-                FROM user_inputs 
-                WHERE user_id = ? AND timestamp > ?
-                GROUP BY input_type
-                ORDER BY count DESC
-                LIMIT 1
-            """, (user_id, week_ago))
-            
-            row = cursor.fetchone()
-            if row:
-                stats['most_practiced_type'] = row[0]
+            if total['types']:
+                stats['most_practiced_type'] = total['types'].most_common(1)[0][0]
             
             # Ardışık gün sayısı (Streak)
-            stats['streak_days'] = self._calculate_streak(user_id)
+            stats['streak_days'] = self._calculate_streak(user_id, cursor)
             
             return stats
         
         except Exception as e:
-            print(f"❌ Haftalık istatistik hatası: {e}")
+            log.error(f"❌ Haftalık istatistik hatası: {e}")
             return stats
         finally:
             conn.close()
@@ -234,60 +196,135 @@ class UserStats:
         }
         
         try:
-            cursor.execute("""
-                SELECT COUNT(*), SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END)
-                FROM user_inputs 
-                WHERE user_id = ? AND timestamp BETWEEN ? AND ?
-            """, (user_id, month_start, month_end))
-            
-            row = cursor.fetchone()
-            if row:
-                stats['total_inputs'] = row[0] or 0
-                correct = row[1] or 0
-                stats['correct_answers'] = correct
-                if stats['total_inputs'] > 0:
-                    stats['accuracy_percent'] = round((correct / stats['total_inputs']) * 100, 2)
-            
-            # Toplam dakika
-            cursor.execute("""
-                SELECT SUM(session_duration_minutes)
-                FROM session_logs 
-                WHERE user_id = ? AND login_time BETWEEN ? AND ?
-            """, (user_id, month_start, month_end))
+            days = self._range_days(cursor, user_id, month_start, month_end)
             
-            minutes = cursor.fetchone()[0]
-            stats['total_minutes'] = minutes or 0
-            
-            # Oturum sayısı
-            cursor.execute("""
-                SELECT COUNT(*) FROM session_logs 
-                WHERE user_id = ? AND login_time BETWEEN ? AND ?
-            """, (user_id, month_start, month_end))
-            
-            stats['total_sessions'] = cursor.fetchone()[0] or 0
+            total = self._sum_days(days.values())
+            stats['total_inputs'] = total['inputs']
+            stats['correct_answers'] = total['correct']
+            stats['accuracy_percent'] = self._accuracy(total['correct'], total['inputs'])
+            stats['total_minutes'] = total['minutes']
+            stats['total_sessions'] = total['sessions']
             
             # Günlere göre veri
-            for day in range(1, 32):
-                try:
-                    date = datetime(year, month, day).strftime('%Y-%m-%d')
-                    daily = self.get_daily_stats(user_id, date)
-                    stats['daily_data'].append({
-                        'date': date,
-                        'inputs': daily['total_inputs'],
-                        'accuracy': daily['accuracy_percent'],
-                        'minutes': daily['total_minutes']
-                    })
-                except:
-                    break
+            date = datetime(year, month, 1)
+            while date < next_month:
+                day = days.get(date.strftime('%Y-%m-%d')) or self._empty_day()
+                stats['daily_data'].append({
+                    'date': date.strftime('%Y-%m-%d'),
+                    'inputs': day['inputs'],
+                    'accuracy': self._accuracy(day['correct'], day['inputs']),
+                    'minutes': day['minutes']
+                })
+                date += timedelta(days=1)
             
             return stats
         
         except Exception as e:
-            print(f"❌ Aylık istatistik hatası: {e}")
+            log.error(f"❌ Aylık istatistik hatası: {e}")
             return stats
         finally:
             conn.close()
     
+    # ==================== ARALIK İSTATİSTİKLERİ ====================
+    
+    def get_range_stats(self, user_id: int, start: str, end: str) -> Dict[str, Any]:
+        """
+        Herhangi bir [start, end) aralığı için toplam ve günlük istatistikler.
+        
+        Args:
+            user_id: Kullanıcı ID
+            start, end: ISO tarih/zaman ('YYYY-MM-DD' veya 'YYYY-MM-DDTHH:MM:SS'); end hariç
+        
+        Returns:
+            {'start', 'end', 'total_inputs', 'correct_answers', 'accuracy_percent',
+             'total_sessions', 'total_minutes', 'input_types', 'days': {gün: {...}}}
+        """
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        try:
+            days = self._range_days(cursor, user_id, start, end)
+        except Exception as e:
+            log.error(f"❌ Aralık istatistik hatası: {e}")
+            days = {}
+        finally:
+            conn.close()
+        
+        total = self._sum_days(days.values())
+        return {
+            'start': start,
+            'end': end,
+            'total_inputs': total['inputs'],
+            'correct_answers': total['correct'],
+            'accuracy_percent': self._accuracy(total['correct'], total['inputs']),
+            'total_sessions': total['sessions'],
+            'total_minutes': total['minutes'],
+            'input_types': dict(total['types']),
+            'days': {date: dict(day, types=dict(day['types'])) for date, day in sorted(days.items())}
+        }
+    
+    def _range_days(self, cursor, user_id: int, start: str, end: str) -> Dict[str, Dict[str, Any]]:
+        """
+        [start, end) aralığının gün başına toplamları, tek sorguda.
+        Canlı satırlar güne (ve girdi türüne) göre gruplanır; arşivlenmiş günler
+        event_rollups_daily'den gelir (türü bilinmez, sadece sayılara eklenir).
+        
+        Returns:
+            {'YYYY-MM-DD': {'inputs', 'correct', 'sessions', 'minutes', 'types': Counter}}
+        """
+        first_day = start[:10]
+        last_day = (datetime.fromisoformat(end) - timedelta(microseconds=1)).strftime('%Y-%m-%d')
+        
+        cursor.execute("""
+            SELECT DATE(timestamp), input_type, COUNT(*), SUM(is_correct = 1), 0, 0
+            FROM user_inputs
+            WHERE user_id = ? AND timestamp >= ? AND timestamp < ?
+            GROUP BY DATE(timestamp), input_type
+            UNION ALL
+            SELECT day, NULL, events, correct, 0, 0
+            FROM event_rollups_daily
+            WHERE table_name = 'user_inputs' AND user_id = ? AND day BETWEEN ? AND ?
+            UNION ALL
+            SELECT DATE(login_time), NULL, 0, 0, COUNT(*), COALESCE(SUM(session_duration_minutes), 0)
+            FROM session_logs
+            WHERE user_id = ? AND login_time >= ? AND login_time < ?
+            GROUP BY DATE(login_time)
+            UNION ALL
+            SELECT day, NULL, 0, 0, events, score_sum
+            FROM event_rollups_daily
+            WHERE table_name = 'session_logs' AND user_id = ? AND day BETWEEN ? AND ?
+        """, (user_id, start, end, user_id, first_day, last_day,
+              user_id, start, end, user_id, first_day, last_day))
+        
+        days = {}
+        for date, input_type, inputs, correct, sessions, minutes in cursor.fetchall():
+            day = days.get(date)
+            if day is None:
+                day = days[date] = self._empty_day()
+            day['inputs'] += inputs
+            day['correct'] += correct or 0
+            day['sessions'] += sessions
+            day['minutes'] += int(minutes)
+            if input_type is not None:
+                day['types'][input_type] += inputs
+        return days
+    
+    @staticmethod
+    def _empty_day() -> Dict[str, Any]:
+        return {'inputs': 0, 'correct': 0, 'sessions': 0, 'minutes': 0, 'types': Counter()}
+    
+    def _sum_days(self, days) -> Dict[str, Any]:
+        total = self._empty_day()
+        for day in days:
+            for key in ('inputs', 'correct', 'sessions', 'minutes'):
+                total[key] += day[key]
+            total['types'].update(day['types'])
+        return total
+    
+    @staticmethod
+    def _accuracy(correct: int, total: int) -> float:
+        return round((correct / total) * 100, 2) if total > 0 else 0
+    
     # ==================== GENEL İSTATİSTİKLER ====================
     
     def get_overall_stats(self, user_id: int) -> Dict[str, Any]:
@@ -297,6 +334,12 @@ class UserStats:
         # Her çağrıda yeni bağlantı açılır, zincirleme bağlantı olmaz
         return self.logger.get_user_statistics(user_id)
 
+    def get_streak(self, user_id: int) -> int:
+        """
+        Güncel streak (bugün veya dün biten ardışık aktif gün sayısı).
+        """
+        return self._calculate_streak(user_id)
+    
     def get_word_stats(self, user_id: int) -> Dict[str, Any]:
         """
         Kelime performans istatistikleri.
@@ -334,20 +377,24 @@ class UserStats:
             return activities
         
         except Exception as e:
-            print(f"❌ Aktivite alma hatası: {e}")
+            log.error(f"❌ Aktivite alma hatası: {e}")
             return activities
         finally:
             conn.close()
     
     # ==================== RAPORLAR ====================
     
-    def generate_weekly_report(self, user_id: int) -> Dict[str, Any]:
+    def generate_weekly_report(self, user_id: int, weekly: Dict[str, Any] = None,
+                               overall: Dict[str, Any] = None,
+                               word_perf: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Haftalık rapor oluştur.
+        Çağıran bu istatistikleri zaten hesapladıysa weekly/overall/word_perf
+        olarak verebilir; yeniden okunmaz.
         """
-        weekly = self.get_weekly_stats(user_id)
-        overall = self.get_overall_stats(user_id)
-        word_perf = self.get_word_stats(user_id)
+        weekly = weekly or self.get_weekly_stats(user_id)
+        overall = overall or self.get_overall_stats(user_id)
+        word_perf = word_perf or self.get_word_stats(user_id)
         
         report = {
             'type': 'weekly_report',
@@ -371,8 +418,8 @@ class UserStats:
                 'easiest_words': word_perf['easiest_words'][:3]
             },
             
-            'achievements': self._get_weekly_achievements(user_id),
-            'recommendations': self._generate_recommendations(user_id)
+            'achievements': self._get_weekly_achievements(user_id, weekly),
+            'recommendations': self._generate_recommendations(user_id, word_perf, overall)
         }
         
         return report
@@ -407,132 +454,84 @@ class UserStats:
                 'hardest_words': word_perf['hardest_words'][:5]
             },
             
-            'achievements': self._get_monthly_achievements(user_id),
-            'recommendations': self._generate_recommendations(user_id)
+            'achievements': self._get_monthly_achievements(user_id, monthly),
+            'recommendations': self._generate_recommendations(user_id, word_perf, overall)
         }
         
         return report
     
     # ==================== YARDIMCI METODLAR ====================
     
-    def _calculate_streak(self, user_id: int) -> int:
+    def _calculate_streak(self, user_id: int, cursor=None) -> int:
         """
         Ardışık giriş yapılan gün sayısını hesapla.
-        user_inputs tablosundan kontrol eder.
+        user_daily_stats'tan (user_inputs trigger'larıyla tutulur) son bir yılın
+        aktif günlerini tek sorguda okur.
         
         Mantık:
         - Bugün aktivite varsa, bugünden geriye say
         - Bugün aktivite yoksa ama dün varsa, dünden geriye say (streak devam ediyor)
         - Her ikisi de yoksa streak = 0
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        conn = None
+        if cursor is None:
+            conn = get_db_connection()
+            cursor = conn.cursor()
         
         try:
-            streak = 0
             today = datetime.now().date()
-            yesterday = today - timedelta(days=1)
-            
-            # Bugün aktivite var mı?
-            cursor.execute("""
-                SELECT COUNT(*) FROM user_inputs 
-                WHERE user_id = ? AND DATE(timestamp) = ?
-            """, (user_id, today.isoformat()))
-            today_has_activity = cursor.fetchone()[0] > 0
-            
-            # Dün aktivite var mı?
             cursor.execute("""
-                SELECT COUNT(*) FROM user_inputs 
-                WHERE user_id = ? AND DATE(timestamp) = ?
-            """, (user_id, yesterday.isoformat()))
-            yesterday_has_activity = cursor.fetchone()[0] > 0
+                SELECT day FROM user_daily_stats
+                WHERE user_id = ? AND day BETWEEN ? AND ? AND inputs > 0
+                ORDER BY day DESC
+            """, (user_id, (today - timedelta(days=365)).isoformat(), today.isoformat()))
+            active = {row[0] for row in cursor.fetchall()}
             
             # Başlangıç gününü belirle
-            if today_has_activity:
-                # Bugün aktivite var, bugünden başla
+            if today.isoformat() in active:
                 start_offset = 0
-            elif yesterday_has_activity:
+            elif (today - timedelta(days=1)).isoformat() in active:
                 # Bugün yok ama dün var, dünden başla (streak kırılmamış)
                 start_offset = 1
             else:
-                # Ne bugün ne dün aktivite yok, streak 0
                 return 0
             
             # Ardışık günleri say
+            streak = 0
             for i in range(start_offset, 365):
-                check_date = (today - timedelta(days=i)).isoformat()
-                
-                cursor.execute("""
-                    SELECT COUNT(*) FROM user_inputs 
-                    WHERE user_id = ? AND DATE(timestamp) = ?
-                """, (user_id, check_date))
-                
-                if cursor.fetchone()[0] == 0:
+                if (today - timedelta(days=i)).isoformat() not in active:
                     break
                 streak += 1
             
             return streak
         finally:
-            conn.close()
+            if conn is not None:
+                conn.close()
     
     def _calculate_improvement(self, user_id: int, days: int) -> float:
         """
         Belirli gün içinde doğruluk iyileşmesini hesapla (%).
+        İlk ve son aktif günün doğruluk oranları karşılaştırılır.
         """
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cutoff = (datetime.now() - timedelta(days=days)).isoformat()
-            
-            # İlk gün ve son gün doğruluk oranı
-            cursor.execute("""
-                SELECT accuracy_percent 
-                FROM (
-                    SELECT 
-                        (SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) / 
-                         COUNT(*) * 100) as accuracy_percent,
-                        DATE(timestamp) as date
-                    FROM user_inputs 
-                    WHERE user_id = ? AND timestamp > ?
-                    GROUP BY DATE(timestamp)
-                    ORDER BY date ASC
-                )
-                LIMIT 1
-            """, (user_id, cutoff))
-            
-            first_day = cursor.fetchone()
-            
-            cursor.execute("""
-                SELECT accuracy_percent 
-                FROM (
-                    SELECT 
-                        (SUM(CASE WHEN is_correct = 1 THEN 1 ELSE 0 END) / 
-                         COUNT(*) * 100) as accuracy_percent,
-                        DATE(timestamp) as date
-                    FROM user_inputs 
-                    WHERE user_id = ? AND timestamp > ?
-                    GROUP BY DATE(timestamp)
-                    ORDER BY date DESC
-                )
-                LIMIT 1
-            """, (user_id, cutoff))
-            
-            last_day = cursor.fetchone()
-            
-            if first_day and last_day and first_day[0]:
-                improvement = ((last_day[0] - first_day[0]) / first_day[0]) * 100
-                return round(improvement, 2)
-            
+        cutoff = (datetime.now() - timedelta(days=days)).isoformat()
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime('%Y-%m-%dT00:00:00')
+        # 'days' tarihe göre sıralı gelir
+        active = [day for day in self.get_range_stats(user_id, cutoff, tomorrow)['days'].values()
+                  if day['inputs'] > 0]
+        if not active:
             return 0.0
-        finally:
-            conn.close()
+        
+        first_day = active[0]['correct'] / active[0]['inputs'] * 100
+        last_day = active[-1]['correct'] / active[-1]['inputs'] * 100
+        if first_day:
+            return round(((last_day - first_day) / first_day) * 100, 2)
+        return 0.0
     
-    def _get_weekly_achievements(self, user_id: int) -> List[str]:
+    def _get_weekly_achievements(self, user_id: int, weekly: Dict[str, Any] = None) -> List[str]:
         """
         Bu hafta kazanılan başarıları döndür.
         """
-        weekly = self.get_weekly_stats(user_id)
+        weekly = weekly or self.get_weekly_stats(user_id)
         achievements = []
         
         if weekly['total_inputs'] >= 100:
@@ -549,11 +548,11 @@ class UserStats:
         
         return achievements
     
-    def _get_monthly_achievements(self, user_id: int) -> List[str]:
+    def _get_monthly_achievements(self, user_id: int, monthly: Dict[str, Any] = None) -> List[str]:
         """
         Bu ay kazanılan başarıları döndür.
         """
-        monthly = self.get_monthly_stats(user_id)
+        monthly = monthly or self.get_monthly_stats(user_id)
         achievements = []
         
         if monthly['total_inputs'] >= 500:
@@ -570,12 +569,13 @@ class UserStats:
         
         return achievements
     
-    def _generate_recommendations(self, user_id: int) -> List[str]:
+    def _generate_recommendations(self, user_id: int, word_perf: Dict[str, Any] = None,
+                                  stats: Dict[str, Any] = None) -> List[str]:
         """
         Kullanıcıya öneriler üret.
         """
-        word_perf = self.get_word_stats(user_id)
-        stats = self.get_overall_stats(user_id)
+        word_perf = word_perf or self.get_word_stats(user_id)
+        stats = stats or self.get_overall_stats(user_id)
         
         recommendations = []
         
@@ -0,0 +1,59 @@
+"""
+gunicorn.conf.py
+
+Production WSGI sunucu ayarları (pre-fork, worker başına thread).
+
+Çalıştırma:
+    gunicorn -c gunicorn.conf.py app:app
+    # veya
+    python run_app.py
+
+Ortam değişkenleri:
+    BIND             (varsayılan 0.0.0.0:8000)
+    WEB_CONCURRENCY  worker süreç sayısı (varsayılan: 2 * CPU + 1, en fazla 8)
+    WEB_THREADS      worker başına thread (varsayılan 4)
+
+Graceful reload:
+    kill -HUP <master_pid>
+        Worker'ları sırayla yeniden başlatır, yarım kalan istekler
+        graceful_timeout kadar tamamlanır. preload_app açık olduğu için
+        HUP uygulama kodunu YENİDEN YÜKLEMEZ (master'daki kopya fork edilir).
+    Kod güncellemesi (sıfır kesinti):
+        kill -USR2 <master_pid>      # yeni master + worker'lar (yeni kod, yeni warmup)
+        kill -WINCH <eski_master>    # eski worker'ları kapat
+        kill -QUIT <eski_master>     # eski master'ı kapat
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+
+# Pre-fork: master uygulamayı bir kez import eder, worker'lar fork ile kopyalanır
+preload_app = True
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 4))
+
+timeout = 60            # LLM çağrıları uzun sürebilir
+graceful_timeout = 30
+keepalive = 5
+
+# Bellek sızıntılarına karşı worker'ları periyodik yenile (hepsi aynı anda değil)
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """Master süreçte, worker'lar fork edilmeden önce cache'leri ısıt (copy-on-write paylaşım)."""
+    import warmup
+    warmup.run_warmup()
+
+
+def post_fork(server, worker):
+    """Fork sonrası her worker kendi rastgele sayı durumunu alsın (aynı soru sıraları olmasın)."""
+    import random
+    random.seed()
@@ -0,0 +1,92 @@
+"""
+import_profile.py
+
+Başlangıç (cold start) import süresi raporu.
+
+Uygulama modülü ayrı bir Python sürecinde `-X importtime` ile import edilir,
+stderr çıktısı ayrıştırılır ve modül başına süreler listelenir.
+
+Kullanım:
+    python app.py --import-profile
+    python import_profile.py app --top 40
+"""
+
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+
+def collect_import_times(module: str = "app") -> List[Dict]:
+    """
+    Modülü temiz bir süreçte import eder ve her modülün süresini döndürür.
+
+    Returns:
+        [{'module': str, 'self_ms': float, 'cumulative_ms': float, 'depth': int}, ...]
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+    )
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        # Format: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0].strip())
+            cumulative_us = int(parts[1].strip())
+        except ValueError:
+            continue  # başlık satırı
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append({
+            'module': name.strip(),
+            'self_ms': self_us / 1000,
+            'cumulative_ms': cumulative_us / 1000,
+            'depth': depth,
+        })
+
+    if proc.returncode != 0:
+        error_lines = [l for l in proc.stderr.splitlines() if not l.startswith("import time:")]
+        raise RuntimeError("\n".join(error_lines[-10:]) or f"{module} import edilemedi")
+
+    return entries
+
+
+def print_import_profile(module: str = "app", top: int = 30):
+    """Import süresi raporunu yazdırır (kümülatif süreye göre sıralı)."""
+    entries = collect_import_times(module)
+    total_ms = sum(e['self_ms'] for e in entries)
+
+    print(f"📦 '{module}' import profili: {len(entries)} modül, toplam {total_ms:.1f} ms")
+    print(f"{'kümülatif ms':>13} {'self ms':>9}  modül")
+    print("-" * 60)
+    for e in sorted(entries, key=lambda x: x['cumulative_ms'], reverse=True)[:top]:
+        print(f"{e['cumulative_ms']:>13.1f} {e['self_ms']:>9.1f}  {'  ' * e['depth']}{e['module']}")
+
+    # Lazy yüklenmesi gereken ağır backend'ler import sırasında gelmiş mi?
+    heavy = ('google.genai', 'deep_translator', 'speech_recognition', 'dotenv')
+    loaded = sorted({e['module'] for e in entries if e['module'].startswith(heavy)})
+    if loaded:
+        print(f"\n⚠️ Başlangıçta yüklenen ağır modüller: {', '.join(loaded)}")
+    else:
+        print("\n✓ LLM / çeviri / STT backend'leri başlangıçta yüklenmiyor")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Modül başına import süresi raporu")
+    parser.add_argument("module", nargs="?", default="app")
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args()
+
+    print_import_profile(args.module, args.top)
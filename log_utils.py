@@ -0,0 +1,121 @@
+"""
+log_utils.py
+
+Uygulama genelinde yapılandırılmış (key=value) ve seviye filtreli logger.
+
+- Seviye LOG_LEVEL ortam değişkeninden okunur (varsayılan INFO). Filtrelenen
+  seviyedeki mesajlar formatlanmaz, yazılmaz.
+- Kayıtlar bir kuyruğa atılır; stderr'e / dosyaya yazma işi ayrı bir thread'de
+  (QueueListener) yapılır, istek thread'i I/O beklemez.
+- Yavaş sorgular (bkz. query_stats.py) ayrıca SLOW_QUERY_LOG dosyasına yazılır
+  (varsayılan: slow_queries.log, boş bırakılırsa kapalı).
+
+Kullanım:
+    from log_utils import get_logger
+    logger = get_logger(__name__)
+    logger.info("✓ Kurs oluşturuldu", extra={"course_id": 5})
+"""
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+
+ROOT_LOGGER = "loroleng"
+SLOW_QUERY_LOGGER = ROOT_LOGGER + ".slow_query"
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_setup_lock = threading.Lock()
+_queue_handler = None
+_listener = None
+
+
+class StructuredFormatter(logging.Formatter):
+    """`ts=... level=... logger=... msg="..." key=value` satırları üretir."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name[len(ROOT_LOGGER) + 1:] if record.name.startswith(ROOT_LOGGER + ".") else record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                fields[key] = value
+        if record.exc_info:
+            fields["exc"] = self.formatException(record.exc_info)
+        return " ".join(f"{k}={_quote(v)}" for k, v in fields.items())
+
+
+def _quote(value) -> str:
+    text = str(value)
+    if text and not any(c in text for c in ' "=\n'):
+        return text
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def _build_listener(log_queue) -> logging.handlers.QueueListener:
+    formatter = StructuredFormatter()
+    handlers = []
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+    handlers.append(stream_handler)
+
+    slow_log_path = os.environ.get(
+        "SLOW_QUERY_LOG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "slow_queries.log")
+    )
+    if slow_log_path:
+        file_handler = logging.FileHandler(slow_log_path, encoding="utf-8", delay=True)
+        file_handler.setFormatter(formatter)
+        file_handler.addFilter(lambda record: record.name == SLOW_QUERY_LOGGER)
+        handlers.append(file_handler)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def _restart_after_fork():
+    """Fork edilen worker'da listener thread'i yoktur; yeni kuyruk ve listener kur."""
+    global _listener
+    if _queue_handler is None:
+        return
+    _queue_handler.queue = queue.SimpleQueue()
+    _listener = _build_listener(_queue_handler.queue)
+
+
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
+
+
+def _setup():
+    global _queue_handler, _listener
+    with _setup_lock:
+        if _queue_handler is not None:
+            return
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+        root.propagate = False
+
+        log_queue = queue.SimpleQueue()
+        _queue_handler = logging.handlers.QueueHandler(log_queue)
+        root.addHandler(_queue_handler)
+        _listener = _build_listener(log_queue)
+
+        atexit.register(_stop_listener)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_after_fork)
+
+
+def get_logger(name: str) -> logging.Logger:
+    """`loroleng.<name>` logger'ını döner (ilk çağrıda yapılandırma yapılır)."""
+    _setup()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
@@ -0,0 +1,89 @@
+"""
+pagination.py
+
+Keyset (cursor) sayfalama yardımcıları.
+
+OFFSET yerine son görülen satırın sıralama anahtarı (ör. timestamp, id) opak
+bir cursor olarak istemciye verilir; sonraki sayfa
+`WHERE (ts, id) < (?, ?) ORDER BY ts DESC, id DESC LIMIT n + 1` ile okunur.
+(user_id, ts, id) index'i olduğunda her sayfa ilk sayfa kadar ucuzdur.
+
+Sayfa sonucu her yerde aynı şekildedir:
+    {"items": [...], "next_cursor": "..." | None}
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    """Çözülemeyen veya bozulmuş cursor."""
+
+
+def encode_cursor(*values) -> str:
+    """Sıralama anahtarını URL-güvenli opak bir string'e çevirir."""
+    raw = json.dumps(list(values), separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int = 2) -> Optional[List[Any]]:
+    """
+    encode_cursor çıktısını geri çözer. Boş cursor için None döner.
+
+    Raises:
+        InvalidCursor: Cursor çözülemezse veya beklenen uzunlukta değilse
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+    except (ValueError, UnicodeError, binascii.Error) as e:
+        raise InvalidCursor(f"Geçersiz cursor: {e}") from None
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Geçersiz cursor")
+    return values
+
+
+def clamp_page_size(limit: Any, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Sayfa boyutunu 1..MAX_PAGE_SIZE aralığına çeker (geçersiz değerde varsayılan)."""
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_condition(columns: Sequence[str], values: Optional[Sequence[Any]]) -> Tuple[str, list]:
+    """
+    Azalan sıralama için "bu cursor'dan sonrası" koşulunu üretir.
+
+    Row-value karşılaştırması kullanılır; SQLite bunu (user_id, ts, id)
+    index'i üzerinde aralık taraması olarak çalıştırır.
+
+    Returns:
+        (" AND (ts, id) < (?, ?)", [ts, id]) veya cursor yoksa ("", [])
+    """
+    if values is None:
+        return "", []
+    placeholders = ", ".join("?" * len(columns))
+    return f" AND ({', '.join(columns)}) < ({placeholders})", list(values)
+
+
+def build_page(rows: List[Any], limit: int, key: Callable[[Any], Sequence[Any]]) -> Dict[str, Any]:
+    """
+    LIMIT n + 1 ile okunan satırlardan sayfa üretir.
+
+    Args:
+        rows: En fazla limit + 1 satır
+        limit: Sayfa boyutu
+        key: Satırdan sıralama anahtarını (cursor değerlerini) döndüren fonksiyon
+    """
+    items = rows[:limit]
+    next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit and items else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,513 @@
+"""
+profile_summary.py
+
+Profil okuma modeli: kullanıcı başına denormalize `user_profile_summary` satırı.
+
+Sayaçlar (girdi/doğru sayısı, skor ortalamaları, telaffuz, tamamlanan hedef,
+ustalaşılan kelime, arkadaş/grup sayısı, streak, en uzun seri, oturum
+dakikası, günlük girdi sayaçları) SQLite trigger'ları ile
+yazma anında, aynı transaction içinde güncellenir; hangi koddan yazılırsa
+yazılsın (user_db, backend/tracker, script'ler) özet tutarlı kalır.
+
+Sıralama puanı (LeaderboardManager.calculate_user_score ile aynı formül)
+`score` kolonunda tutulur; (score, user_id) index'i global sıralamanın
+materyalize hâlidir. Bir kullanıcının sırası iki indexli COUNT ile okunur.
+friends_version her arkadaşlık değişikliğinde artar; süreç içi arkadaş-id
+cache'leri (features/social.py) bununla doğrulanır.
+
+Streak puanı zamanla düşer (gün atlanınca); refresh_streaks() günde bir kez
+eski streak'leri sıfırlar. Trigger'lar kurulmadan önce var olan veri için
+rebuild() çalıştırılır (`python app.py --init-db` bunu yapar).
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Any, Dict, Iterable, Optional
+
+from db_utils import get_db_connection
+from log_utils import get_logger
+
+log = get_logger("profile_summary")
+
+# LeaderboardManager.point_system ile aynı (tek kaynak burası)
+SCORE_POINTS = {
+    'correct_answer': 10,
+    'accuracy_milestone_80': 50,
+    'accuracy_milestone_90': 100,
+    'daily_streak': 25,
+    'weekly_streak': 100,
+    'goal_completed': 200,
+    'session_1hour': 30,
+    'weak_word_mastered': 50
+}
+
+WEAK_WORDS_LIMIT = 5
+
+SCORE_SQL = f"""(
+    correct_answers * {SCORE_POINTS['correct_answer']}
+    + CASE
+        WHEN total_inputs > 0 AND correct_answers * 100.0 / total_inputs >= 90 THEN {SCORE_POINTS['accuracy_milestone_90']}
+        WHEN total_inputs > 0 AND correct_answers * 100.0 / total_inputs >= 80 THEN {SCORE_POINTS['accuracy_milestone_80']}
+        ELSE 0
+      END
+    + completed_goals * {SCORE_POINTS['goal_completed']}
+    + CASE WHEN streak_days >= 7 THEN {SCORE_POINTS['weekly_streak']} ELSE streak_days * {SCORE_POINTS['daily_streak']} END
+    + words_mastered * {SCORE_POINTS['weak_word_mastered']}
+)"""
+
+# translation_log'daki bir kelime "ustalaşıldı" mı (LeaderboardManager._count_weak_words_mastered ile aynı)
+_MASTERED_SQL = "(attempts >= 3 AND correct * 100 / attempts >= 90)"
+
+_WEAK_WORDS_SQL = f"""(
+    SELECT json_group_array(json_object(
+        'word', english_word, 'attempts', fail_count,
+        'avg_similarity', round(fail_similarity_sum / fail_count, 2)))
+    FROM (
+        SELECT english_word, fail_count, fail_similarity_sum FROM user_word_stats
+        WHERE user_id = user_profile_summary.user_id AND fail_count > 0
+        ORDER BY fail_count DESC
+        LIMIT {WEAK_WORDS_LIMIT}
+    )
+)"""
+
+_FRIENDS_COUNT_SQL = """(
+    SELECT COUNT(DISTINCT CASE WHEN f.user_id = user_profile_summary.user_id THEN f.friend_id ELSE f.user_id END)
+    FROM friends f
+    WHERE (f.user_id = user_profile_summary.user_id OR f.friend_id = user_profile_summary.user_id)
+      AND f.status = 'confirmed'
+)"""
+
+_GROUPS_COUNT_SQL = "(SELECT COUNT(*) FROM group_members gm WHERE gm.user_id = user_profile_summary.user_id)"
+
+
+def _ensure_row(ref: str) -> str:
+    return f"INSERT OR IGNORE INTO user_profile_summary (user_id) VALUES ({ref});"
+
+
+# Yeni girdinin tarihine göre güncel streak (UPDATE içinde eski değerler okunur)
+_STREAK_SQL = """CASE
+                WHEN last_active_date IS NULL THEN 1
+                WHEN date(NEW.timestamp) <= last_active_date THEN streak_days
+                WHEN date(NEW.timestamp) = date(last_active_date, '+1 day') THEN streak_days + 1
+                ELSE 1
+            END"""
+
+
+# (trigger adı, olay, gövde)
+_TRIGGERS = [
+    ("trg_summary_user_insert", "AFTER INSERT ON users", _ensure_row("NEW.user_id")),
+
+    ("trg_summary_input_insert", "AFTER INSERT ON user_inputs", _ensure_row("NEW.user_id") + f"""
+        UPDATE user_profile_summary SET
+            total_inputs = total_inputs + 1,
+            correct_answers = correct_answers + (NEW.is_correct = 1),
+            score_sum = score_sum + COALESCE(NEW.score, 0),
+            score_count = score_count + (NEW.score IS NOT NULL),
+            streak_days = {_STREAK_SQL},
+            best_streak = MAX(best_streak, {_STREAK_SQL}),
+            last_active_date = MAX(COALESCE(last_active_date, ''), date(NEW.timestamp)),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;
+        INSERT INTO user_daily_stats (user_id, day, inputs, correct)
+        VALUES (NEW.user_id, COALESCE(date(NEW.timestamp), date('now', 'localtime')), 1, NEW.is_correct = 1)
+        ON CONFLICT (user_id, day) DO UPDATE SET inputs = inputs + 1, correct = correct + excluded.correct;"""),
+
+    ("trg_summary_pronunciation_insert", "AFTER INSERT ON pronunciation_attempts", _ensure_row("NEW.user_id") + """
+        UPDATE user_profile_summary SET
+            pronunciation_sum = pronunciation_sum + COALESCE(NEW.score, 0),
+            pronunciation_count = pronunciation_count + (NEW.score IS NOT NULL),
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;"""),
+
+    ("trg_summary_translation_insert", "AFTER INSERT ON translation_log", _ensure_row("NEW.user_id") + f"""
+        UPDATE user_profile_summary SET words_mastered = words_mastered - COALESCE((
+            SELECT {_MASTERED_SQL} FROM user_word_stats
+            WHERE user_id = NEW.user_id AND english_word = NEW.english_word), 0)
+        WHERE user_id = NEW.user_id;
+        INSERT OR IGNORE INTO user_word_stats (user_id, english_word) VALUES (NEW.user_id, NEW.english_word);
+        UPDATE user_word_stats SET
+            attempts = attempts + 1,
+            correct = correct + (NEW.is_correct = 1),
+            fail_count = fail_count + (NEW.is_correct = 0),
+            fail_similarity_sum = fail_similarity_sum
+                + CASE WHEN NEW.is_correct = 0 THEN COALESCE(NEW.similarity_score, 0) ELSE 0 END
+        WHERE user_id = NEW.user_id AND english_word = NEW.english_word;
+        UPDATE user_profile_summary SET
+            words_mastered = words_mastered + (
+                SELECT {_MASTERED_SQL} FROM user_word_stats
+                WHERE user_id = NEW.user_id AND english_word = NEW.english_word),
+            weak_words = {_WEAK_WORDS_SQL},
+            updated_at = CURRENT_TIMESTAMP
+        WHERE user_id = NEW.user_id;"""),
+
+    ("trg_summary_session_insert", "AFTER INSERT ON session_logs WHEN NEW.session_duration_minutes > 0",
+     _ensure_row("NEW.user_id") + """
+        UPDATE user_profile_summary SET session_minutes = session_minutes + NEW.session_duration_minutes
+        WHERE user_id = NEW.user_id;"""),
+    ("trg_summary_session_duration", "AFTER UPDATE OF session_duration_minutes ON session_logs",
+     _ensure_row("NEW.user_id") + """
+        UPDATE user_profile_summary
+        SET session_minutes = session_minutes
+            + COALESCE(NEW.session_duration_minutes, 0) - COALESCE(OLD.session_duration_minutes, 0)
+        WHERE user_id = NEW.user_id;"""),
+
+    ("trg_summary_goal_insert", "AFTER INSERT ON goals WHEN NEW.status = 'completed'", _ensure_row("NEW.user_id") + """
+        UPDATE user_profile_summary SET completed_goals = completed_goals + 1 WHERE user_id = NEW.user_id;"""),
+    ("trg_summary_goal_status",
+     "AFTER UPDATE OF status ON goals WHEN (OLD.status = 'completed') IS NOT (NEW.status = 'completed')",
+     _ensure_row("NEW.user_id") + """
+        UPDATE user_profile_summary
+        SET completed_goals = completed_goals + CASE WHEN NEW.status = 'completed' THEN 1 ELSE -1 END
+        WHERE user_id = NEW.user_id;"""),
+    ("trg_summary_goal_delete", "AFTER DELETE ON goals WHEN OLD.status = 'completed'", """
+        UPDATE user_profile_summary SET completed_goals = completed_goals - 1 WHERE user_id = OLD.user_id;"""),
+
+    ("trg_summary_group_insert", "AFTER INSERT ON group_members", _ensure_row("NEW.user_id") + f"""
+        UPDATE user_profile_summary SET groups_count = {_GROUPS_COUNT_SQL} WHERE user_id = NEW.user_id;"""),
+    ("trg_summary_group_delete", "AFTER DELETE ON group_members", f"""
+        UPDATE user_profile_summary SET groups_count = {_GROUPS_COUNT_SQL} WHERE user_id = OLD.user_id;"""),
+]
+
+for _event, _ref in (("AFTER INSERT ON friends", "NEW"), ("AFTER UPDATE OF status ON friends", "NEW"),
+                     ("AFTER DELETE ON friends", "OLD")):
+    _TRIGGERS.append((
+        f"trg_summary_friends_{_event.split()[1].lower()}", _event,
+        _ensure_row(f"{_ref}.user_id") + _ensure_row(f"{_ref}.friend_id") + f"""
+        UPDATE user_profile_summary SET friends_count = {_FRIENDS_COUNT_SQL}, friends_version = friends_version + 1
+        WHERE user_id IN ({_ref}.user_id, {_ref}.friend_id);"""
+    ))
+
+# Puana etki eden sayaçlar değişince puanı yeniden hesapla
+_TRIGGERS.append((
+    "trg_summary_score",
+    "AFTER UPDATE OF total_inputs, correct_answers, completed_goals, words_mastered, streak_days ON user_profile_summary",
+    f"UPDATE user_profile_summary SET score = {SCORE_SQL} WHERE user_id = NEW.user_id;"
+))
+
+
+def create_schema(cur):
+    """Özet tablolarını, index'leri ve trigger'ları oluşturur (db_utils.init_db çağırır)."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_profile_summary (
+        user_id INTEGER PRIMARY KEY,
+        total_inputs INTEGER NOT NULL DEFAULT 0,
+        correct_answers INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_count INTEGER NOT NULL DEFAULT 0,
+        pronunciation_sum REAL NOT NULL DEFAULT 0,
+        pronunciation_count INTEGER NOT NULL DEFAULT 0,
+        completed_goals INTEGER NOT NULL DEFAULT 0,
+        words_mastered INTEGER NOT NULL DEFAULT 0,
+        friends_count INTEGER NOT NULL DEFAULT 0,
+        friends_version INTEGER NOT NULL DEFAULT 0,
+        groups_count INTEGER NOT NULL DEFAULT 0,
+        streak_days INTEGER NOT NULL DEFAULT 0,
+        best_streak INTEGER NOT NULL DEFAULT 0,
+        session_minutes INTEGER NOT NULL DEFAULT 0,
+        last_active_date TEXT,
+        weak_words TEXT,
+        score REAL NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """)
+    # Sonradan eklenen kolonlar yoksa ekle (migration)
+    for column in ("friends_version", "best_streak", "session_minutes"):
+        try:
+            cur.execute(f"ALTER TABLE user_profile_summary ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        except sqlite3.OperationalError:
+            pass  # Kolon zaten var
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_profile_summary_score ON user_profile_summary (score, user_id)")
+
+    # Kelime bazlı çeviri sayaçları (ustalaşılan / zayıf kelimeler için)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_word_stats (
+        user_id INTEGER NOT NULL,
+        english_word TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        fail_count INTEGER NOT NULL DEFAULT 0,
+        fail_similarity_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, english_word)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_word_stats_fail ON user_word_stats (user_id, fail_count)")
+
+    # Günlük girdi sayaçları (streak, 30 günlük gelişim)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS user_daily_stats (
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        inputs INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, day)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_user_daily_stats_day ON user_daily_stats (day)")
+
+    # Trigger'lar her init'te yeniden kurulur (formül değişirse güncel kalsın)
+    for name, event, body in _TRIGGERS:
+        cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cur.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+
+
+# ==================== YENİDEN OLUŞTURMA ====================
+
+def _rollup_sql(table: str, filter_and: str) -> str:
+    """Arşivlenmiş satırların (retention.py) kullanıcı başına toplamı: user_id, total, correct, score_sum, score_count."""
+    return f"""SELECT user_id, SUM(events) AS total, SUM(correct) AS correct,
+                       SUM(score_sum) AS score_sum, SUM(score_count) AS score_count
+                FROM event_rollups_daily WHERE table_name = '{table}'{filter_and} GROUP BY user_id"""
+
+
+def rebuild(user_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Özetleri ana tablolardan yeniden hesaplar (tüm kullanıcılar veya verilenler).
+    Arşivlenmiş olaylar retention rollup'larından (event_rollups_daily,
+    archived_word_stats) eklenir.
+
+    Returns:
+        Yeniden oluşturulan özet sayısı
+    """
+    ids = None if user_ids is None else list(user_ids)
+    where = "" if ids is None else f" WHERE user_id IN ({','.join('?' * len(ids))})"
+    params = [] if ids is None else ids
+    filter_and = "" if ids is None else " AND" + where[len(" WHERE"):]
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(f"DELETE FROM user_word_stats{where}", params)
+        cur.execute(f"""
+            INSERT INTO user_word_stats (user_id, english_word, attempts, correct, fail_count, fail_similarity_sum)
+            SELECT user_id, english_word, COUNT(*), SUM(is_correct = 1), SUM(is_correct = 0),
+                   SUM(CASE WHEN is_correct = 0 THEN COALESCE(similarity_score, 0) ELSE 0 END)
+            FROM translation_log{where}
+            GROUP BY user_id, english_word
+        """, params)
+        # Arşivlenmiş (retention.py) çeviri denemeleri
+        cur.execute(f"""
+            INSERT INTO user_word_stats (user_id, english_word, attempts, correct, fail_count, fail_similarity_sum)
+            SELECT user_id, english_word, attempts, correct, fail_count, fail_similarity_sum
+            FROM archived_word_stats WHERE true{filter_and}
+            ON CONFLICT (user_id, english_word) DO UPDATE SET
+                attempts = attempts + excluded.attempts,
+                correct = correct + excluded.correct,
+                fail_count = fail_count + excluded.fail_count,
+                fail_similarity_sum = fail_similarity_sum + excluded.fail_similarity_sum
+        """, params)
+
+        cur.execute(f"DELETE FROM user_daily_stats{where}", params)
+        cur.execute(f"""
+            INSERT INTO user_daily_stats (user_id, day, inputs, correct)
+            SELECT user_id, date(timestamp) AS day, COUNT(*), SUM(is_correct = 1)
+            FROM user_inputs WHERE timestamp IS NOT NULL{filter_and}
+            GROUP BY user_id, day
+        """, params)
+        cur.execute(f"""
+            INSERT INTO user_daily_stats (user_id, day, inputs, correct)
+            SELECT user_id, day, events, correct FROM event_rollups_daily
+            WHERE table_name = 'user_inputs'{filter_and}
+            ON CONFLICT (user_id, day) DO UPDATE SET
+                inputs = inputs + excluded.inputs, correct = correct + excluded.correct
+        """, params)
+
+        # Streak: son aktif günde biten ardışık gün sayısı ve en uzun seri
+        cur.execute(f"SELECT user_id, day FROM user_daily_stats{where} ORDER BY user_id, day", params)
+        streaks = {}
+        for user_id, rows in groupby(cur.fetchall(), key=lambda r: r[0]):
+            days = [datetime.strptime(r[1], "%Y-%m-%d").date() for r in rows]
+            best = run = 1
+            for previous, day in zip(days, days[1:]):
+                run = run + 1 if day - previous == timedelta(days=1) else 1
+                best = max(best, run)
+            streaks[user_id] = (run, best, days[-1].isoformat())
+
+        user_where = "" if ids is None else where.replace("user_id", "u.user_id")
+        cur.execute(f"""
+            INSERT OR REPLACE INTO user_profile_summary (
+                user_id, total_inputs, correct_answers, score_sum, score_count,
+                pronunciation_sum, pronunciation_count, completed_goals, words_mastered, groups_count,
+                session_minutes
+            )
+            SELECT u.user_id,
+                COALESCE(i.total, 0), COALESCE(i.correct, 0), COALESCE(i.score_sum, 0), COALESCE(i.score_count, 0),
+                COALESCE(p.score_sum, 0), COALESCE(p.score_count, 0),
+                COALESCE(g.completed, 0), COALESCE(w.mastered, 0), COALESCE(gm.groups, 0),
+                COALESCE(sl.minutes, 0)
+            FROM users u
+            LEFT JOIN (
+                SELECT user_id, SUM(total) AS total, SUM(correct) AS correct,
+                       SUM(score_sum) AS score_sum, SUM(score_count) AS score_count
+                FROM (
+                    SELECT user_id, COUNT(*) AS total, SUM(is_correct = 1) AS correct,
+                           SUM(COALESCE(score, 0)) AS score_sum, COUNT(score) AS score_count
+                    FROM user_inputs{where} GROUP BY user_id
+                    UNION ALL
+                    {_rollup_sql('user_inputs', filter_and)}
+                ) GROUP BY user_id
+            ) i ON i.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, SUM(score_sum) AS score_sum, SUM(score_count) AS score_count
+                FROM (
+                    SELECT user_id, SUM(COALESCE(score, 0)) AS score_sum, COUNT(score) AS score_count
+                    FROM pronunciation_attempts{where} GROUP BY user_id
+                    UNION ALL
+                    SELECT user_id, score_sum, score_count FROM ({_rollup_sql('pronunciation_attempts', filter_and)})
+                ) GROUP BY user_id
+            ) p ON p.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS completed FROM goals WHERE status = 'completed'{filter_and} GROUP BY user_id
+            ) g ON g.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, SUM({_MASTERED_SQL}) AS mastered FROM user_word_stats{where} GROUP BY user_id
+            ) w ON w.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, COUNT(*) AS groups FROM group_members{where} GROUP BY user_id
+            ) gm ON gm.user_id = u.user_id
+            LEFT JOIN (
+                SELECT user_id, SUM(minutes) AS minutes FROM (
+                    SELECT user_id, SUM(session_duration_minutes) AS minutes FROM session_logs{where} GROUP BY user_id
+                    UNION ALL
+                    SELECT user_id, score_sum FROM ({_rollup_sql('session_logs', filter_and)})
+                ) GROUP BY user_id
+            ) sl ON sl.user_id = u.user_id
+            {user_where}
+        """, params * 10)
+        rebuilt = cur.rowcount
+
+        cur.execute(f"""
+            UPDATE user_profile_summary
+            SET friends_count = {_FRIENDS_COUNT_SQL}, friends_version = ?, weak_words = {_WEAK_WORDS_SQL}{where}
+        """, [time.time_ns() // 1000, *params])
+        cur.executemany("""
+            UPDATE user_profile_summary SET streak_days = ?, best_streak = ?, last_active_date = ? WHERE user_id = ?
+        """, [(streak, best, day, user_id) for user_id, (streak, best, day) in streaks.items()])
+        cur.execute(f"UPDATE user_profile_summary SET score = {SCORE_SQL}{where}", params)
+
+        conn.commit()
+        return rebuilt
+    except Exception as e:
+        log.error(f"❌ Profil özeti oluşturma hatası: {e}")
+        conn.rollback()
+        return 0
+    finally:
+        conn.close()
+
+
+_streaks_refreshed_on = None
+_refresh_lock = threading.Lock()
+
+
+def refresh_streaks(force: bool = False) -> int:
+    """
+    Dünden önce son aktif olan kullanıcıların streak'ini sıfırlar (puan trigger'la güncellenir).
+    Süreç başına günde bir kez çalışır.
+    """
+    global _streaks_refreshed_on
+    today = datetime.now().date()
+    if not force and _streaks_refreshed_on == today:
+        return 0
+    with _refresh_lock:
+        if not force and _streaks_refreshed_on == today:
+            return 0
+        conn = get_db_connection()
+        try:
+            cur = conn.execute("""
+                UPDATE user_profile_summary SET streak_days = 0
+                WHERE streak_days > 0 AND last_active_date < ?
+            """, ((today - timedelta(days=1)).isoformat(),))
+            conn.commit()
+            _streaks_refreshed_on = today
+            return cur.rowcount
+        except Exception as e:
+            log.error(f"❌ Streak yenileme hatası: {e}")
+            return 0
+        finally:
+            conn.close()
+
+
+# ==================== OKUMA ====================
+
+_RANK_SQL = """
+    (SELECT COUNT(*) FROM user_profile_summary r WHERE r.score > s.score)
+    + (SELECT COUNT(*) FROM user_profile_summary r WHERE r.score = s.score AND r.user_id < s.user_id)
+    + 1
+"""
+
+
+def get_summary(user_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Kullanıcı + özet + global sıra tek sorguda. Kullanıcı yoksa None.
+    Özet satırı yoksa (trigger'lardan önceki kullanıcı) o kullanıcı için oluşturulur.
+    """
+    refresh_streaks()
+    for attempt in range(2):
+        conn = get_db_connection()
+        try:
+            row = conn.execute(f"""
+                SELECT u.user_id, u.username, u.level, u.created_at, s.user_id AS summary_id,
+                       s.total_inputs, s.correct_answers, s.score_sum, s.score_count,
+                       s.pronunciation_sum, s.pronunciation_count, s.completed_goals, s.words_mastered,
+                       s.friends_count, s.groups_count, s.streak_days, s.last_active_date, s.weak_words,
+                       s.score, {_RANK_SQL} AS rank
+                FROM users u
+                LEFT JOIN user_profile_summary s ON s.user_id = u.user_id
+                WHERE u.user_id = ?
+            """, (user_id,)).fetchone()
+        finally:
+            conn.close()
+
+        if row is None:
+            return None
+        if row["summary_id"] is None and attempt == 0:
+            rebuild([user_id])
+            continue
+        return _summary_from_row(row)
+    return None
+
+
+def _summary_from_row(row) -> Dict[str, Any]:
+    total = row["total_inputs"] or 0
+    correct = row["correct_answers"] or 0
+    yesterday = (datetime.now().date() - timedelta(days=1)).isoformat()
+    active = row["last_active_date"] is not None and row["last_active_date"] >= yesterday
+    return {
+        'user_id': row["user_id"],
+        'username': row["username"],
+        'level': row["level"],
+        'created_at': row["created_at"],
+        'total_inputs': total,
+        'correct_answers': correct,
+        'accuracy_percent': (correct / total * 100) if total > 0 else 0,
+        'average_score': round(row["score_sum"] / row["score_count"], 2) if row["score_count"] else 0,
+        'average_pronunciation_score': (round(row["pronunciation_sum"] / row["pronunciation_count"], 2)
+                                        if row["pronunciation_count"] else 0),
+        'completed_goals': row["completed_goals"] or 0,
+        'words_mastered': row["words_mastered"] or 0,
+        'friends_count': row["friends_count"] or 0,
+        'groups_count': row["groups_count"] or 0,
+        'streak_days': row["streak_days"] if active else 0,
+        'weak_words': json.loads(row["weak_words"]) if row["weak_words"] else [],
+        'score': round(row["score"] or 0, 2),
+        'rank': row["rank"]
+    }
+
+
+def get_rank(user_id: int) -> Optional[Dict[str, Any]]:
+    """Global sıra (puan, user_id) index'inden: {'rank', 'score', 'total_participants'}."""
+    refresh_streaks()
+    conn = get_db_connection()
+    try:
+        row = conn.execute(f"""
+            SELECT s.score, {_RANK_SQL} AS rank, (SELECT COUNT(*) FROM user_profile_summary) AS participants
+            FROM user_profile_summary s WHERE s.user_id = ?
+        """, (user_id,)).fetchone()
+        if row is None:
+            return None
+        return {'rank': row["rank"], 'score': round(row["score"], 2), 'total_participants': row["participants"]}
+    finally:
+        conn.close()
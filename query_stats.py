@@ -0,0 +1,266 @@
+"""
+query_stats.py
+
+SQLite sorgu enstrümantasyonu.
+
+db_utils'teki bağlantı fabrikası bağlantıları InstrumentedConnection ile açar:
+- sqlite3 trace callback'i her ifadeyi (PRAGMA hariç) o anki isteğe sayar;
+  trigger gövdelerindeki ifadeler ayrı bir sayaçta (trigger_statements) tutulur,
+- cursor.execute süreleri ölçülür ve normalize edilmiş SQL bazında toplanır,
+- SLOW_QUERY_MS (varsayılan 50 ms) üzerindeki sorgular çağrı yeriyle birlikte
+  yavaş sorgu loguna yazılır.
+
+İstek başına istatistikler begin_request()/end_request() ile bir ContextVar'da
+tutulur (app.py bunları flask.g'ye bağlar ve Server-Timing header'ı ekler).
+Süreç genelindeki toplamlar snapshot() ile /metrics endpoint'inden okunur.
+
+QUERY_STATS=0 ile tamamen kapatılabilir (düz sqlite3.Connection kullanılır).
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from log_utils import get_logger
+
+ENABLED = os.environ.get("QUERY_STATS", "1") != "0"
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 50))
+MAX_TRACKED_STATEMENTS = 500
+
+slow_logger = get_logger("slow_query")
+
+_current: ContextVar[Optional["RequestStats"]] = ContextVar("query_stats", default=None)
+
+_metrics_lock = threading.Lock()
+_route_metrics: Dict[str, Dict[str, float]] = {}
+_statement_metrics: Dict[str, Dict[str, float]] = {}
+_slow_query_count = 0
+
+# Çağrı yeri: uygulama dizinindeki ilk (db katmanı dışı) frame
+_APP_ROOT = os.path.dirname(os.path.abspath(__file__))
+_INTERNAL_FILES = {os.path.abspath(__file__), os.path.join(_APP_ROOT, "db_utils.py")}
+
+
+class RequestStats:
+    """Tek bir isteğin sorgu istatistikleri."""
+
+    __slots__ = ("started", "queries", "trigger_statements", "connections", "db_ms", "slow_queries", "last_sql")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.trigger_statements = 0
+        self.connections = 0
+        self.db_ms = 0.0
+        self.slow_queries = 0
+        self.last_sql = None
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "trigger_statements": self.trigger_statements,
+            "connections": self.connections,
+            "db_ms": round(self.db_ms, 2),
+            "slow_queries": self.slow_queries,
+            "total_ms": round(self.elapsed_ms(), 2),
+        }
+
+
+# ==================== SQL NORMALİZASYONU ====================
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Literal'leri ? ile değiştirir, IN (...) listelerini ve boşlukları sadeleştirir."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (?...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def _call_site() -> str:
+    """Sorguyu çalıştıran ilk uygulama kodu satırı (db katmanı ve kütüphaneler atlanır)."""
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(_APP_ROOT) and filename not in _INTERNAL_FILES:
+            return f"{os.path.relpath(filename, _APP_ROOT)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+# ==================== KAYIT ====================
+
+def _on_statement(sql: str):
+    """
+    sqlite3 trace callback: o anki isteğin sorgu sayacını artırır.
+
+    Trigger gövdesindeki her ifade için SQLite "-- TRIGGER ..." yorumu verir;
+    Python modülü bunun yerine tetikleyen ifadenin genişletilmiş SQL'ini
+    tekrar iletir. Her iki durum da trigger sayacına yazılır: yorum satırları
+    ve bir önceki ifadenin birebir tekrarı (aynı parametrelerle arka arkaya
+    çalıştırılan bir sorgu da böyle sayılır; pratikte nadir).
+    """
+    stats = _current.get()
+    if stats is None:
+        return
+    head = sql.lstrip()[:6].upper()
+    if head.startswith("PRAGMA"):
+        return
+    if head.startswith("--") or sql == stats.last_sql:
+        stats.trigger_statements += 1
+    else:
+        stats.queries += 1
+        stats.last_sql = sql
+
+
+def _record(sql: str, duration_ms: float):
+    global _slow_query_count
+    stats = _current.get()
+    if stats is not None:
+        stats.db_ms += duration_ms
+
+    normalized = normalize_sql(sql)
+    with _metrics_lock:
+        entry = _statement_metrics.get(normalized)
+        if entry is None:
+            if len(_statement_metrics) >= MAX_TRACKED_STATEMENTS:
+                normalized = "<other>"
+            entry = _statement_metrics.setdefault(normalized, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += duration_ms
+        entry["max_ms"] = max(entry["max_ms"], duration_ms)
+
+    if duration_ms >= SLOW_QUERY_MS:
+        with _metrics_lock:
+            _slow_query_count += 1
+        if stats is not None:
+            stats.slow_queries += 1
+        slow_logger.warning("slow query", extra={
+            "duration_ms": round(duration_ms, 2),
+            "sql": normalized,
+            "call_site": _call_site(),
+        })
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute/executemany sürelerini ölçen cursor."""
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record(sql, (time.perf_counter() - start) * 1000)
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record(sql, (time.perf_counter() - start) * 1000)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Trace callback'i kurulu, InstrumentedCursor üreten bağlantı."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.set_trace_callback(_on_statement)
+        stats = _current.get()
+        if stats is not None:
+            stats.connections += 1
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or InstrumentedCursor)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    """sqlite3.connect(factory=...) için kullanılacak sınıf."""
+    return InstrumentedConnection if ENABLED else sqlite3.Connection
+
+
+# ==================== İSTEK YAŞAM DÖNGÜSÜ ====================
+
+def begin_request():
+    """Yeni istek istatistiği başlatır. Dönen token end_request'e verilmelidir."""
+    stats = RequestStats()
+    return stats, _current.set(stats)
+
+
+def current() -> Optional[RequestStats]:
+    """O anki isteğin istatistikleri (istek dışında None)."""
+    return _current.get()
+
+
+def end_request(token, route: str):
+    """İstek istatistiğini route toplamlarına ekler ve ContextVar'ı sıfırlar."""
+    stats = _current.get()
+    _current.reset(token)
+    if stats is None:
+        return
+    elapsed = stats.elapsed_ms()
+    with _metrics_lock:
+        entry = _route_metrics.setdefault(route, {
+            "requests": 0, "queries": 0, "max_queries": 0, "trigger_statements": 0,
+            "db_ms": 0.0, "total_ms": 0.0, "slow_queries": 0,
+        })
+        entry["requests"] += 1
+        entry["queries"] += stats.queries
+        entry["trigger_statements"] += stats.trigger_statements
+        entry["max_queries"] = max(entry["max_queries"], stats.queries)
+        entry["db_ms"] += stats.db_ms
+        entry["total_ms"] += elapsed
+        entry["slow_queries"] += stats.slow_queries
+
+
+def server_timing(stats: RequestStats) -> str:
+    """Server-Timing header değeri."""
+    return (f'db;dur={stats.db_ms:.2f};desc="{stats.queries} queries, {stats.connections} conns", '
+            f'app;dur={stats.elapsed_ms():.2f}')
+
+
+def snapshot(top: int = 20) -> Dict[str, Any]:
+    """Süreç genelindeki metrikler (route toplamları + en pahalı sorgular)."""
+    with _metrics_lock:
+        routes = {
+            route: {
+                **{k: round(v, 2) for k, v in m.items()},
+                "avg_queries": round(m["queries"] / m["requests"], 2),
+                "avg_ms": round(m["total_ms"] / m["requests"], 2),
+            }
+            for route, m in _route_metrics.items()
+        }
+        statements = sorted(
+            ({"sql": sql, **{k: round(v, 2) for k, v in m.items()}} for sql, m in _statement_metrics.items()),
+            key=lambda s: s["total_ms"], reverse=True,
+        )[:top]
+        slow_count = _slow_query_count
+    return {
+        "pid": os.getpid(),
+        "enabled": ENABLED,
+        "slow_query_ms": SLOW_QUERY_MS,
+        "slow_queries": slow_count,
+        "routes": routes,
+        "top_statements": statements,
+    }
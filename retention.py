@@ -0,0 +1,309 @@
+"""
+retention.py
+
+Ham olay tabloları için saklama (retention) alt sistemi.
+
+`user_inputs`, `user_actions`, `session_logs`, `pronunciation_attempts` ve
+`translation_log` sınırsız büyür. run() RETENTION_DAYS'ten eski satırları
+sıcak tablolardan çıkarır:
+
+1. Önce günlük toplamlara katlanır: `event_rollups_daily` (tablo, kullanıcı,
+   gün başına olay / doğru / skor toplamı) ve çeviri için kelime bazlı
+   `archived_word_stats`. Özetler (profile_summary) sayaçlarını trigger'larla
+   zaten tutar; silme onları azaltmaz. profile_summary.rebuild() ham
+   tabloları bu toplamlarla birleştirerek okur, yeniden hesaplama ömür boyu
+   değerleri kaybetmez.
+2. Satırlar aylık arşiv SQLite dosyalarına taşınır (ARCHIVE_DIR/YYYY-MM.db,
+   kaynak tabloyla aynı şema). Dosya sadece taşıma sırasında ATTACH edilir;
+   okumak için attach_archive() kullanılır.
+3. Silme RETENTION_BATCH_SIZE satırlık küçük transaction'larla yapılır;
+   yazıcı kilidi uzun süre tutulmaz. Arşive yazma INSERT OR IGNORE olduğundan
+   yarıda kalan bir batch tekrar çalıştırıldığında kopya üretmez.
+4. Son olarak boşalan sayfalar incremental VACUUM ile dosyaya iade edilir
+   (auto_vacuum=INCREMENTAL gerekir; yeni veritabanları init_db'de böyle
+   açılır, eskiler için bir kereye mahsus enable_incremental_vacuum()).
+
+Kullanım: `flask --app app archive-logs --days 90`
+"""
+
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Dict, List, Optional
+
+from db_utils import DB_PATH, get_db_connection
+from log_utils import get_logger
+from backend.memory_model import PRONUNCIATION_PASS_SCORE
+
+log = get_logger("retention")
+
+RETENTION_DAYS = int(os.environ.get("RETENTION_DAYS", 90))
+RETENTION_BATCH_SIZE = int(os.environ.get("RETENTION_BATCH_SIZE", 2000))
+ARCHIVE_DIR = os.environ.get("ARCHIVE_DIR") or os.path.join(os.path.dirname(DB_PATH), "archive")
+VACUUM_PAGES = 1000
+
+# tablo → (doğru sayılan satır ifadesi, skor ifadesi); rollup kolonları bunlardan hesaplanır
+ARCHIVED_TABLES = {
+    "user_inputs": ("is_correct = 1", "score"),
+    "user_actions": ("0", "NULL"),
+    "session_logs": ("0", "session_duration_minutes"),
+    "pronunciation_attempts": (f"score >= {PRONUNCIATION_PASS_SCORE}", "score"),
+    "translation_log": ("is_correct = 1", "similarity_score"),
+}
+
+_MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+
+
+def create_schema(cur):
+    """Rollup ve arşiv manifest tabloları (db_utils.init_db'den çağrılır)."""
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS event_rollups_daily (
+        table_name TEXT NOT NULL,
+        user_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        events INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        score_sum REAL NOT NULL DEFAULT 0,
+        score_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (table_name, user_id, day)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS archived_word_stats (
+        user_id INTEGER NOT NULL,
+        english_word TEXT NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        correct INTEGER NOT NULL DEFAULT 0,
+        fail_count INTEGER NOT NULL DEFAULT 0,
+        fail_similarity_sum REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (user_id, english_word)
+    ) WITHOUT ROWID
+    """)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS archive_manifest (
+        month TEXT NOT NULL,
+        table_name TEXT NOT NULL,
+        rows INTEGER NOT NULL DEFAULT 0,
+        path TEXT NOT NULL,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (month, table_name)
+    )
+    """)
+
+
+def archive_path(month: str) -> str:
+    return os.path.join(ARCHIVE_DIR, f"{month}.db")
+
+
+# ==================== ARŞİVLEME ====================
+
+def _ensure_archive_table(cur, table: str) -> List[str]:
+    """Arşivde kaynak şemayla tabloyu kurar, sonradan eklenen kolonları tamamlar. Kolon listesini döner."""
+    create_sql = cur.execute("SELECT sql FROM main.sqlite_master WHERE type = 'table' AND name = ?",
+                             (table,)).fetchone()[0]
+    cur.execute(re.sub(rf"^CREATE TABLE\s+(IF NOT EXISTS\s+)?{table}",
+                       f"CREATE TABLE IF NOT EXISTS archive.{table}", create_sql.strip(), flags=re.I))
+
+    columns = [(row[1], row[2]) for row in cur.execute(f"PRAGMA main.table_info({table})")]
+    existing = {row[1] for row in cur.execute(f"PRAGMA archive.table_info({table})")}
+    for name, col_type in columns:
+        if name not in existing:
+            cur.execute(f"ALTER TABLE archive.{table} ADD COLUMN {name} {col_type}")
+    return [name for name, _ in columns]
+
+
+def _move_batch(conn, table: str, columns: List[str], month: str, ids: str) -> int:
+    """Bir batch'i tek kısa transaction'da: rollup → arşive kopya → sil."""
+    correct_expr, score_expr = ARCHIVED_TABLES[table]
+    column_list = ", ".join(columns)
+    in_batch = "rowid IN (SELECT value FROM json_each(?))"
+    cur = conn.cursor()
+
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute(f"""
+            INSERT INTO event_rollups_daily (table_name, user_id, day, events, correct, score_sum, score_count)
+            SELECT ?, user_id, date(timestamp), COUNT(*), COALESCE(SUM({correct_expr}), 0),
+                   COALESCE(SUM({score_expr}), 0), COUNT({score_expr})
+            FROM main.{table} WHERE {in_batch}
+            GROUP BY user_id, date(timestamp)
+            ON CONFLICT (table_name, user_id, day) DO UPDATE SET
+                events = events + excluded.events,
+                correct = correct + excluded.correct,
+                score_sum = score_sum + excluded.score_sum,
+                score_count = score_count + excluded.score_count
+        """, (table, ids))
+
+        if table == "translation_log":
+            cur.execute(f"""
+                INSERT INTO archived_word_stats (user_id, english_word, attempts, correct, fail_count, fail_similarity_sum)
+                SELECT user_id, english_word, COUNT(*), SUM(is_correct = 1), SUM(is_correct = 0),
+                       SUM(CASE WHEN is_correct = 0 THEN COALESCE(similarity_score, 0) ELSE 0 END)
+                FROM main.translation_log WHERE {in_batch}
+                GROUP BY user_id, english_word
+                ON CONFLICT (user_id, english_word) DO UPDATE SET
+                    attempts = attempts + excluded.attempts,
+                    correct = correct + excluded.correct,
+                    fail_count = fail_count + excluded.fail_count,
+                    fail_similarity_sum = fail_similarity_sum + excluded.fail_similarity_sum
+            """, (ids,))
+
+        cur.execute(f"""
+            INSERT OR IGNORE INTO archive.{table} ({column_list})
+            SELECT {column_list} FROM main.{table} WHERE {in_batch}
+        """, (ids,))
+        cur.execute(f"DELETE FROM main.{table} WHERE {in_batch}", (ids,))
+        moved = cur.rowcount
+
+        cur.execute("""
+            INSERT INTO archive_manifest (month, table_name, rows, path) VALUES (?, ?, ?, ?)
+            ON CONFLICT (month, table_name) DO UPDATE SET
+                rows = rows + excluded.rows, updated_at = CURRENT_TIMESTAMP
+        """, (month, table, moved, archive_path(month)))
+        conn.commit()
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def archive_table(table: str, cutoff: str, batch_size: int = RETENTION_BATCH_SIZE) -> int:
+    """
+    `cutoff` tarihinden (YYYY-MM-DD) eski satırları aylık arşive taşır.
+
+    Returns:
+        Taşınan satır sayısı
+    """
+    if table not in ARCHIVED_TABLES:
+        raise ValueError(f"Arşivlenmeyen tablo: {table}")
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+
+    conn = get_db_connection()
+    cur = conn.cursor()
+    attached, columns = None, None
+    moved, last_rowid = 0, 0
+    try:
+        while True:
+            rows = cur.execute(f"""
+                SELECT rowid, substr(timestamp, 1, 7) FROM {table}
+                WHERE timestamp < ? AND rowid > ?
+                ORDER BY rowid
+                LIMIT ?
+            """, (cutoff, last_rowid, batch_size)).fetchall()
+            if not rows:
+                break
+            last_rowid = rows[-1][0]
+
+            by_month = sorted(((r[1] if _MONTH_RE.match(r[1] or "") else "unknown"), r[0]) for r in rows)
+            for month, group in groupby(by_month, key=lambda r: r[0]):
+                if month != attached:
+                    if attached:
+                        cur.execute("DETACH DATABASE archive")
+                    cur.execute("ATTACH DATABASE ? AS archive", (archive_path(month),))
+                    columns = _ensure_archive_table(cur, table)
+                    conn.commit()
+                    attached = month
+                moved += _move_batch(conn, table, columns, month, json.dumps([r[1] for r in group]))
+        return moved
+    finally:
+        if attached:
+            try:
+                cur.execute("DETACH DATABASE archive")
+            except sqlite3.Error:
+                pass
+        conn.close()
+
+
+# ==================== VACUUM ====================
+
+def incremental_vacuum(pages: int = VACUUM_PAGES) -> int:
+    """
+    Boş sayfaları `pages`'lik adımlarla dosyaya iade eder (her adım kısa bir yazma kilidi).
+
+    Returns:
+        İade edilen sayfa sayısı (auto_vacuum INCREMENTAL değilse 0)
+    """
+    conn = get_db_connection()
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            log.warning("auto_vacuum INCREMENTAL değil; retention.enable_incremental_vacuum() bir kez çalıştırılmalı")
+            return 0
+        freed = 0
+        while True:
+            before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if before == 0:
+                break
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+            after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if after >= before:
+                break
+            freed += before - after
+        return freed
+    finally:
+        conn.close()
+
+
+def enable_incremental_vacuum():
+    """Mevcut veritabanını auto_vacuum=INCREMENTAL'a çevirir (tek seferlik tam VACUUM, tüm DB kilitlenir)."""
+    conn = get_db_connection()
+    try:
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+# ==================== ÇALIŞTIRMA ====================
+
+def run(days: int = RETENTION_DAYS, batch_size: int = RETENTION_BATCH_SIZE) -> Dict[str, int]:
+    """
+    Tüm olay tablolarını arşivler ve incremental VACUUM çalıştırır.
+
+    Returns:
+        {tablo: taşınan satır, ..., 'vacuumed_pages': int}
+    """
+    cutoff = (date.today() - timedelta(days=days)).isoformat()
+    result = {}
+    started = time.perf_counter()
+    for table in ARCHIVED_TABLES:
+        try:
+            result[table] = archive_table(table, cutoff, batch_size)
+        except Exception as e:
+            log.error(f"❌ {table} arşivleme hatası: {e}")
+            result[table] = 0
+    result["vacuumed_pages"] = incremental_vacuum()
+    log.info("retention tamamlandı cutoff=%s moved=%s duration_ms=%.0f", cutoff,
+             sum(v for k, v in result.items() if k != "vacuumed_pages"), (time.perf_counter() - started) * 1000)
+    return result
+
+
+# ==================== OKUMA ====================
+
+def archived_months(table: Optional[str] = None) -> List[Dict]:
+    """Arşivlenmiş aylar (manifest'ten)."""
+    conn = get_db_connection()
+    try:
+        sql = "SELECT month, table_name, rows, path, updated_at FROM archive_manifest"
+        params = ()
+        if table:
+            sql += " WHERE table_name = ?"
+            params = (table,)
+        return [dict(r) for r in conn.execute(sql + " ORDER BY month, table_name", params).fetchall()]
+    finally:
+        conn.close()
+
+
+def attach_archive(conn, month: str, alias: str = "archive") -> bool:
+    """
+    Bir ayın arşiv dosyasını verilen bağlantıya (transaction dışında) ATTACH eder;
+    sorgular `{alias}.user_inputs` gibi okuyabilir. Dosya yoksa False.
+    """
+    path = archive_path(month)
+    if not _MONTH_RE.match(month) or not os.path.exists(path):
+        return False
+    conn.execute(f"ATTACH DATABASE ? AS {alias}", (path,))
+    return True
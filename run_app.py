@@ -1,18 +1,48 @@
 """
-Flask app başlatıcısı - working directory'yi ayarla.
+Production başlatıcısı.
+
+- gunicorn kuruluysa: gunicorn.conf.py ayarlarıyla pre-fork sunucu
+  (warmup master süreçte fork'tan önce yapılır).
+- gunicorn yoksa (ör. Windows): warmup + çok thread'li Flask sunucusu.
+
+Kullanım:
+    python run_app.py
 """
 
 import os
 import sys
 
-# Doğru working directory'ye geç
-app_dir = r"c:\Users\iclal\OneDrive\Desktop\dualingo_clone"
+# Working directory: bu dosyanın bulunduğu klasör (app.db, templates vb. için)
+app_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(app_dir)
 sys.path.insert(0, app_dir)
 
-# App'ı başlat
-from app import app
+CONFIG_PATH = os.path.join(app_dir, "gunicorn.conf.py")
+
+
+def run_gunicorn():
+    """gunicorn.conf.py ile app:app'i çalıştırır."""
+    from gunicorn.app.wsgiapp import WSGIApplication
+
+    sys.argv = [sys.argv[0], "-c", CONFIG_PATH, "app:app"]
+    WSGIApplication("%(prog)s [OPTIONS] [APP_MODULE]").run()
+
+
+def run_threaded():
+    """gunicorn yoksa: warmup, sonra thread'li Flask sunucusu (debug kapalı)."""
+    from app import app
+    import warmup
+
+    warmup.run_warmup()
+    host, _, port = os.environ.get("BIND", "0.0.0.0:8000").rpartition(":")
+    print("[Flask] gunicorn bulunamadı, thread'li sunucu ile başlatılıyor...")
+    app.run(host=host or "0.0.0.0", port=int(port), debug=False, threaded=True, use_reloader=False)
+
 
 if __name__ == "__main__":
-    print("[Flask] App baslatiliyor...")
-    app.run(debug=True, use_reloader=False)
+    try:
+        import gunicorn  # noqa: F401
+    except ImportError:
+        run_threaded()
+    else:
+        run_gunicorn()
@@ -11,11 +11,15 @@ Strateji: wordfreq.zipf_frequency() kullan:
 - 2.0-2.5     → C1
 - < 2.0       → C2 (nadir)
 
+Seviyesi olmayan kelimeler tek geçişte etiketlenir ve relabel_words_cefr.write_levels
+ile (staging tablosu + tek UPDATE ... FROM) yazılır.
+
 Kullanım:
     pip install wordfreq
     python scripts/assign_cefr_levels.py
 """
 
+import os
 import sqlite3
 import sys
 
@@ -27,8 +31,14 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "wordfreq"])
     from wordfreq import zipf_frequency
 
-DB_PATH = "app.db"
-BATCH_SIZE = 500
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from db_utils import DB_PATH  # noqa: E402
+from scripts.relabel_words_cefr import write_levels  # noqa: E402
+
+# level_rules kolonuna yazılan kural adı (relabel_words_cefr --incremental bunları yeniden etiketler)
+RULES = "wordfreq"
 
 
 def get_cefr_level(word):
@@ -53,39 +63,21 @@ def get_cefr_level(word):
 
 
 def assign_levels():
-    """Tüm kelimelere seviye atanır."""
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # Seviye olmayan kelimeleri al
-    cur.execute("SELECT word_id, english FROM words WHERE level IS NULL LIMIT ?", (BATCH_SIZE,))
-    batch = cur.fetchall()
-
-    total_updated = 0
-    while batch:
-        updates = []
-        for word_id, english in batch:
-            level = get_cefr_level(english)
-            updates.append((level, word_id))
-
-        # Batch update
-        try:
-            cur.executemany("UPDATE words SET level = ? WHERE word_id = ?", updates)
-            conn.commit()
-            total_updated += len(updates)
-            print(f"✓ {total_updated} kelimeye seviye atandı...")
-        except Exception as e:
-            print(f"❌ Update hatası: {e}")
-            conn.rollback()
-            break
-
-        # Sonraki batch
-        cur.execute("SELECT word_id, english FROM words WHERE level IS NULL LIMIT ?", (BATCH_SIZE,))
-        batch = cur.fetchall()
-
-    conn.close()
+    """Seviyesi olmayan kelimelere seviye atanır."""
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, timeout=60)
+    try:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        words = conn.execute("SELECT word_id, english FROM words WHERE level IS NULL AND english IS NOT NULL").fetchall()
+        print(f"📚 {len(words)} kelimenin seviyesi yok")
+        report = write_levels(conn, [(word_id, get_cefr_level(english)) for word_id, english in words], RULES)
+    except Exception as e:
+        print(f"❌ Update hatası: {e}")
+        return
+    finally:
+        conn.close()
+
     print(f"\n✅ Seviye atanması tamamlandı!")
-    print(f"   Toplam güncellenen kelime: {total_updated}")
+    print(f"   Toplam güncellenen kelime: {report['changed']}")
 
 
 if __name__ == "__main__":
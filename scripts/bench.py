@@ -0,0 +1,347 @@
+"""
+bench.py
+
+Öğrenci akışları için tekrarlanabilir yük testi / benchmark.
+
+1. Geçici bir SQLite veritabanına sentetik veri ekler
+   (N kullanıcı, M kelime, kullanıcı başına K giriş).
+2. Flask test client ile gerçekçi oturumları tekrar oynatır:
+   giriş → /learn → ders → /practice_word cevapları → /leaderboard → /stats
+   LLM, çeviri ve STT yerel olarak stub'lanır (ağ çağrısı yok).
+3. Her route için p50/p95/p99 gecikme ve istek başına sorgu sayısını raporlar.
+4. Baseline ile karşılaştırır; gerileme varsa exit code 1 döner.
+
+Kullanım:
+    python scripts/bench.py
+    python scripts/bench.py --users 200 --words 20000 --inputs 300 --sessions 100
+    python scripts/bench.py --save-baseline bench_baseline.json
+    python scripts/bench.py --baseline bench_baseline.json --tolerance 0.25
+
+Baseline dosyası makineye özeldir; aynı makinede aynı parametrelerle karşılaştırın.
+"""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+CATEGORIES = [
+    'greetings', 'introduction', 'numbers', 'time', 'colors', 'family', 'food', 'shopping',
+    'weather', 'nature', 'transport', 'travel', 'work', 'communication', 'technology',
+    'health', 'body', 'emotions', 'education', 'media', 'environment', 'culture', 'economy',
+    'politics', 'other',
+]
+INPUT_TYPES = ['word_translation', 'sentence', 'pronunciation', 'lesson_answer']
+BENCH_PASSWORD = "bench123"
+
+
+# ==================== SORGU SAYACI ====================
+
+# Sorgu sayısı uygulamanın Server-Timing header'ından okunur (bkz. query_stats.py)
+_SERVER_TIMING_QUERIES = re.compile(r'db;[^,]*desc="(\d+) queries')
+
+
+# ==================== STUB'LAR ====================
+
+def install_stubs():
+    """LLM, çeviri ve STT çağrılarını yerel sabit cevaplarla değiştirir."""
+    import app as app_module
+    import translation_utils
+    from backend import ai_utils, speech_stt
+
+    translation_utils.translate_to_turkish = lambda english_word: f"{english_word}_tr"
+    ai_utils._llm_chat = lambda prompt, system=None, timeout=10: "DUMMY_RESPONSE"
+
+    def fake_stt(*args, **kwargs):
+        return "hello"
+
+    for module in (speech_stt, app_module):
+        module.recognize_from_audio_file = fake_stt
+        module.recognize_from_blob = fake_stt
+
+
+# ==================== SENTETİK VERİ ====================
+
+def seed_database(n_users: int, n_words: int, n_inputs: int, rng: random.Random):
+    """Şemayı oluşturur ve sentetik kullanıcı/kelime/giriş verisi ekler."""
+    from db_utils import init_db, DB_PATH
+    from features.course_system import course_system
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        init_db()
+        course_system.initialize()
+
+    conn = sqlite3.connect(DB_PATH)
+    cur = conn.cursor()
+
+    cur.executemany(
+        "INSERT INTO words (english, turkish, level, category, example_sentence) VALUES (?, ?, ?, ?, ?)",
+        [
+            (f"word{i}", f"kelime{i}", rng.choice(LEVELS), rng.choice(CATEGORIES), f"This is word{i}.")
+            for i in range(n_words)
+        ]
+    )
+
+    password_hash = hashlib.sha256(BENCH_PASSWORD.encode()).hexdigest()
+    cur.executemany(
+        "INSERT INTO users (username, password_hash, level, placement_test_done) VALUES (?, ?, 'A1', 1)",
+        [(f"bench_user{i}", password_hash) for i in range(n_users)]
+    )
+    conn.commit()
+
+    cur.execute("SELECT user_id FROM users ORDER BY user_id")
+    user_ids = [r[0] for r in cur.fetchall()]
+
+    now = datetime.now()
+    rows = []
+    for user_id in user_ids:
+        for _ in range(n_inputs):
+            ts = now - timedelta(days=rng.randint(0, 30), seconds=rng.randint(0, 86399))
+            is_correct = rng.random() < 0.7
+            rows.append((
+                user_id, rng.choice(INPUT_TYPES), f"answer{rng.randint(0, n_words)}", "kelime",
+                1 if is_correct else 0, rng.uniform(60, 100) if is_correct else rng.uniform(0, 60),
+                rng.randint(1, n_words), ts.strftime("%Y-%m-%d %H:%M:%S"),
+            ))
+    cur.executemany("""
+        INSERT INTO user_inputs (user_id, input_type, input_text, response_text, is_correct, score, word_id, timestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+
+    # Her kullanıcıya birkaç onaylı arkadaş (uygulamadaki gibi arkadaşlık başına tek
+    # 'confirmed' satır; arkadaş sıralaması ve akış dağıtımı bunları okur)
+    friend_rows = set()
+    for user_id in user_ids:
+        for friend_id in rng.sample(user_ids, min(5, len(user_ids))):
+            if friend_id != user_id:
+                friend_rows.add((min(user_id, friend_id), max(user_id, friend_id)))
+    cur.executemany(
+        "INSERT INTO friends (user_id, friend_id, status, confirmed_at) VALUES (?, ?, 'confirmed', CURRENT_TIMESTAMP)",
+        sorted(friend_rows)
+    )
+    conn.commit()
+    conn.close()
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for user_id in user_ids:
+            course_system.init_user_progress(user_id, 'A1')
+
+    return user_ids
+
+
+# ==================== OTURUM TEKRARI ====================
+
+class Recorder:
+    """Route başına gecikme (ms) ve sorgu sayısı toplar."""
+
+    def __init__(self):
+        self.client = None
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+
+    def request(self, label: str, method: str, path: str, **kwargs):
+        start = time.perf_counter()
+        response = self.client.open(path, method=method, **kwargs)
+        self.latencies[label].append((time.perf_counter() - start) * 1000)
+        match = _SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+        self.queries[label].append(int(match.group(1)) if match else 0)
+        if response.status_code >= 500:
+            raise RuntimeError(f"{label} → HTTP {response.status_code}")
+        return response
+
+
+def replay_session(recorder: Recorder, username: str, n_words: int, n_answers: int, rng: random.Random):
+    """Tek bir öğrenci oturumunu oynatır."""
+    recorder.request("POST /login", "POST", "/",
+                     data={"username": username, "password": BENCH_PASSWORD, "action": "login"})
+    recorder.request("GET /learn", "GET", "/learn")
+
+    conn = sqlite3.connect(os.environ["APP_DB_PATH"])
+    row = conn.execute("""
+        SELECT p.lesson_id FROM user_course_progress p JOIN users u ON u.user_id = p.user_id
+        WHERE u.username = ? AND p.lesson_id IS NOT NULL AND p.status != 'locked'
+        ORDER BY p.status = 'unlocked' DESC, p.lesson_id LIMIT 1
+    """, (username,)).fetchone()
+    conn.close()
+    if row:
+        lesson_id = row[0]
+        recorder.request("GET /learn/lesson/<id>", "GET", f"/learn/lesson/{lesson_id}")
+        recorder.request("POST /api/learn/complete-lesson", "POST", "/api/learn/complete-lesson",
+                         json={"lesson_id": lesson_id, "score": rng.randint(60, 100)})
+
+    recorder.request("GET /practice_word", "GET", "/practice_word")
+    for _ in range(n_answers):
+        word_id = rng.randint(1, n_words)
+        # %70 doğru cevap (sentetik kelimelerin çevirisi DB'de: word{i} → kelime{i})
+        answer = f"kelime{word_id - 1}" if rng.random() < 0.7 else "yanlis"
+        recorder.request("POST /practice_word", "POST", "/practice_word",
+                         data={"word_id": str(word_id), "answer": answer})
+
+    recorder.request("GET /leaderboard", "GET", "/leaderboard")
+    recorder.request("GET /stats", "GET", "/stats")
+    recorder.request("GET /logout", "GET", "/logout")
+
+
+# ==================== RAPOR ====================
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank yüzdelik."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[k]
+
+
+def summarize(recorder: Recorder) -> dict:
+    summary = {}
+    for label, values in recorder.latencies.items():
+        queries = recorder.queries[label]
+        summary[label] = {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 50), 2),
+            "p95_ms": round(percentile(values, 95), 2),
+            "p99_ms": round(percentile(values, 99), 2),
+            "queries_per_request": round(sum(queries) / len(queries), 2),
+            "max_queries": max(queries),
+        }
+    return summary
+
+
+def print_report(summary: dict, params: dict):
+    print(f"\n📊 Benchmark: {params}")
+    print(f"{'route':<36} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/req':>7} {'max q':>6}")
+    print("-" * 86)
+    for label, s in summary.items():
+        print(f"{label:<36} {s['count']:>5} {s['p50_ms']:>9.2f} {s['p95_ms']:>9.2f} {s['p99_ms']:>9.2f} "
+              f"{s['queries_per_request']:>7.1f} {s['max_queries']:>6}")
+
+
+def compare_with_baseline(summary: dict, baseline: dict, tolerance: float,
+                          query_tolerance: float, min_delta_ms: float) -> list:
+    """
+    Baseline'a göre gerilemeleri döner.
+    Gecikme: p95, baseline*(1+tolerance)'ı VE baseline+min_delta_ms'i aşarsa.
+    Sorgu: istek başına ortalama, baseline*(1+query_tolerance)'ı aşarsa.
+    """
+    regressions = []
+    for label, base in baseline.get("routes", {}).items():
+        current = summary.get(label)
+        if not current:
+            regressions.append(f"{label}: bu çalıştırmada ölçülmedi")
+            continue
+        limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + min_delta_ms)
+        if current["p95_ms"] > limit:
+            regressions.append(f"{label}: p95 {current['p95_ms']:.2f} ms > {limit:.2f} ms "
+                               f"(baseline {base['p95_ms']:.2f} ms)")
+        q_limit = base["queries_per_request"] * (1 + query_tolerance)
+        if current["queries_per_request"] > q_limit + 1e-9:
+            regressions.append(f"{label}: {current['queries_per_request']:.1f} sorgu/istek > {q_limit:.1f} "
+                               f"(baseline {base['queries_per_request']:.1f})")
+    return regressions
+
+
+# ==================== MAIN ====================
+
+def main():
+    parser = argparse.ArgumentParser(description="Öğrenci akışları benchmark'ı")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--words", type=int, default=5000)
+    parser.add_argument("--inputs", type=int, default=100, help="kullanıcı başına user_inputs satırı")
+    parser.add_argument("--sessions", type=int, default=30)
+    parser.add_argument("--answers", type=int, default=5, help="oturum başına /practice_word cevabı")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-warmup", action="store_true", help="bellek içi cache'leri ısıtma")
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--baseline", metavar="PATH")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p95 için izin verilen göreli artış")
+    parser.add_argument("--query-tolerance", type=float, default=0.0, help="sorgu/istek için izin verilen göreli artış")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="bunun altındaki p95 artışları gürültü sayılır")
+    parser.add_argument("--keep-db", action="store_true", help="geçici veritabanını silme")
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ("users", "words", "inputs", "sessions", "answers", "seed")}
+    params["warmup"] = not args.no_warmup
+
+    # DB yolu, uygulama modülleri import edilmeden önce ayarlanmalı
+    tmp_dir = tempfile.mkdtemp(prefix="loroleng_bench_")
+    os.environ["APP_DB_PATH"] = os.path.join(tmp_dir, "bench.db")
+    os.environ["API_KEY"] = ""
+    os.environ["QUERY_STATS"] = "1"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("SLOW_QUERY_LOG", "")
+    sys.path.insert(0, REPO_ROOT)
+    os.chdir(REPO_ROOT)
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    started = time.perf_counter()
+    user_ids = seed_database(args.users, args.words, args.inputs, rng)
+    print(f"✓ Sentetik veri: {len(user_ids)} kullanıcı, {args.words} kelime, "
+          f"{len(user_ids) * args.inputs} giriş ({time.perf_counter() - started:.1f} s)")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        from app import app
+        install_stubs()
+        if not args.no_warmup:
+            import warmup
+            warmup.run_warmup()
+
+    app.config["TESTING"] = True
+    recorder = Recorder()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(args.sessions):
+            user_index = rng.randrange(len(user_ids))
+            # Her oturum ayrı cookie jar ile
+            with app.test_client() as client:
+                recorder.client = client
+                replay_session(recorder, f"bench_user{user_index}", args.words, args.answers, rng)
+
+    summary = summarize(recorder)
+    print_report(summary, params)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "routes": summary}, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Baseline kaydedildi: {args.save_baseline}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("params") != params:
+            print(f"\n⚠️ Baseline parametreleri farklı: {baseline.get('params')}")
+        regressions = compare_with_baseline(summary, baseline, args.tolerance,
+                                            args.query_tolerance, args.min_delta_ms)
+        if regressions:
+            print("\n❌ Gerileme tespit edildi:")
+            for r in regressions:
+                print(f"  - {r}")
+            exit_code = 1
+        else:
+            print("\n✓ Baseline'a göre gerileme yok")
+
+    if args.keep_db:
+        print(f"Veritabanı: {os.environ['APP_DB_PATH']}")
+    else:
+        import shutil
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""
+bench_selection.py
+
+Kişiselleştirilmiş kelime seçimi (backend/selection.py) benchmark'ı.
+
+Geçici bir veritabanına N kelime (varsayılan 200k, seviyelere dağıtılmış) ve
+kullanıcı başına görülmüş kelimeler (learner_items) ekler ve şunları ölçer:
+- /practice_word'ün eski yolu: seviyede ORDER BY RANDOM() LIMIT 1
+- next_items(user_id, 1): heap'ten pop (yeniden kurulum maliyeti dahil, amortize)
+- ders soruları için 10 kelime: ORDER BY RANDOM() vs next_items(user_id, 10, level, categories)
+- soğuk heap kurulumu (ilk istek)
+
+Kullanım:
+    python scripts/bench_selection.py
+    python scripts/bench_selection.py --words 50000 --users 500 --requests 2000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+CATEGORIES = ['food', 'travel', 'work', 'family', 'health', 'nature', 'other']
+
+
+def seed(n_words: int, n_users: int, seen_per_user: int, today: int, rng: random.Random):
+    """Kelimeleri, kullanıcıları ve görülmüş kelime durumlarını ekler."""
+    from db_utils import get_db_connection
+
+    conn = get_db_connection()
+    conn.executemany("INSERT INTO words (english, turkish, level, category) VALUES (?, ?, ?, ?)",
+                     [(f"word_{i}", f"kelime_{i}", LEVELS[i % len(LEVELS)], rng.choice(CATEGORIES))
+                      for i in range(n_words)])
+    conn.executemany("INSERT INTO users (username, level) VALUES (?, ?)",
+                     [(f"sel_user_{i}", rng.choice(LEVELS[:4])) for i in range(n_users)])
+    user_ids = [row[0] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+
+    rows = []
+    for user_id in user_ids:
+        for word_id in rng.sample(range(1, n_words + 1), seen_per_user):
+            rows.append((user_id, word_id, rng.randint(1, 20), round(rng.uniform(0, 100), 1),
+                         today + rng.randint(-20, 30)))
+    conn.executemany("""
+        INSERT OR IGNORE INTO learner_items (user_id, word_id, attempts, ewma_score, due_day)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+    return user_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kelime seçimi benchmark'ı")
+    parser.add_argument("--words", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--seen", type=int, default=300, help="kullanıcı başına görülmüş kelime")
+    parser.add_argument("--requests", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-db", action="store_true", help="geçici veritabanını silme")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_selection_")
+    os.environ["APP_DB_PATH"] = os.path.join(tmp_dir, "bench_selection.db")
+    os.environ.setdefault("QUERY_STATS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, REPO_ROOT)
+
+    from db_utils import init_db, get_db_connection
+    from backend import selection
+    from backend.srs import epoch_day
+    from features.course_system import course_system
+
+    rng = random.Random(args.seed)
+    today = epoch_day()
+
+    init_db()
+    start = time.perf_counter()
+    user_ids = seed(args.words, args.users, args.seen, today, rng)
+    print(f"Seed: {args.words} kelime / {args.users} kullanıcı x {args.seen} görülmüş, "
+          f"{time.perf_counter() - start:.1f} s")
+
+    start = time.perf_counter()
+    course_system.load_word_index()
+    print(f"Word index: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    conn = get_db_connection()
+    user_levels = dict(conn.execute("SELECT user_id, level FROM users"))
+    requests = [rng.choice(user_ids) for _ in range(args.requests)]
+    lesson_requests = [(user_id, user_levels[user_id], rng.sample(CATEGORIES[:-1], 2)) for user_id in requests[:500]]
+
+    def old_practice():
+        for user_id in requests:
+            conn.execute("SELECT level FROM users WHERE user_id = ?", (user_id,)).fetchone()
+            conn.execute("SELECT word_id, english, topic_id FROM words WHERE level = ? ORDER BY RANDOM() LIMIT 1",
+                         (user_levels[user_id],)).fetchone()
+
+    def new_practice():
+        for user_id in requests:
+            selection.next_items(user_id, 1)
+
+    def old_lesson():
+        for _, level, categories in lesson_requests:
+            conn.execute("""
+                SELECT word_id, english, turkish, example_sentence FROM words
+                WHERE category IN (?, ?) AND level = ? AND turkish IS NOT NULL AND turkish != ''
+                ORDER BY RANDOM() LIMIT 10
+            """, (*categories, level)).fetchall()
+
+    def new_lesson():
+        for user_id, level, categories in lesson_requests:
+            selection.next_items(user_id, 10, level=level, categories=categories)
+
+    def cold_build():
+        for user_id in requests[:200]:
+            selection.invalidate(user_id)
+            selection.next_items(user_id, 1)
+
+    rows = []
+    for name, fn, n in [
+        ("practice: ORDER BY RANDOM() LIMIT 1", old_practice, len(requests)),
+        ("practice: next_items(k=1)", new_practice, len(requests)),
+        ("lesson: ORDER BY RANDOM() LIMIT 10", old_lesson, len(lesson_requests)),
+        ("lesson: next_items(k=10, level, categories)", new_lesson, len(lesson_requests)),
+        ("cold heap build + next_items(k=1)", cold_build, 200),
+    ]:
+        start = time.perf_counter()
+        fn()
+        rows.append((name, (time.perf_counter() - start) * 1000 / n))
+    conn.close()
+
+    print()
+    print(f"{'işlem':<48} {'ms/istek':>10}")
+    for name, ms in rows:
+        print(f"{name:<48} {ms:>10.3f}")
+
+    if args.keep_db:
+        print(f"\nVeritabanı: {os.environ['APP_DB_PATH']}")
+    else:
+        import shutil
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
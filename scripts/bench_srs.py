@@ -0,0 +1,163 @@
+"""
+bench_srs.py
+
+Aralıklı tekrar (backend/srs.py) benchmark'ı.
+
+Geçici bir veritabanına N tekrar öğesi (varsayılan 1M, kullanıcılara
+dağıtılmış, vadeleri -30..+60 gün) ekler ve şunları ölçer:
+- vadesi gelen sayısı: srs_due_counts sayaçları vs (user_id, due_day) üzerinde COUNT(*)
+- vadesi gelen öğelerin okunması (get_due_items)
+- bir quiz oturumunun kaydı: apply_reviews ile tek transaction vs öğe başına
+  ayrı SELECT + UPDATE + commit (eski /review/submit yolu)
+- sm2 ve fsrs zamanlayıcıları
+
+Kullanım:
+    python scripts/bench_srs.py
+    python scripts/bench_srs.py --items 200000 --users 2000 --sessions 100 --session-size 30
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def seed(n_items: int, n_users: int, today: int, rng: random.Random):
+    """Kullanıcıları ve tekrar öğelerini ekler (trigger'lar sayaçları doldurur)."""
+    from db_utils import get_db_connection
+
+    conn = get_db_connection()
+    conn.executemany("INSERT INTO users (username) VALUES (?)", [(f"srs_user_{i}",) for i in range(n_users)])
+    user_ids = [row[0] for row in conn.execute("SELECT user_id FROM users ORDER BY user_id")]
+
+    batch = []
+    for i in range(n_items):
+        due_day = today + rng.randint(-30, 60)
+        batch.append((user_ids[i % n_users], f"word_{i}", "sentence", f"wrng_{i}", f"word_{i}",
+                      rng.randint(1, 5), rng.randint(0, 6), rng.randint(1, 60), round(rng.uniform(1.3, 2.8), 2),
+                      due_day))
+        if len(batch) >= 50000:
+            _insert(conn, batch)
+            batch = []
+    if batch:
+        _insert(conn, batch)
+    conn.commit()
+    conn.close()
+    return user_ids
+
+
+def _insert(conn, batch):
+    conn.executemany("""
+        INSERT INTO mistakes (user_id, item_key, context, wrong_answer, correct_answer,
+                              count, repetition, interval, easiness, due_day)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, batch)
+
+
+def timed(fn, repeat: int) -> float:
+    """Ortalama süre (ms)."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def per_item_reviews(user_id: int, results, today: int):
+    """Eski yol: her sonuç için ayrı bağlantı, SELECT + UPDATE + commit."""
+    from backend.srs import apply_reviews
+    for result in results:
+        apply_reviews(user_id, [result], scheduler="sm2", today=today)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SRS benchmark'ı")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--session-size", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep-db", action="store_true", help="geçici veritabanını silme")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="bench_srs_")
+    os.environ["APP_DB_PATH"] = os.path.join(tmp_dir, "bench_srs.db")
+    os.environ.setdefault("QUERY_STATS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    sys.path.insert(0, REPO_ROOT)
+
+    from db_utils import init_db, get_db_connection
+    from backend import srs
+
+    rng = random.Random(args.seed)
+    today = srs.epoch_day()
+
+    init_db()
+    start = time.perf_counter()
+    user_ids = seed(args.items, args.users, today, rng)
+    print(f"Seed: {args.items} öğe / {args.users} kullanıcı, {time.perf_counter() - start:.1f} s")
+
+    sample_users = [rng.choice(user_ids) for _ in range(args.sessions)]
+
+    conn = get_db_connection()
+
+    def due_count_scan():
+        for user_id in sample_users:
+            conn.execute("SELECT COUNT(*) FROM mistakes WHERE user_id = ? AND due_day <= ?", (user_id, today)).fetchone()
+
+    def due_count_counters():
+        for user_id in sample_users:
+            conn.execute(srs._DUE_COUNT_SQL, (user_id, today)).fetchone()
+
+    # Doğrulama: sayaçlar taramayla aynı sonucu vermeli
+    for user_id in sample_users[:20]:
+        scanned = conn.execute("SELECT COUNT(*) FROM mistakes WHERE user_id = ? AND due_day <= ?",
+                               (user_id, today)).fetchone()[0]
+        assert scanned == srs.get_due_count(user_id, today), f"sayaç uyuşmazlığı: user {user_id}"
+
+    rows = []
+    rows.append(("due count (COUNT(*) index scan)", timed(due_count_scan, 1) / len(sample_users)))
+    rows.append(("due count (srs_due_counts)", timed(due_count_counters, 1) / len(sample_users)))
+    rows.append(("get_due_items(limit=30)",
+                 timed(lambda: [srs.get_due_items(u, 30, today) for u in sample_users], 1) / len(sample_users)))
+    conn.close()
+
+    def sessions():
+        for user_id in sample_users:
+            items = srs.get_due_items(user_id, args.session_size, today)
+            yield user_id, [{"mistake_id": item["mistake_id"], "quality": rng.choice((1, 3, 4, 5))} for item in items]
+
+    session_list = list(sessions())
+    n = len(session_list)
+    half = n // 2
+
+    start = time.perf_counter()
+    for user_id, results in session_list[:half]:
+        per_item_reviews(user_id, results, today)
+    rows.append((f"session x{args.session_size}: per-item transactions", (time.perf_counter() - start) * 1000 / max(half, 1)))
+
+    for scheduler in ("sm2", "fsrs"):
+        subset = session_list[half:] if scheduler == "sm2" else session_list[:half]
+        start = time.perf_counter()
+        for user_id, results in subset:
+            srs.apply_reviews(user_id, results, scheduler=scheduler, today=today)
+        rows.append((f"session x{args.session_size}: apply_reviews ({scheduler})",
+                     (time.perf_counter() - start) * 1000 / max(len(subset), 1)))
+
+    print()
+    print(f"{'işlem':<48} {'ms/istek':>10}")
+    for name, ms in rows:
+        print(f"{name:<48} {ms:>10.3f}")
+
+    if args.keep_db:
+        print(f"\nVeritabanı: {os.environ['APP_DB_PATH']}")
+    else:
+        import shutil
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
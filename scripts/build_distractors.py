@@ -0,0 +1,164 @@
+"""
+build_distractors.py
+
+Çoktan seçmeli sorular için yanlış seçenek (distractor) index'ini kurar.
+
+Her çevirisi olan kelime için K makul yanlış seçenek seçilir:
+- aynı seviye; önce aynı kategori (word_categories birincil kategorisi), sonra
+  aynı sözcük türü (pos), sonra seviyenin geri kalanı
+- benzer uzunluk ve benzer yazım (ortak son ek / ilk harf): seçenekler
+  uzunluğuna veya bariz farklılığına bakılarak elenemesin
+- çevirileri doğru cevaptan ve birbirinden farklı; english'i doğru cevabı
+  içeren/ona dahil olan kelimeler (çoğul, türev) alınmaz
+
+Adaylar her grupta uzunluğa göre sıralı dizide kelimenin kendi konumunun
+±WINDOW komşuluğundan gelir (aynı uzunluktaki kelimeler farklı komşular görür);
+seviyeler bir process pool'da paralel işlenir. Sonuç word_distractors'a
+(word_id → int64 dizisi blob) tek transaction'da yazılır ve 'words' cache
+sürümü artırılır: vocab_store snapshot'ı id başına sabit genişlikte diziyle
+yeniden kurulur, soru üretimi seçenekleri tek dilimle okur.
+
+Kullanım:
+    python scripts/build_distractors.py
+    python scripts/build_distractors.py --k 8 --workers 4
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from db_utils import DB_PATH, bump_cache_version  # noqa: E402
+from vocab_store import fold  # noqa: E402
+
+K = 6
+WINDOW = 30
+
+# (word_id, english, turkish, category, pos)
+Word = Tuple[int, str, str, Optional[str], Optional[str]]
+
+
+def _common_suffix(a: str, b: str) -> int:
+    n = 0
+    for x, y in zip(reversed(a), reversed(b)):
+        if x != y:
+            break
+        n += 1
+    return n
+
+
+def _score(word: Word, cand: Word) -> float:
+    """Yüksek puan = daha makul yanlış seçenek."""
+    english, cand_english = word[1], cand[1]
+    score = -abs(len(english) - len(cand_english))
+    score += min(_common_suffix(english, cand_english), 4) * 0.5
+    if english[:1] == cand_english[:1]:
+        score += 0.5
+    if word[3] and word[3] == cand[3]:
+        score += 2
+    if word[4] and word[4] == cand[4]:
+        score += 1
+    return score
+
+
+def _window(group: List[Word], pos: int) -> List[Word]:
+    return group[max(pos - WINDOW, 0):pos + WINDOW + 1]
+
+
+def build_level(words: List[Word], k: int) -> List[Tuple[int, List[int]]]:
+    """Worker: bir seviyenin kelimeleri için [(word_id, [distractor_id, ...])]."""
+    # Eşit uzunlukta word_id sırası: pencere kelimenin kendi konumunda ortalanır
+    by_length = sorted(words, key=lambda w: (len(w[1]), w[0]))
+    pools: Dict[Tuple[str, str], List[Word]] = {}
+    for w in by_length:
+        if w[3]:
+            pools.setdefault(("category", w[3]), []).append(w)
+        if w[4]:
+            pools.setdefault(("pos", w[4]), []).append(w)
+    pools[("level", "")] = by_length
+    # (grup, word_id) → gruptaki konum
+    positions = {(key, w[0]): i for key, pool in pools.items() for i, w in enumerate(pool)}
+
+    result = []
+    for word in words:
+        word_id, english, turkish = word[0], word[1], fold(word[2])
+        candidates = {}
+        for key in (("category", word[3]), ("pos", word[4]), ("level", "")):
+            if key in pools:
+                for cand in _window(pools[key], positions[(key, word_id)]):
+                    candidates.setdefault(cand[0], cand)
+
+        picked, translations = [], {turkish}
+        for cand in sorted(candidates.values(), key=lambda c: (-_score(word, c), c[0])):
+            cand_turkish = fold(cand[2])
+            if (cand[0] == word_id or cand_turkish in translations
+                    or english in cand[1] or cand[1] in english):
+                continue
+            picked.append(cand[0])
+            translations.add(cand_turkish)
+            if len(picked) == k:
+                break
+        result.append((word_id, picked))
+    return result
+
+
+def build_distractors(k: int = K, workers: int = None, db_path: str = None) -> Dict[str, float]:
+    """
+    word_distractors tablosunu baştan kurar.
+
+    Returns:
+        {'words', 'complete', 'build_s', 'write_s'}
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path or DB_PATH, isolation_level=None, timeout=60)
+    try:
+        rows = conn.execute("""
+            SELECT w.word_id, LOWER(w.english), w.turkish, w.level, NULLIF(w.category, 'other'), w.pos
+            FROM words w
+            WHERE w.turkish IS NOT NULL AND w.turkish != '' AND w.level IS NOT NULL
+            ORDER BY w.word_id
+        """).fetchall()
+        levels: Dict[str, List[Word]] = {}
+        for word_id, english, turkish, level, category, pos in rows:
+            levels.setdefault(level, []).append((word_id, english, turkish, category, pos))
+        print(f"📚 {len(rows)} kelime, {len(levels)} seviye")
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [item for level_result in pool.map(build_level, levels.values(), [k] * len(levels))
+                       for item in level_result]
+        built_at = time.perf_counter()
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM word_distractors")
+        conn.executemany("INSERT INTO word_distractors (word_id, distractor_ids) VALUES (?, ?)",
+                         [(word_id, array('q', picked).tobytes()) for word_id, picked in results if picked])
+        bump_cache_version(conn.cursor(), 'words')
+        conn.execute("COMMIT")
+        finished = time.perf_counter()
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    report = {"words": len(results), "complete": sum(1 for _, picked in results if len(picked) == k),
+              "build_s": round(built_at - started, 3), "write_s": round(finished - built_at, 3)}
+    print(f"✅ {report['words']} kelime için yanlış seçenek yazıldı ({report['complete']} tanesi {k} seçenekli)")
+    print(f"   Süre: hesaplama {report['build_s']} s, yazma {report['write_s']} s")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yanlış seçenek index'ini kur")
+    parser.add_argument("--k", type=int, default=K, help="kelime başına yanlış seçenek")
+    parser.add_argument("--workers", type=int, default=None, help="process sayısı")
+    args = parser.parse_args()
+    build_distractors(args.k, args.workers)
@@ -5,10 +5,16 @@ Bu script veritabanındaki kelimeleri Türkçe'ye çevirir.
 Yavaş ama etkili. Batch'ler halinde çalışır ve progress gösterir.
 """
 
+import os
 import sqlite3
+import sys
 from pathlib import Path
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_utils import bump_cache_version  # noqa: E402
+
 # google-translate-new kullanacağız (googletrans daha stabil)
 try:
     from google_trans_new import google_translator
@@ -68,7 +74,9 @@ def enrich_turkish_translations():
             print(f"  ❌ '{english}' çevrilemedi: {str(e)[:50]}")
             time.sleep(1)  # Hata sonrası biraz daha bekle
     
-    # Commit et
+    # Commit et (kelime deposu ve word index yeni çevirileri görsün)
+    if translated:
+        bump_cache_version(cursor, 'words')
     conn.commit()
     
     print(f"\n✅ Çeviri tamamlandı!")
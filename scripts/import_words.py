@@ -1,21 +1,59 @@
 """
 import_words.py
 
-database_icin_kelime/data klasöründeki .txt dosyalarından kelimeleri oku,
-SQLite words tablosuna chunked şekilde ekle (INSERT OR IGNORE ile dedup).
+database_icin_kelime/data klasöründeki (veya bir .zip içindeki) konu .txt
+dosyalarından kelimeleri words tablosuna toplu yükler.
+
+Akış:
+1. Dosyalar bir process pool'da ayrıştırılır. Her worker kendi dosyasını satır
+   satır okur (dosya belleğe bütün alınmaz), geçersiz satırları eler ve dosya
+   içi tekrarları atar. Zip kaynağı extract edilmeden, üye üye okunur. Sadece
+   bir konu adıyla eşleşen .txt üyeleri kabul edilir; diğer her şey atlanır.
+2. Ayrıştırılan kelimeler, worker'lar çalışırken index'siz bir TEMP staging
+   tablosuna executemany ile yazılır (synchronous=OFF, temp_store=MEMORY,
+   büyük cache).
+3. Tek bir INSERT ... SELECT ile words'e birleştirilir. Konular arası
+   tekrarlarda ROW_NUMBER ile ilk dosya kazanır. Mevcut kelimeler
+   idx_words_english ile elenir. Eklenecek satır mevcut tablodan çoksa
+   words'ün diğer index'leri birleştirme sırasında düşürülür, sonra yeniden
+   kurulur.
+Yükleme tek transaction'dır ve sonunda aşama süreleri raporlanır. Kelime
+eklendiyse 'words' cache sürümü artırılır (çalışan uygulamada word index yenilenir).
 
 Kullanım:
     python scripts/import_words.py
+    python scripts/import_words.py --source words.zip --workers 4
 """
 
+import argparse
+import io
 import os
+import re
 import sqlite3
-from pathlib import Path
+import sys
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from db_utils import DB_PATH, bump_cache_version  # noqa: E402
 
 # Dosya yolları
-REPO_DATA_DIR = "database_icin_kelime/data"
-DB_PATH = "app.db"
-CHUNK_SIZE = 2000
+REPO_DATA_DIR = os.path.join(REPO_ROOT, "database_icin_kelime", "data")
+BATCH_SIZE = 20000
+MAX_MEMBER_BYTES = 50 * 1024 * 1024
+FILE_ORDER_STRIDE = 10 ** 7
+
+# Veri seti: küçük harf, tek satırda tek kelime/terim
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9 '.\-]{0,63}")
+
+
+def topic_name_for(member: str) -> str:
+    """'health_and_wellness.txt' → 'Health And Wellness' (seed_topics_from_repo ile aynı)."""
+    return os.path.splitext(os.path.basename(member))[0].replace('_', ' ').title()
 
 
 def get_topic_id_map(conn):
@@ -25,71 +63,167 @@ def get_topic_id_map(conn):
     return {row[1]: row[0] for row in cur.fetchall()}
 
 
-def import_words_from_repo():
+# ==================== KAYNAK ====================
+
+def list_members(source: str, topic_map: Dict[str, int]) -> List[str]:
     """
-    Repo dosyalarını oku ve words tablosuna ekle.
+    Kaynaktaki konu dosyalarını listeler (klasör veya zip; zip extract edilmez).
+    Konu adıyla eşleşmeyen, .txt olmayan veya çok büyük üyeler atlanır.
     """
-    if not os.path.isdir(REPO_DATA_DIR):
-        print(f"❌ Repo veri dizini bulunamadı: {REPO_DATA_DIR}")
-        return
-
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    # topic ID mapini al
-    topic_map = get_topic_id_map(conn)
-    print(f"📚 {len(topic_map)} topic bulundu")
-
-    # .txt dosyalarını işle
-    txt_files = sorted([f for f in os.listdir(REPO_DATA_DIR) if f.endswith('.txt')])
-    total_imported = 0
-    total_skipped = 0
-
-    for fname in txt_files:
-        file_path = os.path.join(REPO_DATA_DIR, fname)
-        topic_name = os.path.splitext(fname)[0].replace('_', ' ').title()
-        topic_id = topic_map.get(topic_name)
-
-        if not topic_id:
-            print(f"⚠️  Topic bulunamadı: {topic_name} (dosya: {fname})")
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as zf:
+            infos = [info for info in zf.infolist() if not info.is_dir()]
+        members, skipped = [], []
+        for info in infos:
+            if (info.filename.endswith(".txt") and topic_name_for(info.filename) in topic_map
+                    and info.file_size <= MAX_MEMBER_BYTES):
+                members.append(info.filename)
+            else:
+                skipped.append(info.filename)
+        if skipped:
+            print(f"⚠️  Zip'te konu dosyası olmayan üyeler atlandı: {', '.join(skipped)}")
+        if not members:
+            print(f"⚠️  Zip'te kullanılabilir kelime dosyası yok: {source}")
+        return sorted(members)
+
+    if not os.path.isdir(source):
+        raise FileNotFoundError(source)
+    members = []
+    for fname in sorted(f for f in os.listdir(source) if f.endswith('.txt')):
+        if topic_name_for(fname) in topic_map:
+            members.append(fname)
+        else:
+            print(f"⚠️  Topic bulunamadı: {topic_name_for(fname)} (dosya: {fname})")
+    return members
+
+
+def _iter_lines(source: str, member: str) -> Iterator[str]:
+    if source.endswith(".zip"):
+        with zipfile.ZipFile(source) as zf, zf.open(member) as raw:
+            yield from io.TextIOWrapper(raw, encoding="utf-8", errors="replace")
+    else:
+        with open(os.path.join(source, member), "r", encoding="utf-8", errors="replace") as f:
+            yield from f
+
+
+def parse_file(source: str, member: str) -> Tuple[str, List[str], int]:
+    """Worker: dosyayı satır satır okur. (üye, benzersiz kelimeler, reddedilen satır) döner."""
+    seen = set()
+    words = []
+    rejected = 0
+    for line in _iter_lines(source, member):
+        word = line.strip().lower()
+        if not word:
             continue
+        if not WORD_RE.fullmatch(word):
+            rejected += 1
+        elif word not in seen:
+            seen.add(word)
+            words.append(word)
+    return member, words, rejected
 
-        # Dosya satırlarını oku
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                words = [line.strip() for line in f if line.strip()]
-        except Exception as e:
-            print(f"❌ {fname} okunurken hata: {e}")
-            continue
 
-        # Chunked insert
-        for chunk_start in range(0, len(words), CHUNK_SIZE):
-            chunk = words[chunk_start : chunk_start + CHUNK_SIZE]
-            rows = [(w, None, None, topic_id, None, None, None, None) for w in chunk]
+# ==================== YÜKLEME ====================
 
-            try:
-                cur.executemany(
-                    """
-                    INSERT OR IGNORE INTO words 
-                    (english, turkish, level, topic_id, example_sentence, pronunciation, pos, freq)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    rows
-                )
-                chunk_imported = cur.rowcount
-                total_imported += chunk_imported
-            except Exception as e:
-                print(f"❌ {fname} chunk insert hatası: {e}")
-                continue
+def _tune_for_bulk_load(conn):
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-262144")  # 256 MB
 
-        print(f"✓ {fname}: {len(words)} kelime (eklenen: {min(len(words), chunk_imported or 0)})")
 
-    conn.commit()
-    conn.close()
+def import_words_from_repo(source: str = REPO_DATA_DIR, workers: int = None, db_path: str = None) -> Dict[str, float]:
+    """
+    Kaynağı (klasör veya .zip) ayrıştırıp words tablosuna birleştirir.
 
-    print(f"\n✅ İmport tamamlandı!")
-    print(f"   Toplam eklenen kelime: {total_imported}")
+    Returns:
+        {'files', 'parsed', 'rejected', 'staged', 'inserted', 'parse_stage_s', 'merge_s', 'index_s', 'total_s'}
+    """
+    started = time.perf_counter()
+    conn = sqlite3.connect(db_path or DB_PATH, isolation_level=None, timeout=60)
+    report = {"files": 0, "parsed": 0, "rejected": 0, "staged": 0, "inserted": 0}
+
+    try:
+        _tune_for_bulk_load(conn)
+        topic_map = get_topic_id_map(conn)
+        print(f"📚 {len(topic_map)} topic bulundu")
+        members = list_members(source, topic_map)
+        report["files"] = len(members)
+
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_words_english ON words(english)")
+        conn.execute("DROP TABLE IF EXISTS temp.word_staging")
+        conn.execute("CREATE TEMP TABLE word_staging (english TEXT NOT NULL, topic_id INTEGER, ord INTEGER NOT NULL)")
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        # Worker'lar ayrıştırırken sonuçlar sırayla staging'e yazılır
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(parse_file, [source] * len(members), members)
+            for file_idx, (member, words, rejected) in enumerate(results):
+                topic_id = topic_map[topic_name_for(member)]
+                base = file_idx * FILE_ORDER_STRIDE
+                for start in range(0, len(words), BATCH_SIZE):
+                    conn.executemany("INSERT INTO word_staging (english, topic_id, ord) VALUES (?, ?, ?)",
+                                     [(word, topic_id, base + start + i)
+                                      for i, word in enumerate(words[start:start + BATCH_SIZE])])
+                report["parsed"] += len(words)
+                report["rejected"] += rejected
+                print(f"✓ {member}: {len(words)} kelime" + (f" ({rejected} satır reddedildi)" if rejected else ""))
+        parsed_at = time.perf_counter()
+
+        existing = conn.execute("SELECT COUNT(*) FROM words").fetchone()[0]
+        report["staged"] = conn.execute("SELECT COUNT(*) FROM word_staging").fetchone()[0]
+
+        # Büyük yüklemede ikincil index'ler sona ertelenir (english index'i anti-join için kalır)
+        deferred = []
+        if report["staged"] > existing:
+            deferred = conn.execute("""
+                SELECT name, sql FROM sqlite_master
+                WHERE type = 'index' AND tbl_name = 'words' AND sql IS NOT NULL AND name != 'idx_words_english'
+            """).fetchall()
+            for name, _ in deferred:
+                conn.execute(f"DROP INDEX {name}")
+
+        cur = conn.execute("""
+            INSERT INTO words (english, topic_id)
+            SELECT english, topic_id FROM (
+                SELECT english, topic_id, ord,
+                       ROW_NUMBER() OVER (PARTITION BY english ORDER BY ord) AS rn
+                FROM word_staging
+            ) s
+            WHERE rn = 1 AND NOT EXISTS (SELECT 1 FROM words w WHERE w.english = s.english)
+            ORDER BY ord
+        """)
+        report["inserted"] = cur.rowcount
+        if report["inserted"]:
+            bump_cache_version(conn.cursor(), 'words')
+        merged_at = time.perf_counter()
+
+        for _, sql in deferred:
+            conn.execute(sql)
+        conn.execute("DROP TABLE temp.word_staging")
+        conn.execute("COMMIT")
+        finished = time.perf_counter()
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+    report.update(parse_stage_s=round(parsed_at - started, 3), merge_s=round(merged_at - parsed_at, 3),
+                  index_s=round(finished - merged_at, 3), total_s=round(finished - started, 3))
+
+    print("\n✅ İmport tamamlandı!")
+    print(f"   Dosya: {report['files']}, ayrıştırılan: {report['parsed']}, reddedilen satır: {report['rejected']}")
+    print(f"   Staging: {report['staged']}, eklenen kelime: {report['inserted']}")
+    print(f"   Süre: ayrıştırma+staging {report['parse_stage_s']} s, birleştirme {report['merge_s']} s, "
+          f"index {report['index_s']} s, toplam {report['total_s']} s")
+    return report
 
 
 if __name__ == "__main__":
-    import_words_from_repo()
+    parser = argparse.ArgumentParser(description="Kelime listelerini words tablosuna yükle")
+    parser.add_argument("--source", default=REPO_DATA_DIR, help="konu .txt dosyalarının klasörü veya .zip")
+    parser.add_argument("--workers", type=int, default=None, help="ayrıştırma process sayısı")
+    args = parser.parse_args()
+    import_words_from_repo(args.source, args.workers)
@@ -4,9 +4,15 @@ Demo: A1 kelimeleri için özel Türkçe çeviriler yükle.
 Bu script en sık kullanılan A1 kelimelerinin Türkçe çevirilerini yükler.
 """
 
+import os
 import sqlite3
+import sys
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db_utils import bump_cache_version  # noqa: E402
+
 DB_PATH = Path(__file__).parent.parent / "app.db"
 
 # A1 kelimeleri ve Türkçe çeviriler (sık kullanılanlar)
@@ -85,6 +91,8 @@ def load_translations():
         )
         updated += cursor.rowcount
     
+    # Kelime deposu ve word index yeni çevirileri görsün
+    bump_cache_version(cursor, 'words')
     conn.commit()
     
     # Sonuç kontrol et
@@ -8,10 +8,39 @@ Bu script, kelimeleri aşağıdaki kriterlere göre CEFR seviyelerine yeniden et
 - B2: İleri kelimeler, akademik ve profesyonel (analiz, strateji, karmaşık fiiller)
 - C1: Gelişmiş, nadir kullanılan kelimeler
 - C2: Çok nadir, uzman seviye kelimeler
+
+Seviyeler kelime başına UPDATE yerine küme halinde yazılır: etiketler bir process
+pool'da parça parça hesaplanır, TEMP bir staging tablosuna yazılır ve words tek
+bir UPDATE ... FROM ile güncellenir (sadece seviyesi değişen satırlar). Her satıra
+kural setinin sürümü (level_rules) yazılır; --incremental yalnızca yeni, english'i
+değişmiş veya eski kurallarla etiketlenmiş kelimeleri işler. Yazım 'words' cache
+sürümünü artırır, böylece çalışan uygulamadaki word index ve seçim heap'leri
+yenilenir.
+
+Kullanım:
+    python scripts/relabel_words_cefr.py --dry-run       # dağılım farkı, yazmaz
+    python scripts/relabel_words_cefr.py --incremental
+    python scripts/relabel_words_cefr.py --workers 4
 """
 
+import argparse
+import hashlib
+import inspect
 import sqlite3
 import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from db_utils import DB_PATH, bump_cache_version  # noqa: E402
+
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+CHUNK_SIZE = 20000
 
 # Temel CEFR kelime listeleri (İngilizce öğretimi standartlarına göre)
 A1_CORE_WORDS = {
@@ -378,9 +407,8 @@ C1_CORE_WORDS = {
 }
 
 def get_db_path():
-    """Veritabanı yolunu al."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    return os.path.join(os.path.dirname(script_dir), 'app.db')
+    """Veritabanı yolunu al (APP_DB_PATH, yoksa app.db)."""
+    return DB_PATH
 
 def calculate_word_difficulty(word, pos=None, length=None):
     """Kelime zorluğunu hesapla."""
@@ -458,42 +486,156 @@ def calculate_word_difficulty(word, pos=None, length=None):
     # Çünkü A1/A2 sadece bilinen, yaygın kelimeler olmalı
     return 'B1'
 
-def relabel_all_words():
-    """Tüm kelimeleri yeniden etiketle."""
-    db_path = get_db_path()
-    print(f"Veritabanı: {db_path}")
-    
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # Tüm kelimeleri al
-    cursor.execute("SELECT word_id, english, pos FROM words WHERE english IS NOT NULL")
-    words = cursor.fetchall()
-    
-    print(f"Toplam {len(words)} kelime işlenecek...")
-    
-    level_counts = {'A1': 0, 'A2': 0, 'B1': 0, 'B2': 0, 'C1': 0, 'C2': 0}
-    batch_size = 1000
-    updated = 0
-    
-    for i, (word_id, english, pos) in enumerate(words):
-        new_level = calculate_word_difficulty(english, pos)
+def rules_version() -> str:
+    """Kelime listeleri ve kural fonksiyonundan türetilen sürüm; kurallar değişince değişir."""
+    digest = hashlib.sha1()
+    for words in (A1_CORE_WORDS, A2_CORE_WORDS, B1_CORE_WORDS, B2_CORE_WORDS, C1_CORE_WORDS):
+        digest.update("\n".join(sorted(words)).encode("utf-8"))
+    digest.update(inspect.getsource(calculate_word_difficulty).encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def label_chunk(rows: List[Tuple[int, str, Optional[str]]]) -> List[Tuple[int, str]]:
+    """Worker: (word_id, english, pos) parçasını [(word_id, level)] listesine çevirir."""
+    return [(word_id, calculate_word_difficulty(english, pos)) for word_id, english, pos in rows]
+
+
+def label_words(rows: List[Tuple[int, str, Optional[str]]], workers: int = None) -> List[Tuple[int, str]]:
+    """Etiketleri parçalar halinde process pool'da hesaplar (küçük girdide süreç içinde)."""
+    if len(rows) <= CHUNK_SIZE or workers == 1:
+        return label_chunk(rows)
+    chunks = [rows[i:i + CHUNK_SIZE] for i in range(0, len(rows), CHUNK_SIZE)]
+    labels = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk_labels in pool.map(label_chunk, chunks):
+            labels.extend(chunk_labels)
+    return labels
+
+
+def _distribution(conn) -> Dict[Optional[str], int]:
+    return dict(conn.execute("SELECT level, COUNT(*) FROM words WHERE english IS NOT NULL GROUP BY level"))
+
+
+def write_levels(conn, labels: Iterable[Tuple[int, str]], rules: str, dry_run: bool = False) -> Dict[str, object]:
+    """
+    [(word_id, level)] etiketlerini staging tablosu + tek UPDATE ... FROM ile yazar.
+    Sadece seviyesi veya kural sürümü farklı olan satırlar güncellenir.
+    
+    Args:
+        conn: isolation_level=None bağlantı
+        rules: level_rules kolonuna yazılacak kural sürümü
+        dry_run: Değişiklikleri hesapla ama geri al
+    
+    Returns:
+        {'staged', 'changed', 'before', 'after', 'transitions'}
+    """
+    conn.execute("DROP TABLE IF EXISTS temp.relabel_staging")
+    conn.execute("CREATE TEMP TABLE relabel_staging (word_id INTEGER PRIMARY KEY, level TEXT NOT NULL)")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.executemany("INSERT OR REPLACE INTO relabel_staging (word_id, level) VALUES (?, ?)", labels)
+        staged = conn.execute("SELECT COUNT(*) FROM relabel_staging").fetchone()[0]
         
-        cursor.execute("UPDATE words SET level = ? WHERE word_id = ?", (new_level, word_id))
-        level_counts[new_level] = level_counts.get(new_level, 0) + 1
-        updated += 1
+        before = _distribution(conn)
+        transitions = Counter({
+            (old, new): n for old, new, n in conn.execute("""
+                SELECT w.level, s.level, COUNT(*)
+                FROM relabel_staging s JOIN words w ON w.word_id = s.word_id
+                WHERE w.level IS NOT s.level
+                GROUP BY w.level, s.level
+            """)
+        })
         
-        if (i + 1) % batch_size == 0:
-            conn.commit()
-            print(f"  {i + 1}/{len(words)} kelime işlendi...")
-    
-    conn.commit()
-    conn.close()
-    
-    print(f"\n✓ {updated} kelime yeniden etiketlendi!")
-    print("\nYeni seviye dağılımı:")
-    for level, count in sorted(level_counts.items()):
-        print(f"  {level}: {count} kelime")
+        cur = conn.execute("""
+            UPDATE words SET level = s.level, level_rules = ?
+            FROM relabel_staging s
+            WHERE words.word_id = s.word_id
+              AND (words.level IS NOT s.level OR words.level_rules IS NOT ?)
+        """, (rules, rules))
+        relabeled = cur.rowcount
+        after = _distribution(conn)
+        
+        if dry_run:
+            conn.execute("ROLLBACK")
+        else:
+            # level_rules yazmak seviyeyi değiştirmez; cache'ler sadece seviye değişince bayatlar
+            if transitions:
+                bump_cache_version(conn.cursor(), 'words')
+            conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.execute("DROP TABLE IF EXISTS temp.relabel_staging")
+    
+    return {"staged": staged, "changed": sum(transitions.values()), "relabeled": relabeled,
+            "before": before, "after": after, "transitions": transitions}
+
+
+def print_report(report: Dict[str, object], dry_run: bool):
+    """Seviye dağılımı farkını ve seviye geçişlerini yazdırır."""
+    before, after = report["before"], report["after"]
+    print(f"\n{'seviye':<8} {'önce':>9} {'sonra':>9} {'fark':>8}")
+    for level in LEVELS + [None]:
+        if level is None and not before.get(None) and not after.get(None):
+            continue
+        b, a = before.get(level, 0), after.get(level, 0)
+        print(f"{level or '-':<8} {b:>9} {a:>9} {a - b:>+8}")
+    
+    if report["transitions"]:
+        print("\nSeviye geçişleri:")
+        for (old, new), n in sorted(report["transitions"].items(), key=lambda item: -item[1]):
+            print(f"  {old or '-'} → {new}: {n}")
+    
+    verb = "değişecek" if dry_run else "değişti"
+    print(f"\n{'(dry-run) ' if dry_run else '✓ '}{report['staged']} kelime etiketlendi, "
+          f"{report['changed']} kelimenin seviyesi {verb}")
+
+
+def relabel_all_words(incremental: bool = False, dry_run: bool = False, workers: int = None,
+                      db_path: str = None) -> Dict[str, object]:
+    """
+    Kelimeleri yeniden etiketle.
+    
+    Args:
+        incremental: Sadece seviyesi olmayan, english'i değişmiş veya eski kural
+            sürümüyle etiketlenmiş kelimeler
+        dry_run: Dağılım farkını göster, yazma
+    """
+    db_path = db_path or get_db_path()
+    print(f"Veritabanı: {db_path}")
+    rules = rules_version()
+    started = time.perf_counter()
+    
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=60)
+    try:
+        conn.execute("PRAGMA temp_store=MEMORY")
+        query = "SELECT word_id, english, pos FROM words WHERE english IS NOT NULL"
+        params = ()
+        if incremental:
+            query += " AND (level IS NULL OR level_rules IS NOT ?)"
+            params = (rules,)
+        words = conn.execute(query, params).fetchall()
+        print(f"Toplam {len(words)} kelime işlenecek (kurallar: {rules})...")
+        
+        labels = label_words(words, workers)
+        labeled_at = time.perf_counter()
+        report = write_levels(conn, labels, rules, dry_run)
+    finally:
+        conn.close()
+    
+    finished = time.perf_counter()
+    report.update(label_s=round(labeled_at - started, 3), write_s=round(finished - labeled_at, 3))
+    print_report(report, dry_run)
+    print(f"   Süre: etiketleme {report['label_s']} s, yazma {report['write_s']} s")
+    return report
 
 if __name__ == "__main__":
-    relabel_all_words()
+    parser = argparse.ArgumentParser(description="Kelimeleri CEFR seviyelerine yeniden etiketle")
+    parser.add_argument("--incremental", action="store_true",
+                        help="sadece yeni/değişmiş veya eski kurallarla etiketlenmiş kelimeler")
+    parser.add_argument("--dry-run", action="store_true", help="seviye dağılımı farkını göster, yazma")
+    parser.add_argument("--workers", type=int, default=None, help="etiketleme process sayısı")
+    args = parser.parse_args()
+    relabel_all_words(args.incremental, args.dry_run, args.workers)
@@ -14,6 +14,10 @@ def main():
     print("🎓 KURS SİSTEMİ SEED")
     print("=" * 50)
     
+    # 0. Tablolar (import sırasında artık otomatik oluşturulmuyor)
+    print("\n0. Tablolar hazırlanıyor...")
+    course_system.ensure_tables()
+    
     # 1. CEFR Seviyeleri
     print("\n1. CEFR Seviyeleri ekleniyor...")
     course_system.seed_levels()
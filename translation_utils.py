@@ -3,17 +3,73 @@ Translation Utilities - Deep Translator API ile İngilizce-Türkçe çeviri
 Cache sistemi: Önce DB'den kontrol, yoksa API'den al ve DB'ye kaydet
 """
 
-from deep_translator import GoogleTranslator
 from difflib import SequenceMatcher
-import sqlite3
-import os
+from collections import OrderedDict
+import threading
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "app.db")
+from db_utils import DB_PATH, get_db_connection
+import vocab_store
+from log_utils import get_logger
+
+logger = get_logger("translation_utils")
+
+# Süreç içi LRU çeviri cache'i (english -> turkish).
+# Production'da master süreçte fork'tan önce ısıtılır (bkz. warmup.py),
+# worker'lar copy-on-write ile paylaşır.
+TRANSLATION_CACHE_SIZE = 20000
+_translation_cache = OrderedDict()
+_translation_cache_lock = threading.Lock()
 
 
 def _get_db_connection():
-    """Veritabanı bağlantısı oluşturur."""
-    return sqlite3.connect(DB_PATH)
+    """Veritabanı bağlantısı oluşturur (db_utils'teki ortak fabrika)."""
+    return get_db_connection()
+
+
+def _cache_get(english_word: str):
+    """LRU cache'ten çeviri döner (yoksa None)."""
+    with _translation_cache_lock:
+        value = _translation_cache.get(english_word)
+        if value is not None:
+            _translation_cache.move_to_end(english_word)
+        return value
+
+
+def _cache_put(english_word: str, turkish: str):
+    """LRU cache'e çeviri ekler, kapasite aşılırsa en eskisini atar."""
+    with _translation_cache_lock:
+        _translation_cache[english_word] = turkish
+        _translation_cache.move_to_end(english_word)
+        while len(_translation_cache) > TRANSLATION_CACHE_SIZE:
+            _translation_cache.popitem(last=False)
+
+
+def warm_translation_cache(limit: int = TRANSLATION_CACHE_SIZE) -> int:
+    """
+    Çevirisi olan kelimeleri LRU cache'e yükler (düşük seviyeler önce).
+    
+    Returns:
+        Cache'e yüklenen kelime sayısı
+    """
+    try:
+        conn = _get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT LOWER(english), turkish FROM words
+            WHERE turkish IS NOT NULL AND turkish != ''
+            ORDER BY level, word_id
+            LIMIT ?
+        """, (limit,))
+        rows = cursor.fetchall()
+        conn.close()
+    except Exception as e:
+        logger.error(f"Çeviri cache ısıtma hatası: {e}")
+        return 0
+    
+    # En sık kullanılan (düşük seviye) kelimeler en son eklenir → en geç atılır
+    for english, turkish in reversed(rows):
+        _cache_put(english, turkish)
+    return len(rows)
 
 
 def get_translation(english_word: str) -> str:
@@ -38,6 +94,18 @@ def get_translation(english_word: str) -> str:
     
     english_word = english_word.strip().lower()
     
+    # 0. Süreç içi LRU cache
+    cached = _cache_get(english_word)
+    if cached:
+        return cached
+    
+    # 0b. Paylaşılan kelime deposu (snapshot'tan sonra eklenen çeviriler için DB'ye düşülür)
+    store = vocab_store.get_store()
+    word = store.find(english_word, with_turkish=True) if store is not None else None
+    if word:
+        _cache_put(english_word, word["turkish"])
+        return word["turkish"]
+    
     # 1. DB'de var mı kontrol et
     try:
         conn = _get_db_connection()
@@ -52,11 +120,12 @@ def get_translation(english_word: str) -> str:
         if row and row[0]:
             # DB'de var, hızlıca dön
             conn.close()
+            _cache_put(english_word, row[0])
             return row[0]
         
         conn.close()
     except Exception as e:
-        print(f"DB okuma hatası: {e}")
+        logger.error(f"DB okuma hatası: {e}")
     
     # 2. DB'de yok, API'den al
     api_translation = translate_to_turkish(english_word)
@@ -64,6 +133,8 @@ def get_translation(english_word: str) -> str:
     if not api_translation:
         return None
     
+    _cache_put(english_word, api_translation)
+    
     # 3. API sonucunu DB'ye kaydet (cache)
     try:
         conn = _get_db_connection()
@@ -91,10 +162,10 @@ def get_translation(english_word: str) -> str:
         
         conn.commit()
         conn.close()
-        print(f"✓ Cache'e eklendi: {english_word} → {api_translation}")
+        logger.debug("✓ Cache'e eklendi: %s → %s", english_word, api_translation)
         
     except Exception as e:
-        print(f"DB yazma hatası: {e}")
+        logger.error(f"DB yazma hatası: {e}")
     
     return api_translation
 
@@ -110,11 +181,13 @@ def translate_to_turkish(english_word: str) -> str:
         Türkçe çeviri veya None (hata durumunda)
     """
     try:
+        # deep_translator ilk çeviri isteğinde yüklenir (lazy import)
+        from deep_translator import GoogleTranslator
         translator = GoogleTranslator(source='en', target='tr')
         result = translator.translate(english_word)
         return result.strip() if result else None
     except Exception as e:
-        print(f"Çeviri hatası: {e}")
+        logger.error(f"Çeviri hatası: {e}")
         return None
 
 
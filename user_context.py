@@ -0,0 +1,103 @@
+"""
+user_context.py
+
+İstek kapsamlı kullanıcı bağlamı: current_user() → g.user.
+
+Oturumdaki user_id için kimlik ve sık okunan alanlar (kullanıcı adı, seviye,
+seviye testi durumu, XP, can) tek sorguyla yüklenir ve istek boyunca g.user'da
+tutulur. Sorgu sonucu süreç-içi küçük bir TTL cache'inde (user_id anahtarlı)
+saklanır; aynı kullanıcının sonraki istekleri DB'ye gitmez.
+
+Bu alanları değiştiren kod yoldan sonra invalidate(user_id) çağrılır: yerel
+cache düşürülür ve oturumdaki user_rev artırılır. user_rev çerezle her isteğe
+gittiği için diğer worker'lar da kendi kopyalarını yeniden yükler; başka
+kaynaklardan gelen değişiklikler en geç USER_CACHE_TTL saniyede görünür.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from flask import g, has_request_context, session
+
+from db_utils import get_db_connection, get_user_id
+
+USER_CACHE_TTL = int(os.environ.get("USER_CACHE_TTL", 60))
+USER_CACHE_SIZE = 10000
+
+_cache: "OrderedDict[int, tuple]" = OrderedDict()  # user_id → (yüklenme zamanı, user_rev, kullanıcı)
+_cache_lock = threading.Lock()
+
+
+def _load(user_id: int) -> Optional[Dict[str, Any]]:
+    conn = get_db_connection()
+    try:
+        row = conn.execute("""
+            SELECT u.user_id, u.username, u.level, COALESCE(u.placement_test_done, 0),
+                   s.current_level, s.total_xp, s.hearts
+            FROM users u
+            LEFT JOIN user_course_state s ON s.user_id = u.user_id
+            WHERE u.user_id = ?
+        """, (user_id,)).fetchone()
+    finally:
+        conn.close()
+    if not row:
+        return None
+    return {
+        "user_id": row[0],
+        "username": row[1],
+        "level": row[2],
+        "placement_test_done": bool(row[3]),
+        "course_level": row[4],
+        "total_xp": row[5] or 0,
+        "hearts": row[6],
+    }
+
+
+def get_user(user_id: int, rev: int = 0) -> Optional[Dict[str, Any]]:
+    """Kullanıcı bağlamı; cache'te güncel (TTL içinde ve aynı user_rev) kopya varsa DB'ye gitmez."""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(user_id)
+        if entry and now - entry[0] < USER_CACHE_TTL and entry[1] == rev:
+            _cache.move_to_end(user_id)
+            return entry[2]
+
+    user = _load(user_id)
+    if user is not None:
+        with _cache_lock:
+            _cache[user_id] = (now, rev, user)
+            _cache.move_to_end(user_id)
+            while len(_cache) > USER_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return user
+
+
+def current_user() -> Optional[Dict[str, Any]]:
+    """
+    İsteğin kullanıcısı (giriş yoksa veya kullanıcı silinmişse None).
+    İstek başına bir kez çözülür; user_id'si olmayan eski oturumlara user_id yazılır.
+    """
+    if "user" in g:
+        return g.user
+    user = None
+    user_id = session.get("user_id")
+    if not user_id and session.get("username"):
+        user_id = get_user_id(session["username"])
+        if user_id:
+            session["user_id"] = user_id
+    if user_id:
+        user = get_user(user_id, session.get("user_rev", 0))
+    g.user = user
+    return user
+
+
+def invalidate(user_id: int):
+    """Kullanıcının seviye/test durumu/XP/can alanları değişti: cache'i düşür."""
+    with _cache_lock:
+        _cache.pop(user_id, None)
+    if has_request_context() and session.get("user_id") == user_id:
+        session["user_rev"] = session.get("user_rev", 0) + 1
+        g.pop("user", None)
@@ -14,6 +14,11 @@ from datetime import datetime, timedelta
 import json
 import time
 from db_utils import DB_PATH, get_db_connection, get_db
+from log_utils import get_logger
+from pagination import build_page, keyset_condition
+from backend import memory_model
+
+log = get_logger("user_db")
 
 
 class UserInputLogger:
@@ -69,10 +74,10 @@ class UserInputLogger:
                     datetime.now().isoformat(), metadata_json
                 ))
                 input_id = cursor.lastrowid
-                print(f"✓ Input kaydedildi [ID: {input_id}]")
+                log.debug("✓ Input kaydedildi [ID: %s]", input_id)
                 return input_id
         except Exception as e:
-            print(f"❌ Input kaydetme hatası: {e}")
+            log.error(f"❌ Input kaydetme hatası: {e}")
             return -1
     
     # ==================== USER ACTION LOG ====================
@@ -113,7 +118,7 @@ class UserInputLogger:
                 ))
                 return cursor.lastrowid
         except Exception as e:
-            print(f"❌ Aksiyon kaydetme hatası: {e}")
+            log.error(f"❌ Aksiyon kaydetme hatası: {e}")
             return -1
     
     # ==================== SESSION LOG ====================
@@ -139,10 +144,10 @@ class UserInputLogger:
                     ip_address, device_info
                 ))
                 session_id = cursor.lastrowid
-                print(f"✓ Oturum başladı [Session ID: {session_id}]")
+                log.debug("✓ Oturum başladı [Session ID: %s]", session_id)
                 return session_id
         except Exception as e:
-            print(f"❌ Oturum kaydetme hatası: {e}")
+            log.error(f"❌ Oturum kaydetme hatası: {e}")
             return -1
     
     def log_session_end(
@@ -163,7 +168,7 @@ class UserInputLogger:
                 
                 row = cursor.fetchone()
                 if not row:
-                    print(f"❌ Oturum bulunamadı: {session_id}")
+                    log.warning(f"❌ Oturum bulunamadı: {session_id}")
                     return False
                 
                 login_time = datetime.fromisoformat(row[0])
@@ -177,11 +182,11 @@ class UserInputLogger:
                     WHERE session_id = ?
                 """, (logout_time.isoformat(), duration_minutes, session_id))
                 
-                print(f"✓ Oturum kapandı [Süre: {duration_minutes} dakika]")
+                log.debug("✓ Oturum kapandı [Süre: %s dakika]", duration_minutes)
                 return True
         
         except Exception as e:
-            print(f"❌ Oturum kapatma hatası: {e}")
+            log.error(f"❌ Oturum kapatma hatası: {e}")
             return False
     
     # ==================== PRONUNCIATION LOG ====================
@@ -211,10 +216,14 @@ class UserInputLogger:
                     score, accuracy, feedback, datetime.now().isoformat()
                 ))
                 attempt_id = cursor.lastrowid
-                print(f"✓ Telaffuz kaydedildi [ID: {attempt_id}]")
+                # Skorsuz deneme (ör. tanıma başarısız) hafıza modeline yazılmaz (backend/tracker ile aynı)
+                if score is not None:
+                    memory_model.record_answer(cursor, user_id, word_id, score,
+                                               score >= memory_model.PRONUNCIATION_PASS_SCORE, 'pronunciation')
+                log.debug("✓ Telaffuz kaydedildi [ID: %s]", attempt_id)
                 return attempt_id
         except Exception as e:
-            print(f"❌ Telaffuz kaydetme hatası: {e}")
+            log.error(f"❌ Telaffuz kaydetme hatası: {e}")
             return -1
     
     # ==================== TRANSLATION LOG ====================
@@ -247,10 +256,16 @@ class UserInputLogger:
                     datetime.now().isoformat()
                 ))
                 translation_id = cursor.lastrowid
-                print(f"✓ Çeviri kaydedildi [ID: {translation_id}]")
+                if word_id is None:
+                    cursor.execute("SELECT word_id FROM words WHERE english = ? LIMIT 1", (english_word,))
+                    row = cursor.fetchone()
+                    word_id = row[0] if row else None
+                memory_model.record_answer(cursor, user_id, word_id,
+                                           (similarity_score or 0) * 100, is_correct, 'translation')
+                log.debug("✓ Çeviri kaydedildi [ID: %s]", translation_id)
                 return translation_id
         except Exception as e:
-            print(f"❌ Çeviri kaydetme hatası: {e}")
+            log.error(f"❌ Çeviri kaydetme hatası: {e}")
             return -1
     
     # ==================== İSTATİSTİKLER ====================
@@ -338,7 +353,7 @@ class UserInputLogger:
 
                 return stats
         except Exception as e:
-            print(f"❌ İstatistik alma hatası: {e}")
+            log.error(f"❌ İstatistik alma hatası: {e}")
             return stats
     
     def get_user_session_history(self, user_id: int, limit: int = 10) -> List[Dict]:
@@ -373,7 +388,7 @@ class UserInputLogger:
                 return sessions
         
         except Exception as e:
-            print(f"❌ Oturum geçmişi alma hatası: {e}")
+            log.error(f"❌ Oturum geçmişi alma hatası: {e}")
             return sessions
     
     def get_user_recent_inputs(self, user_id: int, limit: int = 20) -> List[Dict]:
@@ -409,9 +424,45 @@ class UserInputLogger:
                 return inputs
         
         except Exception as e:
-            print(f"❌ Son girişler alma hatası: {e}")
+            log.error(f"❌ Son girişler alma hatası: {e}")
             return inputs
     
+    def get_user_inputs_page(self, user_id: int, cursor_values: Optional[list] = None,
+                             limit: int = 20) -> Dict[str, Any]:
+        """
+        Kullanıcı girişlerini (timestamp, input_id) üzerinden keyset sayfalama ile döndür.
+        
+        Returns:
+            {'items': [...], 'next_cursor': str | None}
+        """
+        try:
+            condition, params = keyset_condition(('timestamp', 'input_id'), cursor_values)
+            with get_db() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT input_id, input_type, input_text, response_text, is_correct, 
+                           score, timestamp
+                    FROM user_inputs 
+                    WHERE user_id = ?{condition}
+                    ORDER BY timestamp DESC, input_id DESC
+                    LIMIT ?
+                """, [user_id, *params, limit + 1])
+                
+                rows = [{
+                    'input_id': row[0],
+                    'input_type': row[1],
+                    'input_text': row[2],
+                    'response_text': row[3],
+                    'is_correct': row[4],
+                    'score': row[5],
+                    'timestamp': row[6]
+                } for row in cursor.fetchall()]
+                return build_page(rows, limit, key=lambda r: (r['timestamp'], r['input_id']))
+        
+        except Exception as e:
+            log.error(f"❌ Son girişler alma hatası: {e}")
+            return {'items': [], 'next_cursor': None}
+    
     def get_word_performance(self, user_id: int) -> Dict[str, Any]:
         """
         Kelime çeviri performansını analiz et.
@@ -500,35 +551,24 @@ class UserInputLogger:
 
                 return performance
         except Exception as e:
-            print(f"❌ Kelime performansı alma hatası: {e}")
+            log.error(f"❌ Kelime performansı alma hatası: {e}")
             return performance
     
     # ==================== CLEANUP ====================
     
     def delete_old_logs(self, days: int = 30) -> int:
         """
-        Eski günlükleri sil.
+        Eski günlükleri sıcak tablolardan çıkar: günlük toplamlara katlanır,
+        aylık arşiv dosyalarına küçük batch'lerle taşınır (bkz. retention.py).
         """
-        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
-        deleted_count = 0
-        
+        import retention
         try:
-            with get_db() as conn:
-                cursor = conn.cursor()
-                tables = ['user_inputs', 'user_actions', 'session_logs', 
-                         'pronunciation_attempts', 'translation_log']
-                
-                for table in tables:
-                    cursor.execute(f"""
-                        DELETE FROM {table} WHERE timestamp < ?
-                    """, (cutoff_date,))
-                    deleted_count += cursor.rowcount
-                
-                print(f"✓ {deleted_count} eski kayıt silindi")
-                return deleted_count
-        
+            result = retention.run(days=days)
+            moved = sum(v for k, v in result.items() if k != 'vacuumed_pages')
+            log.info(f"✓ {moved} eski kayıt arşivlendi")
+            return moved
         except Exception as e:
-            print(f"❌ Eski kayıt silme hatası: {e}")
+            log.error(f"❌ Eski kayıt arşivleme hatası: {e}")
             return 0
     
     def export_user_data(self, user_id: int) -> Dict[str, Any]:
@@ -560,7 +600,7 @@ class UserInputLogger:
             return data
         
         except Exception as e:
-            print(f"❌ Veri dışa aktarma hatası: {e}")
+            log.error(f"❌ Veri dışa aktarma hatası: {e}")
             return data
 
 
@@ -0,0 +1,443 @@
+"""
+vocab_store.py
+
+Salt-okunur kelime deposu: words tablosunun sıcak yollarda okunan kolonları
+(id, english, turkish, örnek cümle, seviye/kategori kodu, topic, freq) tek bir
+snapshot dosyasında, dizi tabanlı kolonlar olarak tutulur.
+
+Dosya düzeni: 8 baytlık sihirli değer, 4 baytlık başlık uzunluğu, JSON başlık
+(sürüm, kelime sayısı, bölümlerin offset/uzunluk/typecode'u, seviye/kategori
+kod tabloları, grup aralıkları) ve 8 bayta hizalanmış bölümler:
+- ids (word_id artan sırada), level/category kodları, topic_id, freq
+- english/turkish/example: UTF-8 blob + offset dizisi
+- english_order: normalize english'e göre sıralı satır numaraları (ikili arama)
+- turkish_order: çevirisi olan satırlar, katlanmış (fold) turkish'e göre sıralı
+- trigram_codes/trigram_starts/trigram_rows: english ve turkish'in katlanmış
+  trigramlarından satırlara ters index (bulanık arama, bkz. backend/word_search)
+- postings: (seviye, kategori) gruplarının word_id listeleri
+- distractors: satır başına sabit genişlikte (distractor_k) yanlış seçenek
+  word_id'leri (word_distractors tablosundan; boş yerler 0)
+
+Dosya mmap ile açılır ve kolonlar memoryview.cast ile kopyalanmadan okunur;
+tüm worker'lar aynı sayfaları (OS page cache) paylaşır, worker başına kelime
+kopyası yoktur. Snapshot 'words' cache sürümüne (db_utils.bump_cache_version)
+bağlıdır; sürüm her veritabanında rastgele bir tabandan başladığı için yeniden
+oluşturulan bir veritabanı eski snapshot'ı kullanmaz. Sürüm değişince (toplu
+import, relabel, kategorize, toplu çeviri script'leri) ilk okuyan süreç
+yeniden kurar, diğerleri yeni dosyayı açar. Tekil yazımlar (API çevirisinin
+kaydı, telaffuzda eklenen kelime) sürümü artırmaz: depoda bulunmayan veri için
+çağıranlar DB'ye düşer.
+
+Gruplar (sadece çevirisi olan kelimeler, CourseSystem word index'i ile aynı):
+- "A1|_all": seviyedeki tüm kelimeler, "A1|_named": kategorisi olanlar,
+  "A1|food": kategori (word_categories; bir kelime birden fazla grupta olabilir)
+- "A1|_any": çevirisi olsun olmasın seviyedeki tüm kelimeler (/practice_word)
+"""
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+from db_utils import DB_PATH, get_db_connection, get_cache_version
+from log_utils import get_logger
+
+log = get_logger("vocab_store")
+
+MAGIC = b"VOCAB\x00\x03\x00"
+SNAPSHOT_PATH = os.environ.get("VOCAB_SNAPSHOT_PATH") or DB_PATH + ".vocab"
+ENABLED = os.environ.get("VOCAB_STORE", "1") != "0"
+# 'words' cache sürümünün kontrol aralığı (saniye)
+CHECK_SECONDS = int(os.environ.get("VOCAB_CHECK_SECONDS", 30))
+
+LEVELS = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
+
+_store = None
+_checked_at = None
+_store_lock = threading.Lock()
+
+
+# Türkçe karakterler ASCII karşılıklarına katlanır: "şeker", "seker" ve "SEKER" aynı anahtar
+_FOLD_TABLE = str.maketrans("çğıöşüâîû", "cgiosuaiu")
+
+
+def normalize(english: str) -> str:
+    return (english or "").strip().lower()
+
+
+def fold(text: str) -> str:
+    """Arama anahtarı: Türkçe büyük/küçük harf kuralları + aksan katlama."""
+    text = (text or "").strip().replace("İ", "i").replace("I", "ı").lower()
+    return text.translate(_FOLD_TABLE)
+
+
+def trigrams(key: str):
+    """Kelime sınırları boşlukla işaretlenmiş trigramlar (kısa kelimeler de en az bir trigram üretir)."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def trigram_code(trigram: str) -> int:
+    return (ord(trigram[0]) << 42) | (ord(trigram[1]) << 21) | ord(trigram[2])
+
+
+# ==================== KURULUM ====================
+
+def _blob(values: List[Optional[str]]):
+    """Metinleri tek UTF-8 blob'a yazar; None boş string olur (offset dizisi n+1 eleman)."""
+    offsets = array('I', [0])
+    parts = []
+    size = 0
+    for value in values:
+        data = (value or "").encode("utf-8")
+        parts.append(data)
+        size += len(data)
+        offsets.append(size)
+    return b"".join(parts), offsets
+
+
+def build_snapshot(path: str = None) -> Dict[str, Any]:
+    """
+    words tablosundan snapshot dosyasını kurar (geçici dosyaya yazıp atomik olarak değiştirir).
+
+    Returns:
+        Başlık (sürüm, kelime sayısı ...)
+    """
+    path = path or SNAPSHOT_PATH
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        # Sürüm ve satırlar aynı okuma transaction'ında (WAL snapshot'ı)
+        cursor.execute("BEGIN")
+        version = get_cache_version(cursor, 'words')
+        rows = cursor.execute("""
+            SELECT word_id, english, turkish, example_sentence, level, category, topic_id, freq
+            FROM words ORDER BY word_id
+        """).fetchall()
+        links = cursor.execute("SELECT word_id, category FROM word_categories ORDER BY word_id").fetchall()
+        distractor_blobs = dict(cursor.execute("SELECT word_id, distractor_ids FROM word_distractors"))
+        cursor.execute("COMMIT")
+    finally:
+        conn.close()
+
+    categories = sorted({row[5] for row in rows if row[5]} | {category for _, category in links})
+    category_codes = {category: code for code, category in enumerate(categories)}
+
+    ids = array('q', (row[0] for row in rows))
+    level_codes = array('b', (LEVELS.index(row[4]) if row[4] in LEVELS else -1 for row in rows))
+    category_col = array('h', (category_codes.get(row[5], -1) for row in rows))
+    topic_ids = array('q', (row[6] or 0 for row in rows))
+    freqs = array('d', (row[7] if row[7] is not None else math.nan for row in rows))
+    english_blob, english_offsets = _blob([row[1] for row in rows])
+    turkish_blob, turkish_offsets = _blob([row[2] for row in rows])
+    example_blob, example_offsets = _blob([row[3] for row in rows])
+    english_order = array('I', sorted(range(len(rows)), key=lambda i: (normalize(rows[i][1]), i)))
+    turkish_keys = {i: fold(row[2]) for i, row in enumerate(rows) if row[2]}
+    turkish_order = array('I', sorted(turkish_keys, key=lambda i: (turkish_keys[i], i)))
+
+    # Trigram ters index'i: kod sırasında trigramlar, her birinin satır listesi
+    trigram_lists: Dict[int, List[int]] = {}
+    for i, row in enumerate(rows):
+        grams = trigrams(fold(row[1]))
+        if i in turkish_keys:
+            grams |= trigrams(turkish_keys[i])
+        for gram in grams:
+            trigram_lists.setdefault(trigram_code(gram), []).append(i)
+    trigram_codes = array('q', sorted(trigram_lists))
+    trigram_starts = array('I', [0])
+    trigram_rows = array('I')
+    for code in trigram_codes:
+        trigram_rows.extend(trigram_lists[code])
+        trigram_starts.append(len(trigram_rows))
+
+    # (seviye, kategori) grupları
+    word_links: Dict[int, List[str]] = {}
+    for word_id, category in links:
+        word_links.setdefault(word_id, []).append(category)
+    group_lists: Dict[str, List[int]] = {}
+    for row in rows:
+        word_id, turkish, level = row[0], row[2], row[4]
+        if level is None:
+            continue
+        group_lists.setdefault(f"{level}|_any", []).append(word_id)
+        if not turkish:
+            continue
+        group_lists.setdefault(f"{level}|_all", []).append(word_id)
+        word_categories = word_links.get(word_id)
+        if word_categories:
+            group_lists.setdefault(f"{level}|_named", []).append(word_id)
+        for category in word_categories or ['other']:
+            group_lists.setdefault(f"{level}|{category}", []).append(word_id)
+    # Yanlış seçenekler: satır başına sabit genişlik → id'den O(1) dilim
+    distractor_lists = {}
+    for word_id, blob in distractor_blobs.items():
+        ids_list = array('q')
+        ids_list.frombytes(blob)
+        distractor_lists[word_id] = ids_list
+    distractor_k = max((len(v) for v in distractor_lists.values()), default=0)
+    distractors = array('q', bytes(8 * distractor_k * len(rows)))
+    for i, row in enumerate(rows):
+        for j, distractor_id in enumerate(distractor_lists.get(row[0], ())):
+            distractors[i * distractor_k + j] = distractor_id
+
+    postings = array('q')
+    groups = {}
+    for key in sorted(group_lists):
+        groups[key] = [len(postings), len(group_lists[key])]
+        postings.extend(group_lists[key])
+
+    sections = [
+        ("ids", ids), ("level", level_codes), ("category", category_col), ("topic_id", topic_ids),
+        ("freq", freqs), ("english_offsets", english_offsets), ("english", english_blob),
+        ("turkish_offsets", turkish_offsets), ("turkish", turkish_blob),
+        ("example_offsets", example_offsets), ("example", example_blob),
+        ("english_order", english_order), ("turkish_order", turkish_order),
+        ("trigram_codes", trigram_codes), ("trigram_starts", trigram_starts), ("trigram_rows", trigram_rows),
+        ("postings", postings), ("distractors", distractors),
+    ]
+    header = {"version": version, "count": len(rows), "built_at": time.time(), "distractor_k": distractor_k,
+              "levels": LEVELS, "categories": categories, "groups": groups, "sections": {}}
+
+    # Bölüm offset'leri başlığın boyutuna bağlı: önce göreli hesapla, sonra başlığı sabitle
+    relative = 0
+    for name, data in sections:
+        typecode = data.typecode if isinstance(data, array) else "B"
+        nbytes = len(data) * data.itemsize if isinstance(data, array) else len(data)
+        header["sections"][name] = [relative, nbytes, typecode]
+        relative += -(-nbytes // 8) * 8
+    base = 0
+    while True:
+        placed = dict(header, sections={name: [offset + base, nbytes, typecode]
+                                        for name, (offset, nbytes, typecode) in header["sections"].items()})
+        encoded = json.dumps(placed).encode("utf-8")
+        if len(MAGIC) + 4 + len(encoded) <= base:
+            break
+        base = -(-(len(MAGIC) + 4 + len(encoded) + 64) // 8) * 8
+    encoded = encoded.ljust(base - len(MAGIC) - 4)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(encoded)))
+        f.write(encoded)
+        for name, data in sections:
+            raw = data.tobytes() if isinstance(data, array) else data
+            f.write(raw)
+            f.write(b"\x00" * (-len(raw) % 8))
+    os.replace(tmp_path, path)
+    log.info(f"✓ Kelime snapshot'ı kuruldu: {len(rows)} kelime, sürüm {version}, {os.path.getsize(path)} bayt")
+    return placed
+
+
+# ==================== OKUMA ====================
+
+class VocabStore:
+    """mmap edilmiş snapshot üzerinde salt-okunur kelime deposu."""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Geçersiz kelime snapshot'ı: {path}")
+        header_len = struct.unpack_from("<I", view, len(MAGIC))[0]
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start:start + header_len]).decode("utf-8").rstrip())
+
+        self.path = path
+        self.version = header["version"]
+        self.count = header["count"]
+        self.categories = header["categories"]
+        self.distractor_k = header["distractor_k"]
+        self._groups = header["groups"]
+        self._columns = {}
+        for name, (offset, nbytes, typecode) in header["sections"].items():
+            self._columns[name] = view[offset:offset + nbytes].cast(typecode)
+        self._ids = self._columns["ids"]
+
+    def __len__(self):
+        return self.count
+
+    def _text(self, name: str, row: int) -> str:
+        offsets = self._columns[name + "_offsets"]
+        return bytes(self._columns[name][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def _row_of(self, word_id: int) -> int:
+        row = bisect.bisect_left(self._ids, word_id)
+        return row if row < self.count and self._ids[row] == word_id else -1
+
+    def _record(self, row: int) -> Dict[str, Any]:
+        level = self._columns["level"][row]
+        category = self._columns["category"][row]
+        freq = self._columns["freq"][row]
+        return {
+            "word_id": self._ids[row],
+            "english": self._text("english", row),
+            "turkish": self._text("turkish", row) or None,
+            "example_sentence": self._text("example", row) or None,
+            "level": LEVELS[level] if level >= 0 else None,
+            "category": self.categories[category] if category >= 0 else None,
+            "topic_id": self._columns["topic_id"][row] or None,
+            "freq": None if math.isnan(freq) else freq,
+        }
+
+    def get(self, word_id: int) -> Optional[Dict[str, Any]]:
+        """word_id ile kelime (yoksa None)."""
+        row = self._row_of(int(word_id))
+        return self._record(row) if row >= 0 else None
+
+    def get_many(self, word_ids) -> Dict[int, Dict[str, Any]]:
+        """Bulunan kelimeler {word_id: kelime}."""
+        found = {}
+        for word_id in word_ids:
+            record = self.get(word_id)
+            if record:
+                found[record["word_id"]] = record
+        return found
+
+    def _lower_bound(self, order, column: str, key_fn, key: str) -> int:
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key_fn(self._text(column, order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _english_range(self, english: str):
+        order = self._columns["english_order"]
+        key = normalize(english)
+        lo = self._lower_bound(order, "english", normalize, key)
+        while lo < self.count and normalize(self._text("english", order[lo])) == key:
+            yield order[lo]
+            lo += 1
+
+    def prefix_rows(self, prefix: str, lang: str = "en", limit: int = 1000) -> List[int]:
+        """
+        Öneki eşleşen satırlar (alfabetik sırayla, en fazla limit).
+        lang='en' → english (normalize), 'tr' → turkish (fold).
+        """
+        if lang == "tr":
+            order, column, key_fn = self._columns["turkish_order"], "turkish", fold
+        else:
+            order, column, key_fn = self._columns["english_order"], "english", normalize
+        key = key_fn(prefix)
+        if not key:
+            return []
+        rows = []
+        pos = self._lower_bound(order, column, key_fn, key)
+        while pos < len(order) and len(rows) < limit:
+            row = order[pos]
+            if not key_fn(self._text(column, row)).startswith(key):
+                break
+            rows.append(row)
+            pos += 1
+        return rows
+
+    def trigram_rows(self, trigram: str):
+        """Trigramı içeren satırlar (kopyasız memoryview; yoksa boş)."""
+        codes = self._columns["trigram_codes"]
+        code = trigram_code(trigram)
+        pos = bisect.bisect_left(codes, code)
+        if pos == len(codes) or codes[pos] != code:
+            return ()
+        starts = self._columns["trigram_starts"]
+        return self._columns["trigram_rows"][starts[pos]:starts[pos + 1]]
+
+    def distractors(self, word_id: int) -> List[int]:
+        """Kelimenin önceden hesaplanmış yanlış seçenek id'leri (yoksa boş)."""
+        row = self._row_of(int(word_id))
+        if row < 0 or not self.distractor_k:
+            return []
+        start = row * self.distractor_k
+        return [i for i in self._columns["distractors"][start:start + self.distractor_k] if i]
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Satır numarasıyla kelime (prefix_rows/trigram_rows sonuçları için)."""
+        return self._record(row)
+
+    def find(self, english: str, with_turkish: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Normalize edilmiş english ile kelime (aynı kelimenin tekrarlarında en küçük id).
+        with_turkish=True ise çevirisi olan ilk tekrar.
+        """
+        for row in self._english_range(english):
+            if not with_turkish or self._columns["turkish_offsets"][row] != self._columns["turkish_offsets"][row + 1]:
+                return self._record(row)
+        return None
+
+    def word_id_for(self, english: str) -> Optional[int]:
+        for row in self._english_range(english):
+            return self._ids[row]
+        return None
+
+    def group(self, level: str, key: str = "_all"):
+        """(seviye, kategori) grubunun word_id'leri (kopyasız memoryview; yoksa boş)."""
+        span = self._groups.get(f"{level}|{key}")
+        if not span:
+            return ()
+        return self._columns["postings"][span[0]:span[0] + span[1]]
+
+    def group_keys(self, level: str) -> List[str]:
+        prefix = f"{level}|"
+        return [key[len(prefix):] for key in self._groups if key.startswith(prefix)]
+
+
+def _db_version() -> int:
+    conn = get_db_connection()
+    try:
+        return get_cache_version(conn.cursor(), 'words')
+    finally:
+        conn.close()
+
+
+def _open_fresh(version: int) -> VocabStore:
+    """Snapshot dosyası güncelse açar, değilse yeniden kurup açar."""
+    if os.path.exists(SNAPSHOT_PATH):
+        try:
+            store = VocabStore(SNAPSHOT_PATH)
+            if store.version == version:
+                return store
+        except (ValueError, KeyError, OSError) as e:
+            log.warning(f"⚠️ Kelime snapshot'ı okunamadı, yeniden kuruluyor: {e}")
+    build_snapshot(SNAPSHOT_PATH)
+    return VocabStore(SNAPSHOT_PATH)
+
+
+def get_store() -> Optional[VocabStore]:
+    """
+    Güncel depoyu döner (en fazla CHECK_SECONDS'ta bir sürüm kontrolü yapar).
+    Devre dışıysa veya kurulamazsa None: çağıranlar DB'ye düşer.
+    """
+    global _store, _checked_at
+    if not ENABLED:
+        return None
+    # Kurulamadıysa da CHECK_SECONDS boyunca tekrar denenmez
+    if _checked_at is not None and time.monotonic() - _checked_at < CHECK_SECONDS:
+        return _store
+
+    with _store_lock:
+        if _checked_at is not None and time.monotonic() - _checked_at < CHECK_SECONDS:
+            return _store
+        try:
+            version = _db_version()
+            if _store is None or _store.version != version:
+                _store = _open_fresh(version)
+        except Exception as e:
+            log.error(f"❌ Kelime deposu yüklenemedi: {e}")
+            _store = None
+        _checked_at = time.monotonic()
+        return _store
+
+
+def load() -> int:
+    """Warmup adımı: depoyu açar (gerekirse kurar). Kelime sayısını döner."""
+    store = get_store()
+    return len(store) if store is not None else 0
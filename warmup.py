@@ -0,0 +1,95 @@
+"""
+warmup.py
+
+Production başlangıcında bellek içi cache'leri ısıtır.
+
+Gunicorn `preload_app` ile çalışırken bu işlem master süreçte, worker'lar
+fork edilmeden ÖNCE yapılır (bkz. gunicorn.conf.py). Böylece:
+- Kurs iskeleti (seviye → ünite → ders)
+- Kelime deposu snapshot'ı (vocab_store; mmap, page cache üzerinden paylaşılır)
+- Soru üretimi için kelime örnekleme index'i (seviye/kategori → word_id)
+- Seviye testi soru bankası (zorluk kovaları → word_id)
+- Çeviri LRU cache'i
+tüm worker'lar arasında copy-on-write bellek olarak paylaşılır. Worker'lar
+arasında ortak/paylaşılan durum yoktur; her worker kendi kopyasını okur.
+
+/readyz endpoint'i warmup tamamlanana kadar 503 döner.
+"""
+
+import threading
+import time
+from typing import Any, Dict
+
+from log_utils import get_logger
+
+log = get_logger("warmup")
+
+_status = {
+    "ready": False,
+    "started_at": None,
+    "finished_at": None,
+    "duration_ms": None,
+    "loaded": {},
+    "errors": [],
+}
+_warmup_lock = threading.Lock()
+
+
+def is_ready() -> bool:
+    """Warmup tamamlandı mı?"""
+    return _status["ready"]
+
+
+def warmup_status() -> Dict[str, Any]:
+    """Readiness endpoint'i için warmup durumunu döner."""
+    return dict(_status, loaded=dict(_status["loaded"]), errors=list(_status["errors"]))
+
+
+def run_warmup() -> Dict[str, Any]:
+    """
+    Tüm cache'leri sırayla yükler. Bir adım hata verirse diğerleri yine de
+    yüklenir; hatalı adımın verisi için uygulama DB'ye düşer.
+
+    Returns:
+        warmup_status() çıktısı
+    """
+    # Ağır importlar burada: app import edilirken warmup çalışmaz
+    from features.course_system import course_system
+    from features.placement import placement_engine
+    from translation_utils import warm_translation_cache
+    from features.leaderboard import LeaderboardManager
+    import profile_summary
+    import vocab_store
+
+    steps = [
+        ("course_lessons", course_system.load_skeleton),
+        ("vocab_store", vocab_store.load),
+        ("word_index", course_system.load_word_index),
+        ("placement_bank", placement_engine.load_bank),
+        ("translations", warm_translation_cache),
+        ("profile_streaks", profile_summary.refresh_streaks),
+        ("category_rankings", lambda: bool(LeaderboardManager().refresh_category_rankings())),
+    ]
+
+    with _warmup_lock:
+        if _status["ready"]:
+            return warmup_status()
+
+        started = time.perf_counter()
+        _status["started_at"] = time.time()
+        _status["errors"] = []
+
+        for name, loader in steps:
+            try:
+                _status["loaded"][name] = loader()
+            except Exception as e:
+                _status["errors"].append(f"{name}: {e}")
+                log.warning(f"⚠️ Warmup adımı başarısız ({name}): {e}")
+
+        _status["finished_at"] = time.time()
+        _status["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        _status["ready"] = True
+
+    loaded = ", ".join(f"{k}={v}" for k, v in _status["loaded"].items())
+    log.info(f"✓ Warmup tamamlandı ({_status['duration_ms']} ms): {loaded}")
+    return warmup_status()